@@ -0,0 +1,27 @@
+"""Add runner and heartbeat columns to jobs (durable inline executor)
+
+Revision ID: 005
+Revises: 004_customers_coupons_reviews
+Create Date: 2026-10-19
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "005_job_runner"
+down_revision = "004_customers_coupons_reviews"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("jobs", sa.Column("runner", sa.String(20), nullable=True))
+    op.add_column("jobs", sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_index("ix_jobs_runner_status", "jobs", ["runner", "status"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_jobs_runner_status", table_name="jobs")
+    op.drop_column("jobs", "heartbeat_at")
+    op.drop_column("jobs", "runner")
@@ -0,0 +1,30 @@
+"""Add parent_id to jobs (batch store generation)
+
+Revision ID: 006
+Revises: 005_job_runner
+Create Date: 2026-10-19
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+from alembic import op
+
+revision = "006_job_batches"
+down_revision = "005_job_runner"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("jobs", sa.Column("parent_id", UUID(as_uuid=True), nullable=True))
+    op.create_foreign_key(
+        "fk_jobs_parent_id", "jobs", "jobs", ["parent_id"], ["id"], ondelete="CASCADE"
+    )
+    op.create_index("ix_jobs_parent_id", "jobs", ["parent_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_jobs_parent_id", table_name="jobs")
+    op.drop_constraint("fk_jobs_parent_id", "jobs", type_="foreignkey")
+    op.drop_column("jobs", "parent_id")
@@ -0,0 +1,50 @@
+"""Unique slugs per store (products, categories) and per tenant (stores)
+
+Revision ID: 007
+Revises: 006_job_batches
+Create Date: 2026-10-19
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "007_unique_slugs"
+down_revision = "006_job_batches"
+branch_labels = None
+depends_on = None
+
+# table, scope column, constraint name
+_SLUG_SCOPES = [
+    ("stores", "tenant_id", "uq_stores_tenant_slug"),
+    ("products", "store_id", "uq_products_store_slug"),
+    ("categories", "store_id", "uq_categories_store_slug"),
+]
+
+
+def upgrade() -> None:
+    for table, scope, name in _SLUG_SCOPES:
+        # Older rows could share a slug (renames were not de-duplicated) — keep the
+        # oldest and suffix the rest with part of their id before adding the constraint
+        op.execute(
+            sa.text(
+                f"""
+                UPDATE {table} SET slug = slug || '-' || SUBSTR(CAST(id AS VARCHAR(36)), 1, 8)
+                WHERE id IN (
+                    SELECT id FROM (
+                        SELECT id, ROW_NUMBER() OVER (
+                            PARTITION BY {scope}, slug ORDER BY created_at, id
+                        ) AS position
+                        FROM {table}
+                    ) ranked
+                    WHERE position > 1
+                )
+                """
+            )
+        )
+        op.create_unique_constraint(name, table, [scope, "slug"])
+
+
+def downgrade() -> None:
+    for table, _scope, name in reversed(_SLUG_SCOPES):
+        op.drop_constraint(name, table, type_="unique")
@@ -0,0 +1,26 @@
+"""Add catalog_version to stores (bumped on catalog writes for cache invalidation)
+
+Revision ID: 008
+Revises: 007_unique_slugs
+Create Date: 2026-10-19
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "008_catalog_version"
+down_revision = "007_unique_slugs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "stores",
+        sa.Column("catalog_version", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("stores", "catalog_version")
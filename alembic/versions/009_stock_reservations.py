@@ -0,0 +1,41 @@
+"""Add stock_reservations table (TTL holds for unpaid orders)
+
+Revision ID: 009
+Revises: 008_catalog_version
+Create Date: 2026-10-19
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "009_stock_reservations"
+down_revision = "008_catalog_version"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stock_reservations",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("tenant_id", sa.Uuid(), sa.ForeignKey("tenants.id"), nullable=False),
+        sa.Column("order_id", sa.Uuid(), sa.ForeignKey("orders.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("product_id", sa.Uuid(), sa.ForeignKey("products.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False, server_default="held"),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_stock_reservations_tenant_id", "stock_reservations", ["tenant_id"])
+    op.create_index("ix_stock_reservations_order_id", "stock_reservations", ["order_id"])
+    op.create_index("ix_stock_reservations_product_id", "stock_reservations", ["product_id"])
+    op.create_index(
+        "ix_stock_reservations_status_expires", "stock_reservations", ["status", "expires_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("stock_reservations")
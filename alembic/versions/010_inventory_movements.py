@@ -0,0 +1,44 @@
+"""Add inventory_movements ledger table
+
+Revision ID: 010
+Revises: 009_stock_reservations
+Create Date: 2026-10-19
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "010_inventory_movements"
+down_revision = "009_stock_reservations"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "inventory_movements",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("tenant_id", sa.Uuid(), sa.ForeignKey("tenants.id"), nullable=False),
+        sa.Column("store_id", sa.Uuid(), sa.ForeignKey("stores.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("product_id", sa.Uuid(), sa.ForeignKey("products.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("order_id", sa.Uuid(), sa.ForeignKey("orders.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("kind", sa.String(20), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("reason", sa.String(100), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_inventory_movements_tenant_id", "inventory_movements", ["tenant_id"])
+    op.create_index("ix_inventory_movements_store_id", "inventory_movements", ["store_id"])
+    op.create_index("ix_inventory_movements_order_id", "inventory_movements", ["order_id"])
+    op.create_index(
+        "ix_inventory_movements_product_created",
+        "inventory_movements",
+        ["product_id", "created_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("inventory_movements")
@@ -0,0 +1,45 @@
+"""Add inventory_snapshots (point-in-time stock) with a baseline of current stock
+
+Revision ID: 011
+Revises: 010_inventory_movements
+Create Date: 2026-10-19
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "011_inventory_snapshots"
+down_revision = "010_inventory_movements"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "inventory_snapshots",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("tenant_id", sa.Uuid(), sa.ForeignKey("tenants.id"), nullable=False),
+        sa.Column("store_id", sa.Uuid(), sa.ForeignKey("stores.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("product_id", sa.Uuid(), sa.ForeignKey("products.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("stock_quantity", sa.Integer(), nullable=False),
+        sa.Column("taken_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_inventory_snapshots_tenant_id", "inventory_snapshots", ["tenant_id"])
+    op.create_index("ix_inventory_snapshots_store_id", "inventory_snapshots", ["store_id"])
+    op.create_index(
+        "ix_inventory_snapshots_product_taken", "inventory_snapshots", ["product_id", "taken_at"]
+    )
+
+    # Stock from before the ledger existed becomes the first snapshot of every product
+    op.execute(
+        """
+        INSERT INTO inventory_snapshots (id, tenant_id, store_id, product_id, stock_quantity, taken_at)
+        SELECT id, tenant_id, store_id, id, stock_quantity, CURRENT_TIMESTAMP FROM products
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("inventory_snapshots")
@@ -0,0 +1,47 @@
+"""Add payment_events table (deduplicated, queued gateway webhooks)
+
+Revision ID: 013
+Revises: 012_order_events
+Create Date: 2026-10-19
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "013_payment_events"
+down_revision = "012_order_events"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "payment_events",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("gateway", sa.String(20), nullable=False),
+        sa.Column("event_id", sa.String(255), nullable=False),
+        sa.Column("payment_id", sa.String(255), nullable=False),
+        sa.Column("order_number", sa.String(50), nullable=False),
+        sa.Column("order_id", sa.Uuid(), sa.ForeignKey("orders.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("gateway_status", sa.String(50), nullable=True),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False, server_default="received"),
+        sa.Column("result", sa.String(50), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("available_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("processed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("gateway", "event_id", name="uq_payment_events_gateway_event"),
+    )
+    op.create_index("ix_payment_events_order_id", "payment_events", ["order_id"])
+    op.create_index(
+        "ix_payment_events_status_available", "payment_events", ["status", "available_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("payment_events")
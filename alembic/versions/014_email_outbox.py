@@ -0,0 +1,39 @@
+"""Add email_outbox table (queued transactional emails)
+
+Revision ID: 014
+Revises: 013_payment_events
+Create Date: 2026-10-19
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "014_email_outbox"
+down_revision = "013_payment_events"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "email_outbox",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("to_address", sa.String(255), nullable=False),
+        sa.Column("subject", sa.String(500), nullable=False),
+        sa.Column("html", sa.Text(), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False, server_default="pending"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("provider_message_id", sa.String(255), nullable=True),
+        sa.Column("available_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("sent_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_email_outbox_status_available", "email_outbox", ["status", "available_at"])
+
+
+def downgrade() -> None:
+    op.drop_table("email_outbox")
@@ -0,0 +1,36 @@
+"""Add media_assets table (responsive image variants)
+
+Revision ID: 015
+Revises: 014_email_outbox
+Create Date: 2026-10-19
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "015_media_assets"
+down_revision = "014_email_outbox"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "media_assets",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("url", sa.String(500), nullable=False),
+        sa.Column("content_type", sa.String(100), nullable=False),
+        sa.Column("width", sa.Integer(), nullable=False),
+        sa.Column("height", sa.Integer(), nullable=False),
+        sa.Column("blurhash", sa.String(64), nullable=True),
+        sa.Column("variants", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("url", name="uq_media_assets_url"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("media_assets")
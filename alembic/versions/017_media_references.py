@@ -0,0 +1,53 @@
+"""Add media_references table (per-tenant references to media objects)
+
+Objects stored before this revision have no owner recorded, so no tenant
+can release them through the API.
+
+Revision ID: 017
+Revises: 016_media_objects
+Create Date: 2026-10-19
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "017_media_references"
+down_revision = "016_media_objects"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "media_references",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("tenant_id", sa.Uuid(), sa.ForeignKey("tenants.id"), nullable=False),
+        sa.Column(
+            "media_object_id",
+            sa.Uuid(),
+            sa.ForeignKey("media_objects.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("count", sa.Integer(), nullable=False, server_default="1"),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "tenant_id", "media_object_id", name="uq_media_references_tenant_object"
+        ),
+    )
+    op.create_index("ix_media_references_tenant_id", "media_references", ["tenant_id"])
+    op.create_index(
+        "ix_media_references_media_object_id", "media_references", ["media_object_id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_media_references_media_object_id", table_name="media_references")
+    op.drop_index("ix_media_references_tenant_id", table_name="media_references")
+    op.drop_table("media_references")
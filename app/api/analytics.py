@@ -11,12 +11,11 @@ from sqlalchemy import case, func, select, extract
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.middleware.auth import get_current_user
+from app.middleware.auth import Principal, get_current_user
 from app.models.customer import Customer
 from app.models.order import Order, OrderItem
 from app.models.product import Product
 from app.models.store import Store
-from app.models.user import User
 
 router = APIRouter()
 
@@ -65,7 +64,7 @@ class FullAnalytics(BaseModel):
     recent_orders_count: int = 0
 
 
-async def _verify_store_access(store_id: str, user: User, db: AsyncSession) -> Store:
+async def _verify_store_access(store_id: str, user: Principal, db: AsyncSession) -> Store:
     result = await db.execute(
         select(Store).where(Store.id == store_id, Store.tenant_id == user.tenant_id)
     )
@@ -79,7 +78,7 @@ async def _verify_store_access(store_id: str, user: User, db: AsyncSession) -> S
 async def get_analytics(
     store_id: str,
     period: str = Query("30d", regex="^(7d|30d|90d|12m)$"),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Get comprehensive store analytics."""
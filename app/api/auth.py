@@ -1,21 +1,23 @@
-"""Auth endpoints — register, login, refresh, me, email verification, password reset."""
+"""Auth endpoints — register, login, refresh, logout, me, email verification, password reset."""
 
 import secrets
 from datetime import UTC, datetime, timedelta
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_settings
 from app.database import get_db
-from app.middleware.auth import CurrentUser
+from app.middleware.auth import CurrentUser, security
 from app.middleware.rate_limit import limiter
 from app.models.user import User
 from app.schemas.auth import (
     ForgotPasswordRequest,
     LoginRequest,
+    LogoutRequest,
     MessageResponse,
     RefreshRequest,
     RegisterRequest,
@@ -35,10 +37,12 @@ from app.services.auth_service import (
     register_user,
 )
 from app.services.email_service import (
-    send_password_reset_email,
-    send_verification_email,
-    send_welcome_email,
+    queue_password_reset_email,
+    queue_verification_email,
+    queue_welcome_email,
 )
+from app.services.principal_cache import invalidate_principal
+from app.services.token_revocation import is_token_revoked, revoke_token
 
 router = APIRouter()
 settings = get_settings()
@@ -82,14 +86,10 @@ async def register(
     user.verification_token = code
     user.verification_token_expires = datetime.now(UTC) + timedelta(hours=24)
 
+    # Sent by the outbox worker — registration never waits on the mail provider
+    queue_verification_email(db, body.email, body.full_name, code)
     await db.commit()
 
-    # Send verification email (non-blocking — don't fail registration if email fails)
-    try:
-        await send_verification_email(body.email, body.full_name, code)
-    except Exception:
-        pass  # Email failure shouldn't block registration
-
     token_data = {"sub": str(user.id), "tenant_id": str(tenant.id), "role": user.role}
     access_token = create_access_token(token_data)
     refresh_token = create_refresh_token(token_data)
@@ -132,7 +132,7 @@ async def refresh(
     db: Annotated[AsyncSession, Depends(get_db)],
 ):
     payload = decode_token(body.refresh_token)
-    if not payload or payload.get("type") != "refresh":
+    if not payload or payload.get("type") != "refresh" or await is_token_revoked(payload):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="رمز التجديد غير صالح أو منتهي",
@@ -153,9 +153,31 @@ async def refresh(
     )
 
 
+@router.post("/logout", response_model=MessageResponse, summary="تسجيل الخروج")
+async def logout(
+    current_user: CurrentUser,
+    credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
+    body: LogoutRequest | None = None,
+):
+    """Revoke the presented access token and, if given, the session's refresh token."""
+    await revoke_token(decode_token(credentials.credentials))
+    if body and body.refresh_token:
+        payload = decode_token(body.refresh_token)
+        # Only the caller's own refresh token
+        if payload and payload.get("type") == "refresh" and payload["sub"] == str(current_user.id):
+            await revoke_token(payload)
+    return MessageResponse(message="تم تسجيل الخروج بنجاح")
+
+
 @router.get("/me", response_model=UserResponse, summary="بيانات المستخدم الحالي")
-async def me(current_user: CurrentUser):
-    return current_user
+async def me(
+    current_user: CurrentUser,
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    user = await get_user_by_id(db, current_user.id)
+    if not user:
+        raise HTTPException(status_code=404, detail="المستخدم غير موجود")
+    return user
 
 
 @router.patch("/me", response_model=UserResponse, summary="تحديث الملف الشخصي")
@@ -166,7 +188,7 @@ async def update_profile(
 ):
     from app.services.auth_service import hash_password, verify_password
 
-    user = await get_user_by_id(db, str(current_user.id))
+    user = await get_user_by_id(db, current_user.id)
     if not user:
         raise HTTPException(status_code=404, detail="المستخدم غير موجود")
 
@@ -179,14 +201,15 @@ async def update_profile(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="يجب إدخال كلمة المرور الحالية",
             )
-        if not verify_password(body.current_password, user.hashed_password):
+        if not await verify_password(body.current_password, user.hashed_password):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="كلمة المرور الحالية غير صحيحة",
             )
-        user.hashed_password = hash_password(body.new_password)
+        user.hashed_password = await hash_password(body.new_password)
 
     await db.commit()
+    await invalidate_principal(user.id)
     await db.refresh(user)
     return user
 
@@ -227,14 +250,9 @@ async def verify_email(
     user.email_verified = True
     user.verification_token = None
     user.verification_token_expires = None
+    queue_welcome_email(db, user.email, user.full_name)
     await db.commit()
 
-    # Send welcome email
-    try:
-        await send_welcome_email(user.email, user.full_name)
-    except Exception:
-        pass
-
     return MessageResponse(message="تم تأكيد البريد الإلكتروني بنجاح! 🎉")
 
 
@@ -258,10 +276,9 @@ async def resend_verification(
     code = _generate_code()
     user.verification_token = code
     user.verification_token_expires = datetime.now(UTC) + timedelta(hours=24)
+    queue_verification_email(db, user.email, user.full_name, code)
     await db.commit()
 
-    await send_verification_email(user.email, user.full_name, code)
-
     return MessageResponse(message="تم إرسال رمز التحقق إلى بريدك الإلكتروني")
 
 
@@ -287,10 +304,9 @@ async def forgot_password(
     code = _generate_code()
     user.reset_token = code
     user.reset_token_expires = datetime.now(UTC) + timedelta(hours=1)
+    queue_password_reset_email(db, user.email, user.full_name, code)
     await db.commit()
 
-    await send_password_reset_email(user.email, user.full_name, code)
-
     return MessageResponse(message="تم إرسال رمز إعادة التعيين إلى بريدك الإلكتروني")
 
 
@@ -318,9 +334,10 @@ async def reset_password(
             detail="رمز إعادة التعيين منتهي الصلاحية",
         )
 
-    user.hashed_password = hash_password(body.new_password)
+    user.hashed_password = await hash_password(body.new_password)
     user.reset_token = None
     user.reset_token_expires = None
     await db.commit()
+    await invalidate_principal(user.id)
 
     return MessageResponse(message="تم تغيير كلمة المرور بنجاح! يمكنك تسجيل الدخول الآن.")
@@ -19,6 +19,7 @@ from app.schemas.category import (
     CategoryUpdate,
 )
 from app.utils.db_helpers import get_store_or_404, slugify
+from app.utils.slugs import flush_with_unique_slugs
 
 router = APIRouter()
 
@@ -39,19 +40,6 @@ async def create_category(
 ):
     await get_store_or_404(db, store_id, ctx.tenant_id)
 
-    # Generate unique slug
-    base_slug = slugify(body.name)
-    slug = base_slug
-    counter = 1
-    while True:
-        exists = await db.execute(
-            select(Category.id).where(Category.store_id == store_id, Category.slug == slug)
-        )
-        if not exists.scalar_one_or_none():
-            break
-        slug = f"{base_slug}-{counter}"
-        counter += 1
-
     # Validate parent exists in same store
     if body.parent_id:
         parent = await db.execute(
@@ -63,14 +51,11 @@ async def create_category(
         if not parent.scalar_one_or_none():
             raise HTTPException(status_code=400, detail="القسم الأب غير موجود")
 
-    category = Category(
-        tenant_id=ctx.tenant_id,
-        store_id=store_id,
-        slug=slug,
-        **body.model_dump(),
+    category = Category(tenant_id=ctx.tenant_id, store_id=store_id, **body.model_dump())
+    # Unique slug within the store (re-allocated if a concurrent insert takes it)
+    await flush_with_unique_slugs(
+        db, Category, Category.store_id == store_id, [category], [slugify(body.name)]
     )
-    db.add(category)
-    await db.flush()
     await db.refresh(category)
     return category
 
@@ -156,13 +141,22 @@ async def update_category(
 
     update_data = body.model_dump(exclude_unset=True)
 
-    if "name" in update_data:
-        update_data["slug"] = slugify(update_data["name"])
-
-    for field, value in update_data.items():
-        setattr(category, field, value)
+    def apply_changes() -> None:
+        for field, value in update_data.items():
+            setattr(category, field, value)
 
-    await db.flush()
+    if "name" in update_data:
+        await flush_with_unique_slugs(
+            db,
+            Category,
+            Category.store_id == category.store_id,
+            [category],
+            [slugify(update_data["name"])],
+            prepare=apply_changes,
+        )
+    else:
+        apply_changes()
+        await db.flush()
     await db.refresh(category)
     return category
 
@@ -10,10 +10,9 @@ from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.middleware.auth import get_current_user
+from app.middleware.auth import Principal, get_current_user
 from app.models.coupon import Coupon
 from app.models.store import Store
-from app.models.user import User
 from app.schemas.coupon import (
     CouponCreate,
     CouponListResponse,
@@ -26,7 +25,7 @@ from app.schemas.coupon import (
 router = APIRouter()
 
 
-async def _verify_store_access(store_id: str, user: User, db: AsyncSession) -> Store:
+async def _verify_store_access(store_id: str, user: Principal, db: AsyncSession) -> Store:
     result = await db.execute(
         select(Store).where(Store.id == store_id, Store.tenant_id == user.tenant_id)
     )
@@ -40,7 +39,7 @@ async def _verify_store_access(store_id: str, user: User, db: AsyncSession) -> S
 async def list_coupons(
     store_id: str,
     is_active: bool | None = None,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """List all coupons for a store."""
@@ -67,7 +66,7 @@ async def list_coupons(
 async def create_coupon(
     store_id: str,
     data: CouponCreate,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new coupon."""
@@ -99,7 +98,7 @@ async def update_coupon(
     store_id: str,
     coupon_id: str,
     data: CouponUpdate,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Update a coupon."""
@@ -127,7 +126,7 @@ async def update_coupon(
 async def delete_coupon(
     store_id: str,
     coupon_id: str,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a coupon."""
@@ -10,11 +10,10 @@ from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.middleware.auth import get_current_user
+from app.middleware.auth import Principal, get_current_user
 from app.models.customer import Customer
 from app.models.order import Order
 from app.models.store import Store
-from app.models.user import User
 from app.schemas.customer import (
     CustomerListResponse,
     CustomerResponse,
@@ -25,7 +24,7 @@ from app.schemas.customer import (
 router = APIRouter()
 
 
-async def _verify_store_access(store_id: str, user: User, db: AsyncSession) -> Store:
+async def _verify_store_access(store_id: str, user: Principal, db: AsyncSession) -> Store:
     result = await db.execute(
         select(Store).where(Store.id == store_id, Store.tenant_id == user.tenant_id)
     )
@@ -42,7 +41,7 @@ async def list_customers(
     per_page: int = Query(20, ge=1, le=100),
     search: str | None = None,
     sort: str = "newest",
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """List store customers with search and pagination."""
@@ -90,7 +89,7 @@ async def list_customers(
 @router.get("/stores/{store_id}/customers/stats", response_model=CustomerStats)
 async def customer_stats(
     store_id: str,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Get customer statistics for a store."""
@@ -136,7 +135,7 @@ async def customer_stats(
 async def get_customer(
     store_id: str,
     customer_id: str,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Get single customer details."""
@@ -160,7 +159,7 @@ async def update_customer(
     store_id: str,
     customer_id: str,
     data: CustomerUpdate,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Update customer tags/notes."""
@@ -0,0 +1,116 @@
+"""Inventory endpoints — stock movements, ledger history and point-in-time stock."""
+
+import uuid
+from datetime import UTC, datetime
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.middleware.tenant import TenantCtx
+from app.models.inventory import InventoryMovement
+from app.models.product import Product
+from app.schemas.inventory import (
+    InventoryLevelResponse,
+    InventoryMovementCreate,
+    InventoryMovementListResponse,
+    InventoryMovementResponse,
+)
+from app.services.inventory_ledger import InsufficientStockError, apply_movement, stock_at
+from app.utils.db_helpers import bump_catalog_version
+
+router = APIRouter()
+
+
+async def _get_product_or_404(db: AsyncSession, product_id: uuid.UUID, tenant_id) -> Product:
+    product = await db.scalar(
+        select(Product).where(Product.id == product_id, Product.tenant_id == tenant_id)
+    )
+    if not product:
+        raise HTTPException(status_code=404, detail="المنتج غير موجود")
+    return product
+
+
+@router.post(
+    "/products/{product_id}/inventory/movements",
+    response_model=InventoryLevelResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="إضافة أو تعديل مخزون منتج",
+)
+async def create_movement(
+    product_id: uuid.UUID,
+    body: InventoryMovementCreate,
+    ctx: TenantCtx,
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    """Relative change (e.g. +24 received, -2 damaged) — safe under concurrent sales."""
+    product = await _get_product_or_404(db, product_id, ctx.tenant_id)
+    if body.quantity == 0:
+        raise HTTPException(status_code=400, detail="الكمية يجب ألا تكون صفراً")
+    try:
+        stock = await apply_movement(db, product, body.kind, body.quantity, reason=body.reason)
+    except InsufficientStockError as e:
+        raise HTTPException(
+            status_code=400, detail=f"المخزون غير كافٍ (المتبقي: {e.available})"
+        ) from e
+    await bump_catalog_version(db, product.store_id)
+    return InventoryLevelResponse(product_id=product.id, stock_quantity=stock)
+
+
+@router.get(
+    "/products/{product_id}/inventory/movements",
+    response_model=InventoryMovementListResponse,
+    summary="سجل حركات المخزون",
+)
+async def list_movements(
+    product_id: uuid.UUID,
+    ctx: TenantCtx,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    since: datetime | None = None,
+    until: datetime | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+):
+    await _get_product_or_404(db, product_id, ctx.tenant_id)
+
+    window = [InventoryMovement.product_id == product_id]
+    if since is not None:
+        window.append(InventoryMovement.created_at > since)
+    if until is not None:
+        window.append(InventoryMovement.created_at <= until)
+
+    result = await db.execute(
+        select(InventoryMovement)
+        .where(*window)
+        .order_by(InventoryMovement.created_at, InventoryMovement.id)
+        .limit(limit)
+    )
+    net_change = await db.scalar(
+        select(func.coalesce(func.sum(InventoryMovement.quantity), 0)).where(*window)
+    )
+    return InventoryMovementListResponse(
+        items=[InventoryMovementResponse.model_validate(m) for m in result.scalars()],
+        net_change=net_change,
+    )
+
+
+@router.get(
+    "/products/{product_id}/inventory",
+    response_model=InventoryLevelResponse,
+    summary="مخزون المنتج (الحالي أو في وقت سابق)",
+)
+async def get_inventory_level(
+    product_id: uuid.UUID,
+    ctx: TenantCtx,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    at: datetime | None = Query(None, description="Point in time (ISO 8601)"),
+):
+    product = await _get_product_or_404(db, product_id, ctx.tenant_id)
+    if at is None:
+        return InventoryLevelResponse(product_id=product.id, stock_quantity=product.stock_quantity)
+    if at.tzinfo is None:
+        at = at.replace(tzinfo=UTC)
+    return InventoryLevelResponse(
+        product_id=product.id, stock_quantity=await stock_at(db, product.id, at), at=at
+    )
@@ -1,9 +1,12 @@
-"""Job tracking endpoints — get status, list jobs."""
+"""Job tracking endpoints — get status, stream events, list jobs."""
 
+import json
 import uuid
+from collections.abc import AsyncIterator
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -11,9 +14,17 @@ from app.database import get_db
 from app.middleware.tenant import TenantCtx
 from app.models.job import Job
 from app.schemas.job import JobListResponse, JobResponse
+from app.services.job_events import TERMINAL_STATUSES, JobEventStream, get_job_broadcaster
 
 router = APIRouter()
 
+SSE_KEEPALIVE_SECONDS = 15.0
+
+
+def _sse(event_type: str, data: dict) -> str:
+    """Format one Server-Sent Event frame."""
+    return f"event: {event_type}\ndata: {json.dumps(data, default=str, ensure_ascii=False)}\n\n"
+
 
 @router.get("/{job_id}", response_model=JobResponse, summary="حالة المهمة")
 async def get_job(
@@ -29,6 +40,56 @@ async def get_job(
     return job
 
 
+@router.get("/{job_id}/events", summary="بث تقدم المهمة (SSE)")
+async def stream_job_events(
+    job_id: uuid.UUID,
+    ctx: TenantCtx,
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    """
+    Push progress, status and result of a job as Server-Sent Events.
+    One tenant-scoped lookup per connection — no polling of the jobs table, and
+    no database connection held while the stream is open.
+    """
+    # Subscribe before reading the snapshot so no event can fall in between
+    stream = await get_job_broadcaster().subscribe(str(job_id))
+    try:
+        stmt = select(Job).where(Job.id == job_id, Job.tenant_id == ctx.tenant_id)
+        job = (await db.execute(stmt)).scalar_one_or_none()
+    except Exception:
+        await stream.close()
+        raise
+    if not job:
+        await stream.close()
+        raise HTTPException(status_code=404, detail="المهمة غير موجودة")
+
+    snapshot = JobResponse.model_validate(job).model_dump(mode="json")
+    # get_db only closes after the stream ends; hand the connection back now
+    await db.close()
+    return StreamingResponse(
+        _job_event_frames(stream, snapshot),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _job_event_frames(stream: JobEventStream, snapshot: dict) -> AsyncIterator[str]:
+    try:
+        yield _sse("status", snapshot)
+        if snapshot["status"] in TERMINAL_STATUSES:
+            return
+        while True:
+            event = await stream.get(timeout=SSE_KEEPALIVE_SECONDS)
+            if event is None:
+                yield ": keepalive\n\n"
+                continue
+            yield _sse(event["type"], event)
+            if event.get("status") in TERMINAL_STATUSES:
+                return
+    finally:
+        await stream.close()
+
+
 @router.get("/", response_model=JobListResponse, summary="قائمة المهام")
 async def list_jobs(
     ctx: TenantCtx,
@@ -19,11 +19,20 @@ from app.models.product import Product
 from app.models.store import Store
 from app.schemas.order import (
     CheckoutRequest,
+    OrderBulkCancelRequest,
+    OrderBulkCancelResponse,
     OrderListResponse,
     OrderResponse,
     OrderSummary,
     OrderUpdateRequest,
 )
+from app.services.inventory_reservations import (
+    InsufficientStockError,
+    release_order_holds,
+    reserve_order_stock,
+)
+from app.services.order_cancellation import cancel_orders
+from app.services.order_events import emit_order_event, item_payload
 from app.utils.db_helpers import get_store_or_404
 
 router = APIRouter()
@@ -56,6 +65,7 @@ async def checkout(
 
     # Validate products & calculate totals
     order_items: list[OrderItem] = []
+    stock_lines: list[tuple[Product, int]] = []
     subtotal = Decimal("0.00")
 
     for cart_item in body.items:
@@ -99,10 +109,7 @@ async def checkout(
                 attributes=cart_item.attributes or {},
             )
         )
-
-        # Deduct inventory
-        if product.track_inventory:
-            product.stock_quantity -= cart_item.quantity
+        stock_lines.append((product, cart_item.quantity))
 
     # Calculate totals
     tax_amount = (subtotal * TAX_RATE).quantize(Decimal("0.01"))
@@ -139,6 +146,15 @@ async def checkout(
     )
     db.add(order)
     await db.flush()
+    # Guarded decrement per product; unpaid online payments get an expiring hold
+    try:
+        await reserve_order_stock(db, order, stock_lines, hold=body.payment_method != "cod")
+    except InsufficientStockError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"الكمية المطلوبة من '{e.product.name}' غير متوفرة (المتبقي: {e.available})",
+        ) from e
+    emit_order_event(db, order, "order.placed", items=item_payload(order_items))
     await db.refresh(order, attribute_names=["items"])
 
     return order
@@ -234,26 +250,47 @@ async def update_order(
         raise HTTPException(status_code=404, detail="الطلب غير موجود")
 
     update_data = body.model_dump(exclude_unset=True)
+    previous_status = order.status
 
     # If cancelling — restore inventory
     if update_data.get("status") == "cancelled" and order.status != "cancelled":
-        for item in order.items:
-            if item.product_id:
-                prod_result = await db.execute(
-                    select(Product).where(Product.id == item.product_id)
-                )
-                product = prod_result.scalar_one_or_none()
-                if product and product.track_inventory:
-                    product.stock_quantity += item.quantity
+        cancelled = await cancel_orders(db, [order.id], reason="admin")
+        await release_order_holds(db, cancelled)
 
     for field, value in update_data.items():
         setattr(order, field, value)
 
+    # Cancellations emit their own event from cancel_orders
+    if order.status not in (previous_status, "cancelled"):
+        emit_order_event(db, order, "order.status_changed", previous_status=previous_status)
+
     await db.flush()
     await db.refresh(order)
     return order
 
 
+@router.post(
+    "/stores/{store_id}/orders/cancel",
+    response_model=OrderBulkCancelResponse,
+    summary="إلغاء عدة طلبات",
+)
+@limiter.limit("10/minute")
+async def bulk_cancel_orders(
+    request: Request,
+    store_id: uuid.UUID,
+    body: OrderBulkCancelRequest,
+    ctx: TenantCtx,
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    """Cancel many orders at once (e.g. fraud); their stock is restored in one statement."""
+    await get_store_or_404(db, store_id, ctx.tenant_id)
+
+    order_ids = list(dict.fromkeys(body.order_ids))
+    cancelled = await cancel_orders(db, order_ids, reason=body.reason, store_id=store_id)
+    await release_order_holds(db, cancelled)
+    return OrderBulkCancelResponse(cancelled=cancelled, skipped=len(order_ids) - len(cancelled))
+
+
 @router.get(
     "/stores/{store_id}/orders/summary",
     response_model=OrderSummary,
@@ -3,7 +3,7 @@
 import uuid
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -12,6 +12,14 @@ from app.middleware.rate_limit import limiter
 from app.middleware.tenant import TenantCtx
 from app.models.order import Order
 from app.models.store import Store
+from app.services.inventory_reservations import convert_order_holds
+from app.services.job_queue import job_queue
+from app.services.payment_events import (
+    mark_order_paid,
+    parse_payment_webhook,
+    process_payment_event,
+    store_payment_event,
+)
 from app.services.payment_service import payment_service
 
 router = APIRouter()
@@ -92,21 +100,22 @@ async def payment_callback(
     if not order:
         raise HTTPException(status_code=404, detail="الطلب غير موجود")
 
-    # Determine gateway from payment_id prefix or metadata
-    gateway = "moyasar"
-    if order.payment_id and order.payment_id.startswith("chg_"):
-        gateway = "tap"
-    elif order.payment_id and order.payment_id.startswith("COD-"):
-        gateway = "cod"
-
     # Verify payment
+    gateway = payment_service.gateway_for(order.payment_id)
     verification = await payment_service.verify_payment(gateway, order.payment_id or "")
 
     if verification.success:
-        order.payment_status = "paid"
-        order.status = "paid"
-        order.payment_metadata = verification.metadata
-        await db.flush()
+        await mark_order_paid(db, order, order.payment_id, verification.metadata)
+        await db.commit()
+        if order.payment_status != "paid":
+            # Cancelled before the payment arrived and its stock is gone
+            return {
+                "status": "cancelled",
+                "order_number": order.order_number,
+                "message": "انتهت مهلة الطلب وأُلغي، وسيتم استرداد المبلغ",
+            }
+        # After the commit, so the sweeper never sees a released hold on an unpaid order
+        await convert_order_holds(db, [order.id])
         return {
             "status": "success",
             "order_number": order.order_number,
@@ -127,43 +136,22 @@ async def payment_callback(
 )
 async def payment_webhook(
     request: Request,
+    background_tasks: BackgroundTasks,
     db: Annotated[AsyncSession, Depends(get_db)],
 ):
-    """Handle payment gateway webhook notifications."""
+    """
+    Store the notification and acknowledge at once. Redeliveries are recognised
+    by (gateway, event id); verification and the order update run in the worker.
+    """
     body = await request.json()
-
-    # Extract order reference
-    order_number = None
-    payment_id = None
-    payment_status = None
-
-    # Moyasar webhook format
-    if "id" in body and "metadata" in body:
-        payment_id = body.get("id")
-        order_number = body.get("metadata", {}).get("order_id")
-        payment_status = body.get("status")
-
-    # Tap webhook format
-    elif "id" in body and "reference" in body:
-        payment_id = body.get("id")
-        order_number = body.get("reference", {}).get("order")
-        status_val = body.get("status", "")
-        payment_status = "paid" if status_val == "CAPTURED" else status_val.lower()
-
-    if not order_number:
+    webhook = parse_payment_webhook(body)
+    if webhook is None:
         return {"status": "ignored", "reason": "no order reference"}
 
-    result = await db.execute(select(Order).where(Order.order_number == order_number))
-    order = result.scalar_one_or_none()
-    if not order:
-        return {"status": "ignored", "reason": f"order {order_number} not found"}
-
-    if payment_status == "paid" and order.payment_status != "paid":
-        order.payment_status = "paid"
-        order.status = "paid"
-        order.payment_id = payment_id
-        order.payment_metadata = body
-        await db.flush()
-        return {"status": "updated", "order": order_number}
+    event_id = await store_payment_event(db, webhook, body)
+    if event_id is None:
+        return {"status": "duplicate", "order": webhook.order_number}
 
-    return {"status": "no_change", "order": order_number}
+    if not await job_queue.enqueue("process_payment_event", str(event_id), job_id=str(event_id)):
+        background_tasks.add_task(process_payment_event, event_id)
+    return {"status": "accepted", "order": webhook.order_number}
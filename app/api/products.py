@@ -1,24 +1,34 @@
 """Product endpoints — CRUD for store products."""
 
 import uuid
-from typing import Annotated
+from datetime import UTC, datetime
+from typing import Annotated, Literal
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy import func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.middleware.rate_limit import limiter
 from app.middleware.tenant import TenantCtx
+from app.models.job import Job
 from app.models.product import Product
 from app.models.store import Store
 from app.schemas.product import (
+    ProductBulkUpdateRequest,
+    ProductBulkUpdateResponse,
     ProductCreate,
+    ProductImportResponse,
     ProductListResponse,
     ProductResponse,
     ProductUpdate,
 )
-from app.utils.db_helpers import get_store_or_404, slugify
+from app.services.inventory_ledger import movement, record_movements
+from app.services.product_bulk import apply_bulk_changes
+from app.services.product_io import ImportFormatError, export_products, import_products
+from app.utils.db_helpers import bump_catalog_version, get_store_or_404, slugify
+from app.utils.slugs import flush_with_unique_slugs
 
 router = APIRouter()
 
@@ -39,27 +49,15 @@ async def create_product(
 ):
     await get_store_or_404(db, store_id, ctx.tenant_id)
 
-    # Generate unique slug
-    base_slug = slugify(body.name)
-    slug = base_slug
-    counter = 1
-    while True:
-        exists = await db.execute(
-            select(Product.id).where(Product.store_id == store_id, Product.slug == slug)
-        )
-        if not exists.scalar_one_or_none():
-            break
-        slug = f"{base_slug}-{counter}"
-        counter += 1
-
-    product = Product(
-        tenant_id=ctx.tenant_id,
-        store_id=store_id,
-        slug=slug,
-        **body.model_dump(),
+    product = Product(tenant_id=ctx.tenant_id, store_id=store_id, **body.model_dump())
+    # Unique slug within the store (re-allocated if a concurrent insert takes it)
+    await flush_with_unique_slugs(
+        db, Product, Product.store_id == store_id, [product], [slugify(body.name)]
     )
-    db.add(product)
-    await db.flush()
+    await record_movements(
+        db, [movement(product, "restock", product.stock_quantity, reason="initial")]
+    )
+    await bump_catalog_version(db, store_id)
     await db.refresh(product)
     return product
 
@@ -119,6 +117,102 @@ async def list_products(
     )
 
 
+@router.patch(
+    "/stores/{store_id}/products/bulk",
+    response_model=ProductBulkUpdateResponse,
+    summary="تحديث أسعار ومخزون منتجات متعددة",
+)
+@limiter.limit("20/minute")
+async def bulk_update_products(
+    request: Request,
+    store_id: uuid.UUID,
+    body: ProductBulkUpdateRequest,
+    ctx: TenantCtx,
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    """Rows are addressed by product_id or sku; unmatched rows are reported, not fatal."""
+    store = await get_store_or_404(db, store_id, ctx.tenant_id)
+
+    results = await apply_bulk_changes(db, store_id, body.changes)
+    updated = sum(1 for result in results if result.status == "updated")
+    # One version bump for the whole batch, not one per row
+    catalog_version = (
+        await bump_catalog_version(db, store_id) if updated else store.catalog_version
+    )
+    return ProductBulkUpdateResponse(
+        updated=updated,
+        failed=len(results) - updated,
+        catalog_version=catalog_version,
+        results=results,
+    )
+
+
+@router.post(
+    "/stores/{store_id}/products/import",
+    response_model=ProductImportResponse,
+    summary="استيراد منتجات من ملف CSV أو NDJSON",
+)
+@limiter.limit("5/minute")
+async def import_store_products(
+    request: Request,
+    store_id: uuid.UUID,
+    ctx: TenantCtx,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    format: Literal["csv", "ndjson"] = Query("csv"),
+):
+    """
+    The request body is the raw file. It is parsed while it uploads and inserted
+    in batches, so progress is visible on the returned job while the request runs.
+    """
+    await get_store_or_404(db, store_id, ctx.tenant_id)
+
+    job = Job(
+        tenant_id=ctx.tenant_id,
+        store_id=store_id,
+        type="product_import",
+        status="running",
+        started_at=datetime.now(UTC),
+    )
+    db.add(job)
+    await db.commit()
+
+    length = request.headers.get("content-length")
+    try:
+        summary = await import_products(
+            db,
+            job,
+            request.stream(),
+            format,
+            total_bytes=int(length) if length and length.isdigit() else None,
+        )
+    except ImportFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    return ProductImportResponse(job_id=job.id, status="done", **summary)
+
+
+@router.get(
+    "/stores/{store_id}/products/export",
+    summary="تصدير منتجات المتجر",
+)
+async def export_store_products(
+    store_id: uuid.UUID,
+    ctx: TenantCtx,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    format: Literal["csv", "ndjson"] = Query("csv"),
+):
+    store = await get_store_or_404(db, store_id, ctx.tenant_id)
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"{store.slug}-products.{format}"
+    # get_db only closes after the stream ends; hand the connection back now
+    await db.close()
+    return StreamingResponse(
+        export_products(store_id, format),
+        media_type=f"{media_type}; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @router.get(
     "/products/{product_id}",
     response_model=ProductResponse,
@@ -158,14 +252,34 @@ async def update_product(
 
     update_data = body.model_dump(exclude_unset=True)
 
-    # Re-slug if name changes
-    if "name" in update_data:
-        update_data["slug"] = slugify(update_data["name"])
+    # Setting stock directly is an adjustment in the ledger — lock the row to diff it
+    if update_data.get("stock_quantity") is not None:
+        current = await db.scalar(
+            select(Product.stock_quantity).where(Product.id == product.id).with_for_update()
+        )
+        await record_movements(
+            db,
+            [movement(product, "adjust", update_data["stock_quantity"] - current, reason="edit")],
+        )
 
-    for field, value in update_data.items():
-        setattr(product, field, value)
+    def apply_changes() -> None:
+        for field, value in update_data.items():
+            setattr(product, field, value)
 
-    await db.flush()
+    # Re-slug if name changes
+    if "name" in update_data:
+        await flush_with_unique_slugs(
+            db,
+            Product,
+            Product.store_id == product.store_id,
+            [product],
+            [slugify(update_data["name"])],
+            prepare=apply_changes,
+        )
+    else:
+        apply_changes()
+        await db.flush()
+    await bump_catalog_version(db, product.store_id)
     await db.refresh(product)
     return product
 
@@ -189,3 +303,4 @@ async def delete_product(
 
     await db.delete(product)
     await db.flush()
+    await bump_catalog_version(db, product.store_id)
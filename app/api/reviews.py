@@ -9,10 +9,9 @@ from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.middleware.auth import get_current_user
+from app.middleware.auth import Principal, get_current_user
 from app.models.review import Review
 from app.models.store import Store
-from app.models.user import User
 from app.schemas.review import (
     ReviewCreate,
     ReviewListResponse,
@@ -23,7 +22,7 @@ from app.schemas.review import (
 router = APIRouter()
 
 
-async def _verify_store_access(store_id: str, user: User, db: AsyncSession) -> Store:
+async def _verify_store_access(store_id: str, user: Principal, db: AsyncSession) -> Store:
     result = await db.execute(
         select(Store).where(Store.id == store_id, Store.tenant_id == user.tenant_id)
     )
@@ -40,7 +39,7 @@ async def list_reviews(
     per_page: int = Query(20, ge=1, le=100),
     product_id: str | None = None,
     is_approved: bool | None = None,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """List reviews for a store (admin)."""
@@ -77,7 +76,7 @@ async def update_review(
     store_id: str,
     review_id: str,
     data: ReviewUpdate,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Approve/reject or feature a review."""
@@ -105,7 +104,7 @@ async def update_review(
 async def delete_review(
     store_id: str,
     review_id: str,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a review."""
@@ -17,6 +17,7 @@ from sqlalchemy.orm import selectinload
 from app.database import get_db
 from app.middleware.rate_limit import limiter
 from app.models.category import Category
+from app.models.media import MediaAsset
 from app.models.order import Order, OrderItem
 from app.models.product import Product
 from app.models.store import Store
@@ -28,7 +29,11 @@ from app.schemas.storefront import (
     PublicProductListResponse,
     PublicProductResponse,
     PublicStoreResponse,
+    ResponsiveImage,
 )
+from app.services.inventory_reservations import InsufficientStockError, reserve_order_stock
+from app.services.media_service import media_assets_by_url, srcset
+from app.services.order_events import emit_order_event, item_payload
 
 router = APIRouter()
 
@@ -51,6 +56,44 @@ async def _get_store_by_slug(db: AsyncSession, slug: str) -> Store:
     return store
 
 
+# ═══════════════════════════════════════════════════════════
+#  Helper — Responsive Images
+# ═══════════════════════════════════════════════════════════
+
+
+def _product_image_urls(product: Product) -> list[str]:
+    urls = [product.image_url, *(product.images or [])]
+    return list(dict.fromkeys(url for url in urls if isinstance(url, str) and url))
+
+
+async def _media_for(
+    db: AsyncSession, products: list[Product] = (), categories: list[Category] = ()
+) -> dict[str, MediaAsset]:
+    """Variant records for every image on the page, in one query."""
+    urls = [url for p in products for url in _product_image_urls(p)]
+    urls += [c.image_url for c in categories]
+    return await media_assets_by_url(db, urls)
+
+
+def _responsive(url: str | None, media: dict[str, MediaAsset]) -> ResponsiveImage | None:
+    if not url:
+        return None
+    asset = media.get(url)
+    if asset is None:
+        return ResponsiveImage(url=url)
+    return ResponsiveImage(
+        url=url,
+        width=asset.width,
+        height=asset.height,
+        blurhash=asset.blurhash,
+        srcset=srcset(asset),
+    )
+
+
+def _product_media(product: Product, media: dict[str, MediaAsset]) -> list[ResponsiveImage]:
+    return [_responsive(url, media) for url in _product_image_urls(product)]
+
+
 # ═══════════════════════════════════════════════════════════
 #  GET /s/{slug} — Store Landing Page Data
 # ═══════════════════════════════════════════════════════════
@@ -105,6 +148,7 @@ async def get_store(
         .limit(10)
     )
     categories = cat_result.scalars().all()
+    media = await _media_for(db, featured_products, categories)
 
     config = store.config or {}
     ai_content = config.get("ai_content", {})
@@ -129,6 +173,7 @@ async def get_store(
                 slug=c.slug,
                 description=c.description,
                 image_url=c.image_url,
+                media=_responsive(c.image_url, media),
                 product_count=0,
             )
             for c in categories
@@ -145,6 +190,7 @@ async def get_store(
                 currency=p.currency,
                 image_url=p.image_url,
                 images=p.images or [],
+                media=_product_media(p, media),
                 is_featured=p.is_featured,
                 in_stock=p.stock_quantity > 0 if p.track_inventory else True,
                 category_name=None,
@@ -235,6 +281,7 @@ async def list_products(
             select(Category.id, Category.name).where(Category.id.in_(category_ids))
         )
         category_map = {row.id: row.name for row in cat_result}
+    media = await _media_for(db, products)
 
     return PublicProductListResponse(
         products=[
@@ -249,6 +296,7 @@ async def list_products(
                 currency=p.currency,
                 image_url=p.image_url,
                 images=p.images or [],
+                media=_product_media(p, media),
                 is_featured=p.is_featured,
                 in_stock=p.stock_quantity > 0 if p.track_inventory else True,
                 category_name=category_map.get(p.category_id) if p.category_id else None,
@@ -313,6 +361,7 @@ async def get_product(
             .limit(4)
         )
         related = rel_result.scalars().all()
+    media = await _media_for(db, [product, *related])
 
     return PublicProductResponse(
         id=product.id,
@@ -325,6 +374,7 @@ async def get_product(
         currency=product.currency,
         image_url=product.image_url,
         images=product.images or [],
+        media=_product_media(product, media),
         is_featured=product.is_featured,
         in_stock=product.stock_quantity > 0 if product.track_inventory else True,
         category_name=category_name,
@@ -343,6 +393,7 @@ async def get_product(
                 currency=r.currency,
                 image_url=r.image_url,
                 images=r.images or [],
+                media=_product_media(r, media),
                 is_featured=r.is_featured,
                 in_stock=r.stock_quantity > 0 if r.track_inventory else True,
                 category_name=category_name,
@@ -389,6 +440,7 @@ async def list_categories(
         .group_by(Product.category_id)
     )
     count_map = {row[0]: row[1] for row in count_result}
+    media = await _media_for(db, categories=categories)
 
     return PublicCategoryListResponse(
         categories=[
@@ -398,6 +450,7 @@ async def list_categories(
                 slug=c.slug,
                 description=c.description,
                 image_url=c.image_url,
+                media=_responsive(c.image_url, media),
                 product_count=count_map.get(c.id, 0),
             )
             for c in categories
@@ -435,6 +488,7 @@ async def public_checkout(
 
     # Validate products & calculate totals
     order_items: list[OrderItem] = []
+    stock_lines: list[tuple[Product, int]] = []
     subtotal = Decimal("0.00")
 
     for cart_item in body.items:
@@ -478,10 +532,7 @@ async def public_checkout(
                 attributes=cart_item.attributes or {},
             )
         )
-
-        # Deduct inventory
-        if product.track_inventory:
-            product.stock_quantity -= cart_item.quantity
+        stock_lines.append((product, cart_item.quantity))
 
     # Calculate totals
     tax_amount = (subtotal * TAX_RATE).quantize(Decimal("0.01"))
@@ -520,6 +571,16 @@ async def public_checkout(
     )
 
     db.add(order)
+    await db.flush()
+    # Guarded decrement per product; unpaid online payments get an expiring hold
+    try:
+        await reserve_order_stock(db, order, stock_lines, hold=body.payment_method != "cod")
+    except InsufficientStockError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"الكمية المطلوبة من '{e.product.name}' غير متوفرة (المتبقي: {e.available})",
+        ) from e
+    emit_order_event(db, order, "order.placed", items=item_payload(order_items))
     await db.commit()
     await db.refresh(order, attribute_names=["items"])
 
@@ -2,11 +2,10 @@
 
 import asyncio
 import uuid
-from datetime import UTC, datetime
 from typing import Annotated
 
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status
-from sqlalchemy import func, select, update
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
@@ -15,42 +14,33 @@ from app.middleware.rate_limit import limiter
 from app.middleware.tenant import TenantCtx
 from app.models.job import Job
 from app.models.store import Store
-from app.schemas.job import JobCreateResponse
+from app.schemas.job import BatchJobCreateResponse, BatchJobStatusResponse, JobCreateResponse
 from app.schemas.store import (
+    StoreBatchGenerateRequest,
     StoreGenerateRequest,
     StoreListResponse,
     StoreResponse,
     StoreUpdateRequest,
 )
-from app.services.store_generator import create_store_and_job, generate_store as run_store_generation
+from app.services.job_progress import batch_job_summary
+from app.services.job_queue import job_queue
+from app.services.store_generator import create_store_and_job, create_stores_and_jobs
+from app.services.store_webhooks import WebhookURLError, new_webhook_secret, resolve_webhook_url
+from app.workers.inline_executor import inline_executor
+from app.workers.store_worker import build_generation_config
 
 router = APIRouter()
 
-# Track background tasks to prevent GC before completion
-_background_tasks: set[asyncio.Task[None]] = set()
 
-
-@router.post(
-    "/generate",
-    response_model=JobCreateResponse,
-    status_code=status.HTTP_202_ACCEPTED,
-    summary="توليد متجر جديد بالذكاء الاصطناعي",
-)
-@limiter.limit("5/minute")
-async def generate_store(
-    request: Request,
-    body: StoreGenerateRequest,
-    ctx: TenantCtx,
-    db: Annotated[AsyncSession, Depends(get_db)],
-):
-    # ── Enforce store limit per plan ──
+async def _enforce_store_limit(db: AsyncSession, tenant_id: uuid.UUID, adding: int = 1) -> None:
+    """Reject the request if ``adding`` more stores would exceed the tenant's plan."""
     from app.config import get_settings
     from app.models.tenant import Tenant
 
     _settings = get_settings()
-    count_stmt = select(func.count()).select_from(Store).where(Store.tenant_id == ctx.tenant_id)
+    count_stmt = select(func.count()).select_from(Store).where(Store.tenant_id == tenant_id)
     store_count = (await db.execute(count_stmt)).scalar() or 0
-    tenant_result = await db.execute(select(Tenant).where(Tenant.id == ctx.tenant_id))
+    tenant_result = await db.execute(select(Tenant).where(Tenant.id == tenant_id))
     tenant = tenant_result.scalar_one_or_none()
     plan = tenant.plan if tenant else "free"
     plan_limits = {
@@ -64,6 +54,59 @@ async def generate_store(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=f"وصلت الحد الأقصى للمتاجر في خطة {plan} ({max_stores} متاجر). يرجى الترقية.",
         )
+    if store_count + adding > max_stores:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=(
+                f"لا يمكن إنشاء {adding} متاجر — المتبقي في خطة {plan} "
+                f"{max_stores - store_count} متاجر فقط. يرجى الترقية."
+            ),
+        )
+
+
+async def _dispatch_generation_jobs(db: AsyncSession, created: list[tuple[Store, Job]]) -> None:
+    """Hand committed jobs to ARQ; any that cannot be enqueued move to the inline executor."""
+    arq_pairs = [(store, job) for store, job in created if job.runner == "arq"]
+    if arq_pairs:
+        # Enqueue on the shared ARQ pool when Redis is healthy (production)
+        enqueued = await asyncio.gather(
+            *(
+                job_queue.enqueue(
+                    "process_store_generation",
+                    str(job.id),
+                    str(store.id),
+                    build_generation_config(store),
+                    job_id=str(job.id),
+                )
+                for store, job in arq_pairs
+            )
+        )
+        rejected = [job for (_, job), ok in zip(arq_pairs, enqueued, strict=True) if not ok]
+        for job in rejected:
+            job.runner = "inline"
+        if rejected:
+            await db.commit()
+
+    # Inline fallback: the jobs are already persisted — wake the in-process executor
+    if any(job.runner == "inline" for _, job in created):
+        await inline_executor.submit()
+
+
+@router.post(
+    "/generate",
+    response_model=JobCreateResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="توليد متجر جديد بالذكاء الاصطناعي",
+)
+@limiter.limit("5/minute")
+async def generate_store(
+    request: Request,
+    body: StoreGenerateRequest,
+    ctx: TenantCtx,
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    # ── Enforce store limit per plan ──
+    await _enforce_store_limit(db, ctx.tenant_id)
 
     request_data = body.model_dump()
     # Convert nested Pydantic models to dicts
@@ -75,102 +118,10 @@ async def generate_store(
                 else request_data[key]
             )
 
-    store, job = await create_store_and_job(db, ctx.tenant_id, request_data)
+    runner = "arq" if job_queue.available else "inline"
+    store, job = await create_store_and_job(db, ctx.tenant_id, request_data, runner=runner)
     await db.commit()
-
-    redis_available = False
-    # Try to enqueue ARQ job (production with Redis)
-    try:
-        from arq import create_pool
-        from arq.connections import RedisSettings
-
-        from app.config import get_settings
-
-        settings = get_settings()
-        redis_url = settings.REDIS_URL
-        host = redis_url.split("://")[1].split(":")[0]
-        port = int(redis_url.split(":")[2].split("/")[0])
-
-        pool = await asyncio.wait_for(
-            create_pool(RedisSettings(host=host, port=port)),
-            timeout=3.0,
-        )
-        await pool.enqueue_job(
-            "process_store_generation",
-            str(job.id),
-            str(store.id),
-            store.config or {},
-        )
-        await pool.close()
-        redis_available = True
-    except Exception as e:
-        print(f"⚠️ Redis unavailable, using inline generation: {e}")
-
-    # Inline fallback: generate directly without Redis/ARQ
-    if not redis_available:
-        async def _run_inline_generation(
-            job_id: str, store_id: str, config: dict
-        ):
-            from app.database import async_session_factory
-
-            async with async_session_factory() as session:
-                try:
-                    await session.execute(
-                        update(Job)
-                        .where(Job.id == job_id)
-                        .values(status="running", started_at=datetime.now(UTC), progress=10)
-                    )
-                    await session.commit()
-
-                    merged_config = dict(config or {})
-                    merged_config["name"] = request_data["name"]
-                    merged_config["store_type"] = request_data["store_type"]
-                    merged_config["language"] = request_data.get("language", "ar")
-
-                    _steps, result = await run_store_generation(job_id, store_id, merged_config)
-
-                    await session.execute(
-                        update(Store).where(Store.id == store_id).values(
-                            status="active",
-                            config=func.json_patch(Store.config, result.get("ai_content", {}))
-                            if hasattr(func, "json_patch")
-                            else result.get("ai_content", {}),
-                        )
-                    )
-
-                    # Update store config properly
-                    store_res = await session.execute(select(Store).where(Store.id == store_id))
-                    s = store_res.scalar_one_or_none()
-                    if s:
-                        new_config = dict(s.config or {})
-                        new_config["ai_content"] = result.get("ai_content", {})
-                        s.config = new_config
-                        s.status = "active"
-
-                    await session.execute(
-                        update(Job)
-                        .where(Job.id == job_id)
-                        .values(
-                            status="done", progress=100,
-                            result=result,
-                            completed_at=datetime.now(UTC),
-                        )
-                    )
-                    await session.commit()
-                    print(f"✅ Inline store generation complete: {store_id}")
-                except Exception as ex:
-                    await session.execute(
-                        update(Job)
-                        .where(Job.id == job_id)
-                        .values(status="failed", error=str(ex), completed_at=datetime.now(UTC))
-                    )
-                    await session.commit()
-                    print(f"❌ Inline generation failed: {ex}")
-
-        # Fire as background task (tracked to prevent GC)
-        task = asyncio.create_task(_run_inline_generation(str(job.id), str(store.id), store.config or {}))
-        _background_tasks.add(task)
-        task.add_done_callback(_background_tasks.discard)
+    await _dispatch_generation_jobs(db, [(store, job)])
 
     return JobCreateResponse(
         job_id=job.id,
@@ -180,6 +131,66 @@ async def generate_store(
     )
 
 
+@router.post(
+    "/generate/batch",
+    response_model=BatchJobCreateResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="توليد عدة متاجر دفعة واحدة",
+)
+@limiter.limit("2/minute")
+async def generate_stores_batch(
+    request: Request,
+    body: StoreBatchGenerateRequest,
+    ctx: TenantCtx,
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    """Create every store and job in bulk; generation fans out over the worker pool."""
+    await _enforce_store_limit(db, ctx.tenant_id, adding=len(body.stores))
+
+    batch = Job(tenant_id=ctx.tenant_id, type="store_batch", status="queued", progress=0)
+    db.add(batch)
+    await db.flush()
+
+    runner = "arq" if job_queue.available else "inline"
+    created = await create_stores_and_jobs(
+        db,
+        ctx.tenant_id,
+        [spec.model_dump() for spec in body.stores],
+        runner=runner,
+        parent_id=batch.id,
+    )
+    await db.commit()
+    await _dispatch_generation_jobs(db, created)
+
+    return BatchJobCreateResponse(
+        batch_id=batch.id,
+        job_ids=[job.id for _, job in created],
+        store_ids=[store.id for store, _ in created],
+        total=len(created),
+    )
+
+
+@router.get(
+    "/generate/batch/{batch_id}",
+    response_model=BatchJobStatusResponse,
+    summary="تقدم توليد الدفعة",
+)
+async def get_batch_status(
+    batch_id: uuid.UUID,
+    ctx: TenantCtx,
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    batch = await db.scalar(
+        select(Job.id).where(
+            Job.id == batch_id, Job.tenant_id == ctx.tenant_id, Job.type == "store_batch"
+        )
+    )
+    if batch is None:
+        raise HTTPException(status_code=404, detail="الدفعة غير موجودة")
+    summary = await batch_job_summary(db, batch_id)
+    return BatchJobStatusResponse(batch_id=batch_id, **summary)
+
+
 @router.get("/", response_model=StoreListResponse, summary="قائمة المتاجر")
 async def list_stores(
     ctx: TenantCtx,
@@ -249,7 +260,18 @@ async def update_store(
     if body.layout is not None:
         config["layout"] = body.layout
     if body.config is not None:
-        config.update(body.config)
+        changes = dict(body.config)
+        changes.pop("webhook_secret", None)  # generated here, never chosen by the client
+        if changes.get("webhook_url"):
+            try:
+                await resolve_webhook_url(changes["webhook_url"])
+            except WebhookURLError:
+                raise HTTPException(
+                    status_code=400,
+                    detail="رابط الـ webhook يجب أن يكون https ويشير إلى عنوان عام",
+                ) from None
+            config.setdefault("webhook_secret", new_webhook_secret())
+        config.update(changes)
     store.config = config
 
     await db.commit()
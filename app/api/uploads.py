@@ -1,14 +1,63 @@
-"""Upload endpoint — image upload for products & categories."""
+"""
+Upload endpoint — image upload for products & categories.
 
-from fastapi import APIRouter, File, Form, HTTPException, UploadFile, status
+The multipart body is spooled to a temporary file before the handler runs,
+so an oversized request is refused up front by its Content-Length (413).
+Chunked requests carry no length; for those the size limit applies while
+the spooled file is read, after the body was received.
+"""
 
-from app.middleware.tenant import TenantCtx
-from app.services.upload_service import upload_service
+from collections.abc import AsyncIterator, Callable, Coroutine
+from typing import Annotated, Any
 
-router = APIRouter()
+from fastapi import APIRouter, Depends, File, HTTPException, Request, Response, UploadFile, status
+from fastapi.routing import APIRoute
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.middleware.tenant import TenantCtx
+from app.services.media_service import (
+    PROCESSABLE_TYPES,
+    create_image_variants,
+    delete_stored_media,
+    discard_unrecorded_media,
+    media_assets_by_url,
+    release_image,
+    store_image,
+)
+from app.services.upload_service import UploadTooLargeError, hash_chunks
 
 ALLOWED_TYPES = {"image/jpeg", "image/png", "image/webp", "image/gif", "image/svg+xml"}
 MAX_SIZE = 5 * 1024 * 1024  # 5MB
+CHUNK_SIZE = 256 * 1024
+# Room for the multipart boundaries and part headers around the file
+MULTIPART_OVERHEAD = 16 * 1024
+
+
+class UploadRoute(APIRoute):
+    """Rejects a body declared larger than the upload limit before it is read."""
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def limited_handler(request: Request) -> Response:
+            length = request.headers.get("content-length", "")
+            if length.isdigit() and int(length) > MAX_SIZE + MULTIPART_OVERHEAD:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"حجم الملف يتجاوز الحد المسموح ({MAX_SIZE // (1024 * 1024)}MB)",
+                )
+            return await handler(request)
+
+        return limited_handler
+
+
+router = APIRouter(route_class=UploadRoute)
+
+
+async def _read_chunks(file: UploadFile) -> AsyncIterator[bytes]:
+    while chunk := await file.read(CHUNK_SIZE):
+        yield chunk
 
 
 @router.post(
@@ -18,35 +67,66 @@ MAX_SIZE = 5 * 1024 * 1024  # 5MB
 )
 async def upload_image(
     ctx: TenantCtx,
+    db: Annotated[AsyncSession, Depends(get_db)],
     file: UploadFile = File(),
-    folder: str = Form(default="products"),
 ):
-    """Upload an image to Cloudflare R2 or local storage."""
+    """
+    Upload an image to Cloudflare R2 or local storage, with responsive variants.
+    Content that is already stored is not stored again; the upload shares it.
+    New images are resized in the request (on the image process pool), so the
+    response already lists their variants.
+    """
     if file.content_type not in ALLOWED_TYPES:
         raise HTTPException(
             status_code=400,
             detail=f"نوع الملف غير مدعوم. الأنواع المدعومة: {', '.join(ALLOWED_TYPES)}",
         )
 
-    contents = await file.read()
-
-    if len(contents) > MAX_SIZE:
+    try:
+        # Hash the spooled file first: known content never reaches storage
+        measured = await hash_chunks(_read_chunks(file), max_size=MAX_SIZE)
+    except UploadTooLargeError:
         raise HTTPException(
             status_code=400,
             detail=f"حجم الملف يتجاوز الحد المسموح ({MAX_SIZE // (1024 * 1024)}MB)",
-        )
+        ) from None
 
-    url = await upload_service.upload_image(
-        file_bytes=contents,
-        filename=file.filename or "image.jpg",
-        content_type=file.content_type or "image/jpeg",
-        folder=f"{ctx.tenant_id}/{folder}",
+    await file.seek(0)
+    stored = await store_image(
+        db, ctx.tenant_id, measured.sha256, _read_chunks(file), file.content_type
     )
-
-    if not url:
+    if not stored:
         raise HTTPException(status_code=500, detail="فشل رفع الصورة")
+    media = stored.media
+
+    # Files written before their rows commit, removed again if the commit never happens
+    written = [media.url] if stored.created else []
+    try:
+        if stored.created and file.content_type in PROCESSABLE_TYPES:
+            await file.seek(0)
+            asset = await create_image_variants(
+                db, media.url, _read_chunks(file), file.content_type
+            )
+            written += [variant["url"] for variant in asset.variants] if asset else []
+        else:
+            asset = (await media_assets_by_url(db, [media.url])).get(media.url)
+        await db.commit()
+    except Exception:
+        await discard_unrecorded_media(db, media.sha256, written)
+        raise
 
-    return {"url": url, "filename": file.filename, "size": len(contents)}
+    return {
+        "url": media.url,
+        "filename": file.filename,
+        "size": media.size,
+        "sha256": media.sha256,
+        # Only about the caller's own uploads — never reveals other tenants' content
+        "deduplicated": stored.duplicate,
+        "width": asset.width if asset else None,
+        "height": asset.height if asset else None,
+        "blurhash": asset.blurhash if asset else None,
+        "variants": asset.variants if asset else [],
+    }
 
 
 @router.delete(
@@ -56,9 +136,16 @@ async def upload_image(
 )
 async def delete_image(
     ctx: TenantCtx,
+    db: Annotated[AsyncSession, Depends(get_db)],
     url: str,
 ):
-    """Delete an uploaded image."""
-    success = await upload_service.delete_image(url)
-    if not success:
+    """
+    Release one of the tenant's uploads of ``url``. Content shared with other
+    uploads is kept until the last one is deleted.
+    """
+    urls = await release_image(db, ctx.tenant_id, url)
+    if urls is None:
         raise HTTPException(status_code=404, detail="الصورة غير موجودة أو لا يمكن حذفها")
+    # Files go only once the rows are committed away: a rollback keeps both
+    await db.commit()
+    await delete_stored_media(urls)
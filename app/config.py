@@ -34,11 +34,40 @@ class Settings(BaseSettings):
     # ── Redis (Optional) ──
     REDIS_URL: str = ""
 
+    # ── In-process job executor (used when Redis is unavailable) ──
+    INLINE_JOB_WORKERS: int = 3
+    INLINE_JOBS_PER_TENANT: int = 2
+
+    # ── Inventory holds for unpaid orders ──
+    STOCK_RESERVATION_TTL_MINUTES: int = 30
+    STOCK_RESERVATION_SWEEP_INTERVAL: int = 60  # seconds
+    INVENTORY_SNAPSHOT_INTERVAL: int = 3600  # seconds
+
+    # ── Order event outbox (emails, store webhooks, customer stats) ──
+    ORDER_EVENT_DISPATCH_INTERVAL: int = 5  # seconds
+    ORDER_EVENT_MAX_ATTEMPTS: int = 8
+
+    # ── Payment webhooks (stored on receipt, verified and applied in the background) ──
+    PAYMENT_EVENT_RETRY_INTERVAL: int = 30  # seconds
+    PAYMENT_EVENT_MAX_ATTEMPTS: int = 10
+    # Unpaid orders with a payment are re-verified with the gateway after this long
+    PAYMENT_RECONCILE_INTERVAL_MINUTES: int = 10
+    PAYMENT_RECONCILE_AFTER_MINUTES: int = 15
+    PAYMENT_RECONCILE_WINDOW_HOURS: int = 48
+    PAYMENT_RECONCILE_CONCURRENCY: int = 10
+
     # ── JWT ──
     JWT_SECRET_KEY: str = "CHANGE-ME-generate-a-real-secret-with-openssl-rand-hex-64"
     JWT_ALGORITHM: str = "HS256"
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     JWT_REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    PRINCIPAL_CACHE_TTL: int = 60  # seconds an authenticated user's id/tenant/role is cached
+    JWT_CACHE_SIZE: int = 10_000  # verified tokens kept per process
+    TOKEN_REVOCATION_SYNC_INTERVAL: float = 2.0  # seconds between revocation list refreshes
+
+    # ── Password hashing (bcrypt, off the event loop) ──
+    PASSWORD_HASH_ROUNDS: int = 12  # hashes with a lower cost are rehashed at login
+    PASSWORD_HASH_CONCURRENCY: int = 4  # bcrypt threads per process
 
     # ── Security ──
     MAX_STORES_FREE: int = 3
@@ -67,6 +96,9 @@ class Settings(BaseSettings):
     GEMINI_MODEL: str = "gemini-2.0-flash"
     AI_TEMPERATURE: float = 0.7
     AI_MAX_TOKENS: int = 16000
+    # Reuse AI output for identical prompts (store name substituted afterwards)
+    AI_CONTENT_CACHE_SIZE: int = 256
+    AI_CONTENT_CACHE_TTL: int = 86400  # seconds
     
     # ── Supabase (Real-time Database) ──
     SUPABASE_URL: str = ""
@@ -88,6 +120,10 @@ class Settings(BaseSettings):
     SMTP_USER: str = ""
     SMTP_PASSWORD: str = ""
     FRONTEND_URL: str = "http://localhost:3000"
+    # Outbox sender (ARQ cron, or in-process without Redis)
+    EMAIL_OUTBOX_INTERVAL: int = 5  # seconds
+    EMAIL_BATCH_SIZE: int = 100  # Resend's batch limit
+    EMAIL_MAX_ATTEMPTS: int = 6
 
     # ── Payment (Phase 3) ──
     MOYASAR_API_KEY: str = ""
@@ -99,6 +135,8 @@ class Settings(BaseSettings):
     R2_SECRET_ACCESS_KEY: str = ""
     R2_BUCKET_NAME: str = "store-images"
     R2_PUBLIC_URL: str = ""
+    STORAGE_IO_THREADS: int = 8  # threads (and pooled connections) for object storage calls
+    IMAGE_PROCESS_WORKERS: int = 2  # processes resizing uploads into responsive variants
 
     @property
     def is_production(self) -> bool:
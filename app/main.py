@@ -56,8 +56,56 @@ async def lifespan(app: FastAPI):
     db_type = "SQLite" if settings.DATABASE_URL.startswith("sqlite") else "PostgreSQL"
     print(f"[DB] {db_type} tables created/verified.")
 
+    # Shared ARQ pool + Redis health probe
+    from app.services.job_queue import job_queue
+
+    await job_queue.start()
+
+    # In-process executor for jobs that run without Redis
+    from app.workers.store_worker import inline_executor
+
+    await inline_executor.start()
+
+    # Returns stock held by unpaid orders once their reservation expires
+    from app.services.inventory_reservations import reservation_sweeper
+
+    await reservation_sweeper.start()
+
+    # Folds the inventory ledger into point-in-time snapshots
+    from app.services.inventory_ledger import inventory_snapshotter
+
+    await inventory_snapshotter.start()
+
+    # Order event outbox — the ARQ worker dispatches it when Redis is configured
+    import app.services.order_consumers  # noqa: F401 — registers the consumers
+    from app.services.email_service import close_email_sender, email_outbox_poller
+    from app.services.media_service import close_image_pool
+    from app.services.object_storage import close_object_storage
+    from app.services.order_events import order_event_poller
+    from app.services.payment_events import payment_event_sweeper
+    from app.services.payment_reconciliation import payment_reconciler
+    from app.services.payment_service import payment_service
+
+    if not settings.REDIS_URL:
+        await email_outbox_poller.start()
+        await order_event_poller.start()
+        await payment_event_sweeper.start()
+        await payment_reconciler.start()
+
     yield
     # Shutdown
+    await payment_reconciler.stop()
+    await payment_event_sweeper.stop()
+    await order_event_poller.stop()
+    await email_outbox_poller.stop()
+    await inventory_snapshotter.stop()
+    await reservation_sweeper.stop()
+    await inline_executor.stop()
+    await job_queue.stop()
+    await payment_service.aclose()
+    await close_email_sender()
+    close_image_pool()
+    await close_object_storage()
     await engine.dispose()
     print("[STOP] Server shutdown complete.")
 
@@ -110,6 +158,7 @@ from app.api.jobs import router as jobs_router  # noqa: E402
 from app.api.ai_chat import router as ai_chat_router  # noqa: E402
 from app.api.preview import router as preview_router  # noqa: E402
 from app.api.products import router as products_router  # noqa: E402
+from app.api.inventory import router as inventory_router  # noqa: E402
 from app.api.categories import router as categories_router  # noqa: E402
 from app.api.orders import router as orders_router  # noqa: E402
 from app.api.payments import router as payments_router  # noqa: E402
@@ -139,6 +188,7 @@ app.include_router(ai_chat_router, prefix=f"{settings.API_V1_PREFIX}/ai", tags=[
 # ── Store content ──
 app.include_router(preview_router, prefix=f"{settings.API_V1_PREFIX}/preview", tags=["Preview"])
 app.include_router(products_router, prefix=f"{settings.API_V1_PREFIX}", tags=["Products"])
+app.include_router(inventory_router, prefix=f"{settings.API_V1_PREFIX}", tags=["Inventory"])
 app.include_router(categories_router, prefix=f"{settings.API_V1_PREFIX}", tags=["Categories"])
 
 # ── Commerce ──
@@ -1,7 +1,12 @@
 """
 JWT Auth Dependency — extracts and validates the current user from Bearer token.
+
+The dependency yields a ``Principal`` (id, tenant_id, role, is_active) served
+from the principal cache; the ``users`` table is only read on a cache miss.
+Endpoints that need the full user row load it themselves.
 """
 
+import uuid
 from typing import Annotated
 
 from fastapi import Depends, HTTPException, status
@@ -9,8 +14,9 @@ from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.models.user import User
 from app.services.auth_service import decode_token, get_user_by_id
+from app.services.principal_cache import Principal, cache_principal, cached_principal
+from app.services.token_revocation import is_token_revoked
 
 security = HTTPBearer(auto_error=False)
 
@@ -18,7 +24,7 @@ security = HTTPBearer(auto_error=False)
 async def get_current_user(
     credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(security)],
     db: Annotated[AsyncSession, Depends(get_db)],
-) -> User:
+) -> Principal:
     """Extract user from JWT Bearer token."""
     if not credentials:
         raise HTTPException(
@@ -28,29 +34,38 @@ async def get_current_user(
         )
 
     payload = decode_token(credentials.credentials)
-    if not payload or payload.get("type") != "access":
+    if not payload or payload.get("type") != "access" or await is_token_revoked(payload):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="رمز المصادقة غير صالح أو منتهي الصلاحية",
         )
 
-    user_id = payload.get("sub")
-    if not user_id:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="رمز غير صالح")
+    try:
+        user_id = uuid.UUID(payload.get("sub"))
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="رمز غير صالح"
+        ) from None
+
+    principal = await cached_principal(user_id)
+    if principal is None:
+        user = await get_user_by_id(db, user_id)
+        if user:
+            principal = Principal.from_user(user)
+            await cache_principal(principal)
 
-    user = await get_user_by_id(db, user_id)
-    if not user or not user.is_active:
+    if not principal or not principal.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="المستخدم غير موجود أو معطّل",
         )
 
-    return user
+    return principal
 
 
 async def require_owner(
-    current_user: Annotated[User, Depends(get_current_user)],
-) -> User:
+    current_user: Annotated[Principal, Depends(get_current_user)],
+) -> Principal:
     """Only allow tenant owners."""
     if current_user.role != "owner":
         raise HTTPException(
@@ -61,5 +76,5 @@ async def require_owner(
 
 
 # Type aliases for cleaner route signatures
-CurrentUser = Annotated[User, Depends(get_current_user)]
-OwnerUser = Annotated[User, Depends(require_owner)]
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
+OwnerUser = Annotated[Principal, Depends(require_owner)]
@@ -8,14 +8,13 @@ from typing import Annotated
 
 from fastapi import Depends
 
-from app.middleware.auth import get_current_user
-from app.models.user import User
+from app.middleware.auth import Principal, get_current_user
 
 
 class TenantContext:
     """Holds tenant info for the current request."""
 
-    def __init__(self, tenant_id: uuid.UUID, user: User):
+    def __init__(self, tenant_id: uuid.UUID, user: Principal):
         self.tenant_id = tenant_id
         self.user = user
 
@@ -25,7 +24,7 @@ class TenantContext:
 
 
 async def get_tenant_context(
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
 ) -> TenantContext:
     """Build tenant context from the authenticated user."""
     return TenantContext(tenant_id=current_user.tenant_id, user=current_user)
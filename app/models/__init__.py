@@ -4,10 +4,15 @@ from app.models.base import Base
 from app.models.category import Category
 from app.models.coupon import Coupon
 from app.models.customer import Customer
+from app.models.email import OutboxEmail
+from app.models.inventory import InventoryMovement, InventorySnapshot, StockReservation
 from app.models.job import Job
-from app.models.order import Order, OrderItem
+from app.models.media import MediaAsset, MediaObject, MediaReference
+from app.models.order import Order, OrderEvent, OrderItem
+from app.models.payment import PaymentEvent
 from app.models.product import Product
 from app.models.review import Review
+from app.models.revoked_token import RevokedToken
 from app.models.store import Store
 from app.models.tenant import Tenant
 from app.models.user import User
@@ -17,11 +22,21 @@ __all__ = [
     "Category",
     "Coupon",
     "Customer",
+    "InventoryMovement",
+    "InventorySnapshot",
     "Job",
+    "MediaAsset",
+    "MediaObject",
+    "MediaReference",
     "Order",
+    "OrderEvent",
     "OrderItem",
+    "OutboxEmail",
+    "PaymentEvent",
     "Product",
     "Review",
+    "RevokedToken",
+    "StockReservation",
     "Store",
     "Tenant",
     "User",
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import uuid
 
-from sqlalchemy import Boolean, ForeignKey, Integer, String, Text, Uuid
+from sqlalchemy import Boolean, ForeignKey, Integer, String, Text, UniqueConstraint, Uuid
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base, TimestampMixin, generate_uuid7
@@ -12,6 +12,7 @@ from app.models.base import Base, TimestampMixin, generate_uuid7
 
 class Category(Base, TimestampMixin):
     __tablename__ = "categories"
+    __table_args__ = (UniqueConstraint("store_id", "slug", name="uq_categories_store_slug"),)
 
     id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=generate_uuid7)
     tenant_id: Mapped[uuid.UUID] = mapped_column(
@@ -0,0 +1,92 @@
+"""Inventory models — stock holds for unpaid orders, the stock movement ledger and snapshots."""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Uuid
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base, TimestampMixin, generate_uuid7
+
+
+class StockReservation(Base, TimestampMixin):
+    """
+    Stock deducted for an unpaid order, returned if the order isn't paid by
+    ``expires_at``. One row per (order, product).
+    """
+
+    __tablename__ = "stock_reservations"
+    __table_args__ = (Index("ix_stock_reservations_status_expires", "status", "expires_at"),)
+
+    id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=generate_uuid7)
+    tenant_id: Mapped[uuid.UUID] = mapped_column(
+        Uuid, ForeignKey("tenants.id"), nullable=False, index=True
+    )
+    order_id: Mapped[uuid.UUID] = mapped_column(
+        Uuid, ForeignKey("orders.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    product_id: Mapped[uuid.UUID] = mapped_column(
+        Uuid, ForeignKey("products.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    quantity: Mapped[int] = mapped_column(Integer, nullable=False)
+    # held → converted (order paid) | released (stock returned)
+    status: Mapped[str] = mapped_column(String(20), default="held", nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<StockReservation {self.product_id} x{self.quantity} {self.status}>"
+
+
+class InventoryMovement(Base, TimestampMixin):
+    """
+    One signed stock change for a product (append-only).
+    kind: sale | cancel | restock | adjust
+    """
+
+    __tablename__ = "inventory_movements"
+    __table_args__ = (Index("ix_inventory_movements_product_created", "product_id", "created_at"),)
+
+    id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=generate_uuid7)
+    tenant_id: Mapped[uuid.UUID] = mapped_column(
+        Uuid, ForeignKey("tenants.id"), nullable=False, index=True
+    )
+    store_id: Mapped[uuid.UUID] = mapped_column(
+        Uuid, ForeignKey("stores.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    product_id: Mapped[uuid.UUID] = mapped_column(
+        Uuid, ForeignKey("products.id", ondelete="CASCADE"), nullable=False
+    )
+    order_id: Mapped[uuid.UUID | None] = mapped_column(
+        Uuid, ForeignKey("orders.id", ondelete="SET NULL"), nullable=True, index=True
+    )
+    kind: Mapped[str] = mapped_column(String(20), nullable=False)
+    quantity: Mapped[int] = mapped_column(Integer, nullable=False)  # + in, - out
+    reason: Mapped[str | None] = mapped_column(String(100), nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<InventoryMovement {self.kind} {self.product_id} {self.quantity:+d}>"
+
+
+class InventorySnapshot(Base):
+    """Stock of a product at ``taken_at``, folded from the ledger."""
+
+    __tablename__ = "inventory_snapshots"
+    __table_args__ = (Index("ix_inventory_snapshots_product_taken", "product_id", "taken_at"),)
+
+    id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=generate_uuid7)
+    tenant_id: Mapped[uuid.UUID] = mapped_column(
+        Uuid, ForeignKey("tenants.id"), nullable=False, index=True
+    )
+    store_id: Mapped[uuid.UUID] = mapped_column(
+        Uuid, ForeignKey("stores.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    product_id: Mapped[uuid.UUID] = mapped_column(
+        Uuid, ForeignKey("products.id", ondelete="CASCADE"), nullable=False
+    )
+    stock_quantity: Mapped[int] = mapped_column(Integer, nullable=False)
+    taken_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<InventorySnapshot {self.product_id} {self.stock_quantity} @ {self.taken_at}>"
@@ -5,7 +5,7 @@ from __future__ import annotations
 import uuid
 from datetime import datetime
 
-from sqlalchemy import JSON, DateTime, ForeignKey, Integer, String, Text, Uuid
+from sqlalchemy import JSON, DateTime, ForeignKey, Index, Integer, String, Text, Uuid
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base, TimestampMixin, generate_uuid7
@@ -13,6 +13,7 @@ from app.models.base import Base, TimestampMixin, generate_uuid7
 
 class Job(Base, TimestampMixin):
     __tablename__ = "jobs"
+    __table_args__ = (Index("ix_jobs_runner_status", "runner", "status"),)
 
     id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=generate_uuid7)
     tenant_id: Mapped[uuid.UUID] = mapped_column(
@@ -21,11 +22,18 @@ class Job(Base, TimestampMixin):
     store_id: Mapped[uuid.UUID | None] = mapped_column(
         Uuid, ForeignKey("stores.id"), nullable=True
     )
+    # Batch generation: child jobs point at the "store_batch" job that groups them
+    parent_id: Mapped[uuid.UUID | None] = mapped_column(
+        Uuid, ForeignKey("jobs.id", ondelete="CASCADE"), nullable=True, index=True
+    )
     type: Mapped[str] = mapped_column(String(100), default="store_generation", nullable=False)
     status: Mapped[str] = mapped_column(String(50), default="queued", nullable=False, index=True)
     progress: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     result: Mapped[dict | None] = mapped_column(JSON, nullable=True)
     error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Who executes the job: "arq" (Redis worker) or "inline" (in-process executor)
+    runner: Mapped[str | None] = mapped_column(String(20), nullable=True)
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     completed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
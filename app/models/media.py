@@ -0,0 +1,66 @@
+"""Media models — content-addressed uploads and their responsive variants."""
+
+from __future__ import annotations
+
+import uuid
+
+from sqlalchemy import JSON, ForeignKey, Integer, String, UniqueConstraint, Uuid
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base, TimestampMixin, generate_uuid7
+
+
+class MediaAsset(Base, TimestampMixin):
+    """An uploaded image (by its public URL) and the resized copies made from it."""
+
+    __tablename__ = "media_assets"
+
+    id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=generate_uuid7)
+    url: Mapped[str] = mapped_column(String(500), nullable=False, unique=True)
+    content_type: Mapped[str] = mapped_column(String(100), nullable=False)
+    width: Mapped[int] = mapped_column(Integer, nullable=False)
+    height: Mapped[int] = mapped_column(Integer, nullable=False)
+    blurhash: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    # [{"url", "width", "height", "format"}], smallest first per format
+    variants: Mapped[list] = mapped_column(JSON, default=list, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<MediaAsset {self.url} {len(self.variants or [])} variants>"
+
+
+class MediaObject(Base, TimestampMixin):
+    """Stored upload bytes, addressed by their SHA-256, and how many uploads refer to them."""
+
+    __tablename__ = "media_objects"
+
+    id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=generate_uuid7)
+    sha256: Mapped[str] = mapped_column(String(64), nullable=False, unique=True)
+    url: Mapped[str] = mapped_column(String(500), nullable=False, unique=True)
+    content_type: Mapped[str] = mapped_column(String(100), nullable=False)
+    size: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Uploads not yet deleted, across tenants; the object is removed at zero
+    ref_count: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<MediaObject {self.sha256[:12]} refs={self.ref_count}>"
+
+
+class MediaReference(Base, TimestampMixin):
+    """A tenant's uploads of one media object; only that tenant can release them."""
+
+    __tablename__ = "media_references"
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "media_object_id", name="uq_media_references_tenant_object"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=generate_uuid7)
+    tenant_id: Mapped[uuid.UUID] = mapped_column(
+        Uuid, ForeignKey("tenants.id"), nullable=False, index=True
+    )
+    media_object_id: Mapped[uuid.UUID] = mapped_column(
+        Uuid, ForeignKey("media_objects.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    count: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<MediaReference tenant={self.tenant_id} count={self.count}>"
@@ -1,11 +1,23 @@
-"""Order & OrderItem models — customer purchases."""
+"""Order, OrderItem & OrderEvent models — customer purchases and their outbox."""
 
 from __future__ import annotations
 
 import uuid
+from datetime import datetime
 from decimal import Decimal
 
-from sqlalchemy import JSON, ForeignKey, Integer, Numeric, String, Text, Uuid
+from sqlalchemy import (
+    JSON,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    Text,
+    Uuid,
+    func,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base, TimestampMixin, generate_uuid7
@@ -59,6 +71,7 @@ class Order(Base, TimestampMixin):
     payment_method: Mapped[str | None] = mapped_column(String(50), nullable=True)
     payment_status: Mapped[str] = mapped_column(String(50), default="unpaid", nullable=False)
     # unpaid → paid → refunded → partially_refunded
+    # OR unpaid → refund_due (paid after the order was cancelled and its stock sold)
     payment_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
     payment_metadata: Mapped[dict | None] = mapped_column(JSON, default=dict)
 
@@ -110,3 +123,41 @@ class OrderItem(Base, TimestampMixin):
 
     def __repr__(self) -> str:
         return f"<OrderItem {self.product_name} x{self.quantity}>"
+
+
+class OrderEvent(Base, TimestampMixin):
+    """
+    Transactional outbox row — written in the same transaction as the order
+    change it describes, delivered to consumers afterwards by the dispatcher.
+    type: order.placed | order.paid | order.cancelled | order.status_changed
+    """
+
+    __tablename__ = "order_events"
+    __table_args__ = (Index("ix_order_events_status_available", "status", "available_at"),)
+
+    id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=generate_uuid7)
+    tenant_id: Mapped[uuid.UUID] = mapped_column(
+        Uuid, ForeignKey("tenants.id"), nullable=False, index=True
+    )
+    store_id: Mapped[uuid.UUID] = mapped_column(
+        Uuid, ForeignKey("stores.id", ondelete="CASCADE"), nullable=False
+    )
+    order_id: Mapped[uuid.UUID] = mapped_column(
+        Uuid, ForeignKey("orders.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    type: Mapped[str] = mapped_column(String(50), nullable=False)
+    payload: Mapped[dict] = mapped_column(JSON, default=dict, nullable=False)
+
+    # Delivery: pending → done | failed (gave up after ORDER_EVENT_MAX_ATTEMPTS)
+    status: Mapped[str] = mapped_column(String(20), default="pending", nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # Consumers that already handled the event — skipped when it is retried
+    delivered: Mapped[list] = mapped_column(JSON, default=list, nullable=False)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    available_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    processed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<OrderEvent {self.type} order={self.order_id} {self.status}>"
@@ -0,0 +1,61 @@
+"""PaymentEvent model — raw payment gateway webhooks, queued for processing."""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import (
+    JSON,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+    Uuid,
+    func,
+)
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base, TimestampMixin, generate_uuid7
+
+
+class PaymentEvent(Base, TimestampMixin):
+    """
+    One webhook delivery as received. ``(gateway, event_id)`` is unique, so a
+    redelivered event is recognised at ingestion and never applied twice.
+    """
+
+    __tablename__ = "payment_events"
+    __table_args__ = (
+        UniqueConstraint("gateway", "event_id", name="uq_payment_events_gateway_event"),
+        Index("ix_payment_events_status_available", "status", "available_at"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=generate_uuid7)
+    gateway: Mapped[str] = mapped_column(String(20), nullable=False)
+    event_id: Mapped[str] = mapped_column(String(255), nullable=False)
+    payment_id: Mapped[str] = mapped_column(String(255), nullable=False)
+    order_number: Mapped[str] = mapped_column(String(50), nullable=False)
+    order_id: Mapped[uuid.UUID | None] = mapped_column(
+        Uuid, ForeignKey("orders.id", ondelete="SET NULL"), nullable=True, index=True
+    )
+    # Status as claimed by the webhook — only trusted after verification
+    gateway_status: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    payload: Mapped[dict] = mapped_column(JSON, default=dict, nullable=False)
+
+    # Processing: received → processed | failed
+    status: Mapped[str] = mapped_column(String(20), default="received", nullable=False)
+    # paid | cancelled | no_change | order_not_found
+    result: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    available_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    processed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<PaymentEvent {self.gateway}:{self.event_id} {self.status}>"
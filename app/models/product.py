@@ -5,7 +5,17 @@ from __future__ import annotations
 import uuid
 from decimal import Decimal
 
-from sqlalchemy import JSON, Boolean, ForeignKey, Integer, Numeric, String, Text, Uuid
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    ForeignKey,
+    Integer,
+    Numeric,
+    String,
+    Text,
+    UniqueConstraint,
+    Uuid,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base, TimestampMixin, generate_uuid7
@@ -13,6 +23,7 @@ from app.models.base import Base, TimestampMixin, generate_uuid7
 
 class Product(Base, TimestampMixin):
     __tablename__ = "products"
+    __table_args__ = (UniqueConstraint("store_id", "slug", name="uq_products_store_slug"),)
 
     id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=generate_uuid7)
     tenant_id: Mapped[uuid.UUID] = mapped_column(
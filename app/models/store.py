@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import uuid
 
-from sqlalchemy import JSON, ForeignKey, String, Uuid
+from sqlalchemy import JSON, ForeignKey, Integer, String, UniqueConstraint, Uuid
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base, TimestampMixin, generate_uuid7
@@ -12,6 +12,7 @@ from app.models.base import Base, TimestampMixin, generate_uuid7
 
 class Store(Base, TimestampMixin):
     __tablename__ = "stores"
+    __table_args__ = (UniqueConstraint("tenant_id", "slug", name="uq_stores_tenant_slug"),)
 
     id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=generate_uuid7)
     tenant_id: Mapped[uuid.UUID] = mapped_column(
@@ -23,6 +24,10 @@ class Store(Base, TimestampMixin):
     language: Mapped[str] = mapped_column(String(10), default="ar", nullable=False)
     config: Mapped[dict | None] = mapped_column(JSON, default=dict)
     status: Mapped[str] = mapped_column(String(50), default="pending", nullable=False)
+    # Bumped on every catalog write; storefront caches key on it
+    catalog_version: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
 
     # Relationships
     tenant: Mapped[Tenant] = relationship("Tenant", back_populates="stores")
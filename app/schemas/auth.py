@@ -33,6 +33,10 @@ class RefreshRequest(BaseModel):
     refresh_token: str
 
 
+class LogoutRequest(BaseModel):
+    refresh_token: str | None = None
+
+
 class UpdateProfileRequest(BaseModel):
     full_name: str | None = Field(None, min_length=2, max_length=255, description="الاسم الكامل")
     current_password: str | None = Field(None, min_length=1, description="كلمة المرور الحالية")
@@ -0,0 +1,37 @@
+"""Inventory schemas — stock movements and point-in-time levels."""
+
+import uuid
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class InventoryMovementCreate(BaseModel):
+    """POST /products/{product_id}/inventory/movements"""
+
+    kind: str = Field(..., pattern="^(restock|adjust)$")
+    quantity: int = Field(..., description="التغيير في المخزون (موجب للإضافة، سالب للخصم)")
+    reason: str | None = Field(None, max_length=100)
+
+
+class InventoryMovementResponse(BaseModel):
+    id: uuid.UUID
+    product_id: uuid.UUID
+    order_id: uuid.UUID | None = None
+    kind: str
+    quantity: int
+    reason: str | None = None
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class InventoryMovementListResponse(BaseModel):
+    items: list[InventoryMovementResponse]
+    net_change: int
+
+
+class InventoryLevelResponse(BaseModel):
+    product_id: uuid.UUID
+    stock_quantity: int
+    at: datetime | None = None
@@ -29,6 +29,26 @@ class JobCreateResponse(BaseModel):
     estimated_seconds: int = 30
 
 
+class BatchJobCreateResponse(BaseModel):
+    batch_id: uuid.UUID
+    job_ids: list[uuid.UUID]
+    store_ids: list[uuid.UUID]
+    total: int
+    status: str = "queued"
+    message: str = "جاري إنشاء المتاجر... ⏳"
+
+
+class BatchJobStatusResponse(BaseModel):
+    batch_id: uuid.UUID
+    status: str
+    progress: int
+    total: int
+    queued: int
+    running: int
+    done: int
+    failed: int
+
+
 class JobListResponse(BaseModel):
     jobs: list[JobResponse]
     total: int
@@ -45,6 +45,18 @@ class OrderUpdateRequest(BaseModel):
     admin_notes: str | None = Field(None, max_length=2000)
 
 
+class OrderBulkCancelRequest(BaseModel):
+    """POST /stores/{store_id}/orders/cancel"""
+
+    order_ids: list[uuid.UUID] = Field(..., min_length=1, max_length=1000)
+    reason: str = Field(default="admin", max_length=100)
+
+
+class OrderBulkCancelResponse(BaseModel):
+    cancelled: list[uuid.UUID]
+    skipped: int  # already cancelled, or not in this store
+
+
 # ── Responses ──
 
 
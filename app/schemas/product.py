@@ -4,7 +4,7 @@ import uuid
 from datetime import datetime
 from decimal import Decimal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 class ProductCreate(BaseModel):
@@ -119,3 +119,65 @@ class ProductListResponse(BaseModel):
     total: int
     page: int
     page_size: int
+
+
+class ProductImportError(BaseModel):
+    row: int
+    error: str
+
+
+class ProductImportResponse(BaseModel):
+    """Result of POST /stores/{store_id}/products/import"""
+
+    job_id: uuid.UUID
+    status: str
+    imported: int
+    failed: int
+    errors: list[ProductImportError] = Field(default=[], description="أول أخطاء الصفوف")
+
+
+class ProductBulkChange(BaseModel):
+    """One row of PATCH /stores/{store_id}/products/bulk — addressed by id or SKU."""
+
+    product_id: uuid.UUID | None = None
+    sku: str | None = Field(None, max_length=100)
+
+    price: Decimal | None = Field(None, gt=0, decimal_places=2)
+    compare_at_price: Decimal | None = Field(None, ge=0, decimal_places=2)
+    stock_quantity: int | None = Field(None, ge=0)
+    is_active: bool | None = None
+
+    @model_validator(mode="after")
+    def check_target_and_changes(self) -> "ProductBulkChange":
+        if (self.product_id is None) == (self.sku is None):
+            raise ValueError("provide exactly one of product_id or sku")
+        if not self.changes():
+            raise ValueError("no fields to update")
+        return self
+
+    def changes(self) -> dict:
+        """Fields explicitly sent (compare_at_price may be cleared with null)."""
+        values = self.model_dump(exclude_unset=True, exclude={"product_id", "sku"})
+        return {
+            field: value
+            for field, value in values.items()
+            if value is not None or field == "compare_at_price"
+        }
+
+
+class ProductBulkUpdateRequest(BaseModel):
+    changes: list[ProductBulkChange] = Field(..., min_length=1, max_length=5000)
+
+
+class ProductBulkResult(BaseModel):
+    index: int
+    product_id: uuid.UUID | None = None
+    sku: str | None = None
+    status: str  # updated | not_found | ambiguous
+
+
+class ProductBulkUpdateResponse(BaseModel):
+    updated: int
+    failed: int
+    catalog_version: int
+    results: list[ProductBulkResult]
@@ -35,6 +35,14 @@ class StoreGenerateRequest(BaseModel):
     features: list[str] | None = Field(default=[])
 
 
+class StoreBatchGenerateRequest(BaseModel):
+    """Request body for POST /stores/generate/batch"""
+
+    stores: list[StoreGenerateRequest] = Field(
+        ..., min_length=1, max_length=200, description="مواصفات المتاجر المطلوب توليدها"
+    )
+
+
 class StoreUpdateRequest(BaseModel):
     """Request body for PATCH /stores/{id}"""
 
@@ -55,6 +63,7 @@ class StoreResponse(BaseModel):
     language: str
     config: dict | None = None
     status: str
+    catalog_version: int = 0
     created_at: datetime
     updated_at: datetime
 
@@ -7,6 +7,16 @@ import uuid
 from pydantic import BaseModel
 
 
+class ResponsiveImage(BaseModel):
+    """An image with its resized variants, ready for ``<img srcset>`` / ``<source>``."""
+
+    url: str
+    width: int | None = None
+    height: int | None = None
+    blurhash: str | None = None
+    srcset: dict[str, str] = {}  # format (webp, avif) -> "url 320w, url 640w, ..."
+
+
 class PublicProductResponse(BaseModel):
     """Product data visible to customers."""
 
@@ -20,6 +30,7 @@ class PublicProductResponse(BaseModel):
     currency: str = "SAR"
     image_url: str | None = None
     images: list[str] = []
+    media: list[ResponsiveImage] = []  # image_url then images, with variants where made
     is_featured: bool = False
     in_stock: bool = True
     category_name: str | None = None
@@ -47,6 +58,7 @@ class PublicCategoryResponse(BaseModel):
     slug: str
     description: str | None = None
     image_url: str | None = None
+    media: ResponsiveImage | None = None
     product_count: int = 0
 
 
@@ -1,8 +1,21 @@
 """
 Auth Service — JWT token creation/verification + password hashing.
+
+bcrypt costs a few hundred milliseconds of CPU per call, so hashing and
+verification run on a dedicated thread pool of PASSWORD_HASH_CONCURRENCY
+threads; callers await them and the event loop keeps serving other requests.
+
+Verified tokens are kept in a bounded LRU keyed by the token's digest, so a
+token presented on every request is only verified and parsed once; an entry is
+not served past the token's ``exp``.
 """
 
+import asyncio
+import hashlib
+import time
 import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime, timedelta
 
 from jose import JWTError, jwt
@@ -17,7 +30,17 @@ from app.models.tenant import Tenant
 from app.models.user import User
 
 settings = get_settings()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.PASSWORD_HASH_ROUNDS,
+    # A lower cost counts as outdated, so verify_and_update rehashes it; a
+    # higher one is kept rather than weakened to the configured cost
+    bcrypt__min_rounds=settings.PASSWORD_HASH_ROUNDS,
+)
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_CONCURRENCY, thread_name_prefix="password-hash"
+)
 
 
 def _truncate_password(password: str) -> str:
@@ -25,12 +48,21 @@ def _truncate_password(password: str) -> str:
     return password.encode("utf-8")[:72].decode("utf-8", errors="ignore")
 
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(_truncate_password(password))
+async def _in_hash_pool(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(_hash_executor, func, *args)
+
+
+async def hash_password(password: str) -> str:
+    return await _in_hash_pool(pwd_context.hash, _truncate_password(password))
 
 
-def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(_truncate_password(plain), hashed)
+async def verify_password(plain: str, hashed: str) -> bool:
+    return await _in_hash_pool(pwd_context.verify, _truncate_password(plain), hashed)
+
+
+async def verify_and_update_password(plain: str, hashed: str) -> tuple[bool, str | None]:
+    """Verify ``plain``; also returns a fresh hash when ``hashed`` uses outdated parameters."""
+    return await _in_hash_pool(pwd_context.verify_and_update, _truncate_password(plain), hashed)
 
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
@@ -38,23 +70,62 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
     expire = datetime.now(UTC) + (
         expires_delta or timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
     )
-    to_encode.update({"exp": expire, "type": "access"})
+    to_encode.update({"exp": expire, "type": "access", "jti": uuid.uuid4().hex})
     return jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
 
 
 def create_refresh_token(data: dict) -> str:
     to_encode = data.copy()
     expire = datetime.now(UTC) + timedelta(days=settings.JWT_REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire, "type": "refresh"})
+    to_encode.update({"exp": expire, "type": "refresh", "jti": uuid.uuid4().hex})
     return jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
 
 
+class VerifiedTokenCache:
+    """LRU of token digest → verified claims; entries are dropped at the token's ``exp``."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[bytes, dict] = OrderedDict()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> dict | None:
+        key = self._key(token)
+        claims = self._entries.get(key)
+        if claims is None:
+            return None
+        if claims["exp"] <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return dict(claims)
+
+    def put(self, token: str, claims: dict) -> None:
+        if self.max_entries <= 0 or not isinstance(claims.get("exp"), int | float):
+            return
+        key = self._key(token)
+        self._entries[key] = dict(claims)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+verified_tokens = VerifiedTokenCache(settings.JWT_CACHE_SIZE)
+
+
 def decode_token(token: str) -> dict | None:
+    claims = verified_tokens.get(token)
+    if claims is not None:
+        return claims
     try:
         payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-        return payload
     except JWTError:
         return None
+    verified_tokens.put(token, payload)
+    return payload
 
 
 async def register_user(
@@ -80,7 +151,7 @@ async def register_user(
         id=generate_uuid7(),
         tenant_id=tenant.id,
         email=email,
-        hashed_password=hash_password(password),
+        hashed_password=await hash_password(password),
         full_name=full_name,
         role="owner",
     )
@@ -91,12 +162,17 @@ async def register_user(
 
 
 async def authenticate_user(db: AsyncSession, email: str, password: str) -> User | None:
-    """Verify email/password, return User or None."""
+    """Verify email/password, return User or None. Outdated hashes are upgraded in place."""
     result = await db.execute(select(User).where(User.email == email, User.is_active.is_(True)))
     user = result.scalar_one_or_none()
-    if user and verify_password(password, user.hashed_password):
-        return user
-    return None
+    if not user:
+        return None
+    valid, new_hash = await verify_and_update_password(password, user.hashed_password)
+    if not valid:
+        return None
+    if new_hash:
+        user.hashed_password = new_hash
+    return user
 
 
 async def get_user_by_id(db: AsyncSession, user_id: str) -> User | None:
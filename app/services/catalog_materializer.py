@@ -0,0 +1,145 @@
+"""
+Catalog Materializer — turns generated ``ai_content`` into Category/Product rows.
+
+The generator returns categories and featured products as JSON; the storefront
+reads the relational tables. This stage inserts them in bulk inside the
+worker's transaction, with slugs precomputed in memory. Row IDs are derived
+from the store ID and slug (uuid5), so re-running a job skips rows it already
+created instead of duplicating the catalog.
+"""
+
+import logging
+import uuid
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.category import Category
+from app.models.product import Product
+from app.models.store import Store
+from app.utils.db_helpers import slugify
+
+logger = logging.getLogger(__name__)
+
+
+def _catalog_id(store_id: uuid.UUID, kind: str, slug: str) -> uuid.UUID:
+    """Deterministic row ID for a generated catalog entry."""
+    return uuid.uuid5(store_id, f"{kind}:{slug}")
+
+
+def _price(value) -> Decimal:
+    try:
+        price = Decimal(str(value)).quantize(Decimal("0.01"))
+    except (InvalidOperation, ValueError):
+        return Decimal("0.00")
+    return max(price, Decimal("0.00"))
+
+
+def _named_entries(ai_content: dict, field: str) -> list[dict]:
+    """Entries of ``field`` that are objects with a name; the rest is logged and skipped."""
+    entries = ai_content.get(field) or []
+    if not isinstance(entries, list):
+        logger.warning(
+            f"[CATALOG] Ignoring {field}: expected a list, got {type(entries).__name__}"
+        )
+        return []
+    named = []
+    for entry in entries:
+        if isinstance(entry, dict) and isinstance(entry.get("name"), str) and entry["name"]:
+            named.append(entry)
+        else:
+            logger.warning(f"[CATALOG] Skipping malformed {field} entry: {entry!r:.200}")
+    return named
+
+
+async def _plan_rows(
+    db: AsyncSession, model, store_id: uuid.UUID, kind: str, names: list[str]
+) -> list[tuple[uuid.UUID, str, bool]]:
+    """(id, slug, is_new) per name — one query for the store's existing slugs."""
+    result = await db.execute(select(model.slug, model.id).where(model.store_id == store_id))
+    existing = dict(result.all())
+    claimed: set[str] = set()
+
+    def available(slug: str) -> bool:
+        # Free, or created by a previous run of this stage — but not twice in one catalog
+        owner = existing.get(slug)
+        return slug not in claimed and owner in (None, _catalog_id(store_id, kind, slug))
+
+    planned = []
+    for name in names:
+        base = slugify(name, fallback=kind)
+        slug, counter = base, 1
+        while not available(slug):
+            slug = f"{base}-{counter}"
+            counter += 1
+        claimed.add(slug)
+        planned.append((_catalog_id(store_id, kind, slug), slug, slug not in existing))
+    return planned
+
+
+async def materialize_catalog(db: AsyncSession, store: Store, ai_content: dict) -> dict:
+    """
+    Bulk-insert generated categories and featured products for ``store``.
+    Does not commit — the caller owns the transaction. Returns inserted counts.
+    """
+    categories = _named_entries(ai_content, "categories")
+    products = _named_entries(ai_content, "featured_products")
+
+    category_plan = await _plan_rows(
+        db, Category, store.id, "category", [c["name"] for c in categories]
+    )
+    category_rows = [
+        {
+            "id": row_id,
+            "tenant_id": store.tenant_id,
+            "store_id": store.id,
+            "name": category["name"][:255],
+            "slug": slug,
+            "description": category.get("description"),
+            "sort_order": position,
+            "is_active": True,
+        }
+        for position, (category, (row_id, slug, is_new)) in enumerate(
+            zip(categories, category_plan, strict=True)
+        )
+        if is_new
+    ]
+    if category_rows:
+        await db.execute(insert(Category), category_rows)
+
+    # Products may name their category; link them when it was generated too
+    category_ids = {
+        category["name"]: row_id
+        for category, (row_id, _, _) in zip(categories, category_plan, strict=True)
+    }
+    product_plan = await _plan_rows(
+        db, Product, store.id, "product", [p["name"] for p in products]
+    )
+    product_rows = [
+        {
+            "id": row_id,
+            "tenant_id": store.tenant_id,
+            "store_id": store.id,
+            "category_id": category_ids.get(str(product.get("category"))),
+            "name": product["name"][:255],
+            "slug": slug,
+            "description": product.get("description"),
+            "price": _price(product.get("price", 0)),
+            "currency": (product.get("currency") or "SAR")[:3],
+            "images": [],
+            "attributes": {},
+            "is_featured": True,
+            "sort_order": position,
+        }
+        for position, (product, (row_id, slug, is_new)) in enumerate(
+            zip(products, product_plan, strict=True)
+        )
+        if is_new
+    ]
+    if product_rows:
+        await db.execute(insert(Product), product_rows)
+
+    counts = {"categories": len(category_rows), "products": len(product_rows)}
+    logger.info(f"[CATALOG] Materialized {counts} for store {store.id}")
+    return counts
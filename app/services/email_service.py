@@ -1,211 +1,345 @@
 """
 Email Service — Send transactional emails.
 
+Bodies come from precompiled templates (``email_templates``) with the CSS
+already inlined; per-store variants carry the store's branding.
+
+Emails are queued in the ``email_outbox`` table inside the caller's
+transaction and delivered in batches by a background sender (ARQ cron, or an
+in-process task without Redis), with retries and exponential backoff.
+
 Supports multiple providers:
-  1. Resend API (recommended for production)
-  2. SMTP (Gmail, Outlook, etc.)
+  1. Resend API (recommended for production) — batch endpoint, pooled client
+  2. SMTP (Gmail, Outlook, etc.) — one persistent authenticated session
   3. Console (development fallback — prints to console)
 """
 
+import asyncio
 import logging
+from collections.abc import Sequence
+from contextlib import suppress
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
 from typing import Literal
 
 import httpx
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_settings
+from app.database import async_session_factory
+from app.models.email import OutboxEmail
+from app.models.store import Store
+from app.services.email_templates import platform_templates, store_brand, store_templates
+from app.services.periodic import PeriodicTask
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
 # ═══════════════════════════════════════════════════════════
-#  Arabic RTL Email Templates
+#  Email Sending (Multi-Provider)
 # ═══════════════════════════════════════════════════════════
 
-_BASE_STYLE = """
-<style>
-    body { margin: 0; padding: 0; background: #0a0b10; font-family: 'Segoe UI', Tahoma, Arial, sans-serif; }
-    .container { max-width: 560px; margin: 40px auto; background: #13141b; border-radius: 16px; border: 1px solid rgba(124, 58, 237, 0.2); overflow: hidden; }
-    .header { background: linear-gradient(135deg, #7c3aed 0%, #3b82f6 100%); padding: 32px; text-align: center; }
-    .header h1 { color: #fff; font-size: 22px; margin: 0; }
-    .body { padding: 32px; color: #e2e8f0; line-height: 1.8; direction: rtl; text-align: right; }
-    .body p { margin: 0 0 16px; }
-    .btn { display: inline-block; background: linear-gradient(135deg, #7c3aed, #3b82f6); color: #fff !important; text-decoration: none; padding: 14px 40px; border-radius: 10px; font-weight: 700; font-size: 16px; margin: 24px 0; }
-    .code-box { background: #1e1f2e; border: 1px solid rgba(124, 58, 237, 0.3); border-radius: 10px; padding: 20px; text-align: center; margin: 20px 0; }
-    .code { font-size: 32px; font-weight: 800; color: #a78bfa; letter-spacing: 8px; font-family: 'Courier New', monospace; }
-    .footer { padding: 20px 32px; text-align: center; color: #64748b; font-size: 12px; border-top: 1px solid rgba(255,255,255,0.05); }
-    .footer a { color: #7c3aed; text-decoration: none; }
-</style>
-"""
+RETRY_BASE = timedelta(seconds=30)
+RETRY_MAX = timedelta(hours=1)
+# A claimed email is invisible to other senders for this long
+CLAIM_LEASE = timedelta(minutes=5)
 
 
-def _wrap_template(content: str) -> str:
-    return f"""<!DOCTYPE html>
-<html lang="ar" dir="rtl">
-<head><meta charset="utf-8"><meta name="viewport" content="width=device-width, initial-scale=1">{_BASE_STYLE}</head>
-<body>
-<div class="container">
-    <div class="header"><h1>⚡ ويب فلو</h1></div>
-    <div class="body">{content}</div>
-    <div class="footer">
-        &copy; 2026 ويب فلو — منشئ المتاجر بالذكاء الاصطناعي<br>
-        <a href="https://webflow.sa">webflow.sa</a>
-    </div>
-</div>
-</body>
-</html>"""
-
-
-def _verification_email(full_name: str, code: str) -> tuple[str, str]:
-    """Return (subject, html_body) for email verification."""
-    subject = "تأكيد بريدك الإلكتروني — ويب فلو"
-    html = _wrap_template(f"""
-        <p>مرحباً {full_name}! 👋</p>
-        <p>شكراً لتسجيلك في <strong>ويب فلو</strong>. استخدم الرمز التالي لتأكيد بريدك الإلكتروني:</p>
-        <div class="code-box">
-            <div class="code">{code}</div>
-        </div>
-        <p>الرمز صالح لمدة <strong>24 ساعة</strong>.</p>
-        <p style="color: #94a3b8; font-size: 13px;">إذا لم تقم بإنشاء حساب، تجاهل هذا البريد.</p>
-    """)
-    return subject, html
-
-
-def _password_reset_email(full_name: str, code: str) -> tuple[str, str]:
-    """Return (subject, html_body) for password reset."""
-    subject = "إعادة تعيين كلمة المرور — ويب فلو"
-    html = _wrap_template(f"""
-        <p>مرحباً {full_name}،</p>
-        <p>تلقينا طلباً لإعادة تعيين كلمة المرور الخاصة بك. استخدم الرمز التالي:</p>
-        <div class="code-box">
-            <div class="code">{code}</div>
-        </div>
-        <p>الرمز صالح لمدة <strong>ساعة واحدة</strong> فقط.</p>
-        <p style="color: #94a3b8; font-size: 13px;">إذا لم تطلب إعادة التعيين، تجاهل هذا البريد وكلمة المرور لن تتغير.</p>
-    """)
-    return subject, html
-
-
-def _welcome_email(full_name: str) -> tuple[str, str]:
-    """Return (subject, html_body) for welcome after verification."""
-    subject = "مرحباً بك في ويب فلو! 🎉"
-    html = _wrap_template(f"""
-        <p>مرحباً {full_name}! 🎉</p>
-        <p>تم تأكيد حسابك بنجاح! أنت الآن جاهز لبناء متجرك الإلكتروني بالذكاء الاصطناعي.</p>
-        <p><strong>ماذا يمكنك فعله الآن؟</strong></p>
-        <ul style="padding-right: 20px;">
-            <li>🏪 أنشئ متجرك الأول بضغطة زر</li>
-            <li>🤖 استخدم الذكاء الاصطناعي لتصميم متجرك</li>
-            <li>📦 أضف منتجاتك وابدأ البيع</li>
-        </ul>
-        <p style="text-align: center;">
-            <a href="{settings.FRONTEND_URL}/dashboard" class="btn">ابدأ الآن ←</a>
-        </p>
-    """)
-    return subject, html
+@dataclass
+class SendResult:
+    """Outcome of one email: the provider's message id, or why it was not accepted."""
 
+    provider_id: str | None = None
+    error: str | None = None
 
-# ═══════════════════════════════════════════════════════════
-#  Email Sending (Multi-Provider)
-# ═══════════════════════════════════════════════════════════
 
-async def _send_via_resend(to: str, subject: str, html: str) -> bool:
-    """Send email via Resend API."""
-    try:
-        async with httpx.AsyncClient(timeout=15) as client:
-            resp = await client.post(
-                "https://api.resend.com/emails",
-                headers={
-                    "Authorization": f"Bearer {settings.RESEND_API_KEY}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "from": f"{settings.EMAIL_FROM_NAME} <{settings.EMAIL_FROM_ADDRESS}>",
-                    "to": [to],
-                    "subject": subject,
-                    "html": html,
-                },
-            )
-            if resp.status_code in (200, 201):
-                logger.info(f"[EMAIL] Sent to {to} via Resend: {subject}")
-                return True
-            logger.error(f"[EMAIL] Resend error {resp.status_code}: {resp.text}")
-            return False
-    except Exception as e:
-        logger.error(f"[EMAIL] Resend exception: {e}")
-        return False
-
-
-async def _send_via_smtp(to: str, subject: str, html: str) -> bool:
-    """Send email via SMTP (aiosmtplib)."""
-    try:
-        import aiosmtplib
-        from email.mime.multipart import MIMEMultipart
-        from email.mime.text import MIMEText
+# Senders return one SendResult per email, in order. A shorter list means delivery
+# stopped early and the remaining emails were not tried; raising fails the batch.
 
-        msg = MIMEMultipart("alternative")
-        msg["From"] = f"{settings.EMAIL_FROM_NAME} <{settings.EMAIL_FROM_ADDRESS}>"
-        msg["To"] = to
-        msg["Subject"] = subject
-        msg.attach(MIMEText(html, "html", "utf-8"))
 
-        await aiosmtplib.send(
-            msg,
+def _sender_address() -> str:
+    return f"{settings.EMAIL_FROM_NAME} <{settings.EMAIL_FROM_ADDRESS}>"
+
+
+class ResendSender:
+    """Resend batch API (up to 100 emails per request) over one pooled client."""
+
+    BATCH_URL = "https://api.resend.com/emails/batch"
+
+    def __init__(self, api_key: str, client: httpx.AsyncClient | None = None):
+        self.api_key = api_key
+        self._client = client or httpx.AsyncClient(timeout=15)
+
+    async def send(self, emails: Sequence[OutboxEmail]) -> list[SendResult]:
+        """Deliver ``emails``; invalid ones are reported per email, the rest still go out."""
+        resp = await self._client.post(
+            self.BATCH_URL,
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                # Send the valid emails instead of rejecting the whole batch
+                "x-batch-validation": "permissive",
+            },
+            json=[
+                {
+                    "from": _sender_address(),
+                    "to": [email.to_address],
+                    "subject": email.subject,
+                    "html": email.html,
+                }
+                for email in emails
+            ],
+        )
+        if resp.status_code not in (200, 201):
+            raise RuntimeError(f"Resend error {resp.status_code}: {resp.text[:500]}")
+        body = resp.json()
+        errors = {
+            item["index"]: item.get("message") or "rejected" for item in body.get("errors") or []
+        }
+        # Ids of the accepted emails, in request order
+        ids = iter([item.get("id") for item in body.get("data") or []])
+        return [
+            SendResult(error=errors[index]) if index in errors else SendResult(next(ids, None))
+            for index in range(len(emails))
+        ]
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+class SmtpSender:
+    """
+    One authenticated SMTP session reused across messages and batches. A
+    dropped session is reopened once before the message counts as failed; a
+    message the server refuses fails alone and the batch goes on.
+    """
+
+    def __init__(self):
+        self._smtp = None
+        self._lock = asyncio.Lock()
+
+    async def _connect(self):
+        import aiosmtplib
+
+        smtp = aiosmtplib.SMTP(
             hostname=settings.SMTP_HOST,
             port=settings.SMTP_PORT,
-            username=settings.SMTP_USER,
-            password=settings.SMTP_PASSWORD,
             use_tls=settings.SMTP_PORT == 465,
             start_tls=settings.SMTP_PORT == 587,
+            timeout=30,
         )
-        logger.info(f"[EMAIL] Sent to {to} via SMTP: {subject}")
-        return True
-    except Exception as e:
-        logger.error(f"[EMAIL] SMTP exception: {e}")
-        return False
+        await smtp.connect()
+        if settings.SMTP_USER:
+            await smtp.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+        return smtp
 
+    @staticmethod
+    def _message(email: OutboxEmail) -> MIMEMultipart:
+        msg = MIMEMultipart("alternative")
+        msg["From"] = _sender_address()
+        msg["To"] = email.to_address
+        msg["Subject"] = email.subject
+        msg.attach(MIMEText(email.html, "html", "utf-8"))
+        return msg
 
-async def _send_via_console(to: str, subject: str, html: str) -> bool:
-    """Development fallback — log email to console."""
-    print(f"\n{'='*60}")
-    print(f"📧 EMAIL (console mode)")
-    print(f"   To:      {to}")
-    print(f"   Subject: {subject}")
-    print(f"   Length:  {len(html)} chars")
-    print(f"{'='*60}\n")
-    logger.info(f"[EMAIL] Console: {to} — {subject}")
-    return True
+    async def send(self, emails: Sequence[OutboxEmail]) -> list[SendResult]:
+        import aiosmtplib
 
+        results: list[SendResult] = []
+        async with self._lock:
+            for email in emails:
+                for reconnect in (False, True):
+                    try:
+                        if self._smtp is None or not self._smtp.is_connected:
+                            self._smtp = await self._connect()
+                        await self._smtp.send_message(self._message(email))
+                        results.append(SendResult())
+                        break
+                    except Exception as e:
+                        refused = (
+                            aiosmtplib.SMTPRecipientsRefused,
+                            aiosmtplib.SMTPResponseException,
+                        )
+                        if isinstance(e, refused) and self._smtp.is_connected:
+                            # Refused by a live session: only this message failed
+                            results.append(SendResult(error=str(e)))
+                            break
+                        await self.aclose()
+                        if reconnect:
+                            # Server unreachable: the rest wait for the next batch
+                            results.append(SendResult(error=str(e)))
+                            return results
+        return results
+
+    async def aclose(self) -> None:
+        if self._smtp is not None:
+            with suppress(Exception):
+                await self._smtp.quit()
+            self._smtp = None
+
+
+class ConsoleSender:
+    """Development fallback — log emails to console."""
+
+    async def send(self, emails: Sequence[OutboxEmail]) -> list[SendResult]:
+        for email in emails:
+            print(f"\n{'='*60}")
+            print(f"📧 EMAIL (console mode)")
+            print(f"   To:      {email.to_address}")
+            print(f"   Subject: {email.subject}")
+            print(f"   Length:  {len(email.html)} chars")
+            print(f"{'='*60}\n")
+            logger.info(f"[EMAIL] Console: {email.to_address} — {email.subject}")
+        return [SendResult() for _ in emails]
+
+    async def aclose(self) -> None:
+        pass
+
+
+_sender: ResendSender | SmtpSender | ConsoleSender | None = None
+
+
+def get_email_sender() -> ResendSender | SmtpSender | ConsoleSender:
+    """Process-wide sender for the configured provider."""
+    global _sender
+    if _sender is None:
+        provider = settings.EMAIL_PROVIDER
+        if provider == "resend" and settings.RESEND_API_KEY:
+            _sender = ResendSender(settings.RESEND_API_KEY)
+        elif provider == "smtp" and settings.SMTP_HOST:
+            _sender = SmtpSender()
+        else:
+            _sender = ConsoleSender()
+    return _sender
+
+
+async def close_email_sender() -> None:
+    global _sender
+    if _sender is not None:
+        await _sender.aclose()
+        _sender = None
 
-async def send_email(to: str, subject: str, html: str) -> bool:
-    """Send email using the configured provider."""
-    provider = settings.EMAIL_PROVIDER
 
-    if provider == "resend" and settings.RESEND_API_KEY:
-        return await _send_via_resend(to, subject, html)
-    elif provider == "smtp" and settings.SMTP_HOST:
-        return await _send_via_smtp(to, subject, html)
-    else:
-        return await _send_via_console(to, subject, html)
+# ═══════════════════════════════════════════════════════════
+#  Outbox
+# ═══════════════════════════════════════════════════════════
+
+def queue_email(db: AsyncSession, to: str, subject: str, html: str) -> None:
+    """Queue an email in the caller's transaction — it is sent only if that commits."""
+    db.add(OutboxEmail(to_address=to, subject=subject, html=html))
+
+
+async def deliver_queued_emails(limit: int | None = None) -> int:
+    """Send one batch of due emails; returns how many were sent."""
+    limit = limit or settings.EMAIL_BATCH_SIZE
+    now = datetime.now(UTC)
+    due = (
+        select(OutboxEmail.id)
+        .where(OutboxEmail.status == "pending", OutboxEmail.available_at <= now)
+        .order_by(OutboxEmail.created_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    async with async_session_factory() as db:
+        # Claim with a lease: a second sender skips these until it runs out
+        claimed = (
+            await db.execute(
+                update(OutboxEmail)
+                .where(OutboxEmail.id.in_(due.scalar_subquery()))
+                .values(available_at=now + CLAIM_LEASE, attempts=OutboxEmail.attempts + 1)
+                .returning(OutboxEmail)
+            )
+        ).scalars().all()
+        await db.commit()
+        if not claimed:
+            return 0
+
+        try:
+            results = await get_email_sender().send(claimed)
+        except Exception as e:
+            logger.error(f"[EMAIL] Sending {len(claimed)} email(s) failed: {e}")
+            results = [SendResult(error=str(e))] * len(claimed)
+
+        sent = failed = 0
+        sent_at = datetime.now(UTC)
+        for index, email in enumerate(claimed):
+            if index >= len(results):
+                # Not tried: back in the queue without using up an attempt
+                email.attempts -= 1
+                email.available_at = now
+                continue
+            result = results[index]
+            if result.error is None:
+                email.status = "sent"
+                email.sent_at = sent_at
+                email.provider_message_id = result.provider_id
+                sent += 1
+                continue
+            failed += 1
+            email.last_error = result.error[:2000]
+            if email.attempts >= settings.EMAIL_MAX_ATTEMPTS:
+                email.status = "failed"
+            else:
+                email.available_at = now + min(RETRY_BASE * 2 ** (email.attempts - 1), RETRY_MAX)
+        await db.commit()
+    if sent:
+        logger.info(f"[EMAIL] Sent {sent} queued email(s)")
+    if failed:
+        logger.warning(f"[EMAIL] {failed} queued email(s) not accepted, will retry")
+    return sent
+
+
+# In-process fallback, started by the app lifespan when there is no ARQ worker
+email_outbox_poller = PeriodicTask(
+    "Email outbox", settings.EMAIL_OUTBOX_INTERVAL, deliver_queued_emails
+)
 
 
 # ═══════════════════════════════════════════════════════════
 #  Public API — High-Level Functions
 # ═══════════════════════════════════════════════════════════
 
-async def send_verification_email(email: str, full_name: str, code: str) -> bool:
-    """Send the 6-digit verification code email."""
-    subject, html = _verification_email(full_name, code)
-    return await send_email(email, subject, html)
+def queue_verification_email(db: AsyncSession, email: str, full_name: str, code: str) -> None:
+    """Queue the 6-digit verification code email."""
+    subject, html = platform_templates["verification"].render(full_name=full_name, code=code)
+    queue_email(db, email, subject, html)
 
 
-async def send_password_reset_email(email: str, full_name: str, code: str) -> bool:
-    """Send the 6-digit password reset code email."""
-    subject, html = _password_reset_email(full_name, code)
-    return await send_email(email, subject, html)
+def queue_password_reset_email(db: AsyncSession, email: str, full_name: str, code: str) -> None:
+    """Queue the 6-digit password reset code email."""
+    subject, html = platform_templates["password_reset"].render(full_name=full_name, code=code)
+    queue_email(db, email, subject, html)
 
 
-async def send_welcome_email(email: str, full_name: str) -> bool:
-    """Send welcome email after verification."""
-    subject, html = _welcome_email(full_name)
-    return await send_email(email, subject, html)
+def queue_welcome_email(db: AsyncSession, email: str, full_name: str) -> None:
+    """Queue the welcome email after verification."""
+    subject, html = platform_templates["welcome"].render(
+        full_name=full_name, dashboard_url=f"{settings.FRONTEND_URL}/dashboard"
+    )
+    queue_email(db, email, subject, html)
+
+
+def queue_order_confirmation_email(db: AsyncSession, order: dict, store: Store) -> None:
+    """Queue the order confirmation to the buyer (``order`` is an event payload)."""
+    templates = store_templates.get(store.id, store_brand(store.name, store.config))
+    item_row = templates.fragments["order_item"]
+    items = "".join(
+        item_row.render_html(
+            name=item["name"],
+            quantity=item["quantity"],
+            unit_price=item["unit_price"],
+            currency=order["currency"],
+        )
+        for item in order.get("items", [])
+    )
+    subject, html = templates.emails["order_confirmation"].render(
+        order_number=order["order_number"],
+        customer_name=order["customer_name"],
+        items=items,
+        total=order["total"],
+        currency=order["currency"],
+    )
+    queue_email(db, order["customer_email"], subject, html)
@@ -0,0 +1,429 @@
+"""
+Email Templates — compiled once, rendered by filling slots.
+
+Templates are written against one stylesheet using CSS classes. Compiling a
+template bakes in the brand (name, colours, logo), inlines the stylesheet into
+``style`` attributes (Gmail and many other clients drop ``<style>`` blocks) and
+leaves a ``str.format`` string whose only fields are the per-message slots.
+Rendering is a single ``format_map`` over HTML-escaped values.
+
+The platform templates are compiled at import; per-store branded variants are
+compiled on first use and kept in an LRU keyed by store id.
+
+Template sources use ``{slot}`` fields and must not contain literal braces.
+"""
+
+import re
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from html import escape
+from html.parser import HTMLParser
+from string import Template
+
+# ═══════════════════════════════════════════════════════════
+#  Brands
+# ═══════════════════════════════════════════════════════════
+
+
+@dataclass(frozen=True)
+class Brand:
+    name: str
+    title: str
+    primary_color: str
+    secondary_color: str
+    accent_color: str
+    tagline: str
+    logo_url: str | None = None
+
+
+PLATFORM_BRAND = Brand(
+    name="ويب فلو",
+    title="⚡ ويب فلو",
+    primary_color="#7c3aed",
+    secondary_color="#3b82f6",
+    accent_color="#a78bfa",
+    tagline="منشئ المتاجر بالذكاء الاصطناعي",
+)
+
+_COLOR = re.compile(r"#[0-9a-fA-F]{3,8}")
+
+
+def store_brand(name: str, config: dict | None) -> Brand:
+    """Brand for a store's emails, from its ``branding`` and ``logo_url`` config."""
+    config = config or {}
+    color = (config.get("branding") or {}).get("primary_color") or ""
+    if not _COLOR.fullmatch(color):
+        color = PLATFORM_BRAND.primary_color
+    return Brand(
+        name=name,
+        title=name,
+        primary_color=color,
+        secondary_color=color,
+        accent_color=color,
+        tagline=f"مدعوم من {PLATFORM_BRAND.name}",
+        logo_url=config.get("logo_url") or None,
+    )
+
+
+# ═══════════════════════════════════════════════════════════
+#  Stylesheet & Sources (Arabic RTL)
+# ═══════════════════════════════════════════════════════════
+
+_STYLESHEET = Template("""
+    body { margin: 0; padding: 0; background: #0a0b10; font-family: 'Segoe UI', Tahoma, Arial, sans-serif; }
+    .container { max-width: 560px; margin: 40px auto; background: #13141b; border-radius: 16px; border: 1px solid rgba(124, 58, 237, 0.2); overflow: hidden; }
+    .header { background: $primary; background: linear-gradient(135deg, $primary 0%, $secondary 100%); padding: 32px; text-align: center; }
+    .header h1 { color: #fff; font-size: 22px; margin: 0; }
+    .header img { max-height: 48px; }
+    .body { padding: 32px; color: #e2e8f0; line-height: 1.8; direction: rtl; text-align: right; }
+    .body p { margin: 0 0 16px; }
+    .btn { display: inline-block; background: $primary; background: linear-gradient(135deg, $primary, $secondary); color: #fff !important; text-decoration: none; padding: 14px 40px; border-radius: 10px; font-weight: 700; font-size: 16px; margin: 24px 0; }
+    .code-box { background: #1e1f2e; border: 1px solid rgba(124, 58, 237, 0.3); border-radius: 10px; padding: 20px; text-align: center; margin: 20px 0; }
+    .code { font-size: 32px; font-weight: 800; color: $accent; letter-spacing: 8px; font-family: 'Courier New', monospace; }
+    .note { color: #94a3b8; font-size: 13px; }
+    .items { width: 100%; color: #e2e8f0; border-collapse: collapse; }
+    .item td { padding: 8px 0; border-bottom: 1px solid rgba(255,255,255,0.05); }
+    .footer { padding: 20px 32px; text-align: center; color: #64748b; font-size: 12px; border-top: 1px solid rgba(255,255,255,0.05); }
+    .footer a { color: $primary; text-decoration: none; }
+""")
+
+_LAYOUT = """<!DOCTYPE html>
+<html lang="ar" dir="rtl">
+<head><meta charset="utf-8"><meta name="viewport" content="width=device-width, initial-scale=1"></head>
+<body>
+<div class="container">
+    <div class="header">{brand_header}</div>
+    <div class="body">{content}</div>
+    <div class="footer">
+        &copy; 2026 {brand_name} — {brand_tagline}<br>
+        <a href="https://webflow.sa">webflow.sa</a>
+    </div>
+</div>
+</body>
+</html>"""
+
+# name -> (subject, body); bodies are placed in the layout's ``content``
+PLATFORM_TEMPLATES = {
+    "verification": (
+        "تأكيد بريدك الإلكتروني — {brand_name}",
+        """
+        <p>مرحباً {full_name}! 👋</p>
+        <p>شكراً لتسجيلك في <strong>{brand_name}</strong>. استخدم الرمز التالي لتأكيد بريدك الإلكتروني:</p>
+        <div class="code-box">
+            <div class="code">{code}</div>
+        </div>
+        <p>الرمز صالح لمدة <strong>24 ساعة</strong>.</p>
+        <p class="note">إذا لم تقم بإنشاء حساب، تجاهل هذا البريد.</p>
+    """,
+    ),
+    "password_reset": (
+        "إعادة تعيين كلمة المرور — {brand_name}",
+        """
+        <p>مرحباً {full_name}،</p>
+        <p>تلقينا طلباً لإعادة تعيين كلمة المرور الخاصة بك. استخدم الرمز التالي:</p>
+        <div class="code-box">
+            <div class="code">{code}</div>
+        </div>
+        <p>الرمز صالح لمدة <strong>ساعة واحدة</strong> فقط.</p>
+        <p class="note">إذا لم تطلب إعادة التعيين، تجاهل هذا البريد وكلمة المرور لن تتغير.</p>
+    """,
+    ),
+    "welcome": (
+        "مرحباً بك في {brand_name}! 🎉",
+        """
+        <p>مرحباً {full_name}! 🎉</p>
+        <p>تم تأكيد حسابك بنجاح! أنت الآن جاهز لبناء متجرك الإلكتروني بالذكاء الاصطناعي.</p>
+        <p><strong>ماذا يمكنك فعله الآن؟</strong></p>
+        <ul style="padding-right: 20px;">
+            <li>🏪 أنشئ متجرك الأول بضغطة زر</li>
+            <li>🤖 استخدم الذكاء الاصطناعي لتصميم متجرك</li>
+            <li>📦 أضف منتجاتك وابدأ البيع</li>
+        </ul>
+        <p style="text-align: center;">
+            <a href="{dashboard_url}" class="btn">ابدأ الآن ←</a>
+        </p>
+    """,
+    ),
+}
+
+STORE_TEMPLATES = {
+    "order_confirmation": (
+        "تم استلام طلبك #{order_number} — {brand_name}",
+        """
+        <p>مرحباً {customer_name}،</p>
+        <p>شكراً لطلبك من <strong>{brand_name}</strong>! رقم طلبك:</p>
+        <div class="code-box">
+            <div class="code">{order_number}</div>
+        </div>
+        <table class="items">{items}</table>
+        <p>الإجمالي: <strong>{total} {currency}</strong></p>
+        <p class="note">سنرسل لك تحديثاً عند شحن طلبك.</p>
+    """,
+    ),
+}
+
+# Repeated fragments, rendered per row and passed to a raw slot
+STORE_FRAGMENTS = {
+    "order_item": (
+        '<tr class="item"><td>{name}</td><td>&times; {quantity}</td>'
+        "<td>{unit_price} {currency}</td></tr>"
+    ),
+}
+
+# Slots that take already-rendered HTML
+RAW_SLOTS = frozenset({"items"})
+
+
+# ═══════════════════════════════════════════════════════════
+#  Compiler
+# ═══════════════════════════════════════════════════════════
+
+_VOID_TAGS = frozenset(
+    {"area", "br", "col", "hr", "img", "input", "link", "meta", "source", "wbr"}
+)
+_SIMPLE_SELECTOR = re.compile(r"^([a-z0-9]*)((?:\.[\w-]+)*)$")
+
+
+@dataclass(frozen=True)
+class _Rule:
+    # Simple selectors, outermost first: (tag or "", frozenset of classes)
+    path: tuple[tuple[str, frozenset[str]], ...]
+    specificity: tuple[int, int]
+    declarations: tuple[tuple[str, str], ...]
+
+
+def _parse_stylesheet(css: str) -> list[_Rule]:
+    rules = []
+    for selectors, body in re.findall(r"([^{}]+)\{([^{}]*)\}", css):
+        declarations = tuple(
+            (name.strip().lower(), value.strip())
+            for name, _, value in (d.partition(":") for d in body.split(";") if ":" in d)
+        )
+        for selector in selectors.split(","):
+            path = []
+            for part in selector.split():
+                match = _SIMPLE_SELECTOR.match(part)
+                if match is None:
+                    raise ValueError(f"Unsupported CSS selector: {selector.strip()}")
+                tag, classes = match.groups()
+                path.append((tag, frozenset(classes.split(".")[1:])))
+            classes = sum(len(c) for _, c in path)
+            tags = sum(1 for t, _ in path if t)
+            rules.append(_Rule(tuple(path), (classes, tags), declarations))
+    # Stable sort keeps source order among equal specificity
+    return sorted(rules, key=lambda rule: rule.specificity)
+
+
+def _matches(node: tuple[str, frozenset[str]], tag: str, classes: frozenset[str]) -> bool:
+    return (not node[0] or node[0] == tag) and node[1] <= classes
+
+
+def _rule_applies(rule: _Rule, stack: list[tuple[str, frozenset[str]]]) -> bool:
+    *ancestors, (tag, classes) = stack
+    if not _matches(rule.path[-1], tag, classes):
+        return False
+    pending = list(rule.path[:-1])
+    for a_tag, a_classes in reversed(ancestors):
+        if pending and _matches(pending[-1], a_tag, a_classes):
+            pending.pop()
+    return not pending
+
+
+def _attribute(value: str) -> str:
+    return escape(value, quote=False).replace('"', "&quot;")
+
+
+class _CssInliner(HTMLParser):
+    """Re-serializes HTML with stylesheet rules moved into ``style`` attributes."""
+
+    def __init__(self, rules: list[_Rule]):
+        super().__init__(convert_charrefs=False)
+        self.rules = rules
+        self.stack: list[tuple[str, frozenset[str]]] = []
+        self.out: list[str] = []
+
+    def _open(self, tag: str, attrs: list[tuple[str, str | None]], close: str) -> None:
+        attributes = dict(attrs)
+        classes = frozenset((attributes.pop("class", None) or "").split())
+        self.stack.append((tag, classes))
+        styles: list[tuple[str, str]] = []
+        for rule in self.rules:
+            if _rule_applies(rule, self.stack):
+                # A rule overrides earlier rules' properties but keeps its own
+                # repeats (a plain background before a gradient is a fallback)
+                overridden = {name for name, _ in rule.declarations}
+                styles = [d for d in styles if d[0] not in overridden]
+                styles.extend(rule.declarations)
+        if tag in _VOID_TAGS or close:
+            self.stack.pop()
+        inline = attributes.pop("style", None)
+        declared = "; ".join(f"{name}: {value}" for name, value in styles)
+        if declared or inline:
+            attributes["style"] = "; ".join(s.strip().rstrip(";") for s in (declared, inline) if s)
+        rendered = "".join(
+            f" {name}" if value is None else f' {name}="{_attribute(value)}"'
+            for name, value in attributes.items()
+        )
+        self.out.append(f"<{tag}{rendered}{close}>")
+
+    def handle_starttag(self, tag, attrs):
+        self._open(tag, attrs, "")
+
+    def handle_startendtag(self, tag, attrs):
+        self._open(tag, attrs, " /")
+
+    def handle_endtag(self, tag):
+        for depth in range(len(self.stack) - 1, -1, -1):
+            if self.stack[depth][0] == tag:
+                del self.stack[depth:]
+                break
+        self.out.append(f"</{tag}>")
+
+    def handle_data(self, data):
+        self.out.append(data)
+
+    def handle_entityref(self, name):
+        self.out.append(f"&{name};")
+
+    def handle_charref(self, name):
+        self.out.append(f"&#{name};")
+
+    def handle_comment(self, data):
+        self.out.append(f"<!--{data}-->")
+
+    def handle_decl(self, decl):
+        self.out.append(f"<!{decl}>")
+
+
+def inline_css(html: str, css: str) -> str:
+    """``html`` with every matching rule of ``css`` written into ``style`` attributes."""
+    inliner = _CssInliner(_parse_stylesheet(css))
+    inliner.feed(html)
+    inliner.close()
+    return "".join(inliner.out)
+
+
+class _Slots(dict):
+    """Format mapping that fills brand fields and leaves every other slot in place."""
+
+    def __missing__(self, key: str) -> str:
+        return "{" + key + "}"
+
+
+def _literal(value: str) -> str:
+    return value.replace("{", "{{").replace("}", "}}")
+
+
+class CompiledTemplate:
+    """Subject and body format strings; ``render`` only fills the message slots."""
+
+    __slots__ = ("html", "subject")
+
+    def __init__(self, subject: str, html: str):
+        self.subject = subject
+        self.html = html
+
+    def render(self, **values) -> tuple[str, str]:
+        """Return (subject, html_body)."""
+        return self.subject.format_map(values), self.render_html(**values)
+
+    def render_html(self, **values) -> str:
+        """The body alone; values are escaped unless in ``RAW_SLOTS``."""
+        return self.html.format_map(
+            {
+                key: value if key in RAW_SLOTS else escape(str(value))
+                for key, value in values.items()
+            }
+        )
+
+
+def _brand_slots(brand: Brand, html: bool) -> _Slots:
+    if not html:
+        return _Slots(brand_name=_literal(brand.name))
+    if brand.logo_url:
+        header = f'<img src="{escape(brand.logo_url)}" alt="{escape(brand.name)}">'
+    else:
+        header = f"<h1>{escape(brand.title)}</h1>"
+    return _Slots(
+        brand_name=_literal(escape(brand.name)),
+        brand_tagline=_literal(escape(brand.tagline)),
+        brand_header=_literal(header),
+    )
+
+
+def _stylesheet(brand: Brand) -> str:
+    return _STYLESHEET.substitute(
+        primary=brand.primary_color,
+        secondary=brand.secondary_color,
+        accent=brand.accent_color,
+    )
+
+
+def compile_templates(
+    sources: dict[str, tuple[str, str]], brand: Brand
+) -> dict[str, CompiledTemplate]:
+    """Compile full emails (subject, body in the layout) for one brand."""
+    css = _stylesheet(brand)
+    subject_slots, html_slots = _brand_slots(brand, html=False), _brand_slots(brand, html=True)
+    compiled = {}
+    for name, (subject, body) in sources.items():
+        page = _LAYOUT.replace("{content}", body).format_map(html_slots)
+        compiled[name] = CompiledTemplate(
+            subject.format_map(subject_slots), inline_css(page, css)
+        )
+    return compiled
+
+
+def compile_fragments(sources: dict[str, str], brand: Brand) -> dict[str, CompiledTemplate]:
+    """Compile HTML fragments (no subject, no layout) for one brand."""
+    css = _stylesheet(brand)
+    html_slots = _brand_slots(brand, html=True)
+    return {
+        name: CompiledTemplate("", inline_css(source.format_map(html_slots), css))
+        for name, source in sources.items()
+    }
+
+
+# ═══════════════════════════════════════════════════════════
+#  Compiled Sets
+# ═══════════════════════════════════════════════════════════
+
+platform_templates = compile_templates(PLATFORM_TEMPLATES, PLATFORM_BRAND)
+
+
+@dataclass(frozen=True)
+class StoreTemplates:
+    brand: Brand
+    emails: dict[str, CompiledTemplate]
+    fragments: dict[str, CompiledTemplate]
+
+
+class StoreTemplateCache:
+    """LRU of per-store branded template sets; a changed brand is recompiled."""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[uuid.UUID, StoreTemplates] = OrderedDict()
+
+    def get(self, store_id: uuid.UUID, brand: Brand) -> StoreTemplates:
+        entry = self._entries.get(store_id)
+        if entry is not None and entry.brand == brand:
+            self._entries.move_to_end(store_id)
+            return entry
+        entry = StoreTemplates(
+            brand,
+            compile_templates(STORE_TEMPLATES, brand),
+            compile_fragments(STORE_FRAGMENTS, brand),
+        )
+        self._entries[store_id] = entry
+        self._entries.move_to_end(store_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+store_templates = StoreTemplateCache()
@@ -0,0 +1,75 @@
+"""
+Generation Cache — reusable store content with the store name substituted last.
+
+Content is kept as a JSON skeleton in which every occurrence of the store name
+is the literal ``STORE_NAME_TOKEN``. Rendering replaces the token with the real
+(JSON-escaped) name and parses the result, so each caller gets fresh objects.
+Template skeletons are compiled once at import (``store_generator``); AI output
+goes through ``GenerationCache``, keyed by a hash of the normalized prompt.
+"""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+
+from app.config import get_settings
+
+STORE_NAME_TOKEN = "{{STORE_NAME}}"
+
+
+def compile_skeleton(content: dict) -> str:
+    """Serialize content that uses ``STORE_NAME_TOKEN`` in place of the store name."""
+    return json.dumps(content, ensure_ascii=False)
+
+
+def render_skeleton(skeleton: str, store_name: str) -> dict:
+    """Fresh content dict with the store name substituted into the skeleton."""
+    escaped_name = json.dumps(store_name, ensure_ascii=False)[1:-1]
+    return json.loads(skeleton.replace(STORE_NAME_TOKEN, escaped_name))
+
+
+def prompt_cache_key(prompt: str) -> str:
+    """Hash of the prompt with whitespace and case normalized."""
+    normalized = " ".join(prompt.split()).casefold()
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+class GenerationCache:
+    """In-process LRU of AI output skeletons with a TTL."""
+
+    def __init__(self, max_entries: int = 256, ttl: float = 86400.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    def get(self, key: str, store_name: str) -> dict | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, skeleton = entry
+        if time.monotonic() - stored_at > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return render_skeleton(skeleton, store_name)
+
+    def put(self, key: str, content: dict) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic(), compile_skeleton(content))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+_settings = get_settings()
+
+# Singleton — shared by every generation in this process
+generation_cache = GenerationCache(
+    max_entries=_settings.AI_CONTENT_CACHE_SIZE,
+    ttl=_settings.AI_CONTENT_CACHE_TTL,
+)
@@ -0,0 +1,147 @@
+"""
+Image Processing — responsive variants and a blurhash placeholder.
+
+``render_variants`` runs in a worker process (see ``media_service``) on an
+image file: it refuses images above MAX_PIXELS from their header alone, before
+anything is decoded, then decodes the image once, resizes it down through the
+target widths, encodes each size as WebP (and AVIF when Pillow supports it)
+and computes a blurhash from a 32 px thumbnail. This module only imports the standard library at load
+time so pool processes start quickly; Pillow is imported on first use.
+"""
+
+import io
+import math
+from dataclasses import dataclass, field
+
+VARIANT_WIDTHS = (320, 640, 1024, 1600)
+# 40 MP: a 5 MB upload can otherwise claim ~90 MP (~350 MB as RGBA) per worker
+MAX_PIXELS = 40_000_000
+WEBP_QUALITY = 80
+AVIF_QUALITY = 50
+
+
+class ImageTooLargeError(ValueError):
+    """The image has more pixels than MAX_PIXELS; it was not decoded."""
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        super().__init__(f"Image of {width}x{height} exceeds {MAX_PIXELS} pixels")
+
+
+@dataclass
+class RenderedVariant:
+    width: int
+    height: int
+    format: str
+    data: bytes
+
+
+@dataclass
+class RenderedImage:
+    width: int
+    height: int
+    blurhash: str
+    variants: list[RenderedVariant] = field(default_factory=list)
+
+
+def render_variants(path: str, widths: tuple[int, ...] = VARIANT_WIDTHS) -> RenderedImage:
+    """Decode the image at ``path`` and encode the widths below its own (or just its own size)."""
+    from PIL import Image, ImageOps, features
+
+    # Pillow's own bomb check only warns below twice its (larger) default
+    Image.MAX_IMAGE_PIXELS = MAX_PIXELS
+    with Image.open(path) as opened:
+        width, height = opened.size
+        if width * height > MAX_PIXELS:
+            raise ImageTooLargeError(width, height)
+        image = ImageOps.exif_transpose(opened)
+        has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+
+    width, height = image.size
+    formats = ["webp", "avif"] if features.check("avif") else ["webp"]
+    targets = sorted((w for w in widths if w < width), reverse=True) or [width]
+
+    rendered = RenderedImage(width=width, height=height, blurhash=_blurhash(image))
+    source = image
+    # Largest first, each size resized from the previous one
+    for target in targets:
+        size = (target, max(round(height * target / width), 1))
+        if source.size != size:
+            source = source.resize(size, Image.Resampling.LANCZOS)
+        for fmt in formats:
+            out = io.BytesIO()
+            if fmt == "webp":
+                source.save(out, "WEBP", quality=WEBP_QUALITY, method=4)
+            else:
+                source.save(out, "AVIF", quality=AVIF_QUALITY, speed=8)
+            rendered.variants.append(RenderedVariant(*size, fmt, out.getvalue()))
+    rendered.variants.sort(key=lambda v: (v.format, v.width))
+    return rendered
+
+
+# ─── Blurhash (https://blurha.sh) ─────────────────────────────────
+
+_BASE83 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~"
+
+
+def _encode83(value: int, length: int) -> str:
+    return "".join(_BASE83[(value // 83 ** (length - i)) % 83] for i in range(1, length + 1))
+
+
+def _to_linear(value: int) -> float:
+    v = value / 255
+    return v / 12.92 if v <= 0.04045 else ((v + 0.055) / 1.055) ** 2.4
+
+
+def _to_srgb(value: float) -> int:
+    v = min(max(value, 0.0), 1.0)
+    if v <= 0.0031308:
+        return int(v * 12.92 * 255 + 0.5)
+    return int((1.055 * v ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+
+def _blurhash(image, size: int = 32) -> str:
+    thumb = image.convert("RGB")
+    thumb.thumbnail((size, size))
+    w, h = thumb.size
+    x_components, y_components = (4, 3) if w >= h else (3, 4)
+    raw = thumb.tobytes()
+    linear = [tuple(map(_to_linear, raw[i : i + 3])) for i in range(0, len(raw), 3)]
+
+    factors = []
+    for j in range(y_components):
+        cos_y = [math.cos(math.pi * j * y / h) for y in range(h)]
+        for i in range(x_components):
+            cos_x = [math.cos(math.pi * i * x / w) for x in range(w)]
+            r = g = b = 0.0
+            for y in range(h):
+                row = y * w
+                for x in range(w):
+                    basis = cos_x[x] * cos_y[y]
+                    pr, pg, pb = linear[row + x]
+                    r += basis * pr
+                    g += basis * pg
+                    b += basis * pb
+            scale = (1 if i == j == 0 else 2) / (w * h)
+            factors.append((r * scale, g * scale, b * scale))
+
+    dc, ac = factors[0], factors[1:]
+    result = _encode83((x_components - 1) + (y_components - 1) * 9, 1)
+    if ac:
+        quantised_max = max(0, min(82, int(max(abs(v) for f in ac for v in f) * 166 - 0.5)))
+        maximum = (quantised_max + 1) / 166
+        result += _encode83(quantised_max, 1)
+    else:
+        maximum = 1.0
+        result += _encode83(0, 1)
+    result += _encode83((_to_srgb(dc[0]) << 16) + (_to_srgb(dc[1]) << 8) + _to_srgb(dc[2]), 4)
+
+    def quantise(v: float) -> int:
+        scaled = math.copysign(abs(v / maximum) ** 0.5, v)
+        return max(0, min(18, int(scaled * 9 + 9.5)))
+
+    for r, g, b in ac:
+        result += _encode83(quantise(r) * 19 * 19 + quantise(g) * 19 + quantise(b), 2)
+    return result
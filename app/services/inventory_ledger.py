@@ -0,0 +1,189 @@
+"""
+Inventory Ledger — append-only stock movements, the live projection and snapshots.
+
+Every stock change is an ``inventory_movements`` row (sale, cancel, restock,
+adjust) written in the same transaction as the matching change to
+``Product.stock_quantity``, which stays the current-stock projection.
+Snapshots periodically fold the ledger into per-product totals, so stock at a
+past moment is one snapshot plus a short range scan of movements.
+"""
+
+import uuid
+from collections.abc import Iterable
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import and_, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.database import async_session_factory
+from app.models.inventory import InventoryMovement, InventorySnapshot
+from app.models.product import Product
+from app.services.periodic import PeriodicTask
+
+# Movements younger than this are left to the next snapshot, so transactions
+# still in flight when a snapshot is folded cannot be skipped.
+SNAPSHOT_LAG = timedelta(minutes=1)
+
+
+class InsufficientStockError(Exception):
+    """A guarded stock decrement matched no row — someone else took the stock."""
+
+    def __init__(self, product: Product, available: int):
+        self.product = product
+        self.available = available
+        super().__init__(f"insufficient stock for {product.id}: {available} left")
+
+
+def movement(
+    product: Product,
+    kind: str,
+    quantity: int,
+    order_id: uuid.UUID | None = None,
+    reason: str | None = None,
+) -> dict:
+    """Ledger row for a signed ``quantity`` change of ``product``."""
+    return {
+        "tenant_id": product.tenant_id,
+        "store_id": product.store_id,
+        "product_id": product.id,
+        "order_id": order_id,
+        "kind": kind,
+        "quantity": quantity,
+        "reason": reason,
+    }
+
+
+async def record_movements(db: AsyncSession, rows: Iterable[dict]) -> None:
+    """Append ledger rows (one multi-row INSERT); zero-quantity rows are dropped."""
+    rows = [row for row in rows if row["quantity"]]
+    if rows:
+        await db.execute(insert(InventoryMovement), rows)
+
+
+async def apply_movement(
+    db: AsyncSession,
+    product: Product,
+    kind: str,
+    quantity: int,
+    reason: str | None = None,
+    order_id: uuid.UUID | None = None,
+) -> int:
+    """
+    Change stock by ``quantity`` atomically and record it; returns the new stock.
+    A decrement that would go below zero raises ``InsufficientStockError``
+    unless the product allows backorders.
+    """
+    stmt = update(Product).where(Product.id == product.id)
+    if quantity < 0 and not product.allow_backorder:
+        stmt = stmt.where(Product.stock_quantity >= -quantity)
+    remaining = await db.scalar(
+        stmt.values(stock_quantity=Product.stock_quantity + quantity).returning(
+            Product.stock_quantity
+        )
+    )
+    if remaining is None:
+        available = await db.scalar(
+            select(Product.stock_quantity).where(Product.id == product.id)
+        )
+        raise InsufficientStockError(product, available or 0)
+    await record_movements(db, [movement(product, kind, quantity, order_id, reason)])
+    return remaining
+
+
+async def stock_at(db: AsyncSession, product_id: uuid.UUID, at: datetime) -> int:
+    """Stock of a product at ``at``: the latest snapshot before it plus later movements."""
+    snapshot = (
+        await db.execute(
+            select(InventorySnapshot.stock_quantity, InventorySnapshot.taken_at)
+            .where(InventorySnapshot.product_id == product_id, InventorySnapshot.taken_at <= at)
+            .order_by(InventorySnapshot.taken_at.desc())
+            .limit(1)
+        )
+    ).first()
+    stmt = select(func.coalesce(func.sum(InventoryMovement.quantity), 0)).where(
+        InventoryMovement.product_id == product_id, InventoryMovement.created_at <= at
+    )
+    base = 0
+    if snapshot is not None:
+        base = snapshot.stock_quantity
+        stmt = stmt.where(InventoryMovement.created_at > snapshot.taken_at)
+    return base + (await db.scalar(stmt))
+
+
+async def take_inventory_snapshots() -> int:
+    """
+    Fold movements since the previous run into new snapshots for the products
+    that moved. All snapshots of a run share ``taken_at``, which doubles as the
+    watermark for the next run.
+    """
+    cutoff = datetime.now(UTC) - SNAPSHOT_LAG
+    async with async_session_factory() as db:
+        since = await db.scalar(select(func.max(InventorySnapshot.taken_at)))
+        window = [InventoryMovement.created_at <= cutoff]
+        if since is not None:
+            window.append(InventoryMovement.created_at > since)
+        deltas = (
+            await db.execute(
+                select(
+                    InventoryMovement.product_id,
+                    InventoryMovement.tenant_id,
+                    InventoryMovement.store_id,
+                    func.sum(InventoryMovement.quantity),
+                )
+                .where(*window)
+                .group_by(
+                    InventoryMovement.product_id,
+                    InventoryMovement.tenant_id,
+                    InventoryMovement.store_id,
+                )
+            )
+        ).all()
+        if not deltas:
+            return 0
+
+        product_ids = [row[0] for row in deltas]
+        latest = (
+            select(
+                InventorySnapshot.product_id,
+                func.max(InventorySnapshot.taken_at).label("taken_at"),
+            )
+            .where(InventorySnapshot.product_id.in_(product_ids))
+            .group_by(InventorySnapshot.product_id)
+            .subquery()
+        )
+        previous = dict(
+            (
+                await db.execute(
+                    select(InventorySnapshot.product_id, InventorySnapshot.stock_quantity).join(
+                        latest,
+                        and_(
+                            InventorySnapshot.product_id == latest.c.product_id,
+                            InventorySnapshot.taken_at == latest.c.taken_at,
+                        ),
+                    )
+                )
+            ).all()
+        )
+        await db.execute(
+            insert(InventorySnapshot),
+            [
+                {
+                    "tenant_id": tenant_id,
+                    "store_id": store_id,
+                    "product_id": product_id,
+                    "stock_quantity": previous.get(product_id, 0) + delta,
+                    "taken_at": cutoff,
+                }
+                for product_id, tenant_id, store_id, delta in deltas
+            ],
+        )
+        await db.commit()
+    print(f"📸 Inventory snapshot: {len(deltas)} product(s)")
+    return len(deltas)
+
+
+# Singleton — started/stopped by the app lifespan
+inventory_snapshotter = PeriodicTask(
+    "Inventory snapshot", get_settings().INVENTORY_SNAPSHOT_INTERVAL, take_inventory_snapshots
+)
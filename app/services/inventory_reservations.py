@@ -0,0 +1,224 @@
+"""
+Inventory Reservations — stock holds with an expiry for unpaid orders.
+
+Checkout takes stock with one guarded ``UPDATE`` per product
+(``stock_quantity >= qty``), in product-id order so concurrent checkouts never
+oversell or deadlock, and records a hold that expires after
+STOCK_RESERVATION_TTL_MINUTES. A successful payment converts the hold; the
+sweeper cancels orders whose holds expired unpaid through the shared
+cancellation service, which returns their stock.
+Holds live in Redis when configured and in ``stock_reservations`` otherwise.
+"""
+
+import uuid
+from collections.abc import Sequence
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.database import async_session_factory
+from app.models.inventory import StockReservation
+from app.models.order import Order
+from app.models.product import Product
+from app.services.inventory_ledger import InsufficientStockError, movement, record_movements
+from app.services.order_cancellation import cancel_orders
+from app.services.periodic import PeriodicTask
+
+# ─── Hold stores ─────────────────────────────────────────────────
+
+
+class DatabaseHoldStore:
+    """Holds as ``stock_reservations`` rows, written in the caller's transaction."""
+
+    async def hold(
+        self,
+        db: AsyncSession,
+        order: Order,
+        quantities: dict[uuid.UUID, int],
+        expires_at: datetime,
+    ) -> None:
+        db.add_all(
+            StockReservation(
+                tenant_id=order.tenant_id,
+                order_id=order.id,
+                product_id=product_id,
+                quantity=quantity,
+                expires_at=expires_at,
+            )
+            for product_id, quantity in quantities.items()
+        )
+        await db.flush()
+
+    async def expired(self, db: AsyncSession, now: datetime, limit: int) -> list[uuid.UUID]:
+        rows = await db.execute(
+            select(StockReservation.order_id)
+            .where(StockReservation.status == "held", StockReservation.expires_at <= now)
+            .distinct()
+            .limit(limit)
+        )
+        return list(rows.scalars())
+
+    async def finish(
+        self, db: AsyncSession, order_ids: Sequence[uuid.UUID], status: str
+    ) -> None:
+        await db.execute(
+            update(StockReservation)
+            .where(StockReservation.order_id.in_(order_ids), StockReservation.status == "held")
+            .values(status=status)
+        )
+
+
+class RedisHoldStore:
+    """Holds as one hash per order plus a sorted set of expiry times."""
+
+    _EXPIRY_KEY = "stock:holds:expiry"
+
+    def __init__(self, redis_url: str):
+        import redis.asyncio as aioredis
+
+        self._redis = aioredis.from_url(redis_url, decode_responses=True)
+
+    @staticmethod
+    def _key(order_id: uuid.UUID) -> str:
+        return f"stock:holds:{order_id}"
+
+    async def hold(
+        self,
+        db: AsyncSession,
+        order: Order,
+        quantities: dict[uuid.UUID, int],
+        expires_at: datetime,
+    ) -> None:
+        # Written before the order commits: if the commit fails, the sweeper finds
+        # no pending order behind this hold and simply drops it.
+        key = self._key(order.id)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping={str(pid): qty for pid, qty in quantities.items()})
+            pipe.expireat(key, expires_at + timedelta(days=1))
+            pipe.zadd(self._EXPIRY_KEY, {str(order.id): expires_at.timestamp()})
+            await pipe.execute()
+
+    async def expired(self, db: AsyncSession, now: datetime, limit: int) -> list[uuid.UUID]:
+        members = await self._redis.zrangebyscore(
+            self._EXPIRY_KEY, "-inf", now.timestamp(), start=0, num=limit
+        )
+        return [uuid.UUID(member) for member in members]
+
+    async def finish(
+        self, db: AsyncSession, order_ids: Sequence[uuid.UUID], status: str
+    ) -> None:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.delete(*[self._key(order_id) for order_id in order_ids])
+            pipe.zrem(self._EXPIRY_KEY, *[str(order_id) for order_id in order_ids])
+            await pipe.execute()
+
+
+_hold_store: DatabaseHoldStore | RedisHoldStore | None = None
+
+
+def get_hold_store() -> DatabaseHoldStore | RedisHoldStore:
+    """Process-wide hold store — Redis when configured, the database otherwise."""
+    global _hold_store
+    if _hold_store is None:
+        settings = get_settings()
+        _hold_store = (
+            RedisHoldStore(settings.REDIS_URL) if settings.REDIS_URL else DatabaseHoldStore()
+        )
+    return _hold_store
+
+
+# ─── Reserve / convert / release ─────────────────────────────────
+
+
+async def take_stock(
+    db: AsyncSession, lines: list[tuple[Product, int]], order_id: uuid.UUID | None = None
+) -> dict[uuid.UUID, int]:
+    """
+    Deduct stock for the tracked products in ``lines``, record ``sale`` movements
+    and return what was taken per product. Raises ``InsufficientStockError`` if
+    any product ran out.
+    """
+    wanted: dict[uuid.UUID, int] = {}
+    products: dict[uuid.UUID, Product] = {}
+    for product, quantity in lines:
+        if product.track_inventory:
+            wanted[product.id] = wanted.get(product.id, 0) + quantity
+            products[product.id] = product
+
+    # Fixed lock order: two carts with the same products can't deadlock
+    for product_id in sorted(wanted):
+        quantity = wanted[product_id]
+        stmt = update(Product).where(Product.id == product_id)
+        if not products[product_id].allow_backorder:
+            stmt = stmt.where(Product.stock_quantity >= quantity)
+        remaining = await db.scalar(
+            stmt.values(stock_quantity=Product.stock_quantity - quantity).returning(
+                Product.stock_quantity
+            )
+        )
+        if remaining is None:
+            available = await db.scalar(
+                select(Product.stock_quantity).where(Product.id == product_id)
+            )
+            raise InsufficientStockError(products[product_id], available or 0)
+    await record_movements(
+        db,
+        (movement(products[pid], "sale", -qty, order_id=order_id) for pid, qty in wanted.items()),
+    )
+    return wanted
+
+
+async def reserve_order_stock(
+    db: AsyncSession, order: Order, lines: list[tuple[Product, int]], hold: bool = True
+) -> None:
+    """
+    Take stock for a flushed ``order``. With ``hold`` the stock comes back
+    automatically unless the order is paid within the reservation TTL; without
+    it (cash on delivery) the deduction is final.
+    """
+    quantities = await take_stock(db, lines, order_id=order.id)
+    if hold and quantities:
+        ttl = timedelta(minutes=get_settings().STOCK_RESERVATION_TTL_MINUTES)
+        await get_hold_store().hold(db, order, quantities, datetime.now(UTC) + ttl)
+
+
+async def convert_order_holds(db: AsyncSession, order_ids: Sequence[uuid.UUID]) -> None:
+    """The orders were paid — their stock is sold, stop the holds from expiring."""
+    if order_ids:
+        await get_hold_store().finish(db, order_ids, "converted")
+
+
+async def release_order_holds(db: AsyncSession, order_ids: Sequence[uuid.UUID]) -> None:
+    """The orders were cancelled (and their stock returned) — drop their holds."""
+    if order_ids:
+        await get_hold_store().finish(db, order_ids, "released")
+
+
+async def release_expired_reservations(limit: int = 100) -> int:
+    """Cancel unpaid orders whose holds expired and return their stock."""
+    store = get_hold_store()
+    async with async_session_factory() as db:
+        expired = await store.expired(db, datetime.now(UTC), limit)
+        if not expired:
+            return 0
+        # Orders paid or cancelled meanwhile are skipped by the conditional cancel
+        cancelled = await cancel_orders(
+            db, expired, reason="reservation_expired", unpaid_only=True
+        )
+        await db.commit()
+        # After the commit: a lost hold must never hide a still-pending order
+        await store.finish(db, expired, "released")
+        await db.commit()
+    if cancelled:
+        print(f"📦 Released stock of {len(cancelled)} expired unpaid order(s)")
+    return len(cancelled)
+
+
+# Singleton — started/stopped by the app lifespan
+reservation_sweeper = PeriodicTask(
+    "Stock reservation sweep",
+    get_settings().STOCK_RESERVATION_SWEEP_INTERVAL,
+    release_expired_reservations,
+)
@@ -0,0 +1,131 @@
+"""
+Job Events — pub/sub channel for store generation progress.
+
+Workers and the inline generator publish progress, status and result events
+per job; the SSE endpoint in ``app/api/jobs.py`` subscribes and pushes them to
+clients. Uses Redis pub/sub when REDIS_URL is set (API and ARQ worker are
+separate processes), and an in-process broadcaster otherwise.
+"""
+
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = {"done", "failed"}
+_QUEUE_SIZE = 100
+
+
+class JobEventStream:
+    """Events for one job, delivered to a single subscriber."""
+
+    def __init__(self, queue: asyncio.Queue, on_close: Callable[[], Awaitable[None]]):
+        self._queue = queue
+        self._on_close = on_close
+
+    async def get(self, timeout: float | None = None) -> dict | None:
+        """Next event, or None if nothing arrived within ``timeout`` seconds."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout=timeout)
+        except TimeoutError:
+            return None
+
+    async def close(self) -> None:
+        await self._on_close()
+
+
+def _offer(queue: asyncio.Queue, event: dict) -> None:
+    """Enqueue without blocking — a slow subscriber loses oldest progress, not the publisher."""
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(event)
+
+
+class InProcessBroadcaster:
+    """Fan-out to subscribers living in this process (single-node, no Redis)."""
+
+    def __init__(self):
+        self._subscribers: dict[str, set[asyncio.Queue]] = defaultdict(set)
+
+    async def publish(self, job_id: str, event: dict) -> None:
+        for queue in list(self._subscribers.get(job_id, ())):
+            _offer(queue, event)
+
+    async def subscribe(self, job_id: str) -> JobEventStream:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=_QUEUE_SIZE)
+        self._subscribers[job_id].add(queue)
+
+        async def _close() -> None:
+            subscribers = self._subscribers.get(job_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[job_id]
+
+        return JobEventStream(queue, _close)
+
+
+class RedisBroadcaster:
+    """Fan-out through Redis pub/sub — one channel per job."""
+
+    def __init__(self, redis_url: str):
+        import redis.asyncio as aioredis
+
+        self._redis = aioredis.from_url(redis_url, decode_responses=True)
+
+    @staticmethod
+    def _channel(job_id: str) -> str:
+        return f"jobs:{job_id}:events"
+
+    async def publish(self, job_id: str, event: dict) -> None:
+        await self._redis.publish(self._channel(job_id), json.dumps(event, default=str))
+
+    async def subscribe(self, job_id: str) -> JobEventStream:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=_QUEUE_SIZE)
+        pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(self._channel(job_id))
+
+        async def _reader() -> None:
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    _offer(queue, json.loads(message["data"]))
+
+        reader = asyncio.create_task(_reader())
+
+        async def _close() -> None:
+            reader.cancel()
+            try:
+                await pubsub.unsubscribe()
+                await pubsub.aclose()
+            except Exception:
+                logger.debug("Redis pubsub close failed", exc_info=True)
+
+        return JobEventStream(queue, _close)
+
+
+_broadcaster: InProcessBroadcaster | RedisBroadcaster | None = None
+
+
+def get_job_broadcaster() -> InProcessBroadcaster | RedisBroadcaster:
+    """Process-wide broadcaster — Redis when configured, in-process otherwise."""
+    global _broadcaster
+    if _broadcaster is None:
+        settings = get_settings()
+        _broadcaster = (
+            RedisBroadcaster(settings.REDIS_URL) if settings.REDIS_URL else InProcessBroadcaster()
+        )
+    return _broadcaster
+
+
+async def publish_job_event(job_id, event_type: str, **data) -> None:
+    """Publish an event for a job. Never raises — progress must not fail a job."""
+    event = {"type": event_type, "job_id": str(job_id), **data}
+    try:
+        await get_job_broadcaster().publish(str(job_id), event)
+    except Exception as e:
+        logger.warning(f"[JOBS] Failed to publish {event_type} for job {job_id}: {e}")
@@ -0,0 +1,106 @@
+"""
+Job Progress Reporter — turns generator progress events into coalesced DB writes.
+
+The generator reports every stage it reaches; the reporter only persists the
+latest one when at least ``min_interval`` seconds passed since the last write,
+so fast generations cost a single UPDATE instead of one per stage. Every event
+is still pushed to subscribers through the job events channel.
+"""
+
+import time
+import uuid
+from datetime import UTC, datetime
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.job import Job
+from app.services.job_events import TERMINAL_STATUSES, publish_job_event
+
+
+class JobProgressReporter:
+    """Async callable passed to ``generate_store`` as its ``on_progress`` hook."""
+
+    def __init__(self, db: AsyncSession, job_id: uuid.UUID, min_interval: float = 1.0):
+        self.db = db
+        self.job_id = job_id
+        self.min_interval = min_interval
+        self.progress = 0
+        self.message = ""
+        self._persisted = 0
+        self._last_write = time.monotonic()
+
+    async def __call__(self, message: str, progress: int) -> None:
+        """Record a progress event; write it only if the interval has elapsed."""
+        # Progress never goes backwards
+        if progress < self.progress:
+            return
+        self.progress = progress
+        self.message = message
+        print(f"  📦 [{progress}%] {message}")
+        await publish_job_event(self.job_id, "progress", progress=progress, message=message)
+
+        if time.monotonic() - self._last_write >= self.min_interval:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Persist the latest progress if it changed since the last write."""
+        if self.progress == self._persisted:
+            return
+        await self.db.execute(
+            update(Job).where(Job.id == self.job_id).values(progress=self.progress)
+        )
+        await self.db.commit()
+        self._persisted = self.progress
+        self._last_write = time.monotonic()
+
+
+async def batch_job_summary(db: AsyncSession, batch_id: uuid.UUID) -> dict:
+    """Aggregate the child jobs of a batch with one GROUP BY query."""
+    rows = await db.execute(
+        select(Job.status, func.count(), func.coalesce(func.sum(Job.progress), 0))
+        .where(Job.parent_id == batch_id)
+        .group_by(Job.status)
+    )
+    counts = {"queued": 0, "running": 0, "done": 0, "failed": 0}
+    total = progress_sum = 0
+    for job_status, count, status_progress in rows:
+        counts[job_status] = counts.get(job_status, 0) + count
+        total += count
+        # Finished jobs count as complete even if they failed midway
+        progress_sum += 100 * count if job_status in TERMINAL_STATUSES else status_progress
+
+    if total and counts["done"] + counts["failed"] == total:
+        status = "failed" if counts["failed"] == total else "done"
+    elif counts["running"] or counts["done"] or counts["failed"]:
+        status = "running"
+    else:
+        status = "queued"
+    return {
+        "status": status,
+        "progress": progress_sum // total if total else 0,
+        "total": total,
+        **counts,
+    }
+
+
+async def refresh_batch_job(db: AsyncSession, batch_id: uuid.UUID) -> dict:
+    """Roll a batch's child jobs up into the parent job row and notify subscribers."""
+    # Write-lock the parent first so concurrent finishers serialize and the
+    # last one to commit aggregates every sibling's final status
+    await db.execute(update(Job).where(Job.id == batch_id).values(updated_at=func.now()))
+    summary = await batch_job_summary(db, batch_id)
+    values: dict = {"status": summary["status"], "progress": summary["progress"]}
+    if summary["status"] in TERMINAL_STATUSES:
+        values.update(
+            completed_at=datetime.now(UTC),
+            result={k: summary[k] for k in ("total", "done", "failed")},
+        )
+    await db.execute(update(Job).where(Job.id == batch_id).values(**values))
+    await db.commit()
+
+    if summary["status"] in TERMINAL_STATUSES:
+        await publish_job_event(batch_id, "result", **summary)
+    else:
+        await publish_job_event(batch_id, "progress", **summary)
+    return summary
@@ -0,0 +1,119 @@
+"""
+Job Queue — app-lifetime ARQ connection pool for background jobs.
+
+The pool is created once in the FastAPI lifespan and reused by every request.
+A background probe pings Redis periodically (and reconnects after outages),
+so ``available`` answers the enqueue-or-inline question instantly instead of
+each request waiting on a connection timeout.
+"""
+
+import asyncio
+import logging
+
+from arq import create_pool
+from arq.connections import ArqRedis, RedisSettings
+from arq.jobs import Job as ArqJob
+from arq.jobs import JobStatus
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def parse_redis_url(url: str) -> RedisSettings:
+    """Parse redis[s]://[user:password@]host:port/db into RedisSettings."""
+    if not url:
+        return RedisSettings()
+    return RedisSettings.from_dsn(url)
+
+
+class JobQueue:
+    """Shared ARQ pool with a health flag kept fresh by a background probe."""
+
+    def __init__(self, redis_url: str, probe_interval: float = 10.0, probe_timeout: float = 2.0):
+        self.redis_url = redis_url
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self._pool: ArqRedis | None = None
+        self._healthy = False
+        self._probe_task: asyncio.Task[None] | None = None
+
+    @property
+    def available(self) -> bool:
+        """True when Redis answered the most recent probe."""
+        return self._pool is not None and self._healthy
+
+    async def start(self) -> None:
+        """Connect once and start the health probe. No-op without REDIS_URL."""
+        if not self.redis_url or self._probe_task is not None:
+            return
+        await self._probe()
+        self._probe_task = asyncio.create_task(self._probe_loop())
+        state = "connected" if self.available else "unreachable, using inline jobs"
+        print(f"[QUEUE] Redis job queue {state}.")
+
+    async def stop(self) -> None:
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            self._probe_task = None
+        if self._pool is not None:
+            await self._pool.aclose()
+            self._pool = None
+        self._healthy = False
+
+    async def enqueue(self, function: str, *args, job_id: str | None = None) -> bool:
+        """
+        Enqueue a job on the shared pool. Returns False if the caller should run it inline.
+        With ``job_id`` ARQ ignores a second job of the same id, and a timed-out
+        enqueue that Redis did accept is recognised instead of also running inline.
+        """
+        if not self.available:
+            return False
+        try:
+            await asyncio.wait_for(
+                self._pool.enqueue_job(function, *args, _job_id=job_id),
+                timeout=self.probe_timeout,
+            )
+            return True
+        except Exception as e:
+            self._healthy = False
+            if job_id is not None and await self._job_exists(job_id):
+                return True
+            logger.warning(f"[QUEUE] Enqueue of {function} failed, falling back inline: {e}")
+            return False
+
+    async def _job_exists(self, job_id: str) -> bool:
+        """Whether ARQ holds ``job_id`` (queued, running or done); False when unknown."""
+        try:
+            status = await asyncio.wait_for(
+                ArqJob(job_id, self._pool).status(), timeout=self.probe_timeout
+            )
+        except Exception:
+            return False
+        return status != JobStatus.not_found
+
+    async def _probe(self) -> None:
+        try:
+            if self._pool is None:
+                settings = parse_redis_url(self.redis_url)
+                settings.conn_retries = 0
+                self._pool = await asyncio.wait_for(
+                    create_pool(settings), timeout=self.probe_timeout
+                )
+            await asyncio.wait_for(self._pool.ping(), timeout=self.probe_timeout)
+            if not self._healthy:
+                logger.info("[QUEUE] Redis job queue available")
+            self._healthy = True
+        except Exception as e:
+            if self._healthy:
+                logger.warning(f"[QUEUE] Redis job queue unavailable: {e}")
+            self._healthy = False
+
+    async def _probe_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.probe_interval)
+            await self._probe()
+
+
+# Singleton — started/stopped by the app lifespan
+job_queue = JobQueue(get_settings().REDIS_URL)
@@ -0,0 +1,330 @@
+"""
+Media Service — content-addressed uploads and their responsive variants.
+
+Uploads are stored once per distinct content: ``store_image`` keys objects by
+their SHA-256 and keeps a reference count in ``media_objects``, with each
+tenant's own references in ``media_references``. Uploading bytes that are
+already stored only adds references. ``release_image`` drops one of the
+caller's references, and removes the object's rows (and its variants') when
+the last reference of any tenant goes — the same template photo used by many
+generated stores is kept once. Storage and database cannot share a
+transaction, so files are deleted only after the rows are committed away
+(``delete_stored_media``), and files written for rows that never committed
+are removed again (``discard_unrecorded_media``).
+
+After a new upload, ``create_image_variants`` streams the file to a temporary
+path and hands that to a process pool (IMAGE_PROCESS_WORKERS processes, so
+decoding and encoding never hold the API's GIL or its memory), stores the
+resized WebP/AVIF copies next to the original and records them as a
+``MediaAsset``. If storing a variant fails, the ones written are removed and
+the upload is kept without variants. Storefront responses look assets up by
+URL and expose them as ``srcset`` strings with a blurhash placeholder.
+
+Needs Pillow; without it uploads are stored as-is.
+"""
+
+import asyncio
+import importlib.util
+import logging
+import multiprocessing
+import os
+import tempfile
+import uuid
+from collections.abc import AsyncIterable, Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.media import MediaAsset, MediaObject, MediaReference
+from app.services.image_processing import ImageTooLargeError, RenderedImage, render_variants
+from app.services.upload_service import upload_service
+
+logger = logging.getLogger(__name__)
+
+PROCESSABLE_TYPES = {"image/jpeg", "image/png", "image/webp"}
+EXTENSIONS = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/webp": "webp",
+    "image/gif": "gif",
+    "image/svg+xml": "svg",
+}
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=get_settings().IMAGE_PROCESS_WORKERS,
+            # Not fork: the API process has an event loop and thread pools
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def close_image_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def content_key(sha256: str, content_type: str) -> str:
+    """Storage key for content with hash ``sha256``, e.g. ``media/3f/3fa9….png``."""
+    return f"media/{sha256[:2]}/{sha256}.{EXTENSIONS.get(content_type, 'bin')}"
+
+
+async def _add_object_reference(db: AsyncSession, sha256: str) -> MediaObject | None:
+    return await db.scalar(
+        update(MediaObject)
+        .where(MediaObject.sha256 == sha256)
+        .values(ref_count=MediaObject.ref_count + 1)
+        .returning(MediaObject)
+    )
+
+
+async def _add_tenant_reference(
+    db: AsyncSession, tenant_id: uuid.UUID, media_id: uuid.UUID
+) -> int:
+    """Count one more upload of ``media_id`` by ``tenant_id``; returns the tenant's count."""
+    stmt = (
+        update(MediaReference)
+        .where(MediaReference.tenant_id == tenant_id, MediaReference.media_object_id == media_id)
+        .values(count=MediaReference.count + 1)
+        .returning(MediaReference.count)
+    )
+    held = await db.scalar(stmt)
+    if held is not None:
+        return held
+    try:
+        async with db.begin_nested():
+            db.add(MediaReference(tenant_id=tenant_id, media_object_id=media_id, count=1))
+    except IntegrityError:
+        # A concurrent upload by the same tenant created the row first
+        return await db.scalar(stmt)
+    return 1
+
+
+@dataclass
+class StoredMedia:
+    media: MediaObject
+    created: bool  # this call stored the bytes
+    duplicate: bool  # the tenant already held this content
+
+
+async def store_image(
+    db: AsyncSession,
+    tenant_id: uuid.UUID,
+    sha256: str,
+    chunks: AsyncIterable[bytes],
+    content_type: str,
+) -> StoredMedia | None:
+    """
+    Give ``tenant_id`` a reference to the content hashed ``sha256``, storing
+    ``chunks`` only when that content is new. Returns None when storage failed.
+    """
+    media = await _add_object_reference(db, sha256)
+    created = False
+    if media is None:
+        stored = await upload_service.upload_image(
+            chunks, "", content_type, key=content_key(sha256, content_type)
+        )
+        if stored is None:
+            return None
+        media = MediaObject(
+            sha256=sha256, url=stored.url, content_type=content_type, size=stored.size
+        )
+        try:
+            async with db.begin_nested():
+                db.add(media)
+            created = True
+        except IntegrityError:
+            # The same bytes were stored concurrently and recorded first (same key)
+            media = await _add_object_reference(db, sha256)
+
+    held = await _add_tenant_reference(db, tenant_id, media.id)
+    return StoredMedia(media=media, created=created, duplicate=held > 1)
+
+
+async def release_image(db: AsyncSession, tenant_id: uuid.UUID, url: str) -> list[str] | None:
+    """
+    Drop one of ``tenant_id``'s references to ``url``; None when it holds
+    none. The last reference of any tenant deletes the object's rows and
+    returns its stored URLs (with the variants), to be passed to
+    ``delete_stored_media`` once the caller has committed. URLs stored before
+    content addressing are released the same way, but only from the tenant's
+    own folder.
+    """
+    media_id = await db.scalar(select(MediaObject.id).where(MediaObject.url == url))
+    if media_id is None:
+        key = upload_service.storage.key_for(url) if url else None
+        if key is None or not key.startswith(f"{tenant_id}/"):
+            return None
+        return [url, *await _forget_variants(db, url)]
+
+    owned = (MediaReference.tenant_id == tenant_id, MediaReference.media_object_id == media_id)
+    held = await db.scalar(
+        update(MediaReference)
+        .where(*owned, MediaReference.count > 0)
+        .values(count=MediaReference.count - 1)
+        .returning(MediaReference.count)
+    )
+    if held is None:
+        return None
+    if held == 0:
+        await db.execute(delete(MediaReference).where(*owned, MediaReference.count <= 0))
+
+    remaining = await db.scalar(
+        update(MediaObject)
+        .where(MediaObject.id == media_id)
+        .values(ref_count=MediaObject.ref_count - 1)
+        .returning(MediaObject.ref_count)
+    )
+    if remaining > 0:
+        return []
+    await db.execute(
+        delete(MediaObject).where(MediaObject.id == media_id, MediaObject.ref_count <= 0)
+    )
+    return [url, *await _forget_variants(db, url)]
+
+
+async def delete_stored_media(urls: Sequence[str]) -> None:
+    """Delete files whose rows are gone — only after that change has committed."""
+    if urls:
+        await upload_service.delete_images(urls)
+
+
+async def discard_unrecorded_media(db: AsyncSession, sha256: str, urls: Sequence[str]) -> None:
+    """
+    Roll back and delete files written for content whose rows never
+    committed — unless another upload of the same content recorded it
+    meanwhile, since it stored the very same keys.
+    """
+    await db.rollback()
+    if not urls:
+        return
+    recorded = await db.scalar(select(MediaObject.id).where(MediaObject.sha256 == sha256))
+    if recorded is None:
+        await upload_service.delete_images(urls)
+
+
+async def _one_chunk(data: bytes):
+    yield data
+
+
+async def _render(chunks: AsyncIterable[bytes]) -> RenderedImage:
+    """Spool ``chunks`` to a temporary file and render it in the process pool."""
+    import aiofiles
+
+    fd, path = tempfile.mkstemp(prefix="upload-", suffix=".img")
+    os.close(fd)
+    try:
+        async with aiofiles.open(path, "wb") as f:
+            async for chunk in chunks:
+                await f.write(chunk)
+        return await asyncio.get_running_loop().run_in_executor(
+            _get_pool(), render_variants, path
+        )
+    finally:
+        os.remove(path)
+
+
+async def create_image_variants(
+    db: AsyncSession, url: str, chunks: AsyncIterable[bytes], content_type: str
+) -> MediaAsset | None:
+    """
+    Render, store and record the variants of the image uploaded at ``url``.
+    Returns None, storing nothing, when the image cannot be processed.
+    """
+    if content_type not in PROCESSABLE_TYPES:
+        return None
+    if importlib.util.find_spec("PIL") is None:
+        logger.warning("Pillow not installed, skipping image variants")
+        return None
+
+    storage = upload_service.storage
+    key = storage.key_for(url)
+    if key is None:
+        return None
+    try:
+        rendered = await _render(chunks)
+    except ImageTooLargeError as e:
+        logger.warning(f"Skipping variants for {url}: {e}")
+        return None
+    except Exception:
+        logger.exception(f"Image processing failed for {url}")
+        return None
+
+    base = key.rsplit(".", 1)[0]
+    keys = [f"{base}_{variant.width}.{variant.format}" for variant in rendered.variants]
+    outcomes = await asyncio.gather(
+        *(
+            storage.upload(key, _one_chunk(variant.data), f"image/{variant.format}")
+            for key, variant in zip(keys, rendered.variants, strict=True)
+        ),
+        return_exceptions=True,
+    )
+    failures = [outcome for outcome in outcomes if isinstance(outcome, BaseException)]
+    if failures:
+        # The original is stored; serve it without variants rather than fail the upload
+        logger.error(f"Storing variants for {url} failed: {failures[0]!r}")
+        written = [k for k, outcome in zip(keys, outcomes, strict=True) if outcome is None]
+        await upload_service.delete_images([storage.url_for(k) for k in written])
+        return None
+
+    variants = [
+        {
+            "url": storage.url_for(key),
+            "width": variant.width,
+            "height": variant.height,
+            "format": variant.format,
+        }
+        for key, variant in zip(keys, rendered.variants, strict=True)
+    ]
+
+    asset = MediaAsset(
+        url=url,
+        content_type=content_type,
+        width=rendered.width,
+        height=rendered.height,
+        blurhash=rendered.blurhash,
+        variants=variants,
+    )
+    db.add(asset)
+    await db.flush()
+    return asset
+
+
+async def _forget_variants(db: AsyncSession, url: str) -> list[str]:
+    """Delete the asset record of ``url``, if any; returns its variant URLs."""
+    asset = await db.scalar(select(MediaAsset).where(MediaAsset.url == url))
+    if asset is None:
+        return []
+    await db.delete(asset)
+    await db.flush()
+    return [variant["url"] for variant in asset.variants]
+
+
+async def media_assets_by_url(
+    db: AsyncSession, urls: Iterable[str | None]
+) -> dict[str, MediaAsset]:
+    """Assets for whichever of ``urls`` have variants, in one query."""
+    wanted = {url for url in urls if url}
+    if not wanted:
+        return {}
+    rows = await db.scalars(select(MediaAsset).where(MediaAsset.url.in_(wanted)))
+    return {asset.url: asset for asset in rows}
+
+
+def srcset(asset: MediaAsset) -> dict[str, str]:
+    """``srcset`` attribute values per format, e.g. {"webp": "a_320.webp 320w, ..."}."""
+    by_format: dict[str, list[str]] = {}
+    for variant in sorted(asset.variants, key=lambda v: v["width"]):
+        by_format.setdefault(variant["format"], []).append(f"{variant['url']} {variant['width']}w")
+    return {fmt: ", ".join(entries) for fmt, entries in by_format.items()}
@@ -0,0 +1,241 @@
+"""
+Object Storage — where uploaded media lives.
+
+Two backends with the same async interface:
+  • S3ObjectStorage    — Cloudflare R2 (or any S3 API) through one long-lived
+                         boto3 client; its blocking calls run on a dedicated
+                         thread pool of STORAGE_IO_THREADS, never on the loop
+  • LocalObjectStorage — files under ``uploads/`` served from ``/static/uploads``;
+                         the default without R2 credentials, and the stand-in
+                         used by tests
+
+Uploads take an async iterable of chunks: S3 stores small objects with one PUT
+and switches to a multipart upload once the data passes one part. Deletes can
+be batched (``DeleteObjects``, 1000 keys per request).
+"""
+
+import asyncio
+import logging
+import os
+import uuid
+from collections.abc import AsyncIterable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from functools import partial
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# S3 parts must be at least 5 MiB, except the last one
+MULTIPART_PART_SIZE = 8 * 1024 * 1024
+# DeleteObjects accepts at most this many keys
+DELETE_BATCH_SIZE = 1000
+
+
+class S3ObjectStorage:
+    """S3-compatible bucket behind a pooled client and an I/O thread pool."""
+
+    def __init__(
+        self,
+        bucket: str,
+        public_url: str,
+        *,
+        endpoint_url: str | None = None,
+        access_key: str = "",
+        secret_key: str = "",
+        io_threads: int = 8,
+        client=None,
+    ):
+        self.bucket = bucket
+        self.public_url = public_url.rstrip("/")
+        self._endpoint_url = endpoint_url
+        self._access_key = access_key
+        self._secret_key = secret_key
+        self._client = client
+        self._io_threads = io_threads
+        self._executor = ThreadPoolExecutor(
+            max_workers=io_threads, thread_name_prefix="object-storage"
+        )
+
+    @property
+    def client(self):
+        if self._client is None:
+            import boto3
+            from botocore.config import Config
+
+            self._client = boto3.client(
+                "s3",
+                endpoint_url=self._endpoint_url,
+                aws_access_key_id=self._access_key,
+                aws_secret_access_key=self._secret_key,
+                config=Config(
+                    signature_version="s3v4",
+                    max_pool_connections=self._io_threads,
+                ),
+                region_name="auto",
+            )
+        return self._client
+
+    async def _call(self, method: str, **kwargs):
+        func = partial(getattr(self.client, method), Bucket=self.bucket, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func)
+
+    def url_for(self, key: str) -> str:
+        return f"{self.public_url}/{key}"
+
+    def key_for(self, url: str) -> str | None:
+        prefix = f"{self.public_url}/"
+        return url.removeprefix(prefix) if url.startswith(prefix) else None
+
+    async def upload(self, key: str, chunks: AsyncIterable[bytes], content_type: str) -> None:
+        buffer = bytearray()
+        upload_id = None
+        parts: list[dict] = []
+
+        async def flush_part() -> None:
+            number = len(parts) + 1
+            part = await self._call(
+                "upload_part", Key=key, UploadId=upload_id, PartNumber=number, Body=bytes(buffer)
+            )
+            parts.append({"PartNumber": number, "ETag": part["ETag"]})
+            buffer.clear()
+
+        try:
+            async for chunk in chunks:
+                buffer += chunk
+                if len(buffer) >= MULTIPART_PART_SIZE:
+                    if upload_id is None:
+                        created = await self._call(
+                            "create_multipart_upload", Key=key, ContentType=content_type
+                        )
+                        upload_id = created["UploadId"]
+                    await flush_part()
+
+            if upload_id is None:
+                await self._call(
+                    "put_object", Key=key, Body=bytes(buffer), ContentType=content_type
+                )
+            else:
+                if buffer:
+                    await flush_part()
+                await self._call(
+                    "complete_multipart_upload",
+                    Key=key,
+                    UploadId=upload_id,
+                    MultipartUpload={"Parts": parts},
+                )
+        except BaseException:
+            if upload_id is not None:
+                with suppress(Exception):
+                    await self._call("abort_multipart_upload", Key=key, UploadId=upload_id)
+            raise
+
+    async def delete(self, key: str) -> bool:
+        await self._call("delete_object", Key=key)
+        return True
+
+    async def delete_many(self, keys: Sequence[str]) -> list[str]:
+        """Delete ``keys`` in batches; returns the keys that were deleted."""
+        deleted: list[str] = []
+        for start in range(0, len(keys), DELETE_BATCH_SIZE):
+            batch = keys[start : start + DELETE_BATCH_SIZE]
+            resp = await self._call(
+                "delete_objects",
+                Delete={"Objects": [{"Key": key} for key in batch], "Quiet": False},
+            )
+            deleted.extend(item["Key"] for item in resp.get("Deleted", []))
+            for error in resp.get("Errors", []):
+                logger.warning(f"[STORAGE] Delete failed for {error.get('Key')}: {error}")
+        return deleted
+
+    async def aclose(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+class LocalObjectStorage:
+    """Files on local disk; a partial upload never appears under its key."""
+
+    def __init__(self, root: str = "uploads", url_prefix: str = "/static/uploads"):
+        self.root = root
+        self.url_prefix = url_prefix.rstrip("/")
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def url_for(self, key: str) -> str:
+        return f"{self.url_prefix}/{key}"
+
+    def key_for(self, url: str) -> str | None:
+        prefix = f"{self.url_prefix}/"
+        key = url.removeprefix(prefix) if url.startswith(prefix) else None
+        # Keys never climb out of the storage root
+        if key is None or ".." in key.split("/") or os.path.isabs(key):
+            return None
+        return key
+
+    async def upload(self, key: str, chunks: AsyncIterable[bytes], content_type: str) -> None:
+        import aiofiles
+
+        filepath = self._path(key)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        # Own temp name per write: identical content may be stored concurrently
+        temp = f"{filepath}.{uuid.uuid4().hex}.part"
+        try:
+            async with aiofiles.open(temp, "wb") as f:
+                async for chunk in chunks:
+                    await f.write(chunk)
+            os.replace(temp, filepath)
+        except BaseException:
+            with suppress(FileNotFoundError):
+                os.remove(temp)
+            raise
+
+    async def delete(self, key: str) -> bool:
+        try:
+            await asyncio.to_thread(os.remove, self._path(key))
+        except FileNotFoundError:
+            return False
+        return True
+
+    async def delete_many(self, keys: Sequence[str]) -> list[str]:
+        return [key for key in keys if await self.delete(key)]
+
+    async def aclose(self) -> None:
+        pass
+
+
+_storage: S3ObjectStorage | LocalObjectStorage | None = None
+
+
+def get_object_storage() -> S3ObjectStorage | LocalObjectStorage:
+    """Process-wide storage — R2 when its credentials are set, local disk otherwise."""
+    global _storage
+    if _storage is None:
+        settings = get_settings()
+        account = settings.CLOUDFLARE_ACCOUNT_ID
+        if account and settings.R2_ACCESS_KEY_ID and settings.R2_SECRET_ACCESS_KEY:
+            try:
+                import boto3  # noqa: F401
+            except ImportError:
+                logger.warning("boto3 not installed, falling back to local storage")
+            else:
+                bucket = settings.R2_BUCKET_NAME
+                _storage = S3ObjectStorage(
+                    bucket,
+                    settings.R2_PUBLIC_URL or f"https://{bucket}.{account}.r2.dev",
+                    endpoint_url=f"https://{account}.r2.cloudflarestorage.com",
+                    access_key=settings.R2_ACCESS_KEY_ID,
+                    secret_key=settings.R2_SECRET_ACCESS_KEY,
+                    io_threads=settings.STORAGE_IO_THREADS,
+                )
+        if _storage is None:
+            _storage = LocalObjectStorage()
+    return _storage
+
+
+async def close_object_storage() -> None:
+    global _storage
+    if _storage is not None:
+        await _storage.aclose()
+        _storage = None
@@ -0,0 +1,104 @@
+"""
+Order Cancellation — cancel one or many orders and put their stock back.
+
+Shared by admin cancels, failed payments and expired reservations. The status
+change is one conditional ``UPDATE`` (an order is never restored twice), stock
+returns with a single ``UPDATE products ... FROM (VALUES ...)`` on PostgreSQL
+(a batched executemany of atomic increments elsewhere), and every returned
+quantity is recorded as a ``cancel`` movement in the inventory ledger. Each
+cancelled order also gets an ``order.cancelled`` outbox event.
+"""
+
+import uuid
+from collections.abc import Sequence
+
+from sqlalchemy import Integer, Uuid, bindparam, column, func, select, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.order import Order, OrderItem
+from app.models.product import Product
+from app.services.inventory_ledger import record_movements
+from app.services.order_events import ORDER_EVENT_COLUMNS, order_event_row, record_order_events
+
+
+async def return_stock(db: AsyncSession, quantities: dict[uuid.UUID, int]) -> None:
+    """Add ``quantities`` back to product stock in one statement."""
+    if not quantities:
+        return
+    rows = sorted(quantities.items())  # stable lock order
+    if db.get_bind().dialect.name == "postgresql":
+        source = values(column("id", Uuid()), column("qty", Integer()), name="returned").data(
+            rows
+        )
+        await db.execute(
+            update(Product)
+            .where(Product.id == source.c.id)
+            .values(stock_quantity=Product.stock_quantity + source.c.qty)
+            .execution_options(synchronize_session=False)
+        )
+    else:
+        products = Product.__table__
+        await db.execute(
+            update(products)
+            .where(products.c.id == bindparam("product_id"))
+            .values(stock_quantity=products.c.stock_quantity + bindparam("qty")),
+            [{"product_id": product_id, "qty": qty} for product_id, qty in rows],
+        )
+
+
+async def cancel_orders(
+    db: AsyncSession,
+    order_ids: Sequence[uuid.UUID],
+    reason: str,
+    store_id: uuid.UUID | None = None,
+    unpaid_only: bool = False,
+) -> list[uuid.UUID]:
+    """
+    Cancel the given orders and return the ids that actually changed state.
+    ``unpaid_only`` restricts it to orders still pending and unpaid (used when
+    the cancel is automatic rather than a merchant decision).
+    """
+    if not order_ids:
+        return []
+    stmt = update(Order).where(Order.id.in_(order_ids), Order.status != "cancelled")
+    if store_id is not None:
+        stmt = stmt.where(Order.store_id == store_id)
+    if unpaid_only:
+        stmt = stmt.where(Order.status == "pending", Order.payment_status == "unpaid")
+    cancelled = (
+        await db.execute(stmt.values(status="cancelled").returning(*ORDER_EVENT_COLUMNS))
+    ).all()
+    if not cancelled:
+        return []
+    owners = {row.id: (row.tenant_id, row.store_id) for row in cancelled}
+
+    # Quantities to return, per order and product, for inventory-tracked products only
+    items = await db.execute(
+        select(OrderItem.order_id, OrderItem.product_id, func.sum(OrderItem.quantity))
+        .join(Product, Product.id == OrderItem.product_id)
+        .where(OrderItem.order_id.in_(owners), Product.track_inventory.is_(True))
+        .group_by(OrderItem.order_id, OrderItem.product_id)
+    )
+    totals: dict[uuid.UUID, int] = {}
+    movements = []
+    for order_id, product_id, quantity in items:
+        totals[product_id] = totals.get(product_id, 0) + quantity
+        tenant_id, order_store_id = owners[order_id]
+        movements.append(
+            {
+                "tenant_id": tenant_id,
+                "store_id": order_store_id,
+                "product_id": product_id,
+                "order_id": order_id,
+                "kind": "cancel",
+                "quantity": quantity,
+                "reason": reason,
+            }
+        )
+
+    await return_stock(db, totals)
+    await record_movements(db, movements)
+    await record_order_events(
+        db, [order_event_row(row, "order.cancelled", reason=reason) for row in cancelled]
+    )
+    return list(owners)
@@ -0,0 +1,96 @@
+"""
+Order Event Consumers — side effects of order changes, run by the dispatcher.
+
+  • customer_stats  — keeps the store's Customer aggregates (orders, spend) in step
+  • order_emails    — queues the order confirmation email to the buyer
+  • store_webhook   — POSTs every event, signed, to the store's ``config.webhook_url``
+
+Database consumers (emails go through the outbox table) commit together with
+their delivery mark, so they run exactly once; webhooks are at-least-once.
+"""
+
+import json
+from datetime import UTC, datetime
+from decimal import Decimal
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.customer import Customer
+from app.models.order import OrderEvent
+from app.models.store import Store
+from app.services.email_service import queue_order_confirmation_email
+from app.services.order_events import order_event_dispatcher
+from app.services.store_webhooks import new_webhook_secret, post_webhook
+
+
+async def update_customer_stats(db: AsyncSession, event: OrderEvent) -> None:
+    data = event.payload
+    email = data["customer_email"].strip().lower()
+    customer = await db.scalar(
+        select(Customer).where(
+            Customer.store_id == event.store_id, func.lower(Customer.email) == email
+        )
+    )
+    if customer is None:
+        customer = Customer(
+            tenant_id=event.tenant_id,
+            store_id=event.store_id,
+            name=data["customer_name"],
+            email=email,
+            phone=data.get("customer_phone"),
+            total_orders=0,
+            total_spent=Decimal("0.00"),
+        )
+        db.add(customer)
+
+    total = Decimal(data["total"])
+    if event.type == "order.placed":
+        customer.total_orders += 1
+        customer.last_order_date = event.created_at or datetime.now(UTC)
+    elif event.type == "order.paid":
+        customer.total_spent += total
+    elif event.type == "order.cancelled":
+        customer.total_orders = max(customer.total_orders - 1, 0)
+        if data.get("payment_status") == "paid":
+            customer.total_spent = max(customer.total_spent - total, Decimal("0.00"))
+    await db.flush()
+
+
+async def queue_order_emails(db: AsyncSession, event: OrderEvent) -> None:
+    store = await db.get(Store, event.store_id)
+    if store is not None:
+        queue_order_confirmation_email(db, event.payload, store)
+
+
+async def post_store_webhook(db: AsyncSession, event: OrderEvent) -> None:
+    store = await db.get(Store, event.store_id)
+    config = dict(store.config or {}) if store is not None else {}
+    url = config.get("webhook_url")
+    if not url:
+        return
+    secret = config.get("webhook_secret")
+    if not secret:  # URL saved before deliveries were signed
+        secret = config["webhook_secret"] = new_webhook_secret()
+        store.config = config
+    body = json.dumps(
+        {
+            "id": str(event.id),
+            "type": event.type,
+            "order_id": str(event.order_id),
+            "created_at": event.created_at.isoformat() if event.created_at else None,
+            "data": event.payload,
+        }
+    ).encode()
+    # No connection is held while the merchant's server answers
+    await db.commit()
+    await post_webhook(url, secret, event.type, body)
+
+
+order_event_dispatcher.register(
+    "customer_stats",
+    update_customer_stats,
+    events=("order.placed", "order.paid", "order.cancelled"),
+)
+order_event_dispatcher.register("order_emails", queue_order_emails, events=("order.placed",))
+order_event_dispatcher.register("store_webhook", post_store_webhook)
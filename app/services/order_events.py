@@ -0,0 +1,196 @@
+"""
+Order Events — transactional outbox for order side effects.
+
+Order writes add an ``order_events`` row in their own transaction, so an event
+exists exactly when the change it describes was committed. The dispatcher
+(ARQ cron in the worker, an in-process periodic task without Redis) delivers
+due events to the registered consumers. Each consumer runs and is marked
+delivered in its own transaction; a failing consumer is retried with
+exponential backoff without re-running the ones that already succeeded.
+"""
+
+import logging
+import uuid
+from collections.abc import Awaitable, Callable, Iterable
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.database import async_session_factory
+from app.models.order import Order, OrderEvent, OrderItem
+from app.services.periodic import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+Consumer = Callable[[AsyncSession, OrderEvent], Awaitable[None]]
+
+RETRY_BASE = timedelta(seconds=30)
+RETRY_MAX = timedelta(hours=1)
+# A claimed event is invisible to other dispatchers for this long
+CLAIM_LEASE = timedelta(minutes=5)
+
+
+# ─── Emitting ────────────────────────────────────────────────────
+
+
+# Columns ``order_event_row`` reads — RETURNING these lets bulk updates emit events
+ORDER_EVENT_COLUMNS = (
+    Order.id,
+    Order.tenant_id,
+    Order.store_id,
+    Order.order_number,
+    Order.customer_name,
+    Order.customer_email,
+    Order.customer_phone,
+    Order.total,
+    Order.currency,
+    Order.status,
+    Order.payment_status,
+)
+
+
+def order_payload(order: Order) -> dict:
+    """JSON snapshot of the order fields consumers need."""
+    return {
+        "order_number": order.order_number,
+        "customer_name": order.customer_name,
+        "customer_email": order.customer_email,
+        "customer_phone": order.customer_phone,
+        "total": str(order.total),
+        "currency": order.currency,
+        "status": order.status,
+        "payment_status": order.payment_status,
+    }
+
+
+def item_payload(items: Iterable[OrderItem]) -> list[dict]:
+    return [
+        {
+            "product_id": str(item.product_id) if item.product_id else None,
+            "name": item.product_name,
+            "quantity": item.quantity,
+            "unit_price": str(item.unit_price),
+        }
+        for item in items
+    ]
+
+
+def order_event_row(order: Order, type: str, **extra) -> dict:
+    """Column values of an event; ``order`` may also be a row of ``ORDER_EVENT_COLUMNS``."""
+    return {
+        "tenant_id": order.tenant_id,
+        "store_id": order.store_id,
+        "order_id": order.id,
+        "type": type,
+        "payload": {**order_payload(order), **extra},
+    }
+
+
+def emit_order_event(db: AsyncSession, order: Order, type: str, **extra) -> None:
+    """Add an event for ``order`` to the caller's transaction."""
+    db.add(OrderEvent(**order_event_row(order, type, **extra), delivered=[]))
+
+
+async def record_order_events(db: AsyncSession, rows: list[dict]) -> None:
+    """Add many events (rows from ``order_event_row``) with one INSERT."""
+    if rows:
+        await db.execute(insert(OrderEvent), [{**row, "delivered": []} for row in rows])
+
+
+# ─── Dispatching ─────────────────────────────────────────────────
+
+
+class OrderEventDispatcher:
+    """Fans committed order events out to registered consumers, with retries."""
+
+    def __init__(self):
+        self._consumers: dict[str, tuple[frozenset[str] | None, Consumer]] = {}
+
+    def register(self, name: str, handler: Consumer, events: Iterable[str] | None = None) -> None:
+        """Register ``handler`` for the given event types (all of them when None)."""
+        self._consumers[name] = (frozenset(events) if events else None, handler)
+
+    def consumers_for(self, event_type: str) -> list[tuple[str, Consumer]]:
+        return [
+            (name, handler)
+            for name, (events, handler) in self._consumers.items()
+            if events is None or event_type in events
+        ]
+
+    async def dispatch(self, limit: int = 100) -> int:
+        """Deliver up to ``limit`` due events; returns how many were attempted."""
+        now = datetime.now(UTC)
+        due = (
+            select(OrderEvent.id)
+            .where(OrderEvent.status == "pending", OrderEvent.available_at <= now)
+            .order_by(OrderEvent.created_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        async with async_session_factory() as db:
+            # Claim with a lease: a second dispatcher skips these until it runs out
+            event_ids = list(
+                (
+                    await db.execute(
+                        update(OrderEvent)
+                        .where(OrderEvent.id.in_(due.scalar_subquery()))
+                        .values(available_at=now + CLAIM_LEASE)
+                        .returning(OrderEvent.id)
+                    )
+                ).scalars()
+            )
+            await db.commit()
+        for event_id in event_ids:
+            await self._deliver(event_id)
+        return len(event_ids)
+
+    async def _deliver(self, event_id: uuid.UUID) -> None:
+        async with async_session_factory() as db:
+            event = await db.get(OrderEvent, event_id)
+            if event is None or event.status != "pending":
+                return
+            errors = []
+            for name, handler in self.consumers_for(event.type):
+                if name in event.delivered:
+                    continue
+                try:
+                    await handler(db, event)
+                    event.delivered = [*event.delivered, name]
+                    await db.commit()
+                except Exception as e:
+                    await db.rollback()
+                    await db.refresh(event)
+                    errors.append(f"{name}: {e}")
+                    logger.warning(f"[EVENTS] {name} failed for {event.type} {event.id}: {e}")
+
+            now = datetime.now(UTC)
+            if not errors:
+                event.status = "done"
+                event.processed_at = now
+            else:
+                event.attempts += 1
+                event.last_error = "; ".join(errors)[:2000]
+                if event.attempts >= get_settings().ORDER_EVENT_MAX_ATTEMPTS:
+                    event.status = "failed"
+                    print(f"❌ Order event {event.type} {event.id} gave up: {event.last_error}")
+                else:
+                    event.available_at = now + min(
+                        RETRY_BASE * 2 ** (event.attempts - 1), RETRY_MAX
+                    )
+            await db.commit()
+
+
+# Singleton — consumers register themselves in app.services.order_consumers
+order_event_dispatcher = OrderEventDispatcher()
+
+
+async def dispatch_order_events() -> int:
+    return await order_event_dispatcher.dispatch()
+
+
+# In-process fallback, started by the app lifespan when there is no ARQ worker
+order_event_poller = PeriodicTask(
+    "Order event dispatch", get_settings().ORDER_EVENT_DISPATCH_INTERVAL, dispatch_order_events
+)
@@ -0,0 +1,326 @@
+"""
+Payment Events — deduplicated, queued processing of gateway webhooks.
+
+The webhook endpoint only parses the delivery and stores it; the unique
+``(gateway, event_id)`` constraint turns redeliveries into no-ops, and the
+gateway gets its 200 without waiting on anything else. Processing happens in
+the ARQ worker (or a background task without Redis): the payment is verified
+with the gateway's API — the webhook body itself is never trusted — and the
+order is updated with conditional statements, so applying an event twice
+changes nothing. Failures are retried with backoff by a periodic sweep.
+"""
+
+import logging
+import uuid
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.database import async_session_factory
+from app.models.order import Order, OrderItem
+from app.models.payment import PaymentEvent
+from app.models.product import Product
+from app.services.inventory_reservations import (
+    InsufficientStockError,
+    convert_order_holds,
+    release_order_holds,
+    take_stock,
+)
+from app.services.order_cancellation import cancel_orders
+from app.services.order_events import (
+    ORDER_EVENT_COLUMNS,
+    emit_order_event,
+    order_event_row,
+    record_order_events,
+)
+from app.services.payment_service import payment_service
+from app.services.periodic import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+# Gateway statuses after which the payment can no longer succeed
+FAILED_PAYMENT_STATUSES = {"failed", "declined"}
+# Payment status of a cancelled order whose payment arrived after its stock was sold
+REFUND_DUE = "refund_due"
+
+RETRY_BASE = timedelta(seconds=30)
+RETRY_MAX = timedelta(hours=1)
+# A claimed event is invisible to other processors for this long
+CLAIM_LEASE = timedelta(minutes=5)
+
+
+@dataclass
+class ParsedWebhook:
+    gateway: str
+    payment_id: str
+    order_number: str
+    status: str
+
+
+def parse_payment_webhook(body: dict) -> ParsedWebhook | None:
+    """Recognise a Moyasar or Tap payment notification; None if it names no order."""
+    if "id" in body and "metadata" in body:  # Moyasar
+        gateway = "moyasar"
+        order_number = (body.get("metadata") or {}).get("order_id")
+        status = str(body.get("status") or "")
+    elif "id" in body and "reference" in body:  # Tap
+        gateway = "tap"
+        order_number = (body.get("reference") or {}).get("order")
+        status = str(body.get("status") or "")
+        status = "paid" if status == "CAPTURED" else status.lower()
+    else:
+        return None
+    if not order_number:
+        return None
+    return ParsedWebhook(gateway, str(body["id"]), str(order_number), status)
+
+
+async def store_payment_event(
+    db: AsyncSession, webhook: ParsedWebhook, body: dict
+) -> uuid.UUID | None:
+    """Persist and commit a delivery; returns None when it was already received."""
+    event = PaymentEvent(
+        gateway=webhook.gateway,
+        # A payment notifies once per status change — redeliveries repeat both
+        event_id=f"{webhook.payment_id}:{webhook.status}",
+        payment_id=webhook.payment_id,
+        order_number=webhook.order_number,
+        gateway_status=webhook.status,
+        payload=body,
+    )
+    db.add(event)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        return None
+    return event.id
+
+
+async def _settle_cancelled(db: AsyncSession, order_id: uuid.UUID, values: dict) -> str | None:
+    """
+    A verified payment for an order that was cancelled meanwhile (its hold
+    expired). Take its stock again if it is still there and mark it paid;
+    otherwise keep it cancelled with ``REFUND_DUE`` so the payment is returned.
+    None when the order is not cancelled-and-unpaid (or another call won).
+    """
+    claim = (
+        update(Order)
+        .where(
+            Order.id == order_id,
+            Order.status == "cancelled",
+            Order.payment_status == "unpaid",
+        )
+        .returning(*ORDER_EVENT_COLUMNS)
+        .execution_options(synchronize_session=False)
+    )
+    lines = (
+        await db.execute(
+            select(Product, OrderItem.quantity)
+            .join(OrderItem, OrderItem.product_id == Product.id)
+            .where(OrderItem.order_id == order_id)
+        )
+    ).all()
+    try:
+        async with db.begin_nested():
+            row = (
+                await db.execute(claim.values(status="paid", payment_status="paid", **values))
+            ).one_or_none()
+            if row is None:
+                return None
+            await take_stock(db, [(product, quantity) for product, quantity in lines], order_id)
+    except InsufficientStockError:
+        row = (await db.execute(claim.values(payment_status=REFUND_DUE, **values))).one_or_none()
+        if row is None:
+            return None
+        await record_order_events(db, [order_event_row(row, "order.refund_due")])
+        logger.warning(f"[PAYMENTS] Order {row.order_number} paid after cancel — refund due")
+        return REFUND_DUE
+    await record_order_events(db, [order_event_row(row, "order.paid")])
+    return "paid"
+
+
+async def mark_order_paid(
+    db: AsyncSession, order: Order, payment_id: str | None, metadata: dict | None
+) -> str | None:
+    """
+    Mark ``order`` paid unless it already is. Returns "paid" when this call did
+    it, ``REFUND_DUE`` when the order had been cancelled and its stock is gone,
+    and None when there was nothing to change. ``order`` is refreshed.
+    """
+    paid = await db.scalar(
+        update(Order)
+        .where(
+            Order.id == order.id,
+            Order.payment_status != "paid",
+            Order.status != "cancelled",
+        )
+        .values(
+            payment_status="paid",
+            status="paid",
+            payment_id=payment_id or order.payment_id,
+            payment_metadata=metadata,
+        )
+        .returning(Order.id)
+        .execution_options(synchronize_session=False)
+    )
+    if paid is None:
+        outcome = await _settle_cancelled(
+            db,
+            order.id,
+            {"payment_id": payment_id or order.payment_id, "payment_metadata": metadata},
+        )
+        await db.refresh(order)
+        return outcome
+    await db.refresh(order)
+    emit_order_event(db, order, "order.paid")
+    return "paid"
+
+
+async def mark_orders_paid(
+    db: AsyncSession, metadata: dict[uuid.UUID, dict]
+) -> list[uuid.UUID]:
+    """
+    Bulk ``mark_order_paid`` keyed by order id; returns the orders this call
+    marked. Orders cancelled meanwhile get the same late-payment settlement.
+    """
+    if not metadata:
+        return []
+    rows = (
+        await db.execute(
+            update(Order)
+            .where(
+                Order.id.in_(metadata),
+                Order.payment_status != "paid",
+                Order.status != "cancelled",
+            )
+            .values(payment_status="paid", status="paid")
+            .returning(*ORDER_EVENT_COLUMNS)
+            .execution_options(synchronize_session=False)
+        )
+    ).all()
+    if rows:
+        # Per-order gateway data: one executemany by primary key
+        await db.execute(
+            update(Order), [{"id": row.id, "payment_metadata": metadata[row.id]} for row in rows]
+        )
+        await record_order_events(db, [order_event_row(row, "order.paid") for row in rows])
+    paid = [row.id for row in rows]
+
+    late = await db.scalars(
+        select(Order.id).where(
+            Order.id.in_(set(metadata) - set(paid)),
+            Order.status == "cancelled",
+            Order.payment_status == "unpaid",
+        )
+    )
+    for order_id in list(late):
+        outcome = await _settle_cancelled(db, order_id, {"payment_metadata": metadata[order_id]})
+        if outcome == "paid":
+            paid.append(order_id)
+    return paid
+
+
+async def _apply(db: AsyncSession, event: PaymentEvent) -> str:
+    order = await db.scalar(select(Order).where(Order.order_number == event.order_number))
+    if order is None:
+        return "order_not_found"
+    event.order_id = order.id
+
+    verification = await payment_service.verify_payment(event.gateway, event.payment_id)
+    if verification.success:
+        outcome = await mark_order_paid(db, order, event.payment_id, event.payload)
+        return outcome or "no_change"
+
+    verified_status = str(verification.metadata.get("status") or "").lower()
+    if verified_status in FAILED_PAYMENT_STATUSES:
+        # Give the held stock back now instead of waiting for the hold to expire
+        cancelled = await cancel_orders(db, [order.id], reason="payment_failed", unpaid_only=True)
+        return "cancelled" if cancelled else "no_change"
+    if not verification.metadata:
+        # No answer from the gateway — try again later
+        raise RuntimeError(verification.error or "payment verification failed")
+    return "no_change"
+
+
+async def process_payment_event(event_id: uuid.UUID) -> str | None:
+    """Verify and apply one stored event; returns its result, None if not processed now."""
+    now = datetime.now(UTC)
+    async with async_session_factory() as db:
+        claimed = await db.scalar(
+            update(PaymentEvent)
+            .where(
+                PaymentEvent.id == event_id,
+                PaymentEvent.status == "received",
+                PaymentEvent.available_at <= now,
+            )
+            .values(available_at=now + CLAIM_LEASE, attempts=PaymentEvent.attempts + 1)
+            .returning(PaymentEvent.id)
+        )
+        await db.commit()
+        if claimed is None:
+            return None
+
+        event = await db.get(PaymentEvent, event_id)
+        try:
+            result = await _apply(db, event)
+        except Exception as e:
+            await db.rollback()
+            await db.refresh(event)
+            event.last_error = str(e)[:2000]
+            if event.attempts >= get_settings().PAYMENT_EVENT_MAX_ATTEMPTS:
+                event.status = "failed"
+                logger.error(f"[PAYMENTS] Event {event.gateway}:{event.event_id} gave up: {e}")
+            else:
+                event.available_at = now + min(RETRY_BASE * 2 ** (event.attempts - 1), RETRY_MAX)
+            await db.commit()
+            logger.error(f"[PAYMENTS] Event {event.event_id} failed (attempt {event.attempts})")
+            return None
+
+        event.status = "processed"
+        event.result = result
+        event.processed_at = datetime.now(UTC)
+        await db.commit()
+
+        # After the commit, so the sweeper never sees a released hold on an unpaid order
+        if result == "paid":
+            await convert_order_holds(db, [event.order_id])
+        elif result == "cancelled":
+            await release_order_holds(db, [event.order_id])
+        await db.commit()
+    return result
+
+
+async def process_pending_payment_events(limit: int = 100) -> int:
+    """Retry stored events that are due (failed attempts, lost enqueues)."""
+    async with async_session_factory() as db:
+        event_ids = list(
+            (
+                await db.execute(
+                    select(PaymentEvent.id)
+                    .where(
+                        PaymentEvent.status == "received",
+                        PaymentEvent.available_at <= datetime.now(UTC),
+                    )
+                    .order_by(PaymentEvent.created_at)
+                    .limit(limit)
+                )
+            ).scalars()
+        )
+    processed = 0
+    for event_id in event_ids:
+        if await process_payment_event(event_id) is not None:
+            processed += 1
+    return processed
+
+
+# In-process fallback, started by the app lifespan when there is no ARQ worker
+payment_event_sweeper = PeriodicTask(
+    "Payment event retry",
+    get_settings().PAYMENT_EVENT_RETRY_INTERVAL,
+    process_pending_payment_events,
+)
@@ -0,0 +1,116 @@
+"""
+Payment Reconciliation — settles orders whose callback and webhook never came.
+
+Orders that have a gateway payment but are still unpaid after
+PAYMENT_RECONCILE_AFTER_MINUTES are re-verified with the gateway, at most
+PAYMENT_RECONCILE_CONCURRENCY at a time over the payment service's shared
+client. Paid ones are marked with one conditional UPDATE, failed ones go
+through the bulk cancellation service, and the rest are left for next time.
+Work is done in chunks that each commit, with no session open while the
+gateways are called.
+"""
+
+import asyncio
+import uuid
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import select
+
+from app.config import get_settings
+from app.database import async_session_factory
+from app.models.order import Order
+from app.services.inventory_reservations import convert_order_holds, release_order_holds
+from app.services.order_cancellation import cancel_orders
+from app.services.payment_events import FAILED_PAYMENT_STATUSES, mark_orders_paid
+from app.services.payment_service import PaymentResult, payment_service
+from app.services.periodic import PeriodicTask
+
+# Orders verified and then committed together
+RECONCILE_CHUNK_SIZE = 50
+
+
+async def _verify_all(
+    payment_ids: list[str], semaphore: asyncio.Semaphore
+) -> list[PaymentResult]:
+    async def verify(payment_id: str) -> PaymentResult:
+        async with semaphore:
+            gateway = payment_service.gateway_for(payment_id)
+            return await payment_service.verify_payment(gateway, payment_id)
+
+    return await asyncio.gather(*(verify(payment_id) for payment_id in payment_ids))
+
+
+async def _apply_outcomes(
+    chunk: list[tuple[uuid.UUID, str]], results: list[PaymentResult]
+) -> tuple[list[uuid.UUID], list[uuid.UUID]]:
+    paid_metadata = {}
+    failed = []
+    for (order_id, _), result in zip(chunk, results, strict=True):
+        if result.success:
+            paid_metadata[order_id] = result.metadata
+        elif str(result.metadata.get("status") or "").lower() in FAILED_PAYMENT_STATUSES:
+            failed.append(order_id)
+    if not paid_metadata and not failed:
+        return [], []
+
+    async with async_session_factory() as db:
+        # Both updates are conditional, so an order settled meanwhile is left alone
+        paid = await mark_orders_paid(db, paid_metadata)
+        cancelled = await cancel_orders(db, failed, reason="payment_failed", unpaid_only=True)
+        await db.commit()
+        # After the commit, so the sweeper never sees a released hold on an unpaid order
+        await convert_order_holds(db, paid)
+        await release_order_holds(db, cancelled)
+        await db.commit()
+    return paid, cancelled
+
+
+async def reconcile_payments(limit: int = 500) -> dict[str, int]:
+    """
+    Verify stale unpaid orders with their gateway and apply the outcome in bulk.
+    No connection is held during gateway calls, and each chunk of
+    RECONCILE_CHUNK_SIZE orders is committed before the next is verified, so a
+    pass cut short keeps the outcomes it already has.
+    """
+    settings = get_settings()
+    now = datetime.now(UTC)
+    newest = now - timedelta(minutes=settings.PAYMENT_RECONCILE_AFTER_MINUTES)
+    oldest = now - timedelta(hours=settings.PAYMENT_RECONCILE_WINDOW_HOURS)
+    async with async_session_factory() as db:
+        stale = (
+            await db.execute(
+                select(Order.id, Order.payment_id)
+                .where(
+                    Order.payment_status == "unpaid",
+                    Order.status == "pending",
+                    Order.payment_id.is_not(None),
+                    Order.payment_id.not_like("COD-%"),
+                    Order.created_at <= newest,
+                    Order.created_at >= oldest,
+                )
+                .order_by(Order.created_at)
+                .limit(limit)
+            )
+        ).all()
+
+    semaphore = asyncio.Semaphore(settings.PAYMENT_RECONCILE_CONCURRENCY)
+    paid: list[uuid.UUID] = []
+    cancelled: list[uuid.UUID] = []
+    for start in range(0, len(stale), RECONCILE_CHUNK_SIZE):
+        chunk = stale[start : start + RECONCILE_CHUNK_SIZE]
+        results = await _verify_all([payment_id for _, payment_id in chunk], semaphore)
+        chunk_paid, chunk_cancelled = await _apply_outcomes(chunk, results)
+        paid += chunk_paid
+        cancelled += chunk_cancelled
+
+    if paid or cancelled:
+        print(f"💳 Reconciled payments: {len(paid)} paid, {len(cancelled)} cancelled")
+    return {"checked": len(stale), "paid": len(paid), "cancelled": len(cancelled)}
+
+
+# In-process fallback, started by the app lifespan when there is no ARQ worker
+payment_reconciler = PeriodicTask(
+    "Payment reconciliation",
+    get_settings().PAYMENT_RECONCILE_INTERVAL_MINUTES * 60,
+    reconcile_payments,
+)
@@ -26,6 +26,30 @@ class PaymentService:
     def __init__(self):
         self.moyasar_key = getattr(settings, "MOYASAR_API_KEY", "")
         self.tap_key = getattr(settings, "TAP_SECRET_KEY", "")
+        self._http: httpx.AsyncClient | None = None
+
+    def _client(self) -> httpx.AsyncClient:
+        """Shared client — keeps gateway connections alive across calls."""
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                timeout=15.0,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            )
+        return self._http
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    @staticmethod
+    def gateway_for(payment_id: str | None) -> str:
+        """Gateway that issued ``payment_id`` (Tap charges start with ``chg_``)."""
+        if payment_id and payment_id.startswith("chg_"):
+            return "tap"
+        if payment_id and payment_id.startswith("COD-"):
+            return "cod"
+        return "moyasar"
 
     async def create_payment(
         self,
@@ -86,42 +110,42 @@ class PaymentService:
             return PaymentResult(success=False, error="Moyasar API key not configured")
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    "https://api.moyasar.com/v1/payments",
-                    auth=(self.moyasar_key, ""),
-                    json={
-                        "amount": int(amount * 100),  # Moyasar expects halalas
-                        "currency": currency,
-                        "description": description,
-                        "callback_url": callback_url,
-                        "source": {
-                            "type": "creditcard"
-                            if payment_method in ("visa", "mastercard")
-                            else payment_method,
-                        },
-                        "metadata": {
-                            "order_id": order_id,
-                            "customer_name": customer_name,
-                        },
+            client = self._client()
+            response = await client.post(
+                "https://api.moyasar.com/v1/payments",
+                auth=(self.moyasar_key, ""),
+                json={
+                    "amount": int(amount * 100),  # Moyasar expects halalas
+                    "currency": currency,
+                    "description": description,
+                    "callback_url": callback_url,
+                    "source": {
+                        "type": "creditcard"
+                        if payment_method in ("visa", "mastercard")
+                        else payment_method,
                     },
-                    timeout=30.0,
-                )
+                    "metadata": {
+                        "order_id": order_id,
+                        "customer_name": customer_name,
+                    },
+                },
+                timeout=30.0,
+            )
 
-                if response.status_code in (200, 201):
-                    data = response.json()
-                    return PaymentResult(
-                        success=True,
-                        payment_id=data.get("id"),
-                        redirect_url=data.get("source", {}).get("transaction_url"),
-                        metadata=data,
-                    )
-                else:
-                    logger.error(f"Moyasar error: {response.status_code} {response.text}")
-                    return PaymentResult(
-                        success=False,
-                        error=f"خطأ في بوابة الدفع: {response.status_code}",
-                    )
+            if response.status_code in (200, 201):
+                data = response.json()
+                return PaymentResult(
+                    success=True,
+                    payment_id=data.get("id"),
+                    redirect_url=data.get("source", {}).get("transaction_url"),
+                    metadata=data,
+                )
+            else:
+                logger.error(f"Moyasar error: {response.status_code} {response.text}")
+                return PaymentResult(
+                    success=False,
+                    error=f"خطأ في بوابة الدفع: {response.status_code}",
+                )
         except Exception as e:
             logger.exception("Moyasar payment failed")
             return PaymentResult(success=False, error=str(e))
@@ -147,45 +171,45 @@ class PaymentService:
             first_name = name_parts[0]
             last_name = name_parts[1] if len(name_parts) > 1 else ""
 
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    "https://api.tap.company/v2/charges",
-                    headers={
-                        "Authorization": f"Bearer {self.tap_key}",
-                        "Content-Type": "application/json",
+            client = self._client()
+            response = await client.post(
+                "https://api.tap.company/v2/charges",
+                headers={
+                    "Authorization": f"Bearer {self.tap_key}",
+                    "Content-Type": "application/json",
+                },
+                json={
+                    "amount": float(amount),
+                    "currency": currency,
+                    "description": description,
+                    "reference": {"order": order_id},
+                    "receipt": {"email": True, "sms": bool(customer_phone)},
+                    "customer": {
+                        "first_name": first_name,
+                        "last_name": last_name,
+                        "email": customer_email,
+                        "phone": {"number": customer_phone or "", "country_code": "966"},
                     },
-                    json={
-                        "amount": float(amount),
-                        "currency": currency,
-                        "description": description,
-                        "reference": {"order": order_id},
-                        "receipt": {"email": True, "sms": bool(customer_phone)},
-                        "customer": {
-                            "first_name": first_name,
-                            "last_name": last_name,
-                            "email": customer_email,
-                            "phone": {"number": customer_phone or "", "country_code": "966"},
-                        },
-                        "redirect": {"url": callback_url},
-                        "post": {"url": callback_url},
-                    },
-                    timeout=30.0,
-                )
+                    "redirect": {"url": callback_url},
+                    "post": {"url": callback_url},
+                },
+                timeout=30.0,
+            )
 
-                if response.status_code in (200, 201):
-                    data = response.json()
-                    return PaymentResult(
-                        success=True,
-                        payment_id=data.get("id"),
-                        redirect_url=data.get("transaction", {}).get("url"),
-                        metadata=data,
-                    )
-                else:
-                    logger.error(f"Tap error: {response.status_code} {response.text}")
-                    return PaymentResult(
-                        success=False,
-                        error=f"خطأ في بوابة الدفع: {response.status_code}",
-                    )
+            if response.status_code in (200, 201):
+                data = response.json()
+                return PaymentResult(
+                    success=True,
+                    payment_id=data.get("id"),
+                    redirect_url=data.get("transaction", {}).get("url"),
+                    metadata=data,
+                )
+            else:
+                logger.error(f"Tap error: {response.status_code} {response.text}")
+                return PaymentResult(
+                    success=False,
+                    error=f"خطأ في بوابة الدفع: {response.status_code}",
+                )
         except Exception as e:
             logger.exception("Tap payment failed")
             return PaymentResult(success=False, error=str(e))
@@ -202,39 +226,39 @@ class PaymentService:
 
     async def _verify_moyasar(self, payment_id: str) -> PaymentResult:
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"https://api.moyasar.com/v1/payments/{payment_id}",
-                    auth=(self.moyasar_key, ""),
-                    timeout=15.0,
-                )
-                data = response.json()
-                paid = data.get("status") == "paid"
-                return PaymentResult(
-                    success=paid,
-                    payment_id=payment_id,
-                    metadata=data,
-                    error=None if paid else f"حالة الدفع: {data.get('status')}",
-                )
+            client = self._client()
+            response = await client.get(
+                f"https://api.moyasar.com/v1/payments/{payment_id}",
+                auth=(self.moyasar_key, ""),
+                timeout=15.0,
+            )
+            data = response.json()
+            paid = data.get("status") == "paid"
+            return PaymentResult(
+                success=paid,
+                payment_id=payment_id,
+                metadata=data,
+                error=None if paid else f"حالة الدفع: {data.get('status')}",
+            )
         except Exception as e:
             return PaymentResult(success=False, error=str(e))
 
     async def _verify_tap(self, payment_id: str) -> PaymentResult:
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"https://api.tap.company/v2/charges/{payment_id}",
-                    headers={"Authorization": f"Bearer {self.tap_key}"},
-                    timeout=15.0,
-                )
-                data = response.json()
-                paid = data.get("status") == "CAPTURED"
-                return PaymentResult(
-                    success=paid,
-                    payment_id=payment_id,
-                    metadata=data,
-                    error=None if paid else f"حالة الدفع: {data.get('status')}",
-                )
+            client = self._client()
+            response = await client.get(
+                f"https://api.tap.company/v2/charges/{payment_id}",
+                headers={"Authorization": f"Bearer {self.tap_key}"},
+                timeout=15.0,
+            )
+            data = response.json()
+            paid = data.get("status") == "CAPTURED"
+            return PaymentResult(
+                success=paid,
+                payment_id=payment_id,
+                metadata=data,
+                error=None if paid else f"حالة الدفع: {data.get('status')}",
+            )
         except Exception as e:
             return PaymentResult(success=False, error=str(e))
 
@@ -0,0 +1,34 @@
+"""Periodic background tasks run inside the API process."""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """Runs ``func`` every ``interval`` seconds until stopped; failures are logged."""
+
+    def __init__(self, name: str, interval: float, func: Callable[[], Awaitable[object]]):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self._task: asyncio.Task[None] | None = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.func()
+            except Exception:
+                logger.exception(f"[TASKS] {self.name} failed")
@@ -0,0 +1,141 @@
+"""
+Principal Cache — the authenticated user's identity without a DB lookup.
+
+``get_current_user`` resolves a token's ``sub`` to a ``Principal`` (id, tenant,
+role, active flag), cached for PRINCIPAL_CACHE_TTL seconds. With REDIS_URL the
+cache is shared by every API worker, so an invalidation is seen everywhere;
+without it each process keeps its own bounded map.
+
+Call ``invalidate_principal`` after committing any change to a user's role,
+tenant, active flag or password.
+"""
+
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Principal:
+    id: uuid.UUID
+    tenant_id: uuid.UUID
+    role: str
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(id=user.id, tenant_id=user.tenant_id, role=user.role, is_active=user.is_active)
+
+
+class MemoryPrincipalCache:
+    """Per-process LRU with a TTL."""
+
+    def __init__(self, ttl: float, max_entries: int = 10_000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[uuid.UUID, tuple[float, Principal]] = OrderedDict()
+
+    async def get(self, user_id: uuid.UUID) -> Principal | None:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, principal = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return principal
+
+    async def set(self, principal: Principal) -> None:
+        self._entries[principal.id] = (time.monotonic() + self.ttl, principal)
+        self._entries.move_to_end(principal.id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def invalidate(self, user_id: uuid.UUID) -> None:
+        self._entries.pop(user_id, None)
+
+
+class RedisPrincipalCache:
+    """One expiring key per user, shared by all workers."""
+
+    def __init__(self, redis_url: str, ttl: float):
+        import redis.asyncio as aioredis
+
+        self._redis = aioredis.from_url(redis_url, decode_responses=True)
+        self.ttl = ttl
+
+    @staticmethod
+    def _key(user_id: uuid.UUID) -> str:
+        return f"auth:principal:{user_id}"
+
+    async def get(self, user_id: uuid.UUID) -> Principal | None:
+        raw = await self._redis.get(self._key(user_id))
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        return Principal(
+            id=user_id,
+            tenant_id=uuid.UUID(data["tenant_id"]),
+            role=data["role"],
+            is_active=data["is_active"],
+        )
+
+    async def set(self, principal: Principal) -> None:
+        value = {
+            "tenant_id": str(principal.tenant_id),
+            "role": principal.role,
+            "is_active": principal.is_active,
+        }
+        await self._redis.set(self._key(principal.id), json.dumps(value), ex=int(self.ttl))
+
+    async def invalidate(self, user_id: uuid.UUID) -> None:
+        await self._redis.delete(self._key(user_id))
+
+
+_principal_cache: MemoryPrincipalCache | RedisPrincipalCache | None = None
+
+
+def get_principal_cache() -> MemoryPrincipalCache | RedisPrincipalCache:
+    """Process-wide principal cache — Redis when configured, in-memory otherwise."""
+    global _principal_cache
+    if _principal_cache is None:
+        settings = get_settings()
+        ttl = settings.PRINCIPAL_CACHE_TTL
+        _principal_cache = (
+            RedisPrincipalCache(settings.REDIS_URL, ttl)
+            if settings.REDIS_URL
+            else MemoryPrincipalCache(ttl)
+        )
+    return _principal_cache
+
+
+async def cached_principal(user_id: uuid.UUID) -> Principal | None:
+    try:
+        return await get_principal_cache().get(user_id)
+    except Exception as e:
+        logger.warning(f"[AUTH] Principal cache read failed: {e}")
+        return None
+
+
+async def cache_principal(principal: Principal) -> None:
+    try:
+        await get_principal_cache().set(principal)
+    except Exception as e:
+        logger.warning(f"[AUTH] Principal cache write failed: {e}")
+
+
+async def invalidate_principal(user_id: uuid.UUID) -> None:
+    """Drop a user's cached principal; the next request reloads it from the database."""
+    try:
+        await get_principal_cache().invalidate(user_id)
+    except Exception as e:
+        # The entry still expires after PRINCIPAL_CACHE_TTL
+        logger.error(f"[AUTH] Principal cache invalidation failed for {user_id}: {e}")
@@ -0,0 +1,123 @@
+"""
+Bulk product mutations — price/stock/visibility changes for thousands of SKUs.
+
+Targets are resolved with one query per key type (id, SKU); changes are then
+applied set-based: a single ``UPDATE ... FROM (VALUES ...)`` per distinct set
+of changed columns on PostgreSQL, and a batched executemany elsewhere.
+"""
+
+import uuid
+
+from sqlalchemy import Boolean, Integer, Numeric, Uuid, column, func, select, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.product import Product
+from app.schemas.product import ProductBulkChange, ProductBulkResult
+from app.services.inventory_ledger import movement, record_movements
+
+# Column types for the VALUES list (PostgreSQL needs them to cast parameters)
+_COLUMN_TYPES = {
+    "price": Numeric(12, 2),
+    "compare_at_price": Numeric(12, 2),
+    "stock_quantity": Integer(),
+    "is_active": Boolean(),
+}
+
+
+async def _resolve_targets(
+    db: AsyncSession, store_id: uuid.UUID, changes: list[ProductBulkChange]
+) -> tuple[set[uuid.UUID], dict[str, list[uuid.UUID]]]:
+    """Known product ids and SKU → ids, each in a single query scoped to the store."""
+    ids = {change.product_id for change in changes if change.product_id}
+    skus = {change.sku for change in changes if change.sku}
+
+    known_ids: set[uuid.UUID] = set()
+    if ids:
+        rows = await db.execute(
+            select(Product.id).where(Product.store_id == store_id, Product.id.in_(ids))
+        )
+        known_ids = set(rows.scalars())
+
+    by_sku: dict[str, list[uuid.UUID]] = {}
+    if skus:
+        rows = await db.execute(
+            select(Product.sku, Product.id).where(
+                Product.store_id == store_id, Product.sku.in_(skus)
+            )
+        )
+        for sku, product_id in rows:
+            by_sku.setdefault(sku, []).append(product_id)
+    return known_ids, by_sku
+
+
+def _values_update(store_id: uuid.UUID, fields: tuple[str, ...], rows: list[dict]):
+    """``UPDATE products SET ... FROM (VALUES ...) AS changes WHERE products.id = changes.id``"""
+    source = values(
+        column("id", Uuid()),
+        *[column(field, _COLUMN_TYPES[field]) for field in fields],
+        name="changes",
+    ).data([(row["id"], *[row[field] for field in fields]) for row in rows])
+    return (
+        update(Product)
+        .where(Product.id == source.c.id, Product.store_id == store_id)
+        .values({**{field: source.c[field] for field in fields}, "updated_at": func.now()})
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def apply_bulk_changes(
+    db: AsyncSession, store_id: uuid.UUID, changes: list[ProductBulkChange]
+) -> list[ProductBulkResult]:
+    """Apply ``changes`` to the store's products and report the outcome per input row."""
+    known_ids, by_sku = await _resolve_targets(db, store_id, changes)
+
+    results: list[ProductBulkResult] = []
+    merged: dict[uuid.UUID, dict] = {}  # later rows for the same product win
+    for index, change in enumerate(changes):
+        if change.product_id:
+            targets = [change.product_id] if change.product_id in known_ids else []
+        else:
+            targets = by_sku.get(change.sku, [])
+
+        if len(targets) != 1:
+            status = "not_found" if not targets else "ambiguous"
+            results.append(
+                ProductBulkResult(
+                    index=index, product_id=change.product_id, sku=change.sku, status=status
+                )
+            )
+            continue
+        [product_id] = targets
+        merged.setdefault(product_id, {}).update(change.changes())
+        results.append(
+            ProductBulkResult(index=index, product_id=product_id, sku=change.sku, status="updated")
+        )
+
+    # Absolute stock values are adjustments in the ledger: diff them against the
+    # locked current rows in one query
+    adjusted = [pid for pid, fields in merged.items() if "stock_quantity" in fields]
+    if adjusted:
+        current = await db.execute(
+            select(Product.id, Product.tenant_id, Product.store_id, Product.stock_quantity)
+            .where(Product.id.in_(adjusted))
+            .with_for_update()
+        )
+        deltas = [(row, merged[row.id]["stock_quantity"] - row.stock_quantity) for row in current]
+        await record_movements(
+            db, [movement(row, "adjust", delta, reason="bulk") for row, delta in deltas]
+        )
+
+    # One statement per distinct set of changed columns — usually exactly one
+    groups: dict[tuple[str, ...], list[dict]] = {}
+    for product_id, fields in merged.items():
+        groups.setdefault(tuple(sorted(fields)), []).append({"id": product_id, **fields})
+
+    postgres = db.get_bind().dialect.name == "postgresql"
+    for fields, rows in groups.items():
+        if postgres:
+            await db.execute(_values_update(store_id, fields, rows))
+        else:
+            # ORM bulk UPDATE by primary key — a single executemany
+            await db.execute(update(Product), rows)
+    return results
+
@@ -0,0 +1,424 @@
+"""
+Product Import/Export — streaming CSV and NDJSON for large catalogs.
+
+Import parses the request body incrementally, validates rows against
+``ProductCreate`` one batch at a time, allocates slugs per batch with a single
+query and inserts each batch as multi-row INSERTs, committing as it goes so
+memory stays flat and progress lands on the import's job record.
+Export streams rows from a server-side cursor in its own session.
+"""
+
+import codecs
+import csv
+import io
+import json
+import logging
+import uuid
+from collections import deque
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime
+from decimal import Decimal
+
+from pydantic import ValidationError
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import async_session_factory
+from app.models.base import generate_uuid7
+from app.models.category import Category
+from app.models.job import Job
+from app.models.product import Product
+from app.schemas.product import ProductCreate
+from app.services.inventory_ledger import movement, record_movements
+from app.services.job_events import publish_job_event
+from app.utils.db_helpers import bump_catalog_version, slugify
+from app.utils.slugs import flush_with_unique_slugs
+
+logger = logging.getLogger(__name__)
+
+IMPORT_BATCH_SIZE = 500
+EXPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+
+EXPORT_FIELDS = [
+    "id",
+    "slug",
+    "name",
+    "description",
+    "short_description",
+    "category_id",
+    "price",
+    "compare_at_price",
+    "cost_price",
+    "currency",
+    "sku",
+    "barcode",
+    "stock_quantity",
+    "track_inventory",
+    "allow_backorder",
+    "image_url",
+    "images",
+    "meta_title",
+    "meta_description",
+    "attributes",
+    "weight",
+    "weight_unit",
+    "is_active",
+    "is_featured",
+    "sort_order",
+]
+
+
+class ImportFormatError(ValueError):
+    """The uploaded file cannot be parsed at all (not a row-level problem)."""
+
+
+# ─── Incremental parsing ─────────────────────────────────────────
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a byte stream as UTF-8 (BOM tolerated) and yield lines with their endings."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    try:
+        async for chunk in chunks:
+            buffer += decoder.decode(chunk)
+            lines = buffer.splitlines(keepends=True)
+            # The last piece may be a partial line — keep it for the next chunk
+            buffer = lines.pop() if lines and not lines[-1].endswith(("\n", "\r")) else ""
+            for line in lines:
+                yield line
+        buffer += decoder.decode(b"", final=True)
+    except UnicodeDecodeError as e:
+        raise ImportFormatError("الملف ليس بترميز UTF-8") from e
+    if buffer:
+        yield buffer
+
+
+async def iter_ndjson_rows(lines: AsyncIterator[str]) -> AsyncIterator[tuple[int, dict | str]]:
+    """(row number, object) per non-blank line, or (row number, error message)."""
+    row = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            value = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row, f"JSON غير صالح: {e.msg}"
+            continue
+        yield row, value if isinstance(value, dict) else "يجب أن يكون كل سطر كائن JSON"
+
+
+def _csv_value(field: str, value: str):
+    if field == "images":
+        return [url.strip() for url in value.split("|") if url.strip()]
+    if field == "attributes":
+        return json.loads(value)
+    return value
+
+
+class _NeedMoreLinesError(Exception):
+    pass
+
+
+class _LineFeed:
+    """
+    Synchronous line source for ``csv.reader``. When it runs dry before the
+    end of input it raises ``_NeedMoreLinesError``; the lines of the unfinished
+    record are kept so the caller can replay them with more data.
+    """
+
+    def __init__(self):
+        self.lines: deque[str] = deque()
+        self.record: list[str] = []
+        self.eof = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self.lines:
+            if self.eof:
+                raise StopIteration
+            raise _NeedMoreLinesError
+        line = self.lines.popleft()
+        self.record.append(line)
+        return line
+
+    def replay(self, line: str | None) -> None:
+        self.lines.extendleft(reversed(self.record))
+        self.record = []
+        if line is None:
+            self.eof = True
+        else:
+            self.lines.append(line)
+
+
+async def iter_csv_rows(lines: AsyncIterator[str]) -> AsyncIterator[tuple[int, dict | str]]:
+    """
+    (row number, dict) per CSV record, keyed by the header row. Records are
+    split by ``csv.reader`` itself, so quoted fields may span lines and stray
+    quotes inside unquoted fields stay literal. Empty cells are dropped so
+    schema defaults apply.
+    """
+    feed = _LineFeed()
+    # strict: an unterminated quoted field is an error, not a silently cut value
+    reader = csv.reader(feed, strict=True)
+    header: list[str] | None = None
+    row = 0
+    while True:
+        try:
+            values = next(reader)
+        except _NeedMoreLinesError:
+            feed.replay(await anext(lines, None))
+            continue
+        except StopIteration:
+            return
+        except csv.Error as e:
+            if feed.eof and not feed.lines:
+                raise ImportFormatError("علامة اقتباس غير مغلقة في نهاية ملف CSV") from e
+            feed.record = []
+            if header is not None:
+                row += 1
+                yield row, "سطر CSV غير صالح"
+            continue
+        feed.record = []
+        if len(values) <= 1 and not "".join(values).strip():
+            continue
+        if header is None:
+            header = [name.strip() for name in values]
+            if "name" not in header:
+                raise ImportFormatError("ملف CSV يجب أن يحتوي على عمود name")
+            continue
+        row += 1
+        try:
+            yield row, {
+                field: _csv_value(field, value)
+                for field, value in zip(header, values, strict=False)
+                if field and value != ""
+            }
+        except json.JSONDecodeError:
+            yield row, "قيمة attributes ليست JSON صالحاً"
+
+
+# ─── Import ──────────────────────────────────────────────────────
+
+
+class ProductImporter:
+    """Validates and inserts product rows in batches, reporting to a job."""
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        job: Job,
+        total_bytes: int | None = None,
+        batch_size: int = IMPORT_BATCH_SIZE,
+    ):
+        self.db = db
+        self.job = job
+        self.tenant_id = job.tenant_id
+        self.store_id = job.store_id
+        self.total_bytes = total_bytes
+        self.batch_size = batch_size
+        self.bytes_read = 0
+        self.imported = 0
+        self.failed = 0
+        self.errors: list[dict] = []
+
+    async def count_bytes(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        """Pass-through that tracks how much of the upload was consumed."""
+        async for chunk in chunks:
+            self.bytes_read += len(chunk)
+            yield chunk
+
+    def _reject(self, row: int, error: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "error": error})
+
+    async def run(self, rows: AsyncIterator[tuple[int, dict | str]]) -> dict:
+        batch: list[tuple[int, dict]] = []
+        async for row, data in rows:
+            if isinstance(data, str):
+                self._reject(row, data)
+                continue
+            batch.append((row, data))
+            if len(batch) >= self.batch_size:
+                await self._import_batch(batch)
+                batch = []
+        if batch:
+            await self._import_batch(batch)
+        return self.summary()
+
+    def summary(self) -> dict:
+        # Parse errors are recorded immediately, validation errors per batch
+        errors = sorted(self.errors, key=lambda e: e["row"])
+        return {"imported": self.imported, "failed": self.failed, "errors": errors}
+
+    async def _import_batch(self, batch: list[tuple[int, dict]]) -> None:
+        valid: list[tuple[int, ProductCreate]] = []
+        for row, data in batch:
+            try:
+                valid.append((row, ProductCreate.model_validate(data)))
+            except ValidationError as e:
+                first = e.errors()[0]
+                location = ".".join(str(part) for part in first["loc"])
+                self._reject(row, f"{location}: {first['msg']}")
+
+        # Category references must belong to this store — one query per batch
+        category_ids = {item.category_id for _, item in valid if item.category_id}
+        if category_ids:
+            known = set(
+                (
+                    await self.db.execute(
+                        select(Category.id).where(
+                            Category.store_id == self.store_id, Category.id.in_(category_ids)
+                        )
+                    )
+                ).scalars()
+            )
+            known.add(None)
+            kept: list[tuple[int, ProductCreate]] = []
+            for row, item in valid:
+                if item.category_id in known:
+                    kept.append((row, item))
+                else:
+                    self._reject(row, "category_id: القسم غير موجود في هذا المتجر")
+            valid = kept
+
+        if valid:
+            products = [
+                Product(
+                    id=generate_uuid7(),
+                    tenant_id=self.tenant_id,
+                    store_id=self.store_id,
+                    **item.model_dump(),
+                )
+                for _, item in valid
+            ]
+            await flush_with_unique_slugs(
+                self.db,
+                Product,
+                Product.store_id == self.store_id,
+                products,
+                [slugify(item.name) for _, item in valid],
+            )
+            await record_movements(
+                self.db,
+                [movement(p, "restock", p.stock_quantity, reason="import") for p in products],
+            )
+            self.imported += len(products)
+
+        progress = self._progress()
+        await self.db.execute(
+            update(Job).where(Job.id == self.job.id).values(progress=progress)
+        )
+        await self.db.commit()
+        # Inserted rows are not needed any more — keep the session small
+        self.db.expunge_all()
+        await publish_job_event(
+            self.job.id, "progress", progress=progress, imported=self.imported, failed=self.failed
+        )
+
+    def _progress(self) -> int:
+        if not self.total_bytes:
+            return 0
+        return min(99, self.bytes_read * 100 // self.total_bytes)
+
+
+async def import_products(
+    db: AsyncSession,
+    job: Job,
+    chunks: AsyncIterator[bytes],
+    fmt: str,
+    total_bytes: int | None = None,
+) -> dict:
+    """Run a streaming import for ``job`` and record its outcome on the job."""
+    importer = ProductImporter(db, job, total_bytes=total_bytes, batch_size=IMPORT_BATCH_SIZE)
+    lines = iter_lines(importer.count_bytes(chunks))
+    rows = iter_ndjson_rows(lines) if fmt == "ndjson" else iter_csv_rows(lines)
+    job_id = job.id
+    try:
+        summary = await importer.run(rows)
+    except Exception as e:
+        await db.rollback()
+        await db.execute(
+            update(Job)
+            .where(Job.id == job_id)
+            .values(
+                status="failed",
+                error=str(e),
+                result=importer.summary(),
+                completed_at=datetime.now(UTC),
+            )
+        )
+        await db.commit()
+        await publish_job_event(job_id, "result", status="failed", error=str(e))
+        raise
+
+    if summary["imported"]:
+        await bump_catalog_version(db, job.store_id)
+    await db.execute(
+        update(Job)
+        .where(Job.id == job_id)
+        .values(status="done", progress=100, result=summary, completed_at=datetime.now(UTC))
+    )
+    await db.commit()
+    await publish_job_event(job_id, "result", status="done", progress=100, result=summary)
+    print(f"📥 Product import done: job={job_id} imported={summary['imported']}")
+    return summary
+
+
+# ─── Export ──────────────────────────────────────────────────────
+
+
+def _json_value(value):
+    if isinstance(value, Decimal | uuid.UUID):
+        return str(value)
+    return value
+
+
+def _csv_cell(field: str, value) -> str:
+    if value is None:
+        return ""
+    if field == "images":
+        return "|".join(value)
+    if field == "attributes":
+        return json.dumps(value, ensure_ascii=False) if value else ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+async def export_products(store_id: uuid.UUID, fmt: str) -> AsyncIterator[str]:
+    """
+    Yield the store's products as CSV or NDJSON text chunks.
+    Uses its own session; the endpoint closes the request's session before
+    streaming, so an export holds one connection.
+    """
+    columns = [getattr(Product, field) for field in EXPORT_FIELDS]
+    stmt = (
+        select(*columns)
+        .where(Product.store_id == store_id)
+        .order_by(Product.sort_order, Product.created_at, Product.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    if fmt == "csv":
+        yield ",".join(EXPORT_FIELDS) + "\r\n"
+
+    async with async_session_factory() as db:
+        result = await db.stream(stmt)
+        async for partition in result.partitions():
+            out = io.StringIO()
+            if fmt == "csv":
+                writer = csv.writer(out)
+                writer.writerows(
+                    [_csv_cell(f, v) for f, v in zip(EXPORT_FIELDS, row, strict=True)]
+                    for row in partition
+                )
+            else:
+                for row in partition:
+                    record = {f: _json_value(v) for f, v in zip(EXPORT_FIELDS, row, strict=True)}
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            yield out.getvalue()
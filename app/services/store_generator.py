@@ -5,6 +5,7 @@ Falls back to template-based generation when no API key is configured.
 """
 
 import json
+from collections.abc import Awaitable, Callable
 from datetime import UTC, datetime
 
 from slugify import slugify
@@ -14,59 +15,80 @@ from app.config import get_settings
 from app.models.base import generate_uuid7
 from app.models.job import Job
 from app.models.store import Store
+from app.services.generation_cache import (
+    STORE_NAME_TOKEN,
+    compile_skeleton,
+    generation_cache,
+    prompt_cache_key,
+    render_skeleton,
+)
+from app.utils.slugs import flush_with_unique_slugs
+
+# on_progress(message, percent) — called as generation reaches each stage
+ProgressCallback = Callable[[str, int], Awaitable[None]]
 
 
 async def create_store_and_job(
     db: AsyncSession,
     tenant_id,
     request_data: dict,
+    runner: str | None = None,
 ) -> tuple[Store, Job]:
-    """Create a store (pending) + a job (queued), return both."""
-    # Generate unique slug
-    base_slug = slugify(request_data["name"])
-    slug = base_slug
-    counter = 1
-    while True:
-        from sqlalchemy import select as sa_select
-
-        existing = await db.execute(
-            sa_select(Store.id).where(Store.slug == slug, Store.tenant_id == tenant_id)
-        )
-        if not existing.scalar_one_or_none():
-            break
-        slug = f"{base_slug}-{counter}"
-        counter += 1
-
-    store = Store(
-        id=generate_uuid7(),
-        tenant_id=tenant_id,
-        name=request_data["name"],
-        slug=slug,
-        store_type=request_data["store_type"],
-        language=request_data.get("language", "ar"),
-        config={
-            "branding": request_data.get("branding", {}),
-            "payment": request_data.get("payment", {}),
-            "shipping": request_data.get("shipping", {}),
-            "features": request_data.get("features", []),
-        },
-        status="pending",
-    )
-    db.add(store)
-    await db.flush()
+    """Create a store (pending) + a job (queued for ``runner``), return both."""
+    [(store, job)] = await create_stores_and_jobs(db, tenant_id, [request_data], runner=runner)
+    return store, job
+
 
-    job = Job(
-        id=generate_uuid7(),
-        tenant_id=tenant_id,
-        store_id=store.id,
-        type="store_generation",
-        status="queued",
-        progress=0,
+async def create_stores_and_jobs(
+    db: AsyncSession,
+    tenant_id,
+    specs: list[dict],
+    runner: str | None = None,
+    parent_id=None,
+) -> list[tuple[Store, Job]]:
+    """Create pending stores + queued jobs for many specs with two bulk INSERTs."""
+    stores = [
+        Store(
+            id=generate_uuid7(),
+            tenant_id=tenant_id,
+            name=spec["name"],
+            store_type=spec["store_type"],
+            language=spec.get("language", "ar"),
+            config={
+                "branding": spec.get("branding", {}),
+                "payment": spec.get("payment", {}),
+                "shipping": spec.get("shipping", {}),
+                "features": spec.get("features", []),
+            },
+            status="pending",
+        )
+        for spec in specs
+    ]
+    jobs = [
+        Job(
+            id=generate_uuid7(),
+            tenant_id=tenant_id,
+            store_id=store.id,
+            parent_id=parent_id,
+            type="store_generation",
+            status="queued",
+            progress=0,
+            runner=runner,
+        )
+        for store in stores
+    ]
+    # Slugs unique per tenant, allocated for the whole batch in one query
+    await flush_with_unique_slugs(
+        db,
+        Store,
+        Store.tenant_id == tenant_id,
+        stores,
+        [slugify(spec["name"]) or "store" for spec in specs],
     )
-    db.add(job)
+    db.add_all(jobs)
     await db.flush()
 
-    return store, job
+    return list(zip(stores, jobs, strict=True))
 
 
 # ─── AI Content Generation ───────────────────────────────────────
@@ -106,7 +128,7 @@ def _build_generation_prompt(config: dict, store_name: str, store_type: str, lan
     style = config.get("branding", {}).get("style", "modern")
 
     return f"""أنشئ محتوى متجر إلكتروني بالتفاصيل التالية:
-- اسم المتجر: {store_name}
+- اسم المتجر: {store_name} (اكتبه بهذا الشكل حرفياً في كل موضع يُذكر فيه الاسم)
 - نوع المتجر: {type_label}
 - اللغة: {lang_label}
 - أسلوب التصميم: {style}
@@ -201,173 +223,174 @@ async def _generate_with_openai(prompt: str, api_key: str) -> dict:
         return {}
 
 
-def _generate_template_content(store_name: str, store_type: str, language: str) -> dict:
-    """Fallback: Generate template-based content when no API key is available."""
-    type_label = STORE_TYPE_LABELS.get(store_type, "متجر")
-
-    product_templates = {
-        "fashion": [
-            {
-                "name": "فستان سهرة أنيق",
-                "description": "فستان سهرة فاخر بتصميم عصري",
-                "price": 450,
-                "currency": "SAR",
-            },
-            {
-                "name": "بدلة رسمية رجالية",
-                "description": "بدلة كلاسيكية بقصة احترافية",
-                "price": 890,
-                "currency": "SAR",
-            },
-            {
-                "name": "حقيبة يد جلدية",
-                "description": "حقيبة يد من الجلد الطبيعي",
-                "price": 320,
-                "currency": "SAR",
-            },
-            {
-                "name": "حذاء رياضي",
-                "description": "حذاء مريح للاستخدام اليومي",
-                "price": 280,
-                "currency": "SAR",
-            },
-            {
-                "name": "شال حريري",
-                "description": "شال من الحرير الطبيعي",
-                "price": 180,
-                "currency": "SAR",
-            },
-            {
-                "name": "ساعة يد كلاسيكية",
-                "description": "ساعة أنيقة بتصميم عصري",
-                "price": 650,
-                "currency": "SAR",
-            },
-        ],
-        "electronics": [
-            {
-                "name": "سماعات بلوتوث",
-                "description": "سماعات لاسلكية بجودة صوت عالية",
-                "price": 350,
-                "currency": "SAR",
-            },
-            {
-                "name": "شاحن سريع",
-                "description": "شاحن 65 واط يدعم الشحن السريع",
-                "price": 120,
-                "currency": "SAR",
-            },
-            {
-                "name": "ماوس لاسلكي",
-                "description": "ماوس مريح للاستخدام المكتبي",
-                "price": 95,
-                "currency": "SAR",
-            },
-            {
-                "name": "حامل لابتوب",
-                "description": "حامل ألمنيوم قابل للتعديل",
-                "price": 180,
-                "currency": "SAR",
-            },
-            {
-                "name": "كاميرا ويب HD",
-                "description": "كاميرا 1080p للاجتماعات",
-                "price": 230,
-                "currency": "SAR",
-            },
-            {
-                "name": "لوحة مفاتيح ميكانيكية",
-                "description": "كيبورد ميكانيكي RGB",
-                "price": 420,
-                "currency": "SAR",
-            },
-        ],
-        "beauty": [
-            {
-                "name": "عطر فاخر",
-                "description": "عطر شرقي بمكونات طبيعية",
-                "price": 380,
-                "currency": "SAR",
-            },
-            {
-                "name": "كريم ترطيب",
-                "description": "كريم مرطب طبيعي للبشرة",
-                "price": 120,
-                "currency": "SAR",
-            },
-            {
-                "name": "مجموعة مكياج",
-                "description": "طقم مكياج احترافي 12 قطعة",
-                "price": 550,
-                "currency": "SAR",
-            },
-            {
-                "name": "زيت أرغان أصلي",
-                "description": "زيت أرغان مغربي طبيعي",
-                "price": 95,
-                "currency": "SAR",
-            },
-            {
-                "name": "عود معطر",
-                "description": "بخور عود كمبودي فاخر",
-                "price": 280,
-                "currency": "SAR",
-            },
-            {
-                "name": "لوشن للجسم",
-                "description": "لوشن معطر بالمسك الأبيض",
-                "price": 85,
-                "currency": "SAR",
-            },
-        ],
-    }
-
-    default_products = [
+_PRODUCT_TEMPLATES = {
+    "fashion": [
         {
-            "name": "منتج مميز 1",
-            "description": "منتج عالي الجودة",
-            "price": 199,
+            "name": "فستان سهرة أنيق",
+            "description": "فستان سهرة فاخر بتصميم عصري",
+            "price": 450,
             "currency": "SAR",
         },
         {
-            "name": "منتج مميز 2",
-            "description": "أفضل قيمة مقابل السعر",
-            "price": 149,
+            "name": "بدلة رسمية رجالية",
+            "description": "بدلة كلاسيكية بقصة احترافية",
+            "price": 890,
             "currency": "SAR",
         },
-        {"name": "منتج مميز 3", "description": "الأكثر مبيعاً", "price": 299, "currency": "SAR"},
-        {"name": "منتج مميز 4", "description": "جديد في المتجر", "price": 179, "currency": "SAR"},
-        {"name": "منتج مميز 5", "description": "عرض خاص محدود", "price": 249, "currency": "SAR"},
-        {"name": "منتج مميز 6", "description": "حصري لدينا", "price": 349, "currency": "SAR"},
-    ]
+        {
+            "name": "حقيبة يد جلدية",
+            "description": "حقيبة يد من الجلد الطبيعي",
+            "price": 320,
+            "currency": "SAR",
+        },
+        {
+            "name": "حذاء رياضي",
+            "description": "حذاء مريح للاستخدام اليومي",
+            "price": 280,
+            "currency": "SAR",
+        },
+        {
+            "name": "شال حريري",
+            "description": "شال من الحرير الطبيعي",
+            "price": 180,
+            "currency": "SAR",
+        },
+        {
+            "name": "ساعة يد كلاسيكية",
+            "description": "ساعة أنيقة بتصميم عصري",
+            "price": 650,
+            "currency": "SAR",
+        },
+    ],
+    "electronics": [
+        {
+            "name": "سماعات بلوتوث",
+            "description": "سماعات لاسلكية بجودة صوت عالية",
+            "price": 350,
+            "currency": "SAR",
+        },
+        {
+            "name": "شاحن سريع",
+            "description": "شاحن 65 واط يدعم الشحن السريع",
+            "price": 120,
+            "currency": "SAR",
+        },
+        {
+            "name": "ماوس لاسلكي",
+            "description": "ماوس مريح للاستخدام المكتبي",
+            "price": 95,
+            "currency": "SAR",
+        },
+        {
+            "name": "حامل لابتوب",
+            "description": "حامل ألمنيوم قابل للتعديل",
+            "price": 180,
+            "currency": "SAR",
+        },
+        {
+            "name": "كاميرا ويب HD",
+            "description": "كاميرا 1080p للاجتماعات",
+            "price": 230,
+            "currency": "SAR",
+        },
+        {
+            "name": "لوحة مفاتيح ميكانيكية",
+            "description": "كيبورد ميكانيكي RGB",
+            "price": 420,
+            "currency": "SAR",
+        },
+    ],
+    "beauty": [
+        {
+            "name": "عطر فاخر",
+            "description": "عطر شرقي بمكونات طبيعية",
+            "price": 380,
+            "currency": "SAR",
+        },
+        {
+            "name": "كريم ترطيب",
+            "description": "كريم مرطب طبيعي للبشرة",
+            "price": 120,
+            "currency": "SAR",
+        },
+        {
+            "name": "مجموعة مكياج",
+            "description": "طقم مكياج احترافي 12 قطعة",
+            "price": 550,
+            "currency": "SAR",
+        },
+        {
+            "name": "زيت أرغان أصلي",
+            "description": "زيت أرغان مغربي طبيعي",
+            "price": 95,
+            "currency": "SAR",
+        },
+        {
+            "name": "عود معطر",
+            "description": "بخور عود كمبودي فاخر",
+            "price": 280,
+            "currency": "SAR",
+        },
+        {
+            "name": "لوشن للجسم",
+            "description": "لوشن معطر بالمسك الأبيض",
+            "price": 85,
+            "currency": "SAR",
+        },
+    ],
+}
 
-    category_templates = {
-        "fashion": [
-            {"name": "ملابس رجالية", "description": "أحدث صيحات الموضة الرجالية", "icon": "👔"},
-            {"name": "ملابس نسائية", "description": "أزياء نسائية أنيقة", "icon": "👗"},
-            {"name": "أحذية", "description": "أحذية لكل المناسبات", "icon": "👟"},
-            {"name": "إكسسوارات", "description": "إكمال إطلالتك", "icon": "💎"},
-        ],
-        "electronics": [
-            {"name": "هواتف ذكية", "description": "أحدث الهواتف", "icon": "📱"},
-            {"name": "أجهزة حاسوب", "description": "لابتوبات وملحقات", "icon": "💻"},
-            {"name": "سماعات", "description": "صوت بجودة عالية", "icon": "🎧"},
-            {"name": "أجهزة منزلية", "description": "تقنية للمنزل", "icon": "🏠"},
-        ],
-        "beauty": [
-            {"name": "عطور", "description": "عطور فاخرة ومميزة", "icon": "🌸"},
-            {"name": "مكياج", "description": "منتجات تجميل احترافية", "icon": "💄"},
-            {"name": "عناية بالبشرة", "description": "كريمات ومرطبات", "icon": "✨"},
-            {"name": "بخور وعود", "description": "أجود أنواع البخور", "icon": "🕌"},
-        ],
-    }
+_DEFAULT_PRODUCTS = [
+    {
+        "name": "منتج مميز 1",
+        "description": "منتج عالي الجودة",
+        "price": 199,
+        "currency": "SAR",
+    },
+    {
+        "name": "منتج مميز 2",
+        "description": "أفضل قيمة مقابل السعر",
+        "price": 149,
+        "currency": "SAR",
+    },
+    {"name": "منتج مميز 3", "description": "الأكثر مبيعاً", "price": 299, "currency": "SAR"},
+    {"name": "منتج مميز 4", "description": "جديد في المتجر", "price": 179, "currency": "SAR"},
+    {"name": "منتج مميز 5", "description": "عرض خاص محدود", "price": 249, "currency": "SAR"},
+    {"name": "منتج مميز 6", "description": "حصري لدينا", "price": 349, "currency": "SAR"},
+]
+
+_CATEGORY_TEMPLATES = {
+    "fashion": [
+        {"name": "ملابس رجالية", "description": "أحدث صيحات الموضة الرجالية", "icon": "👔"},
+        {"name": "ملابس نسائية", "description": "أزياء نسائية أنيقة", "icon": "👗"},
+        {"name": "أحذية", "description": "أحذية لكل المناسبات", "icon": "👟"},
+        {"name": "إكسسوارات", "description": "إكمال إطلالتك", "icon": "💎"},
+    ],
+    "electronics": [
+        {"name": "هواتف ذكية", "description": "أحدث الهواتف", "icon": "📱"},
+        {"name": "أجهزة حاسوب", "description": "لابتوبات وملحقات", "icon": "💻"},
+        {"name": "سماعات", "description": "صوت بجودة عالية", "icon": "🎧"},
+        {"name": "أجهزة منزلية", "description": "تقنية للمنزل", "icon": "🏠"},
+    ],
+    "beauty": [
+        {"name": "عطور", "description": "عطور فاخرة ومميزة", "icon": "🌸"},
+        {"name": "مكياج", "description": "منتجات تجميل احترافية", "icon": "💄"},
+        {"name": "عناية بالبشرة", "description": "كريمات ومرطبات", "icon": "✨"},
+        {"name": "بخور وعود", "description": "أجود أنواع البخور", "icon": "🕌"},
+    ],
+}
 
-    default_categories = [
-        {"name": "الأكثر مبيعاً", "description": "المنتجات الأكثر شعبية", "icon": "🔥"},
-        {"name": "جديدنا", "description": "أحدث المنتجات", "icon": "✨"},
-        {"name": "عروض خاصة", "description": "أفضل العروض والتخفيضات", "icon": "🏷️"},
-        {"name": "حصري", "description": "منتجات حصرية لدينا", "icon": "💎"},
-    ]
+_DEFAULT_CATEGORIES = [
+    {"name": "الأكثر مبيعاً", "description": "المنتجات الأكثر شعبية", "icon": "🔥"},
+    {"name": "جديدنا", "description": "أحدث المنتجات", "icon": "✨"},
+    {"name": "عروض خاصة", "description": "أفضل العروض والتخفيضات", "icon": "🏷️"},
+    {"name": "حصري", "description": "منتجات حصرية لدينا", "icon": "💎"},
+]
+
+
+def _template_content(store_name: str, store_type: str) -> dict:
+    """Template-based store content (language and style do not change it)."""
+    type_label = STORE_TYPE_LABELS.get(store_type, "متجر")
 
     return {
         "hero": {
@@ -375,8 +398,8 @@ def _generate_template_content(store_name: str, store_type: str, language: str)
             "subtitle": f"وجهتكم الأولى لأفضل منتجات {type_label}",
             "cta_text": "تسوق الآن",
         },
-        "categories": category_templates.get(store_type, default_categories),
-        "featured_products": product_templates.get(store_type, default_products),
+        "categories": _CATEGORY_TEMPLATES.get(store_type, _DEFAULT_CATEGORIES),
+        "featured_products": _PRODUCT_TEMPLATES.get(store_type, _DEFAULT_PRODUCTS),
         "about": {
             "title": f"عن {store_name}",
             "content": f"نحن {store_name}، متجر إلكتروني متخصص في {type_label}. نسعى لتقديم أفضل المنتجات بأعلى جودة وأنسب الأسعار. هدفنا رضا العميل وتوفير تجربة تسوق استثنائية.",
@@ -418,40 +441,71 @@ def _generate_template_content(store_name: str, store_type: str, language: str)
     }
 
 
-async def generate_store(job_id: str, store_id: str, config: dict) -> tuple[list, dict]:
+# Compiled once at import — one skeleton per known store type plus the default
+_DEFAULT_TEMPLATE_KEY = ""
+_TEMPLATE_SKELETONS = {
+    store_type: compile_skeleton(_template_content(STORE_NAME_TOKEN, store_type))
+    for store_type in [_DEFAULT_TEMPLATE_KEY, *STORE_TYPE_LABELS]
+}
+
+
+def _generate_template_content(store_name: str, store_type: str, language: str) -> dict:
+    """Fallback: Generate template-based content when no API key is available."""
+    if store_type in STORE_TYPE_LABELS:
+        skeleton = _TEMPLATE_SKELETONS[store_type]
+    else:
+        # Free-text types get the generic labels and catalog
+        skeleton = _TEMPLATE_SKELETONS[_DEFAULT_TEMPLATE_KEY]
+    return render_skeleton(skeleton, store_name)
+
+
+async def _ignore_progress(message: str, progress: int) -> None:
+    """Default progress hook — generation without a job to report to."""
+    return None
+
+
+async def generate_store(
+    job_id: str,
+    store_id: str,
+    config: dict,
+    on_progress: ProgressCallback | None = None,
+) -> dict:
     """
-    Generate store content using AI (OpenAI) or template fallback.
-    Returns (steps, result) tuple.
+    Generate store content using AI (Anthropic/OpenAI) or template fallback.
+    Reports each stage it actually reaches through ``on_progress(message, percent)``
+    and returns the generation result.
     """
+    report = on_progress or _ignore_progress
     settings = get_settings()
     store_name = config.get("name", "متجري")
     store_type = config.get("store_type", "general")
     language = config.get("language", "ar")
 
-    steps = [
-        ("تحليل المتطلبات...", 10),
-        ("تصميم هيكل المتجر...", 25),
-        ("إنشاء المحتوى بالذكاء الاصطناعي...", 40),
-        ("تكوين بوابة الدفع...", 55),
-        ("إعداد الشحن...", 70),
-        ("تطبيق الثيم والتصميم...", 85),
-        ("مراجعة نهائية...", 95),
-        ("المتجر جاهز! 🎉", 100),
-    ]
+    # Try AI generation: Anthropic Claude first, then OpenAI, then template.
+    # The prompt carries a name placeholder, so stores that differ only by name
+    # share one cached AI answer and the real name is substituted afterwards.
+    prompt = _build_generation_prompt(config, STORE_NAME_TOKEN, store_type, language)
+    cache_key = prompt_cache_key(prompt)
+    ai_content = generation_cache.get(cache_key, store_name) or {}
+    await report("تحليل المتطلبات وتجهيز الطلب...", 10)
+
+    if not ai_content and (settings.ANTHROPIC_API_KEY or settings.OPENAI_API_KEY):
+        await report("إنشاء المحتوى بالذكاء الاصطناعي...", 25)
 
-    # Try AI generation: Anthropic Claude first, then OpenAI, then template
-    ai_content = {}
-    prompt = _build_generation_prompt(config, store_name, store_type, language)
+        if settings.ANTHROPIC_API_KEY:
+            ai_content = await _generate_with_anthropic(prompt, settings.ANTHROPIC_API_KEY)
 
-    if settings.ANTHROPIC_API_KEY:
-        ai_content = await _generate_with_anthropic(prompt, settings.ANTHROPIC_API_KEY)
+        if not ai_content and settings.OPENAI_API_KEY:
+            ai_content = await _generate_with_openai(prompt, settings.OPENAI_API_KEY)
 
-    if not ai_content and settings.OPENAI_API_KEY:
-        ai_content = await _generate_with_openai(prompt, settings.OPENAI_API_KEY)
+        if ai_content:
+            generation_cache.put(cache_key, ai_content)
+            ai_content = render_skeleton(compile_skeleton(ai_content), store_name)
 
     # Fallback to template if AI returned nothing
     if not ai_content:
         ai_content = _generate_template_content(store_name, store_type, language)
+    await report("تحليل المحتوى المُولَّد...", 70)
 
     result = {
         "store_id": store_id,
@@ -464,5 +518,6 @@ async def generate_store(job_id: str, store_id: str, config: dict) -> tuple[list
         "generated_at": datetime.now(UTC).isoformat(),
         "ai_content": ai_content,
     }
+    await report("تجهيز كتالوج المتجر...", 90)
 
-    return steps, result
+    return result
@@ -0,0 +1,87 @@
+"""
+Store Webhooks — validated, signed delivery of order events to merchant URLs.
+
+A store's ``config.webhook_url`` is merchant input, so it must be https and
+resolve only to public addresses. That is checked when the URL is saved and
+again right before every delivery, and the request is sent to the address
+that was checked (no second lookup for DNS rebinding to exploit); redirects
+are not followed. Bodies are signed with HMAC-SHA256 under the store's own
+``config.webhook_secret``:
+
+    X-Webflow-Signature: t=<unix time>,v1=hex(hmac(secret, "<t>." + body))
+"""
+
+import asyncio
+import hashlib
+import hmac
+import ipaddress
+import secrets
+import socket
+import time
+from urllib.parse import urlsplit
+
+import httpx
+
+WEBHOOK_TIMEOUT = 10  # seconds
+
+
+class WebhookURLError(ValueError):
+    """The URL is not https or resolves to a non-public address."""
+
+
+def new_webhook_secret() -> str:
+    return secrets.token_hex(32)
+
+
+def sign_webhook(secret: str, timestamp: int, body: bytes) -> str:
+    """Value of the ``X-Webflow-Signature`` header for ``body`` sent at ``timestamp``."""
+    digest = hmac.new(secret.encode(), f"{timestamp}.".encode() + body, hashlib.sha256)
+    return f"t={timestamp},v1={digest.hexdigest()}"
+
+
+def _is_public(address: ipaddress.IPv4Address | ipaddress.IPv6Address) -> bool:
+    if isinstance(address, ipaddress.IPv6Address) and address.ipv4_mapped:
+        address = address.ipv4_mapped
+    # is_global excludes private, loopback, link-local, shared and reserved ranges
+    return address.is_global and not address.is_multicast
+
+
+async def resolve_webhook_url(url: str) -> str:
+    """The public address ``url`` resolves to; raises ``WebhookURLError`` otherwise."""
+    parts = urlsplit(url)
+    if parts.scheme != "https" or not parts.hostname or parts.username or parts.password:
+        raise WebhookURLError("webhook_url must be an https URL without credentials")
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(
+            parts.hostname, parts.port or 443, type=socket.SOCK_STREAM
+        )
+    except (socket.gaierror, UnicodeError) as e:
+        raise WebhookURLError(f"cannot resolve {parts.hostname}") from e
+    addresses = {ipaddress.ip_address(info[4][0].split("%")[0]) for info in infos}
+    # Every address must be public: any of them may be the one that is dialled
+    if not addresses or not all(_is_public(address) for address in addresses):
+        raise WebhookURLError(f"{parts.hostname} resolves to a non-public address")
+    return str(min(addresses, key=str))
+
+
+async def post_webhook(url: str, secret: str, event_type: str, body: bytes) -> None:
+    """POST ``body`` to ``url`` signed with ``secret``; raises on any failure."""
+    address = await resolve_webhook_url(url)
+    parts = urlsplit(url)
+    host = f"[{address}]" if ":" in address else address
+    pinned = parts._replace(netloc=f"{host}:{parts.port or 443}").geturl()
+    timestamp = int(time.time())
+    async with httpx.AsyncClient(timeout=WEBHOOK_TIMEOUT, follow_redirects=False) as client:
+        resp = await client.post(
+            pinned,
+            content=body,
+            headers={
+                "Host": parts.netloc,
+                "Content-Type": "application/json",
+                "X-Webflow-Event": event_type,
+                "X-Webflow-Signature": sign_webhook(secret, timestamp, body),
+            },
+            # TLS is negotiated and verified for the merchant's hostname
+            extensions={"sni_hostname": parts.hostname},
+        )
+        resp.raise_for_status()
@@ -0,0 +1,242 @@
+"""
+Token Revocation — reject stolen or logged-out JWTs before they expire.
+
+Access and refresh tokens carry a ``jti``; revoking one records the jti until
+the token's own ``exp``, after which it is dropped. With REDIS_URL the list is
+a sorted set (jti → exp) shared by every worker. Each process keeps a Bloom
+filter of it, refreshed at most every TOKEN_REVOCATION_SYNC_INTERVAL seconds
+when the list's version changes: a token not in the filter is not revoked and
+costs no Redis call; a hit is confirmed with one ZSCORE.
+
+Without Redis the list is an in-process dict.
+
+Every revocation is also written to the ``revoked_tokens`` table first. When
+the store cannot answer (Redis down), the check falls back to that table, and
+if the database fails too the token is refused: a revoked token is never
+accepted because a dependency is unavailable. ``revocation_fallbacks`` counts
+both cases. Revocations the store missed are copied back into it from the
+table once it answers again.
+"""
+
+import hashlib
+import logging
+import math
+import time
+from collections import Counter
+from datetime import UTC, datetime
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+
+from app.config import get_settings
+from app.database import async_session_factory
+from app.models.revoked_token import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings; no false negatives."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(round(self.size / capacity * math.log(2)), 1)
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class MemoryRevocationStore:
+    """Single-process revocation list."""
+
+    def __init__(self):
+        self._revoked: dict[str, float] = {}
+
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        now = time.time()
+        self._revoked = {j: exp for j, exp in self._revoked.items() if exp > now}
+        self._revoked[jti] = expires_at
+
+    async def revoke_many(self, revoked: dict[str, float]) -> None:
+        self._revoked.update(revoked)
+
+    async def is_revoked(self, jti: str) -> bool:
+        expires_at = self._revoked.get(jti)
+        return expires_at is not None and expires_at > time.time()
+
+
+class RedisRevocationStore:
+    """Shared revocation list with a per-process Bloom filter in front of it."""
+
+    _KEY = "auth:revoked"
+    _VERSION_KEY = "auth:revoked:version"
+    MIN_CAPACITY = 10_000
+
+    def __init__(self, redis_url: str, sync_interval: float):
+        import redis.asyncio as aioredis
+
+        self._redis = aioredis.from_url(redis_url, decode_responses=True)
+        self.sync_interval = sync_interval
+        self._bloom = BloomFilter(self.MIN_CAPACITY)
+        self._version: str | None = None
+        self._synced_at = float("-inf")
+
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.zadd(self._KEY, {jti: expires_at})
+            pipe.incr(self._VERSION_KEY)
+            await pipe.execute()
+        self._bloom.add(jti)
+
+    async def revoke_many(self, revoked: dict[str, float]) -> None:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.zadd(self._KEY, revoked)
+            pipe.incr(self._VERSION_KEY)
+            await pipe.execute()
+        for jti in revoked:
+            self._bloom.add(jti)
+
+    async def _sync(self) -> None:
+        if time.monotonic() - self._synced_at < self.sync_interval:
+            return
+        self._synced_at = time.monotonic()
+        version = await self._redis.get(self._VERSION_KEY)
+        if version == self._version:
+            return
+        now = time.time()
+        await self._redis.zremrangebyscore(self._KEY, "-inf", now)
+        members = await self._redis.zrangebyscore(self._KEY, now, "+inf")
+        bloom = BloomFilter(max(self.MIN_CAPACITY, 2 * len(members)))
+        for jti in members:
+            bloom.add(jti)
+        self._bloom, self._version = bloom, version
+
+    async def is_revoked(self, jti: str) -> bool:
+        await self._sync()
+        if jti not in self._bloom:
+            return False
+        expires_at = await self._redis.zscore(self._KEY, jti)
+        return expires_at is not None and expires_at > time.time()
+
+
+_revocation_store: MemoryRevocationStore | RedisRevocationStore | None = None
+
+
+def get_revocation_store() -> MemoryRevocationStore | RedisRevocationStore:
+    """Process-wide revocation store — Redis when configured, in-memory otherwise."""
+    global _revocation_store
+    if _revocation_store is None:
+        settings = get_settings()
+        _revocation_store = (
+            RedisRevocationStore(settings.REDIS_URL, settings.TOKEN_REVOCATION_SYNC_INTERVAL)
+            if settings.REDIS_URL
+            else MemoryRevocationStore()
+        )
+    return _revocation_store
+
+
+# How often a check could not use the store: "database" answered, or "refused"
+revocation_fallbacks: Counter[str] = Counter()
+# The store missed revocations (or could not be reached): refill it from the table
+_store_behind = False
+
+
+async def _record_revocation(jti: str, expires_at: float) -> None:
+    now = datetime.now(UTC)
+    async with async_session_factory() as db:
+        await db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= now))
+        try:
+            async with db.begin_nested():
+                db.add(RevokedToken(jti=jti, expires_at=datetime.fromtimestamp(expires_at, UTC)))
+        except IntegrityError:
+            pass  # already revoked
+        await db.commit()
+
+
+async def _revoked_in_database(jti: str) -> bool:
+    async with async_session_factory() as db:
+        found = await db.scalar(
+            select(RevokedToken.jti).where(
+                RevokedToken.jti == jti, RevokedToken.expires_at > datetime.now(UTC)
+            )
+        )
+    return found is not None
+
+
+async def _refill_store(store: MemoryRevocationStore | RedisRevocationStore) -> None:
+    global _store_behind
+    async with async_session_factory() as db:
+        rows = await db.execute(
+            select(RevokedToken.jti, RevokedToken.expires_at).where(
+                RevokedToken.expires_at > datetime.now(UTC)
+            )
+        )
+        revoked = {
+            jti: (expires_at if expires_at.tzinfo else expires_at.replace(tzinfo=UTC)).timestamp()
+            for jti, expires_at in rows
+        }
+    if revoked:
+        await store.revoke_many(revoked)
+    _store_behind = False
+    logger.info(f"[AUTH] Revocation store refilled with {len(revoked)} token(s)")
+
+
+def _store_failed(action: str, error: Exception) -> None:
+    global _store_behind
+    _store_behind = True
+    logger.warning(f"[AUTH] Revocation store {action} failed: {error}")
+
+
+async def revoke_token(claims: dict) -> None:
+    """
+    Revoke a decoded token until it expires. Tokens without a ``jti`` cannot
+    be revoked. Raises only when the revocation could not be recorded at all.
+    """
+    if not claims.get("jti"):
+        return
+    jti, expires_at = claims["jti"], float(claims["exp"])
+    await _record_revocation(jti, expires_at)
+    try:
+        await get_revocation_store().revoke(jti, expires_at)
+    except Exception as e:
+        # Recorded in the table, which answers for the store until it is refilled
+        _store_failed("write", e)
+
+
+async def is_token_revoked(claims: dict) -> bool:
+    """Whether the token was revoked; True when that cannot be determined."""
+    if not claims.get("jti"):
+        return False
+    jti = claims["jti"]
+    store = get_revocation_store()
+    try:
+        if _store_behind:
+            await _refill_store(store)
+        return await store.is_revoked(jti)
+    except Exception as e:
+        _store_failed("check", e)
+
+    try:
+        revoked = await _revoked_in_database(jti)
+    except Exception as e:
+        revocation_fallbacks["refused"] += 1
+        logger.error(
+            f"[AUTH] Revocation list unavailable, refusing token "
+            f"({revocation_fallbacks['refused']} so far): {e}"
+        )
+        return True
+    revocation_fallbacks["database"] += 1
+    return revoked
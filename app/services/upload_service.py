@@ -1,128 +1,129 @@
-"""Upload service — Cloudflare R2 (S3-compatible) image storage."""
+"""
+Upload service — image storage on Cloudflare R2 or local disk.
 
+Uploads are streamed: chunks are size-checked and hashed as they arrive and
+go straight to the object storage backend (``object_storage``), so a file is
+never held in memory whole. Going over the size limit aborts the write and
+stores nothing. ``hash_chunks`` runs the same checks without storing, so a
+caller can learn the content hash first (see ``media_service.store_image``).
+"""
+
+import hashlib
 import logging
 import uuid
+from collections.abc import AsyncIterable, AsyncIterator, Sequence
+from dataclasses import dataclass
 
-from app.config import get_settings
+from app.services.object_storage import get_object_storage
 
 logger = logging.getLogger(__name__)
-settings = get_settings()
+
+
+class UploadTooLargeError(Exception):
+    """The upload passed its size limit; nothing was stored."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        super().__init__(f"Upload exceeds {max_size} bytes")
+
+
+@dataclass
+class StoredImage:
+    url: str
+    size: int
+    sha256: str
+
+
+class _Meter:
+    """Counts and hashes chunks as they pass, stopping at ``max_size``."""
+
+    def __init__(self, max_size: int | None):
+        self.max_size = max_size
+        self.size = 0
+        self._hash = hashlib.sha256()
+
+    async def stream(self, chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+        async for chunk in chunks:
+            self.size += len(chunk)
+            if self.max_size is not None and self.size > self.max_size:
+                raise UploadTooLargeError(self.max_size)
+            self._hash.update(chunk)
+            yield chunk
+
+    @property
+    def sha256(self) -> str:
+        return self._hash.hexdigest()
+
+
+async def hash_chunks(
+    chunks: AsyncIterable[bytes], max_size: int | None = None
+) -> StoredImage:
+    """Size and SHA-256 of ``chunks`` without storing them; ``url`` is left empty."""
+    meter = _Meter(max_size)
+    async for _ in meter.stream(chunks):
+        pass
+    return StoredImage(url="", size=meter.size, sha256=meter.sha256)
 
 
 class UploadService:
-    """Handles file uploads to Cloudflare R2 or local storage."""
+    """Handles image uploads and deletes against the configured storage backend."""
 
-    def __init__(self):
-        self.r2_account_id = getattr(settings, "CLOUDFLARE_ACCOUNT_ID", "")
-        self.r2_access_key = getattr(settings, "R2_ACCESS_KEY_ID", "")
-        self.r2_secret_key = getattr(settings, "R2_SECRET_ACCESS_KEY", "")
-        self.r2_bucket = getattr(settings, "R2_BUCKET_NAME", "store-images")
-        self.r2_public_url = getattr(settings, "R2_PUBLIC_URL", "")
+    def __init__(self, storage=None):
+        self._storage = storage
 
     @property
-    def is_configured(self) -> bool:
-        return bool(self.r2_account_id and self.r2_access_key and self.r2_secret_key)
+    def storage(self):
+        return self._storage or get_object_storage()
 
     async def upload_image(
         self,
-        file_bytes: bytes,
+        chunks: AsyncIterable[bytes],
         filename: str,
         content_type: str = "image/jpeg",
         folder: str = "products",
-    ) -> str | None:
-        """Upload image and return public URL."""
-        # Generate unique key
-        ext = filename.rsplit(".", 1)[-1] if "." in filename else "jpg"
-        key = f"{folder}/{uuid.uuid4().hex}.{ext}"
-
-        if self.is_configured:
-            return await self._upload_to_r2(file_bytes, key, content_type)
-        else:
-            # Fallback: save locally
-            return await self._save_local(file_bytes, key)
-
-    async def _upload_to_r2(self, file_bytes: bytes, key: str, content_type: str) -> str | None:
-        """Upload to Cloudflare R2 via S3-compatible API."""
+        max_size: int | None = None,
+        key: str | None = None,
+    ) -> StoredImage | None:
+        """
+        Stream an image to storage and return where it went. Raises
+        ``UploadTooLargeError`` as soon as more than ``max_size`` bytes arrive.
+        Without an explicit ``key`` a unique one is made under ``folder``.
+        """
+        if key is None:
+            ext = filename.rsplit(".", 1)[-1] if "." in filename else "jpg"
+            key = f"{folder}/{uuid.uuid4().hex}.{ext}"
+        meter = _Meter(max_size)
+
         try:
-            # Using boto3-compatible approach with httpx for minimal deps
-            import boto3
-            from botocore.config import Config
-
-            s3 = boto3.client(
-                "s3",
-                endpoint_url=f"https://{self.r2_account_id}.r2.cloudflarestorage.com",
-                aws_access_key_id=self.r2_access_key,
-                aws_secret_access_key=self.r2_secret_key,
-                config=Config(signature_version="s3v4"),
-                region_name="auto",
-            )
-
-            s3.put_object(
-                Bucket=self.r2_bucket,
-                Key=key,
-                Body=file_bytes,
-                ContentType=content_type,
-            )
-
-            if self.r2_public_url:
-                return f"{self.r2_public_url.rstrip('/')}/{key}"
-            return f"https://{self.r2_bucket}.{self.r2_account_id}.r2.dev/{key}"
-
-        except ImportError:
-            logger.warning("boto3 not installed, falling back to local storage")
-            return await self._save_local(file_bytes, key)
+            await self.storage.upload(key, meter.stream(chunks), content_type)
+        except UploadTooLargeError:
+            raise
         except Exception:
-            logger.exception("R2 upload failed")
+            logger.exception("Image upload failed")
             return None
-
-    async def _save_local(self, file_bytes: bytes, key: str) -> str | None:
-        """Save file locally as fallback."""
-        import os
-
-        import aiofiles
-
-        upload_dir = os.path.join("uploads", os.path.dirname(key))
-        os.makedirs(upload_dir, exist_ok=True)
-
-        filepath = os.path.join("uploads", key)
-        async with aiofiles.open(filepath, "wb") as f:
-            await f.write(file_bytes)
-
-        return f"/static/uploads/{key}"
+        return StoredImage(url=self.storage.url_for(key), size=meter.size, sha256=meter.sha256)
 
     async def delete_image(self, url: str) -> bool:
         """Delete an image by URL."""
-        if not url:
+        key = self.storage.key_for(url) if url else None
+        if key is None:
+            return False
+        try:
+            return await self.storage.delete(key)
+        except Exception:
+            logger.exception("Image delete failed")
             return False
 
-        if self.is_configured and self.r2_public_url and url.startswith(self.r2_public_url):
-            try:
-                import boto3
-                from botocore.config import Config
-
-                key = url.replace(self.r2_public_url.rstrip("/") + "/", "")
-                s3 = boto3.client(
-                    "s3",
-                    endpoint_url=f"https://{self.r2_account_id}.r2.cloudflarestorage.com",
-                    aws_access_key_id=self.r2_access_key,
-                    aws_secret_access_key=self.r2_secret_key,
-                    config=Config(signature_version="s3v4"),
-                    region_name="auto",
-                )
-                s3.delete_object(Bucket=self.r2_bucket, Key=key)
-                return True
-            except Exception:
-                logger.exception("R2 delete failed")
-                return False
-        else:
-            # Local file
-            import os
-
-            filepath = url.replace("/static/", "")
-            if os.path.exists(filepath):
-                os.remove(filepath)
-                return True
-        return False
+    async def delete_images(self, urls: Sequence[str]) -> int:
+        """Delete many images in batched requests; returns how many were deleted."""
+        keys = [key for url in urls if url and (key := self.storage.key_for(url))]
+        if not keys:
+            return 0
+        try:
+            return len(await self.storage.delete_many(keys))
+        except Exception:
+            logger.exception("Batch image delete failed")
+            return 0
 
 
 # Singleton
@@ -4,7 +4,7 @@ import re
 import uuid
 
 from fastapi import HTTPException
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.store import Store
@@ -23,6 +23,18 @@ async def get_store_or_404(
     return store
 
 
+async def bump_catalog_version(db: AsyncSession, store_id: uuid.UUID) -> int:
+    """Increment the store's catalog version in place and return the new value."""
+    result = await db.execute(
+        update(Store)
+        .where(Store.id == store_id)
+        .values(catalog_version=Store.catalog_version + 1)
+        .returning(Store.catalog_version)
+        .execution_options(synchronize_session=False)
+    )
+    return result.scalar_one()
+
+
 def slugify(text: str, fallback: str = "item") -> str:
     """Generate URL-safe slug from text."""
     slug = re.sub(r"[^\w\s-]", "", text.lower().strip())
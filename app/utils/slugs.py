@@ -0,0 +1,106 @@
+"""Unique slug allocation — one prefix query per batch instead of one query per candidate."""
+
+from collections.abc import Callable, Sequence
+from typing import Any
+
+from sqlalchemy import ColumnElement, inspect, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def _like_prefix(base: str) -> str:
+    escaped = base.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"{escaped}-%"
+
+
+async def allocate_slugs(
+    db: AsyncSession,
+    model: Any,
+    scope: ColumnElement[bool],
+    bases: Sequence[str],
+    exclude_ids: Sequence[Any] = (),
+) -> list[str]:
+    """
+    Free slug for every base within ``scope`` (e.g. ``Product.store_id == store_id``).
+    Taken slugs are fetched with a single ``slug = base OR slug LIKE 'base-%'`` query;
+    the smallest free ``-N`` suffix is then picked in memory, also avoiding
+    duplicates inside ``bases``. Rows in ``exclude_ids`` don't count as taken.
+    """
+    if not bases:
+        return []
+    unique_bases = set(bases)
+    stmt = select(model.slug).where(
+        scope,
+        or_(
+            *[model.slug == base for base in unique_bases],
+            *[model.slug.like(_like_prefix(base), escape="\\") for base in unique_bases],
+        ),
+    )
+    if exclude_ids:
+        stmt = stmt.where(model.id.not_in(exclude_ids))
+    taken = set((await db.execute(stmt)).scalars())
+
+    # Numeric suffixes already used per base (0 = the bare base)
+    used: dict[str, set[int]] = {base: set() for base in unique_bases}
+    for slug in taken:
+        if slug in used:
+            used[slug].add(0)
+        head, _, tail = slug.rpartition("-")
+        if tail.isdigit() and head in used:
+            used[head].add(int(tail))
+
+    slugs = []
+    assigned = set(taken)  # a base like "shoe-1" may collide with "shoe" + suffix
+    for base in bases:
+        counter, slug = 0, base
+        while counter in used[base] or slug in assigned:
+            counter += 1
+            slug = f"{base}-{counter}"
+        used[base].add(counter)
+        assigned.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+async def allocate_slug(
+    db: AsyncSession,
+    model: Any,
+    scope: ColumnElement[bool],
+    base: str,
+    exclude_ids: Sequence[Any] = (),
+) -> str:
+    """Single-slug form of ``allocate_slugs``."""
+    [slug] = await allocate_slugs(db, model, scope, [base], exclude_ids)
+    return slug
+
+
+async def flush_with_unique_slugs(
+    db: AsyncSession,
+    model: Any,
+    scope: ColumnElement[bool],
+    objects: Sequence[Any],
+    bases: Sequence[str],
+    prepare: Callable[[], None] | None = None,
+    attempts: int = 3,
+) -> None:
+    """
+    Assign allocated slugs to ``objects`` and flush them inside a savepoint.
+    A concurrent writer that takes the same slug trips the unique constraint;
+    the savepoint is rolled back and slugs are re-allocated, up to ``attempts``.
+    ``prepare`` re-applies other pending changes, which a rollback discards.
+    """
+    for attempt in range(1, attempts + 1):
+        persisted = [obj.id for obj in objects if inspect(obj).persistent]
+        slugs = await allocate_slugs(db, model, scope, bases, exclude_ids=persisted)
+        try:
+            async with db.begin_nested():
+                if prepare is not None:
+                    prepare()
+                for obj, slug in zip(objects, slugs, strict=True):
+                    obj.slug = slug
+                db.add_all(objects)
+                await db.flush()
+            return
+        except IntegrityError:
+            if attempt == attempts:
+                raise
@@ -0,0 +1,227 @@
+"""
+Inline Job Executor — durable in-process job runner for deployments without Redis.
+
+Jobs stay in the ``jobs`` table (runner="inline") until a worker claims them with
+``SELECT ... FOR UPDATE SKIP LOCKED``, so nothing lives only in memory:
+- a bounded pool of worker coroutines processes jobs, capped per tenant;
+- running jobs get a heartbeat; jobs whose heartbeat stops (crash, restart)
+  are put back in the queue by the maintenance loop and at startup;
+- a graceful stop re-queues whatever was in flight.
+"""
+
+import asyncio
+import logging
+import uuid
+from collections.abc import Awaitable, Callable
+from contextlib import suppress
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import func, select, update
+
+from app.config import get_settings
+from app.database import async_session_factory
+from app.models.job import Job
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Job], Awaitable[object]]
+
+INLINE_RUNNER = "inline"
+
+
+class InlineJobExecutor:
+    """Bounded worker pool over a DB-backed job queue."""
+
+    def __init__(
+        self,
+        concurrency: int = 3,
+        per_tenant_limit: int = 2,
+        poll_interval: float = 15.0,
+        heartbeat_interval: float = 30.0,
+    ):
+        self.concurrency = concurrency
+        self.per_tenant_limit = per_tenant_limit
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = timedelta(seconds=heartbeat_interval * 3)
+        self._handlers: dict[str, JobHandler] = {}
+        self._tasks: list[asyncio.Task[None]] = []
+        self._running: set[uuid.UUID] = set()
+        self._claim_lock: asyncio.Lock | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def register(self, job_type: str, handler: JobHandler) -> None:
+        """Register the coroutine that executes jobs of ``job_type``."""
+        self._handlers[job_type] = handler
+
+    @property
+    def started(self) -> bool:
+        return bool(self._tasks) and self._loop is asyncio.get_running_loop()
+
+    async def start(self) -> None:
+        """Recover orphaned jobs and spawn the worker pool (idempotent)."""
+        if self.started:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._claim_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        recovered = await self.recover_orphans()
+        if recovered:
+            print(f"[JOBS] Re-queued {recovered} orphaned inline job(s).")
+        self._tasks = [
+            asyncio.create_task(self._worker_loop(i)) for i in range(self.concurrency)
+        ]
+        self._tasks.append(asyncio.create_task(self._maintenance_loop()))
+
+    async def stop(self) -> None:
+        """Cancel workers and hand their in-flight jobs back to the queue."""
+        tasks, self._tasks = self._tasks, []
+        in_flight = list(self._running)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if in_flight:
+            await self._requeue(in_flight)
+        self._running.clear()
+
+    async def submit(self) -> None:
+        """Wake the pool after an inline job was committed to the queue."""
+        await self.start()
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def drain(self, timeout: float = 10.0) -> None:
+        """Wait until no inline job is queued or running (tests, shutdown hooks)."""
+        deadline = asyncio.get_running_loop().time() + timeout
+        while asyncio.get_running_loop().time() < deadline:
+            async with async_session_factory() as db:
+                pending = await db.scalar(
+                    select(func.count())
+                    .select_from(Job)
+                    .where(Job.runner == INLINE_RUNNER, Job.status.in_(["queued", "running"]))
+                )
+            if not pending and not self._running:
+                return
+            await asyncio.sleep(0.02)
+        raise TimeoutError("inline jobs still pending")
+
+    async def recover_orphans(self) -> int:
+        """Re-queue running inline jobs whose heartbeat went stale."""
+        cutoff = datetime.now(UTC) - self.stale_after
+        async with async_session_factory() as db:
+            stmt = update(Job).where(
+                Job.runner == INLINE_RUNNER,
+                Job.status == "running",
+                Job.heartbeat_at < cutoff,
+            )
+            if self._running:
+                stmt = stmt.where(Job.id.not_in(self._running))
+            result = await db.execute(
+                stmt.values(status="queued", progress=0, heartbeat_at=None)
+            )
+            await db.commit()
+            return result.rowcount or 0
+
+    async def _claim(self) -> Job | None:
+        """Atomically move the oldest eligible queued job to running."""
+        saturated_tenants = (
+            select(Job.tenant_id)
+            .where(Job.runner == INLINE_RUNNER, Job.status == "running")
+            .group_by(Job.tenant_id)
+            .having(func.count() >= self.per_tenant_limit)
+        )
+        async with self._claim_lock, async_session_factory() as db:
+            stmt = (
+                select(Job)
+                .where(
+                    Job.runner == INLINE_RUNNER,
+                    Job.status == "queued",
+                    Job.type.in_(list(self._handlers)),
+                    Job.tenant_id.not_in(saturated_tenants),
+                )
+                .order_by(Job.created_at)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            )
+            job = (await db.execute(stmt)).scalar_one_or_none()
+            if job is None:
+                return None
+            now = datetime.now(UTC)
+            job.status = "running"
+            job.started_at = now
+            job.heartbeat_at = now
+            await db.commit()
+            self._running.add(job.id)
+            return job
+
+    async def _run(self, job: Job) -> None:
+        try:
+            await self._handlers[job.type](job)
+        except Exception as e:
+            logger.exception(f"[JOBS] Inline job {job.id} failed")
+            # Handlers normally record failure themselves — make sure it's not left running
+            async with async_session_factory() as db:
+                await db.execute(
+                    update(Job)
+                    .where(Job.id == job.id, Job.status == "running")
+                    .values(status="failed", error=str(e), completed_at=datetime.now(UTC))
+                )
+                await db.commit()
+        finally:
+            self._running.discard(job.id)
+
+    async def _worker_loop(self, index: int) -> None:
+        while True:
+            # Clear before claiming: a submit() during the claim must still wake us
+            self._wakeup.clear()
+            try:
+                job = await self._claim()
+            except Exception:
+                logger.exception("[JOBS] Claiming an inline job failed")
+                job = None
+            if job is not None:
+                await self._run(job)
+                # A slot freed up — another worker may now pass the tenant cap
+                self._wakeup.set()
+                continue
+            with suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+
+    async def _maintenance_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                if self._running:
+                    async with async_session_factory() as db:
+                        await db.execute(
+                            update(Job)
+                            .where(Job.id.in_(self._running))
+                            .values(heartbeat_at=datetime.now(UTC))
+                        )
+                        await db.commit()
+                if await self.recover_orphans():
+                    self._wakeup.set()
+            except Exception:
+                logger.exception("[JOBS] Inline executor maintenance failed")
+
+    async def _requeue(self, job_ids: list[uuid.UUID]) -> None:
+        try:
+            async with async_session_factory() as db:
+                await db.execute(
+                    update(Job)
+                    .where(Job.id.in_(job_ids), Job.status == "running")
+                    .values(status="queued", progress=0, heartbeat_at=None)
+                )
+                await db.commit()
+        except Exception:
+            logger.exception("[JOBS] Could not re-queue in-flight inline jobs")
+
+
+_settings = get_settings()
+
+# Singleton — started by the app lifespan (or lazily on first submit)
+inline_executor = InlineJobExecutor(
+    concurrency=_settings.INLINE_JOB_WORKERS,
+    per_tenant_limit=_settings.INLINE_JOBS_PER_TENANT,
+)
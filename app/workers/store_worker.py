@@ -1,72 +1,86 @@
 """
-ARQ Worker — processes store generation jobs in the background.
+ARQ Worker — processes store generation jobs and payment webhooks, and
+delivers the order event and email outboxes in the background.
 Runs as a separate container (docker-compose worker service).
 """
 
-import asyncio
+import uuid
 from datetime import UTC, datetime
 
-from arq import func
-from arq.connections import RedisSettings
+from arq import cron, func
 from sqlalchemy import update
 
 from app.config import get_settings
 from app.database import async_session_factory
 from app.models.job import Job
 from app.models.store import Store
+from app.services.catalog_materializer import materialize_catalog
+from app.services.email_service import close_email_sender, deliver_queued_emails
+from app.services.job_events import publish_job_event
+from app.services.job_progress import JobProgressReporter, refresh_batch_job
+from app.services.job_queue import parse_redis_url
+from app.services.order_consumers import order_event_dispatcher
+from app.services.payment_events import process_payment_event as apply_payment_event
+from app.services.payment_events import process_pending_payment_events
+from app.services.payment_reconciliation import reconcile_payments
+from app.services.payment_service import payment_service
 from app.services.store_generator import generate_store
+from app.workers.inline_executor import inline_executor
 
 settings = get_settings()
 
 
-def parse_redis_url(url: str) -> RedisSettings:
-    """Parse redis://host:port/db into RedisSettings."""
-    url = url.replace("redis://", "")
-    parts = url.split("/")
-    host_port = parts[0].split(":")
-    host = host_port[0]
-    port = int(host_port[1]) if len(host_port) > 1 else 6379
-    database = int(parts[1]) if len(parts) > 1 else 0
-    return RedisSettings(host=host, port=port, database=database)
+def build_generation_config(store: Store) -> dict:
+    """Generator input for a store — its saved config plus name, type and language."""
+    config = dict(store.config or {})
+    config.update(name=store.name, store_type=store.store_type, language=store.language)
+    return config
 
 
 async def process_store_generation(ctx: dict, job_id: str, store_id: str, config: dict):
     """
-    Main worker function — simulates AI store generation with progress updates.
-    In Phase 2, replace with real LLM calls.
+    Main worker function — generates store content and reports real progress.
+    ``config`` must include the store ``name``, ``store_type`` and ``language``.
     """
     print(f"🏗️ Starting store generation: job={job_id}, store={store_id}")
+    job_uuid = uuid.UUID(str(job_id))
+    store_uuid = uuid.UUID(str(store_id))
 
     async with async_session_factory() as db:
         # Mark job as running
-        await db.execute(
+        parent_id = await db.scalar(
             update(Job)
-            .where(Job.id == job_id)
+            .where(Job.id == job_uuid)
             .values(status="running", started_at=datetime.now(UTC), progress=0)
+            .returning(Job.parent_id)
         )
+        if parent_id:
+            await db.execute(
+                update(Job)
+                .where(Job.id == parent_id, Job.status == "queued")
+                .values(status="running", started_at=datetime.now(UTC))
+            )
         await db.commit()
+        await publish_job_event(job_id, "status", status="running", progress=0)
 
+        reporter = JobProgressReporter(db, job_uuid)
         try:
-            # Get generation steps
-            steps, result = await generate_store(job_id, store_id, config)
-
-            # Simulate progress through each step
-            for step_msg, progress in steps:
-                print(f"  📦 [{progress}%] {step_msg}")
-
-                await db.execute(update(Job).where(Job.id == job_id).values(progress=progress))
-                await db.commit()
-
-                # Simulate work (2 seconds per step)
-                await asyncio.sleep(2)
-
-            # Mark store as active
-            await db.execute(update(Store).where(Store.id == store_id).values(status="active"))
+            result = await generate_store(job_id, store_id, config, on_progress=reporter)
+
+            # Mark store as active and keep generated content with its config
+            store = await db.get(Store, store_uuid)
+            if store:
+                new_config = dict(store.config or {})
+                new_config["ai_content"] = result.get("ai_content", {})
+                store.config = new_config
+                store.status = "active"
+                # Real Category/Product rows, committed together with the job result
+                result["catalog"] = await materialize_catalog(db, store, new_config["ai_content"])
 
             # Mark job as done
             await db.execute(
                 update(Job)
-                .where(Job.id == job_id)
+                .where(Job.id == job_uuid)
                 .values(
                     status="done",
                     progress=100,
@@ -75,15 +89,19 @@ async def process_store_generation(ctx: dict, job_id: str, store_id: str, config
                 )
             )
             await db.commit()
+            await publish_job_event(job_id, "result", status="done", progress=100, result=result)
+            if parent_id:
+                await refresh_batch_job(db, parent_id)
 
             print(f"✅ Store generation complete: job={job_id}")
             return result
 
         except Exception as e:
+            await db.rollback()
             # Mark job as failed
             await db.execute(
                 update(Job)
-                .where(Job.id == job_id)
+                .where(Job.id == job_uuid)
                 .values(
                     status="failed",
                     error=str(e),
@@ -91,10 +109,51 @@ async def process_store_generation(ctx: dict, job_id: str, store_id: str, config
                 )
             )
             await db.commit()
+            await publish_job_event(job_id, "result", status="failed", error=str(e))
+            if parent_id:
+                await refresh_batch_job(db, parent_id)
             print(f"❌ Store generation failed: job={job_id}, error={e}")
             raise
 
 
+async def run_inline_store_generation(job: Job):
+    """Inline executor handler — rebuilds the worker arguments from the database."""
+    async with async_session_factory() as db:
+        store = await db.get(Store, job.store_id)
+        if store is None:
+            raise ValueError(f"Store {job.store_id} no longer exists")
+        config = build_generation_config(store)
+    return await process_store_generation({}, str(job.id), str(job.store_id), config)
+
+
+inline_executor.register("store_generation", run_inline_store_generation)
+
+
+async def dispatch_order_events(ctx: dict):
+    """Cron — deliver due order events (emails, store webhooks, customer stats)."""
+    return await order_event_dispatcher.dispatch()
+
+
+async def process_payment_event(ctx: dict, event_id: str):
+    """Verify and apply a stored payment webhook."""
+    return await apply_payment_event(uuid.UUID(event_id))
+
+
+async def retry_payment_events(ctx: dict):
+    """Cron — pick up payment webhooks whose processing failed or was never enqueued."""
+    return await process_pending_payment_events()
+
+
+async def send_queued_emails(ctx: dict):
+    """Cron — deliver the email outbox in provider-sized batches."""
+    return await deliver_queued_emails()
+
+
+async def reconcile_unpaid_orders(ctx: dict):
+    """Cron — settle orders whose payment callback and webhook never arrived."""
+    return await reconcile_payments()
+
+
 async def startup(ctx: dict):
     """Worker startup — called once when worker starts."""
     print("⚙️ ARQ Worker started — listening for store generation jobs...")
@@ -102,13 +161,42 @@ async def startup(ctx: dict):
 
 async def shutdown(ctx: dict):
     """Worker shutdown — cleanup."""
+    await payment_service.aclose()
+    await close_email_sender()
     print("👋 ARQ Worker shutting down...")
 
 
 class WorkerSettings:
     """ARQ Worker configuration."""
 
-    functions = [func(process_store_generation, name="process_store_generation")]  # noqa: RUF012
+    functions = [  # noqa: RUF012
+        func(process_store_generation, name="process_store_generation"),
+        func(process_payment_event, name="process_payment_event"),
+    ]
+    cron_jobs = [  # noqa: RUF012
+        cron(
+            dispatch_order_events,
+            second=set(range(0, 60, settings.ORDER_EVENT_DISPATCH_INTERVAL)),
+            run_at_startup=True,
+            timeout=120,
+        ),
+        cron(
+            send_queued_emails,
+            second=set(range(0, 60, settings.EMAIL_OUTBOX_INTERVAL)),
+            timeout=300,
+        ),
+        cron(
+            retry_payment_events,
+            second=set(range(0, 60, settings.PAYMENT_EVENT_RETRY_INTERVAL)),
+            timeout=300,
+        ),
+        cron(
+            reconcile_unpaid_orders,
+            minute=set(range(0, 60, settings.PAYMENT_RECONCILE_INTERVAL_MINUTES)),
+            second=0,
+            timeout=600,
+        ),
+    ]
     on_startup = startup
     on_shutdown = shutdown
     redis_settings = parse_redis_url(settings.REDIS_URL)
@@ -161,8 +161,51 @@ export const storesApi = {
 };
 
 // ══════ Jobs API ══════
+export interface JobEvent {
+  type?: string;
+  status?: string;
+  progress?: number;
+  message?: string;
+  result?: { store_id?: string } | null;
+  error?: string | null;
+}
+
 export const jobsApi = {
   get: (id: string) => api.get(`/jobs/${id}`),
+  // بث التقدم عبر SSE — يعيد آخر حدث (done / failed) بدون polling
+  watch: async (
+    id: string,
+    onEvent?: (event: JobEvent) => void,
+  ): Promise<JobEvent> => {
+    const token = localStorage.getItem("access_token");
+    const res = await fetch(`${api.defaults.baseURL}/jobs/${id}/events`, {
+      headers: token ? { Authorization: `Bearer ${token}` } : {},
+    });
+    if (!res.ok || !res.body) {
+      throw new Error(`Job stream failed: ${res.status}`);
+    }
+    const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+    let buffer = "";
+    let last: JobEvent | null = null;
+    for (;;) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += value;
+      let sep = buffer.indexOf("\n\n");
+      while (sep !== -1) {
+        const frame = buffer.slice(0, sep);
+        buffer = buffer.slice(sep + 2);
+        const data = frame.split("\n").find((l) => l.startsWith("data: "));
+        if (data) {
+          last = JSON.parse(data.slice(6)) as JobEvent;
+          onEvent?.(last);
+        }
+        sep = buffer.indexOf("\n\n");
+      }
+    }
+    if (!last) throw new Error("Job stream closed without events");
+    return last;
+  },
   list: (skip = 0, limit = 20, status?: string) => {
     let url = `/jobs/?skip=${skip}&limit=${limit}`;
     if (status) url += `&status_filter=${status}`;
@@ -1,6 +1,7 @@
 import { useState, useCallback, useMemo, useEffect } from "react";
 import { useSearchParams, useNavigate } from "react-router-dom";
 import { storesApi, aiChatApi, jobsApi } from "../lib/api";
+import type { JobEvent } from "../lib/api";
 import { STORE_TEMPLATES, getTemplateHTML } from "../data/templates";
 import toast from "react-hot-toast";
 
@@ -383,42 +384,33 @@ export default function AIBuilderOptimized() {
 
         const jobId = genRes.data?.job_id;
         if (jobId) {
-          // Poll the job status instead of setTimeout race condition
-          let attempts = 0;
-          const maxAttempts = 15;
-
-          while (attempts < maxAttempts) {
-            attempts++;
-            await new Promise((r) => setTimeout(r, 2000));
-
-            try {
-              const jobRes = await jobsApi.get(jobId);
-              const job = jobRes.data;
-
-              if (job.status === "completed" && job.result?.store_id) {
-                finalStoreId = job.result.store_id;
-                setStoreId(finalStoreId);
-                break;
-              } else if (job.status === "failed") {
-                throw new Error(job.error || "فشل إنشاء المتجر");
-              }
-              // Still processing — continue polling
-            } catch {
-              // If job endpoint fails, fallback to store search
-              if (attempts >= 3) {
-                const storesRes = await storesApi.list(0, 50);
-                const stores = storesRes.data?.stores || [];
-                const ourStore = stores.find(
-                  (s: { name: string; status: string }) =>
-                    s.name === storeName &&
-                    (s.status === "pending" || s.status === "active"),
-                );
-                if (ourStore) {
-                  finalStoreId = ourStore.id;
-                  setStoreId(finalStoreId);
-                  break;
-                }
-              }
+          // Follow the job over SSE until it finishes
+          let final: JobEvent | null = null;
+          try {
+            final = await jobsApi.watch(jobId);
+          } catch {
+            // Stream unavailable — fall back to looking the store up
+          }
+          if (final?.status === "failed") {
+            throw new Error(final.error || "فشل إنشاء المتجر");
+          }
+          if (final?.result?.store_id) {
+            finalStoreId = final.result.store_id;
+            setStoreId(finalStoreId);
+          }
+
+          // Fallback: find the store we just created
+          if (!finalStoreId) {
+            const storesRes = await storesApi.list(0, 50);
+            const stores = storesRes.data?.stores || [];
+            const ourStore = stores.find(
+              (s: { name: string; status: string }) =>
+                s.name === storeName &&
+                (s.status === "pending" || s.status === "active"),
+            );
+            if (ourStore) {
+              finalStoreId = ourStore.id;
+              setStoreId(finalStoreId);
             }
           }
 
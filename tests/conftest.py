@@ -1,16 +1,22 @@
 """
 Test fixtures — shared test configuration.
-Uses in-memory SQLite for fast, isolated tests.
+Uses a throwaway SQLite file for fast, isolated tests.
 """
 
 import os
+import tempfile
 from collections.abc import AsyncGenerator
 
+import pytest
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
 
 # Force SQLite for tests (before any app imports)
-os.environ["DATABASE_URL"] = "sqlite+aiosqlite://"
+# A file (not :memory:) so concurrent sessions — requests and inline job workers —
+# get their own connections and transactions, as they do on PostgreSQL
+os.environ["DATABASE_URL"] = (
+    f"sqlite+aiosqlite:///{tempfile.mkdtemp(prefix='store-builder-tests-')}/test.db"
+)
 os.environ["JWT_SECRET_KEY"] = "test-secret-key-for-testing-only"
 os.environ["APP_ENV"] = "testing"
 os.environ["REDIS_URL"] = ""
@@ -21,6 +27,8 @@ os.environ["GOOGLE_API_KEY"] = ""
 from app.database import engine
 from app.main import app
 from app.models import Base
+from app.services.payment_service import PaymentResult, payment_service
+from app.workers.inline_executor import inline_executor
 
 API = "/api/v1"
 
@@ -46,8 +54,14 @@ async def setup_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     yield
+    # Let inline jobs finish, then stop the workers before their event loop goes away
+    if inline_executor.started:
+        await inline_executor.drain()
+    await inline_executor.stop()
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
+    # Fresh connection per test — its locks are bound to this test's event loop
+    await engine.dispose()
 
 
 @pytest_asyncio.fixture
@@ -92,9 +106,8 @@ async def store_id(client: AsyncClient, auth_headers: dict[str, str]) -> str:
     assert res.status_code == 202, f"Generate failed: {res.text}"
     job_id = res.json()["job_id"]
 
-    # The store was created in DB; find it via list
-    import asyncio
-    await asyncio.sleep(0.3)  # small delay for background task
+    # The store was created in DB; wait for its generation, then find it via list
+    await inline_executor.drain()
 
     list_res = await client.get(f"{API}/stores/", headers=auth_headers)
     assert list_res.status_code == 200
@@ -102,3 +115,23 @@ async def store_id(client: AsyncClient, auth_headers: dict[str, str]) -> str:
     stores = data.get("stores", [])
     assert len(stores) > 0, f"No stores found after generate. Response: {data}"
     return stores[0]["id"]
+
+
+@pytest.fixture
+def gateway_statuses(monkeypatch) -> dict[str, str]:
+    """
+    Fake payment gateway: tests set a payment id's status here and webhook
+    verification reports it; unknown ids behave like an unreachable gateway.
+    """
+    statuses: dict[str, str] = {}
+
+    async def verify_payment(gateway: str, payment_id: str) -> PaymentResult:
+        if payment_id not in statuses:
+            return PaymentResult(success=False, error="gateway unreachable")
+        status = statuses[payment_id]
+        return PaymentResult(
+            success=status == "paid", payment_id=payment_id, metadata={"status": status}
+        )
+
+    monkeypatch.setattr(payment_service, "verify_payment", verify_payment)
+    return statuses
@@ -1,6 +1,15 @@
 """Tests — Auth endpoints (register, login, me)."""
 
+import asyncio
+
 import pytest
+from passlib.context import CryptContext
+from sqlalchemy import select, update
+
+from app.config import get_settings
+from app.database import async_session_factory
+from app.models.user import User
+from app.services.auth_service import hash_password, pwd_context
 
 TEST_USER = {
     "email": "test@example.com",
@@ -86,3 +95,48 @@ async def test_me(client):
     data = response.json()
     assert "email" in data
     assert data["role"] == "owner"
+
+
+@pytest.mark.asyncio
+async def test_login_rehashes_outdated_password_hash(client):
+    reg = await client.post("/api/v1/auth/register", json=TEST_USER)
+    assert reg.status_code == 201
+    weak = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash(TEST_USER["password"])
+    async with async_session_factory() as db:
+        await db.execute(update(User).values(hashed_password=weak))
+        await db.commit()
+
+    response = await client.post(
+        "/api/v1/auth/login",
+        json={"email": TEST_USER["email"], "password": TEST_USER["password"]},
+    )
+    assert response.status_code == 200
+    async with async_session_factory() as db:
+        stored = await db.scalar(select(User.hashed_password))
+    assert stored != weak
+    assert not pwd_context.needs_update(stored)
+    assert pwd_context.verify(TEST_USER["password"], stored)
+
+
+def test_stronger_password_hash_is_not_downgraded():
+    rounds = get_settings().PASSWORD_HASH_ROUNDS
+    stronger = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds + 1).hash("pw")
+    weaker = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds - 1).hash("pw")
+    assert not pwd_context.needs_update(stronger)
+    assert pwd_context.needs_update(weaker)
+
+
+@pytest.mark.asyncio
+async def test_password_hashing_does_not_block_event_loop():
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.005)
+
+    task = asyncio.create_task(ticker())
+    await asyncio.gather(*(hash_password(f"pw-{n}") for n in range(2)))
+    task.cancel()
+    assert ticks > 5
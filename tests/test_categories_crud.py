@@ -73,19 +73,20 @@ async def test_create_category_no_auth(client, store_id):
 
 
 @pytest.mark.asyncio
-async def test_list_categories_empty(client, auth_headers, store_id):
-    """New store should have 0 categories."""
+async def test_list_categories_generated_catalog(client, auth_headers, store_id):
+    """A generated store should list its generated categories."""
     res = await client.get(
         f"{API}/stores/{store_id}/categories", headers=auth_headers
     )
     assert res.status_code == 200
     data = res.json()
-    assert data["total"] == 0
+    assert data["total"] > 0
 
 
 @pytest.mark.asyncio
 async def test_list_categories(client, auth_headers, store_id):
     """Should list created categories."""
+    before = (await client.get(f"{API}/stores/{store_id}/categories", headers=auth_headers)).json()
     await client.post(
         f"{API}/stores/{store_id}/categories",
         headers=auth_headers,
@@ -102,7 +103,7 @@ async def test_list_categories(client, auth_headers, store_id):
     )
     assert res.status_code == 200
     data = res.json()
-    assert data["total"] == 2
+    assert data["total"] == before["total"] + 2
 
 
 # ── Get Category ──
@@ -0,0 +1,223 @@
+"""Tests -- Email outbox (queued in the request, batched delivery, retries)."""
+
+import json
+from datetime import UTC, datetime
+
+import httpx
+import pytest
+from sqlalchemy import select, update
+
+from app.database import async_session_factory
+from app.models.email import OutboxEmail
+from app.services import email_service
+from app.services.email_service import (
+    ResendSender,
+    SendResult,
+    SmtpSender,
+    deliver_queued_emails,
+)
+
+API = "/api/v1"
+
+
+class FakeSender:
+    def __init__(self, reject: str | None = None, stop_after: int | None = None):
+        self.batches: list[list[str]] = []
+        self.reject = reject
+        self.stop_after = stop_after
+
+    async def send(self, emails):
+        self.batches.append([email.to_address for email in emails])
+        results = [
+            SendResult(error="mailbox unavailable")
+            if email.to_address == self.reject
+            else SendResult(f"msg_{n}")
+            for n, email in enumerate(emails)
+        ]
+        return results[: self.stop_after]
+
+
+async def _outbox() -> list[OutboxEmail]:
+    async with async_session_factory() as db:
+        return list((await db.execute(select(OutboxEmail))).scalars())
+
+
+async def _register(client, n: int) -> None:
+    res = await client.post(
+        f"{API}/auth/register",
+        json={
+            "email": f"owner{n}@example.com",
+            "password": "TestPass123!",
+            "full_name": f"Owner {n}",
+            "tenant_name": f"Shop {n}",
+        },
+    )
+    assert res.status_code == 201
+
+
+@pytest.mark.asyncio
+async def test_registration_queues_and_batch_sends(client, monkeypatch):
+    sender = FakeSender()
+    monkeypatch.setattr(email_service, "_sender", sender)
+    for n in range(3):
+        await _register(client, n)
+    assert sender.batches == []  # nothing sent inside the request
+    assert {email.status for email in await _outbox()} == {"pending"}
+
+    assert await deliver_queued_emails() == 3
+    assert len(sender.batches) == 1 and len(sender.batches[0]) == 3
+    emails = await _outbox()
+    assert {email.status for email in emails} == {"sent"}
+    assert emails[0].provider_message_id.startswith("msg_")
+    assert await deliver_queued_emails() == 0
+
+
+@pytest.mark.asyncio
+async def test_rejected_email_fails_alone(client, monkeypatch):
+    monkeypatch.setattr(email_service, "_sender", FakeSender(reject="owner0@example.com"))
+    for n in range(3):
+        await _register(client, n)
+
+    # The emails queued behind the bad one still go out
+    assert await deliver_queued_emails() == 2
+    [retry] = [email for email in await _outbox() if email.status != "sent"]
+    assert retry.to_address == "owner0@example.com"
+    assert (retry.status, retry.attempts, retry.last_error) == (
+        "pending",
+        1,
+        "mailbox unavailable",
+    )
+    assert await deliver_queued_emails() == 0  # backing off
+
+    monkeypatch.setattr(email_service, "_sender", FakeSender())
+    async with async_session_factory() as db:
+        await db.execute(update(OutboxEmail).values(available_at=datetime.now(UTC)))
+        await db.commit()
+    assert await deliver_queued_emails() == 1
+    assert {email.status for email in await _outbox()} == {"sent"}
+
+
+@pytest.mark.asyncio
+async def test_untried_emails_keep_their_attempts(client, monkeypatch):
+    monkeypatch.setattr(email_service, "_sender", FakeSender(stop_after=1))
+    for n in range(3):
+        await _register(client, n)
+
+    assert await deliver_queued_emails() == 1
+    untried = [email for email in await _outbox() if email.status != "sent"]
+    assert [(email.status, email.attempts) for email in untried] == [("pending", 0)] * 2
+    assert await deliver_queued_emails() == 1  # due again right away
+
+
+@pytest.mark.asyncio
+async def test_resend_sender_uses_batch_endpoint():
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        body = json.loads(request.content)
+        return httpx.Response(200, json={"data": [{"id": f"re_{n}"} for n in range(len(body))]})
+
+    sender = ResendSender("re_key", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    emails = [
+        OutboxEmail(to_address=f"c{n}@example.com", subject="Hi", html="<p>Hi</p>")
+        for n in range(3)
+    ]
+    assert await sender.send(emails) == [SendResult(f"re_{n}") for n in range(3)]
+    [request] = requests
+    assert request.url.path == "/emails/batch"
+    assert request.headers["x-batch-validation"] == "permissive"
+    assert [item["to"] for item in json.loads(request.content)] == [
+        ["c0@example.com"],
+        ["c1@example.com"],
+        ["c2@example.com"],
+    ]
+    await sender.aclose()
+
+
+@pytest.mark.asyncio
+async def test_smtp_sender_reuses_one_session(monkeypatch):
+    class FakeSMTP:
+        is_connected = True
+
+        def __init__(self):
+            self.sent = []
+
+        async def send_message(self, message):
+            self.sent.append(message["To"])
+
+        async def quit(self):
+            self.is_connected = False
+
+    sessions = []
+
+    async def connect():
+        sessions.append(FakeSMTP())
+        return sessions[-1]
+
+    sender = SmtpSender()
+    monkeypatch.setattr(sender, "_connect", connect)
+    for batch in range(2):
+        emails = [OutboxEmail(to_address=f"b{batch}@example.com", subject="s", html="h")] * 2
+        await sender.send(emails)
+    assert len(sessions) == 1
+    assert len(sessions[0].sent) == 4
+
+
+@pytest.mark.asyncio
+async def test_resend_sender_reports_invalid_emails_alone():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            json={
+                "data": [{"id": "re_0"}, {"id": "re_2"}],
+                "errors": [{"index": 1, "message": "bad to"}],
+            },
+        )
+
+    sender = ResendSender("re_key", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    emails = [
+        OutboxEmail(to_address=f"c{n}@example.com", subject="Hi", html="h") for n in range(3)
+    ]
+    assert await sender.send(emails) == [
+        SendResult("re_0"),
+        SendResult(error="bad to"),
+        SendResult("re_2"),
+    ]
+    await sender.aclose()
+
+
+@pytest.mark.asyncio
+async def test_smtp_refused_recipient_does_not_stop_the_batch(monkeypatch):
+    import aiosmtplib
+
+    class FakeSMTP:
+        is_connected = True
+
+        def __init__(self):
+            self.sent = []
+
+        async def send_message(self, message):
+            if message["To"] == "bad@example.com":
+                raise aiosmtplib.SMTPRecipientsRefused([])
+            self.sent.append(message["To"])
+
+        async def quit(self):
+            self.is_connected = False
+
+    sessions = []
+
+    async def connect():
+        sessions.append(FakeSMTP())
+        return sessions[-1]
+
+    sender = SmtpSender()
+    monkeypatch.setattr(sender, "_connect", connect)
+    emails = [
+        OutboxEmail(to_address=address, subject="s", html="h")
+        for address in ("a@example.com", "bad@example.com", "c@example.com")
+    ]
+    results = await sender.send(emails)
+    assert [result.error is None for result in results] == [True, False, True]
+    assert len(sessions) == 1
+    assert sessions[0].sent == ["a@example.com", "c@example.com"]
@@ -0,0 +1,56 @@
+"""Tests -- Email templates (compiled once, CSS inlined, per-store branded variants)."""
+
+import uuid
+
+from app.services.email_templates import (
+    StoreTemplateCache,
+    inline_css,
+    platform_templates,
+    store_brand,
+)
+
+
+def test_css_is_inlined_and_values_escaped():
+    subject, html = platform_templates["verification"].render(
+        full_name="<script>x</script>", code="482913"
+    )
+    assert "ويب فلو" in subject
+    assert "<style" not in html and "class=" not in html
+    assert "&lt;script&gt;x&lt;/script&gt;" in html
+    assert 'letter-spacing: 8px; font-family: \'Courier New\', monospace">482913</div>' in html
+
+
+def test_inline_css_specificity_and_existing_styles():
+    css = "p { color: red; margin: 0; } .box p { color: blue; } .note { color: grey; }"
+    html = inline_css(
+        '<div class="box"><p>a</p><p class="note" style="margin: 4px">b</p></div><p>c</p>',
+        css,
+    )
+    assert html == (
+        "<div>"
+        '<p style="margin: 0; color: blue">a</p>'
+        '<p style="margin: 0; color: blue; margin: 4px">b</p>'
+        '</div><p style="color: red; margin: 0">c</p>'
+    )
+
+
+def test_store_variants_are_cached_until_branding_changes():
+    cache = StoreTemplateCache(max_entries=2)
+    store_id = uuid.uuid4()
+    brand = store_brand("عطور {الورد}", {"branding": {"primary_color": "#8B4513"}})
+
+    templates = cache.get(store_id, brand)
+    assert cache.get(store_id, brand) is templates
+    subject, html = templates.emails["order_confirmation"].render(
+        order_number="ORD-1", customer_name="Sara", items="", total="10.00", currency="SAR"
+    )
+    assert subject == "تم استلام طلبك #ORD-1 — عطور {الورد}"
+    assert "#8B4513" in html and "#7c3aed" not in html
+
+    rebranded = cache.get(store_id, store_brand(brand.name, {"logo_url": "https://cdn/x.png"}))
+    assert rebranded is not templates
+    assert '<img src="https://cdn/x.png"' in rebranded.emails["order_confirmation"].html
+
+    for _ in range(2):
+        cache.get(uuid.uuid4(), brand)
+    assert cache.get(store_id, rebranded.brand) is not rebranded  # evicted
@@ -0,0 +1,54 @@
+"""Tests -- Generation cache (precompiled templates, AI output reuse by prompt)."""
+
+import pytest
+
+from app.config import get_settings
+from app.services import store_generator
+from app.services.generation_cache import STORE_NAME_TOKEN, GenerationCache, generation_cache
+
+
+def test_template_content_substitutes_name_into_fresh_copies():
+    first = store_generator._generate_template_content('متجر "النخبة"', "fashion", "ar")
+    assert first["hero"]["title"] == 'مرحباً بكم في متجر "النخبة"'
+    assert STORE_NAME_TOKEN not in str(first)
+
+    first["featured_products"].clear()
+    second = store_generator._generate_template_content("Other", "fashion", "ar")
+    assert second["featured_products"]
+    assert second["seo"]["keywords"][0] == "Other"
+
+
+def test_cache_expires_and_evicts_oldest():
+    cache = GenerationCache(max_entries=2, ttl=60)
+    for key in ("a", "b", "c"):
+        cache.put(key, {"title": f"{STORE_NAME_TOKEN} {key}"})
+    assert cache.get("a", "X") is None
+    assert cache.get("c", "X") == {"title": "X c"}
+
+    cache.ttl = -1
+    assert cache.get("c", "X") is None
+
+
+@pytest.mark.asyncio
+async def test_identical_prompts_reuse_ai_output(monkeypatch):
+    """Two stores that differ only by name should cost one AI call."""
+    calls: list[str] = []
+
+    async def fake_anthropic(prompt: str, api_key: str) -> dict:
+        calls.append(prompt)
+        return {"hero": {"title": f"أهلاً في {STORE_NAME_TOKEN}"}, "categories": []}
+
+    monkeypatch.setattr(get_settings(), "ANTHROPIC_API_KEY", "test-key")
+    monkeypatch.setattr(store_generator, "_generate_with_anthropic", fake_anthropic)
+    generation_cache.clear()
+
+    config = {"store_type": "beauty", "language": "ar", "branding": {"style": "luxury"}}
+    first = await store_generator.generate_store("j1", "s1", {**config, "name": "ورد"})
+    second = await store_generator.generate_store("j2", "s2", {**config, "name": "عنبر"})
+    other_style = {**config, "branding": {"style": "minimal"}, "name": "مسك"}
+    await store_generator.generate_store("j3", "s3", other_style)
+
+    assert len(calls) == 2
+    assert first["ai_content"]["hero"]["title"] == "أهلاً في ورد"
+    assert second["ai_content"]["hero"]["title"] == "أهلاً في عنبر"
+    generation_cache.clear()
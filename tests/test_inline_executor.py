@@ -0,0 +1,139 @@
+"""Tests -- Inline job executor (durable queue, per-tenant cap, orphan recovery)."""
+
+import asyncio
+import time
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.database import async_session_factory
+from app.models.job import Job
+from app.models.tenant import Tenant
+from app.workers.inline_executor import InlineJobExecutor, inline_executor
+
+API = "/api/v1"
+
+
+async def _create_tenant_jobs(count: int, **values) -> list:
+    async with async_session_factory() as db:
+        tenant = Tenant(name="Queue Corp", slug=f"queue-corp-{time.monotonic_ns()}")
+        db.add(tenant)
+        await db.flush()
+        jobs = [
+            Job(tenant_id=tenant.id, type="test", runner="inline", **values) for _ in range(count)
+        ]
+        db.add_all(jobs)
+        await db.commit()
+        return [job.id for job in jobs]
+
+
+async def _statuses() -> dict:
+    async with async_session_factory() as db:
+        rows = (await db.execute(select(Job.id, Job.status))).all()
+    return dict(rows)
+
+
+@pytest.mark.asyncio
+async def test_generate_runs_on_inline_executor(client, auth_headers):
+    """Without Redis the generate endpoint persists an inline job and the executor runs it."""
+    res = await client.post(
+        f"{API}/stores/generate",
+        headers=auth_headers,
+        json={"name": "Inline Store", "store_type": "fashion"},
+    )
+    assert res.status_code == 202
+    await inline_executor.drain()
+
+    job = (await client.get(f"{API}/jobs/{res.json()['job_id']}", headers=auth_headers)).json()
+    assert job["status"] == "done"
+    async with async_session_factory() as db:
+        assert (await db.execute(select(Job.runner))).scalar_one() == "inline"
+
+
+@pytest.mark.asyncio
+async def test_per_tenant_limit_and_fairness():
+    """A tenant never exceeds its cap, and other tenants are not starved by it."""
+    seen: list = []
+
+    async def handler(job: Job) -> None:
+        seen.append(job.tenant_id)
+        await asyncio.sleep(60)
+
+    executor = InlineJobExecutor(concurrency=3, per_tenant_limit=1, poll_interval=0.05)
+    executor.register("test", handler)
+    busy = await _create_tenant_jobs(3)
+    other = await _create_tenant_jobs(1)
+
+    await executor.submit()
+    await asyncio.sleep(0.3)
+    statuses = await _statuses()
+    await executor.stop()
+
+    assert [statuses[j] for j in busy].count("running") == 1
+    assert statuses[other[0]] == "running"
+    assert len(seen) == 2
+
+
+@pytest.mark.asyncio
+async def test_submit_during_empty_claim_wakes_worker():
+    """A job submitted while a worker is finding the queue empty still runs at once."""
+    ran = asyncio.Event()
+
+    async def handler(job: Job) -> None:
+        ran.set()
+
+    executor = InlineJobExecutor(concurrency=1, poll_interval=60)
+    executor.register("test", handler)
+    claim = executor._claim
+    raced = False
+
+    async def racing_claim():
+        nonlocal raced
+        if raced:
+            return await claim()
+        raced = True
+        await _create_tenant_jobs(1)
+        await executor.submit()
+        return None
+
+    executor._claim = racing_claim
+    await executor.start()
+    try:
+        await asyncio.wait_for(ran.wait(), timeout=2)
+    finally:
+        await executor.stop()
+
+
+@pytest.mark.asyncio
+async def test_stale_running_jobs_are_requeued():
+    """Jobs whose heartbeat stopped (process died) go back to the queue."""
+    stale = datetime.now(UTC) - timedelta(minutes=10)
+    orphaned = await _create_tenant_jobs(1, status="running", heartbeat_at=stale)
+    fresh = await _create_tenant_jobs(1, status="running", heartbeat_at=datetime.now(UTC))
+
+    executor = InlineJobExecutor(heartbeat_interval=30)
+    assert await executor.recover_orphans() == 1
+
+    statuses = await _statuses()
+    assert statuses[orphaned[0]] == "queued"
+    assert statuses[fresh[0]] == "running"
+
+
+@pytest.mark.asyncio
+async def test_stop_requeues_in_flight_jobs():
+    """A graceful stop hands unfinished jobs back instead of losing them."""
+
+    async def handler(job: Job) -> None:
+        await asyncio.sleep(60)
+
+    executor = InlineJobExecutor(concurrency=1, poll_interval=0.05)
+    executor.register("test", handler)
+    [job_id] = await _create_tenant_jobs(1)
+
+    await executor.submit()
+    await asyncio.sleep(0.2)
+    assert (await _statuses())[job_id] == "running"
+
+    await executor.stop()
+    assert (await _statuses())[job_id] == "queued"
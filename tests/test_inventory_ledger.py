@@ -0,0 +1,117 @@
+"""Tests -- Inventory ledger (movements for every stock change, snapshots, stock-at)."""
+
+import uuid
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from app.database import async_session_factory
+from app.models.inventory import InventoryMovement
+from app.models.product import Product
+from app.services.inventory_ledger import stock_at, take_inventory_snapshots
+
+API = "/api/v1"
+
+
+async def _create(client, auth_headers, store_id, stock: int) -> str:
+    res = await client.post(
+        f"{API}/stores/{store_id}/products",
+        headers=auth_headers,
+        json={"name": f"Oud {uuid.uuid4().hex[:6]}", "price": 50, "stock_quantity": stock},
+    )
+    return res.json()["id"]
+
+
+async def _movements(client, auth_headers, product_id) -> dict:
+    url = f"{API}/products/{product_id}/inventory/movements"
+    return (await client.get(url, headers=auth_headers)).json()
+
+
+@pytest.mark.asyncio
+async def test_every_stock_change_is_in_the_ledger(client, auth_headers, store_id):
+    product_id = await _create(client, auth_headers, store_id, stock=10)
+    order = await client.post(
+        f"{API}/stores/{store_id}/checkout",
+        headers=auth_headers,
+        json={
+            "items": [{"product_id": product_id, "quantity": 3}],
+            "customer_name": "Lina",
+            "customer_email": "lina@example.com",
+            "shipping_address": {"city": "Riyadh"},
+        },
+    )
+    await client.patch(
+        f"{API}/products/{product_id}", headers=auth_headers, json={"stock_quantity": 20}
+    )
+    res = await client.post(
+        f"{API}/products/{product_id}/inventory/movements",
+        headers=auth_headers,
+        json={"kind": "restock", "quantity": 5, "reason": "PO-77"},
+    )
+    assert res.status_code == 201
+    assert res.json()["stock_quantity"] == 25
+    await client.patch(
+        f"{API}/orders/{order.json()['id']}", headers=auth_headers, json={"status": "cancelled"}
+    )
+
+    ledger = await _movements(client, auth_headers, product_id)
+    assert sorted((m["kind"], m["quantity"]) for m in ledger["items"]) == [
+        ("adjust", 13),
+        ("cancel", 3),
+        ("restock", 5),
+        ("restock", 10),
+        ("sale", -3),
+    ]
+    level = await client.get(f"{API}/products/{product_id}/inventory", headers=auth_headers)
+    assert level.json()["stock_quantity"] == ledger["net_change"] == 28
+
+
+@pytest.mark.asyncio
+async def test_negative_movement_cannot_oversell(client, auth_headers, store_id):
+    product_id = await _create(client, auth_headers, store_id, stock=2)
+    res = await client.post(
+        f"{API}/products/{product_id}/inventory/movements",
+        headers=auth_headers,
+        json={"kind": "adjust", "quantity": -3, "reason": "damaged"},
+    )
+    assert res.status_code == 400
+    assert (await _movements(client, auth_headers, product_id))["net_change"] == 2
+
+
+@pytest.mark.asyncio
+async def test_snapshots_and_point_in_time_stock(client, auth_headers, store_id):
+    product_id = uuid.UUID(await _create(client, auth_headers, store_id, stock=0))
+    day_ago = datetime.now(UTC) - timedelta(days=1)
+
+    async with async_session_factory() as db:
+        product = await db.get(Product, product_id)
+        for hours, quantity in ((3, 10), (2, -4), (1, 1)):
+            db.add(
+                InventoryMovement(
+                    tenant_id=product.tenant_id,
+                    store_id=product.store_id,
+                    product_id=product_id,
+                    kind="adjust",
+                    quantity=quantity,
+                    created_at=day_ago - timedelta(hours=hours),
+                )
+            )
+        await db.commit()
+
+        assert await stock_at(db, product_id, day_ago - timedelta(hours=2.5)) == 10
+        assert await stock_at(db, product_id, day_ago) == 7
+
+    assert await take_inventory_snapshots() == 1
+    assert await take_inventory_snapshots() == 0  # nothing moved since
+
+    async with async_session_factory() as db:
+        # Earlier than the snapshot: answered from the movements alone
+        assert await stock_at(db, product_id, day_ago - timedelta(hours=1.5)) == 6
+        # Later: the snapshot (7) plus anything after it
+        assert await stock_at(db, product_id, datetime.now(UTC)) == 7
+
+    at = (day_ago - timedelta(hours=2.5)).isoformat()
+    res = await client.get(
+        f"{API}/products/{product_id}/inventory", headers=auth_headers, params={"at": at}
+    )
+    assert res.json()["stock_quantity"] == 10
@@ -0,0 +1,96 @@
+"""Tests -- Job progress channel (in-process broadcaster + SSE endpoint)."""
+
+import asyncio
+
+import pytest
+
+from app.services.job_events import InProcessBroadcaster, publish_job_event
+from app.workers.inline_executor import inline_executor
+
+API = "/api/v1"
+
+
+async def _generate(client, auth_headers) -> str:
+    res = await client.post(
+        f"{API}/stores/generate",
+        headers=auth_headers,
+        json={"name": "Events Store", "store_type": "fashion"},
+    )
+    assert res.status_code == 202
+    return res.json()["job_id"]
+
+
+@pytest.mark.asyncio
+async def test_in_process_broadcaster_fanout():
+    """Every subscriber of a job receives its events; other jobs are isolated."""
+    broadcaster = InProcessBroadcaster()
+    first = await broadcaster.subscribe("job-1")
+    second = await broadcaster.subscribe("job-1")
+    other = await broadcaster.subscribe("job-2")
+
+    await broadcaster.publish("job-1", {"type": "progress", "progress": 40})
+
+    assert (await first.get(timeout=1))["progress"] == 40
+    assert (await second.get(timeout=1))["progress"] == 40
+    assert await other.get(timeout=0.05) is None
+
+    for stream in (first, second, other):
+        await stream.close()
+    await broadcaster.publish("job-1", {"type": "progress", "progress": 50})
+    assert await first.get(timeout=0.05) is None
+
+
+@pytest.mark.asyncio
+async def test_stream_finished_job_sends_snapshot(client, auth_headers):
+    """A finished job should yield a single status frame and close."""
+    job_id = await _generate(client, auth_headers)
+    await inline_executor.drain()
+
+    res = await client.get(f"{API}/jobs/{job_id}/events", headers=auth_headers)
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/event-stream")
+    assert res.text.startswith("event: status\n")
+    assert '"status": "done"' in res.text
+
+
+@pytest.mark.asyncio
+async def test_stream_pushes_live_events(client, auth_headers):
+    """Published progress and result events should be pushed until the job ends."""
+    job_id = await _generate(client, auth_headers)
+    await inline_executor.drain()
+    await inline_executor.stop()
+
+    # Put the job back in flight, then feed events while the stream is open
+    from sqlalchemy import update
+
+    from app.database import async_session_factory, engine
+    from app.models.job import Job
+
+    async with async_session_factory() as db:
+        await db.execute(update(Job).values(status="running", progress=10))
+        await db.commit()
+
+    request = asyncio.create_task(
+        client.get(f"{API}/jobs/{job_id}/events", headers=auth_headers)
+    )
+    await asyncio.sleep(0.2)
+    # The open stream holds no pooled connection
+    assert engine.pool.checkedout() == 0
+    await publish_job_event(job_id, "progress", progress=70, message="parsed")
+    await publish_job_event(job_id, "result", status="done", progress=100)
+
+    res = await asyncio.wait_for(request, timeout=5)
+    frames = [f for f in res.text.split("\n\n") if f]
+    assert [f.split("\n")[0] for f in frames] == [
+        "event: status",
+        "event: progress",
+        "event: result",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_stream_other_tenant_job_not_found(client, auth_headers, auth_headers_2):
+    """Tenants cannot subscribe to each other's jobs."""
+    job_id = await _generate(client, auth_headers)
+    res = await client.get(f"{API}/jobs/{job_id}/events", headers=auth_headers_2)
+    assert res.status_code == 404
@@ -0,0 +1,83 @@
+"""Tests -- Shared ARQ job queue (URL parsing, instant inline fallback)."""
+
+import asyncio
+import time
+
+import pytest
+from arq.jobs import JobStatus
+
+from app.services import job_queue
+from app.services.job_queue import JobQueue, parse_redis_url
+from app.workers import store_worker
+
+
+def test_parse_redis_url_full():
+    settings = parse_redis_url("rediss://:secret@cache.internal:6380/2")
+    assert settings.host == "cache.internal"
+    assert settings.port == 6380
+    assert settings.database == 2
+    assert settings.password == "secret"
+    assert settings.ssl is True
+
+
+def test_parse_redis_url_defaults():
+    settings = parse_redis_url("redis://redis")
+    assert (settings.host, settings.port, settings.database) == ("redis", 6379, 0)
+    assert parse_redis_url("").host == "localhost"
+
+
+def test_worker_shares_url_parser():
+    assert store_worker.parse_redis_url is parse_redis_url
+
+
+@pytest.mark.asyncio
+async def test_queue_without_redis_is_instant():
+    """No REDIS_URL: the queue never connects and enqueue answers immediately."""
+    queue = JobQueue("")
+    await queue.start()
+    assert queue.available is False
+
+    started = time.monotonic()
+    assert await queue.enqueue("process_store_generation", "job", "store", {}) is False
+    assert time.monotonic() - started < 0.05
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_queue_unreachable_redis_falls_back():
+    """An unreachable Redis is detected once at start, not on every enqueue."""
+    queue = JobQueue("redis://127.0.0.1:1/0", probe_interval=60, probe_timeout=0.5)
+    await queue.start()
+    assert queue.available is False
+
+    started = time.monotonic()
+    assert await queue.enqueue("process_store_generation", "job", "store", {}) is False
+    assert time.monotonic() - started < 0.05
+    await queue.stop()
+
+
+class SlowPool:
+    """Accepts every job, but answers later than the enqueue timeout."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def enqueue_job(self, function, *args, **kwargs):
+        self.calls.append(kwargs)
+        await asyncio.sleep(1)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("status", "enqueued"), [(JobStatus.queued, True), (JobStatus.not_found, False)]
+)
+async def test_timed_out_enqueue_checks_the_job_before_falling_back(monkeypatch, status, enqueued):
+    async def job_status(self):
+        return status
+
+    monkeypatch.setattr(job_queue.ArqJob, "status", job_status)
+    queue = JobQueue("redis://cache", probe_timeout=0.05)
+    queue._pool, queue._healthy = SlowPool(), True
+
+    assert await queue.enqueue("process_payment_event", "e1", job_id="e1") is enqueued
+    assert queue._pool.calls == [{"_job_id": "e1"}]
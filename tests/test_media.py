@@ -0,0 +1,130 @@
+"""Tests -- Responsive image variants and their storefront srcset."""
+
+import io
+import os
+import uuid
+
+import pytest
+from sqlalchemy import select, update
+
+from app.database import async_session_factory
+from app.models.media import MediaAsset
+from app.models.store import Store
+from app.services import image_processing, media_service
+from app.services.image_processing import ImageTooLargeError, render_variants
+from app.services.object_storage import LocalObjectStorage
+
+Image = pytest.importorskip("PIL.Image")
+
+API = "/api/v1"
+
+
+def _png(width: int, height: int) -> bytes:
+    image = Image.new("RGB", (width, height))
+    for x in range(width):
+        image.putpixel((x, height // 2), (x % 256, 80, 160))
+    out = io.BytesIO()
+    image.save(out, "PNG")
+    return out.getvalue()
+
+
+@pytest.fixture
+def image_pool():
+    yield
+    media_service.close_image_pool()
+
+
+def test_render_variants_skips_upscaling(tmp_path):
+    path = tmp_path / "wide.png"
+    path.write_bytes(_png(700, 350))
+    rendered = render_variants(str(path))
+
+    assert (rendered.width, rendered.height) == (700, 350)
+    assert len(rendered.blurhash) == 6 + 2 * (4 * 3 - 1)
+    webp = [v for v in rendered.variants if v.format == "webp"]
+    assert [(v.width, v.height) for v in webp] == [(320, 160), (640, 320)]
+    assert all(Image.open(io.BytesIO(v.data)).size == (v.width, v.height) for v in webp)
+
+
+@pytest.mark.filterwarnings("ignore::PIL.Image.DecompressionBombWarning")
+def test_render_variants_refuses_huge_images_before_decoding(tmp_path, monkeypatch):
+    monkeypatch.setattr(image_processing, "MAX_PIXELS", 100 * 100)
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", Image.MAX_IMAGE_PIXELS)
+    path = tmp_path / "big.png"
+    path.write_bytes(_png(200, 100))
+
+    with pytest.raises(ImageTooLargeError):
+        render_variants(str(path))
+
+
+@pytest.mark.asyncio
+async def test_failed_variant_storage_keeps_the_upload(
+    client, auth_headers, tmp_path, monkeypatch, image_pool
+):
+    monkeypatch.chdir(tmp_path)
+    upload = LocalObjectStorage.upload
+
+    async def flaky_upload(self, key, chunks, content_type):
+        if "_640." in key:
+            raise OSError("disk full")
+        await upload(self, key, chunks, content_type)
+
+    monkeypatch.setattr(LocalObjectStorage, "upload", flaky_upload)
+    res = await client.post(
+        f"{API}/upload/image",
+        headers=auth_headers,
+        files={"file": ("hero.png", _png(1200, 800), "image/png")},
+    )
+    assert res.status_code == 201, res.text
+    assert res.json()["variants"] == []
+    files = [name for _, _, names in os.walk(tmp_path) for name in names]
+    assert files == [res.json()["url"].rsplit("/", 1)[1]]
+
+
+@pytest.mark.asyncio
+async def test_upload_creates_variants_and_storefront_srcset(
+    client, auth_headers, store_id, tmp_path, monkeypatch, image_pool
+):
+    monkeypatch.chdir(tmp_path)
+
+    res = await client.post(
+        f"{API}/upload/image",
+        headers=auth_headers,
+        files={"file": ("hero.png", _png(1200, 800), "image/png")},
+    )
+    assert res.status_code == 201, res.text
+    body = res.json()
+    url = body["url"]
+    assert (body["width"], body["height"]) == (1200, 800)
+    assert body["blurhash"]
+    widths = sorted(v["width"] for v in body["variants"] if v["format"] == "webp")
+    assert widths == [320, 640, 1024]
+    for variant in body["variants"]:
+        assert os.path.exists(variant["url"].removeprefix("/static/"))
+
+    res = await client.post(
+        f"{API}/stores/{store_id}/products",
+        headers=auth_headers,
+        json={"name": "Lamp", "price": 10, "stock_quantity": 5, "image_url": url},
+    )
+    assert res.status_code == 201, res.text
+    async with async_session_factory() as db:
+        await db.execute(
+            update(Store).where(Store.id == uuid.UUID(store_id)).values(status="published")
+        )
+        await db.commit()
+        slug = await db.scalar(select(Store.slug).where(Store.id == uuid.UUID(store_id)))
+
+    res = await client.get(f"{API}/s/{slug}/products")
+    assert res.status_code == 200, res.text
+    [lamp] = [p for p in res.json()["products"] if p["name"] == "Lamp"]
+    [media] = lamp["media"]
+    assert media["url"] == url
+    assert media["blurhash"] == body["blurhash"]
+    assert media["srcset"]["webp"].endswith(" 1024w")
+
+    res = await client.delete(f"{API}/upload/image", headers=auth_headers, params={"url": url})
+    assert res.status_code == 204
+    async with async_session_factory() as db:
+        assert await db.scalar(select(MediaAsset).where(MediaAsset.url == url)) is None
+    assert not any(os.path.exists(v["url"].removeprefix("/static/")) for v in body["variants"])
@@ -0,0 +1,113 @@
+"""Tests -- Order cancellation service (bulk stock return, ledger entries, idempotency)."""
+
+import uuid
+
+import pytest
+from sqlalchemy import select
+
+from app.database import async_session_factory
+from app.models.inventory import InventoryMovement
+
+API = "/api/v1"
+
+
+async def _product(client, auth_headers, store_id, stock: int, **fields) -> str:
+    res = await client.post(
+        f"{API}/stores/{store_id}/products",
+        headers=auth_headers,
+        json={"name": f"P {uuid.uuid4().hex[:6]}", "price": 10, "stock_quantity": stock, **fields},
+    )
+    return res.json()["id"]
+
+
+async def _order(client, auth_headers, store_id, items: list[tuple[str, int]], method="cod"):
+    res = await client.post(
+        f"{API}/stores/{store_id}/checkout",
+        headers=auth_headers,
+        json={
+            "items": [{"product_id": pid, "quantity": qty} for pid, qty in items],
+            "customer_name": "Omar",
+            "customer_email": "omar@example.com",
+            "shipping_address": {"city": "Dammam"},
+            "payment_method": method,
+        },
+    )
+    assert res.status_code == 201, res.text
+    return res.json()
+
+
+async def _stock(client, auth_headers, product_id) -> int:
+    res = await client.get(f"{API}/products/{product_id}", headers=auth_headers)
+    return res.json()["stock_quantity"]
+
+
+async def _movements(order_id: str) -> list[InventoryMovement]:
+    async with async_session_factory() as db:
+        rows = await db.execute(
+            select(InventoryMovement).where(
+                InventoryMovement.order_id == uuid.UUID(order_id),
+                InventoryMovement.kind == "cancel",
+            )
+        )
+        return list(rows.scalars())
+
+
+@pytest.mark.asyncio
+async def test_bulk_cancel_returns_stock_once(client, auth_headers, store_id):
+    mug = await _product(client, auth_headers, store_id, stock=10)
+    tea = await _product(client, auth_headers, store_id, stock=10)
+    gift = await _product(client, auth_headers, store_id, stock=0, track_inventory=False)
+    first = await _order(client, auth_headers, store_id, [(mug, 2), (tea, 1), (gift, 1)])
+    second = await _order(client, auth_headers, store_id, [(mug, 3)])
+    assert await _stock(client, auth_headers, mug) == 5
+
+    url = f"{API}/stores/{store_id}/orders/cancel"
+    body = {"order_ids": [first["id"], second["id"], str(uuid.uuid4())], "reason": "fraud"}
+    res = await client.post(url, headers=auth_headers, json=body)
+    assert res.status_code == 200
+    assert set(res.json()["cancelled"]) == {first["id"], second["id"]}
+    assert res.json()["skipped"] == 1
+
+    assert await _stock(client, auth_headers, mug) == 10
+    assert await _stock(client, auth_headers, tea) == 10
+    assert await _stock(client, auth_headers, gift) == 0
+    movements = {(str(m.product_id), m.kind, m.quantity) for m in await _movements(first["id"])}
+    assert movements == {(mug, "cancel", 2), (tea, "cancel", 1)}
+    assert (await _movements(second["id"]))[0].reason == "fraud"
+
+    # Already cancelled: nothing changes
+    again = await client.post(url, headers=auth_headers, json=body)
+    assert again.json()["cancelled"] == []
+    assert await _stock(client, auth_headers, mug) == 10
+
+
+@pytest.mark.asyncio
+async def test_admin_cancel_via_update(client, auth_headers, store_id):
+    mug = await _product(client, auth_headers, store_id, stock=4)
+    order = await _order(client, auth_headers, store_id, [(mug, 4)])
+
+    for _ in range(2):
+        res = await client.patch(
+            f"{API}/orders/{order['id']}", headers=auth_headers, json={"status": "cancelled"}
+        )
+        assert res.json()["status"] == "cancelled"
+    assert await _stock(client, auth_headers, mug) == 4
+    assert len(await _movements(order["id"])) == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_payment_cancels_unpaid_order(
+    client, auth_headers, store_id, gateway_statuses
+):
+    gateway_statuses["pay_9"] = "failed"
+    mug = await _product(client, auth_headers, store_id, stock=3)
+    order = await _order(client, auth_headers, store_id, [(mug, 3)], method="mada")
+
+    res = await client.post(
+        f"{API}/payments/webhook",
+        json={"id": "pay_9", "status": "failed", "metadata": {"order_id": order["order_number"]}},
+    )
+    assert res.json()["status"] == "accepted"
+    assert await _stock(client, auth_headers, mug) == 3
+    [movement] = await _movements(order["id"])
+    assert movement.reason == "payment_failed"
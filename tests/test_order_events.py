@@ -0,0 +1,124 @@
+"""Tests -- Order event outbox (transactional writes, consumers, retries)."""
+
+import uuid
+from datetime import UTC, datetime
+
+import pytest
+from sqlalchemy import func, select, update
+
+from app.database import async_session_factory
+from app.models.customer import Customer
+from app.models.email import OutboxEmail
+from app.models.order import OrderEvent
+from app.services.order_events import dispatch_order_events, order_event_dispatcher
+
+API = "/api/v1"
+
+
+async def _queued_to(address: str) -> list[str]:
+    async with async_session_factory() as db:
+        subjects = await db.scalars(
+            select(OutboxEmail.subject).where(func.lower(OutboxEmail.to_address) == address)
+        )
+        return list(subjects)
+
+
+async def _checkout(client, auth_headers, store_id, stock=5, quantity=1) -> dict:
+    product = await client.post(
+        f"{API}/stores/{store_id}/products",
+        headers=auth_headers,
+        json={"name": f"Dates {uuid.uuid4().hex[:6]}", "price": 40, "stock_quantity": stock},
+    )
+    return await client.post(
+        f"{API}/stores/{store_id}/checkout",
+        headers=auth_headers,
+        json={
+            "items": [{"product_id": product.json()["id"], "quantity": quantity}],
+            "customer_name": "Huda",
+            "customer_email": "Huda@Example.com",
+            "shipping_address": {"city": "Riyadh"},
+            "payment_method": "mada",
+        },
+    )
+
+
+async def _events(order_id: str | None = None) -> list[OrderEvent]:
+    async with async_session_factory() as db:
+        stmt = select(OrderEvent).order_by(OrderEvent.created_at)
+        if order_id:
+            stmt = stmt.where(OrderEvent.order_id == uuid.UUID(order_id))
+        return list((await db.execute(stmt)).scalars())
+
+
+async def _customer(store_id: str) -> Customer:
+    async with async_session_factory() as db:
+        return await db.scalar(select(Customer).where(Customer.store_id == uuid.UUID(store_id)))
+
+
+@pytest.mark.asyncio
+async def test_order_lifecycle_events_update_customer(
+    client, auth_headers, store_id, gateway_statuses
+):
+    order = (await _checkout(client, auth_headers, store_id)).json()
+    [placed] = await _events(order["id"])
+    assert placed.type == "order.placed" and placed.status == "pending"
+    assert placed.payload["items"][0]["quantity"] == 1
+
+    assert await dispatch_order_events() == 1
+    [subject] = await _queued_to("huda@example.com")
+    assert order["order_number"] in subject
+    customer = await _customer(store_id)
+    assert (customer.email, customer.total_orders) == ("huda@example.com", 1)
+
+    gateway_statuses["pay_1"] = "paid"
+    await client.post(
+        f"{API}/payments/webhook",
+        json={"id": "pay_1", "status": "paid", "metadata": {"order_id": order["order_number"]}},
+    )
+    await client.patch(
+        f"{API}/orders/{order['id']}", headers=auth_headers, json={"status": "cancelled"}
+    )
+    await dispatch_order_events()
+
+    types = sorted(event.type for event in await _events(order["id"]))
+    assert types == ["order.cancelled", "order.paid", "order.placed"]
+    assert {event.status for event in await _events()} == {"done"}
+    customer = await _customer(store_id)
+    assert (customer.total_orders, customer.total_spent) == (0, 0)
+    assert len(await _queued_to("huda@example.com")) == 1  # only on placement
+
+
+@pytest.mark.asyncio
+async def test_failed_checkout_writes_no_event(client, auth_headers, store_id):
+    res = await _checkout(client, auth_headers, store_id, stock=1, quantity=2)
+    assert res.status_code == 400
+    assert await _events() == []
+
+
+@pytest.mark.asyncio
+async def test_failing_consumer_is_retried_alone(client, auth_headers, store_id, monkeypatch):
+    calls = []
+
+    async def flaky(db, event):
+        calls.append(event.type)
+        if len(calls) == 1:
+            raise RuntimeError("partner API down")
+
+    monkeypatch.setitem(order_event_dispatcher._consumers, "flaky", (None, flaky))
+    order = (await _checkout(client, auth_headers, store_id)).json()
+
+    await dispatch_order_events()
+    [event] = await _events(order["id"])
+    assert (event.status, event.attempts) == ("pending", 1)
+    assert "partner API down" in event.last_error
+    assert "customer_stats" in event.delivered and "flaky" not in event.delivered
+    assert await dispatch_order_events() == 0  # backing off
+
+    async with async_session_factory() as db:
+        await db.execute(update(OrderEvent).values(available_at=datetime.now(UTC)))
+        await db.commit()
+    assert await dispatch_order_events() == 1
+    [event] = await _events(order["id"])
+    assert event.status == "done"
+    assert calls == ["order.placed", "order.placed"]
+    assert (await _customer(store_id)).total_orders == 1  # not counted twice
@@ -0,0 +1,123 @@
+"""Tests -- Payment webhooks (stored on receipt, deduplicated, verified, retried)."""
+
+import uuid
+from datetime import UTC, datetime
+
+import pytest
+from sqlalchemy import select, update
+
+from app.database import async_session_factory
+from app.models.order import Order, OrderEvent
+from app.models.payment import PaymentEvent
+from app.models.product import Product
+from app.services.order_cancellation import cancel_orders
+from app.services.payment_events import mark_orders_paid, process_pending_payment_events
+
+API = "/api/v1"
+
+
+async def _order(client, auth_headers, store_id) -> dict:
+    product = await client.post(
+        f"{API}/stores/{store_id}/products",
+        headers=auth_headers,
+        json={"name": f"Kettle {uuid.uuid4().hex[:6]}", "price": 90, "stock_quantity": 3},
+    )
+    res = await client.post(
+        f"{API}/stores/{store_id}/checkout",
+        headers=auth_headers,
+        json={
+            "items": [{"product_id": product.json()["id"], "quantity": 1}],
+            "customer_name": "Faisal",
+            "customer_email": "faisal@example.com",
+            "shipping_address": {"city": "Abha"},
+            "payment_method": "mada",
+        },
+    )
+    return res.json()
+
+
+def _webhook(order: dict, payment_id: str, status: str = "paid") -> dict:
+    return {"id": payment_id, "status": status, "metadata": {"order_id": order["order_number"]}}
+
+
+async def _payment_events() -> list[PaymentEvent]:
+    async with async_session_factory() as db:
+        return list((await db.execute(select(PaymentEvent))).scalars())
+
+
+async def _order_state(client, auth_headers, order: dict) -> str:
+    res = await client.get(f"{API}/orders/{order['id']}", headers=auth_headers)
+    return res.json()["payment_status"]
+
+
+@pytest.mark.asyncio
+async def test_redelivered_webhook_is_applied_once(
+    client, auth_headers, store_id, gateway_statuses
+):
+    gateway_statuses["pay_7"] = "paid"
+    order = await _order(client, auth_headers, store_id)
+
+    first = await client.post(f"{API}/payments/webhook", json=_webhook(order, "pay_7"))
+    again = await client.post(f"{API}/payments/webhook", json=_webhook(order, "pay_7"))
+    assert first.json()["status"] == "accepted"
+    assert again.json()["status"] == "duplicate"
+
+    [event] = await _payment_events()
+    assert (event.status, event.result, event.attempts) == ("processed", "paid", 1)
+    assert await _order_state(client, auth_headers, order) == "paid"
+    async with async_session_factory() as db:
+        paid_events = await db.scalars(select(OrderEvent).where(OrderEvent.type == "order.paid"))
+        assert len(list(paid_events)) == 1
+
+
+@pytest.mark.asyncio
+async def test_unverified_webhook_changes_nothing(
+    client, auth_headers, store_id, gateway_statuses
+):
+    # The body claims "paid", the gateway says otherwise
+    gateway_statuses["pay_fake"] = "initiated"
+    order = await _order(client, auth_headers, store_id)
+
+    res = await client.post(f"{API}/payments/webhook", json=_webhook(order, "pay_fake"))
+    assert res.json()["status"] == "accepted"
+    [event] = await _payment_events()
+    assert event.result == "no_change"
+    assert await _order_state(client, auth_headers, order) == "unpaid"
+
+
+@pytest.mark.asyncio
+async def test_unreachable_gateway_is_retried(client, auth_headers, store_id, gateway_statuses):
+    order = await _order(client, auth_headers, store_id)
+    await client.post(f"{API}/payments/webhook", json=_webhook(order, "pay_3"))
+
+    [event] = await _payment_events()
+    assert (event.status, event.attempts) == ("received", 1)
+    assert "unreachable" in event.last_error
+    assert await process_pending_payment_events() == 0  # backing off
+
+    gateway_statuses["pay_3"] = "paid"
+    async with async_session_factory() as db:
+        await db.execute(update(PaymentEvent).values(available_at=datetime.now(UTC)))
+        await db.commit()
+    assert await process_pending_payment_events() == 1
+    [event] = await _payment_events()
+    assert (event.status, event.result, event.attempts) == ("processed", "paid", 2)
+    assert await _order_state(client, auth_headers, order) == "paid"
+
+
+@pytest.mark.asyncio
+async def test_bulk_mark_skips_cancelled_orders(client, auth_headers, store_id):
+    order = await _order(client, auth_headers, store_id)
+    order_id = uuid.UUID(order["id"])
+    async with async_session_factory() as db:
+        await cancel_orders(db, [order_id], reason="reservation_expired", unpaid_only=True)
+        # The unit went to another buyer meanwhile
+        await db.execute(update(Product).values(stock_quantity=0))
+        await db.commit()
+
+        assert await mark_orders_paid(db, {order_id: {"status": "paid"}}) == []
+        await db.commit()
+        order_row = await db.get(Order, order_id)
+        assert (order_row.status, order_row.payment_status) == ("cancelled", "refund_due")
+        events = await db.scalars(select(OrderEvent.type).where(OrderEvent.order_id == order_id))
+        assert "order.paid" not in list(events)
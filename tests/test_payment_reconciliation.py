@@ -0,0 +1,122 @@
+"""Tests -- Payment reconciliation (stale unpaid orders re-verified in bulk)."""
+
+import asyncio
+import uuid
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import select, update
+
+from app.config import get_settings
+from app.database import async_session_factory, engine
+from app.models.order import Order, OrderEvent
+from app.services import payment_reconciliation
+from app.services.payment_reconciliation import reconcile_payments
+from app.services.payment_service import PaymentResult, payment_service
+
+API = "/api/v1"
+
+
+async def _order(client, auth_headers, store_id, payment_id: str, age_minutes: int = 20) -> str:
+    product = await client.post(
+        f"{API}/stores/{store_id}/products",
+        headers=auth_headers,
+        json={"name": f"Lamp {uuid.uuid4().hex[:6]}", "price": 25, "stock_quantity": 5},
+    )
+    res = await client.post(
+        f"{API}/stores/{store_id}/checkout",
+        headers=auth_headers,
+        json={
+            "items": [{"product_id": product.json()["id"], "quantity": 1}],
+            "customer_name": "Reem",
+            "customer_email": "reem@example.com",
+            "shipping_address": {"city": "Tabuk"},
+            "payment_method": "mada",
+        },
+    )
+    order_id = uuid.UUID(res.json()["id"])
+    async with async_session_factory() as db:
+        await db.execute(
+            update(Order)
+            .where(Order.id == order_id)
+            .values(
+                payment_id=payment_id,
+                created_at=datetime.now(UTC) - timedelta(minutes=age_minutes),
+            )
+        )
+        await db.commit()
+    return res.json()["id"]
+
+
+async def _states() -> dict[str, tuple[str, str]]:
+    async with async_session_factory() as db:
+        rows = await db.execute(select(Order.payment_id, Order.status, Order.payment_status))
+        return {payment_id: (status, paid) for payment_id, status, paid in rows}
+
+
+@pytest.mark.asyncio
+async def test_reconcile_applies_gateway_outcomes(
+    client, auth_headers, store_id, gateway_statuses
+):
+    gateway_statuses.update(pay_ok="paid", pay_bad="failed", pay_wait="initiated")
+    for payment_id in ("pay_ok", "pay_bad", "pay_wait", "pay_down"):
+        await _order(client, auth_headers, store_id, payment_id)
+    await _order(client, auth_headers, store_id, "pay_new", age_minutes=1)  # too recent
+
+    assert await reconcile_payments() == {"checked": 4, "paid": 1, "cancelled": 1}
+    assert await _states() == {
+        "pay_ok": ("paid", "paid"),
+        "pay_bad": ("cancelled", "unpaid"),
+        "pay_wait": ("pending", "unpaid"),
+        "pay_down": ("pending", "unpaid"),
+        "pay_new": ("pending", "unpaid"),
+    }
+    async with async_session_factory() as db:
+        types = (await db.scalars(select(OrderEvent.type))).all()
+    assert types.count("order.paid") == 1
+
+    # Settled orders are not checked again
+    assert (await reconcile_payments())["checked"] == 2
+
+
+@pytest.mark.asyncio
+async def test_reconcile_bounds_gateway_concurrency(
+    client, auth_headers, store_id, monkeypatch
+):
+    running = peak = 0
+
+    async def slow_verify(gateway: str, payment_id: str) -> PaymentResult:
+        nonlocal running, peak
+        # No connection is held while gateways are called
+        assert engine.pool.checkedout() == 0
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return PaymentResult(success=True, payment_id=payment_id, metadata={"status": "paid"})
+
+    monkeypatch.setattr(payment_service, "verify_payment", slow_verify)
+    monkeypatch.setattr(get_settings(), "PAYMENT_RECONCILE_CONCURRENCY", 2)
+    for n in range(5):
+        await _order(client, auth_headers, store_id, f"pay_{n}")
+
+    assert (await reconcile_payments())["paid"] == 5
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_reconcile_commits_each_chunk(client, auth_headers, store_id, monkeypatch):
+    async def verify(gateway: str, payment_id: str) -> PaymentResult:
+        if payment_id == "pay_2":
+            raise asyncio.CancelledError  # e.g. the cron timeout cut the pass short
+        return PaymentResult(success=True, payment_id=payment_id, metadata={"status": "paid"})
+
+    monkeypatch.setattr(payment_service, "verify_payment", verify)
+    monkeypatch.setattr(payment_reconciliation, "RECONCILE_CHUNK_SIZE", 2)
+    for n in range(3):
+        await _order(client, auth_headers, store_id, f"pay_{n}", age_minutes=30 - n)
+
+    with pytest.raises(asyncio.CancelledError):
+        await reconcile_payments()
+    states = await _states()
+    assert [states[f"pay_{n}"][1] for n in range(3)] == ["paid", "paid", "unpaid"]
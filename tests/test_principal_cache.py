@@ -0,0 +1,63 @@
+"""Tests -- Principal cache (authenticated requests skip the users lookup)."""
+
+import uuid
+
+import pytest
+from sqlalchemy import event, update
+
+from app.database import async_session_factory, engine
+from app.models.user import User
+from app.services.auth_service import decode_token
+from app.services.principal_cache import get_principal_cache, invalidate_principal
+
+API = "/api/v1"
+
+
+@pytest.fixture
+def user_queries():
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if "FROM users" in statement:
+            statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
+def _user_id(auth_headers) -> uuid.UUID:
+    return uuid.UUID(decode_token(auth_headers["Authorization"].split()[1])["sub"])
+
+
+@pytest.mark.asyncio
+async def test_repeated_requests_hit_the_cache(client, auth_headers, user_queries):
+    for _ in range(5):
+        res = await client.get(f"{API}/stores/", headers=auth_headers)
+        assert res.status_code == 200
+    assert len(user_queries) <= 1
+
+
+@pytest.mark.asyncio
+async def test_invalidation_applies_deactivation(client, auth_headers):
+    assert (await client.get(f"{API}/stores/", headers=auth_headers)).status_code == 200
+    user_id = _user_id(auth_headers)
+    async with async_session_factory() as db:
+        await db.execute(update(User).where(User.id == user_id).values(is_active=False))
+        await db.commit()
+
+    # Still cached until invalidated (or the TTL runs out)
+    assert (await client.get(f"{API}/stores/", headers=auth_headers)).status_code == 200
+    await invalidate_principal(user_id)
+    assert (await client.get(f"{API}/stores/", headers=auth_headers)).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_profile_update_invalidates(client, auth_headers):
+    assert (await client.get(f"{API}/auth/me", headers=auth_headers)).status_code == 200
+    user_id = _user_id(auth_headers)
+    assert await get_principal_cache().get(user_id) is not None
+
+    res = await client.patch(f"{API}/auth/me", headers=auth_headers, json={"full_name": "Renamed"})
+    assert res.json()["full_name"] == "Renamed"
+    assert await get_principal_cache().get(user_id) is None
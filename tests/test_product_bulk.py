@@ -0,0 +1,88 @@
+"""Tests -- Bulk price/stock updates (set-based, per-row results, catalog version)."""
+
+import uuid
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.product_bulk import _values_update
+
+API = "/api/v1"
+
+
+async def _create(client, auth_headers, store_id, **fields) -> dict:
+    res = await client.post(
+        f"{API}/stores/{store_id}/products", headers=auth_headers, json={"price": 10, **fields}
+    )
+    return res.json()
+
+
+async def _catalog_version(client, auth_headers, store_id) -> int:
+    res = await client.get(f"{API}/stores/{store_id}", headers=auth_headers)
+    return res.json()["catalog_version"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_by_id_and_sku(client, auth_headers, store_id):
+    cup = await _create(client, auth_headers, store_id, name="Cup", sku="CUP-1")
+    pen = await _create(
+        client, auth_headers, store_id, name="Pen", sku="PEN-1", compare_at_price=15
+    )
+    await _create(client, auth_headers, store_id, name="Pen B", sku="DUP")
+    await _create(client, auth_headers, store_id, name="Pen C", sku="DUP")
+    version = await _catalog_version(client, auth_headers, store_id)
+
+    res = await client.patch(
+        f"{API}/stores/{store_id}/products/bulk",
+        headers=auth_headers,
+        json={
+            "changes": [
+                {"product_id": cup["id"], "price": "12.50", "stock_quantity": 40},
+                {"sku": "PEN-1", "compare_at_price": None, "is_active": False},
+                {"sku": "CUP-1", "stock_quantity": 41},
+                {"sku": "DUP", "price": 1},
+                {"product_id": str(uuid.uuid4()), "price": 1},
+            ]
+        },
+    )
+    assert res.status_code == 200
+    data = res.json()
+    assert (data["updated"], data["failed"]) == (3, 2)
+    statuses = [r["status"] for r in data["results"]]
+    assert statuses == ["updated", "updated", "updated", "ambiguous", "not_found"]
+    assert data["results"][1]["product_id"] == pen["id"]
+    assert data["catalog_version"] == version + 1
+
+    cup_after = (await client.get(f"{API}/products/{cup['id']}", headers=auth_headers)).json()
+    assert (cup_after["price"], cup_after["stock_quantity"]) == ("12.50", 41)
+    pen_after = (await client.get(f"{API}/products/{pen['id']}", headers=auth_headers)).json()
+    assert pen_after["compare_at_price"] is None
+    assert pen_after["is_active"] is False
+    assert pen_after["price"] == "10.00"
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_validates_rows(client, auth_headers, store_id):
+    url = f"{API}/stores/{store_id}/products/bulk"
+    invalid = [
+        {"price": 5},  # no target
+        {"sku": "X", "product_id": str(uuid.uuid4()), "price": 5},  # two targets
+        {"sku": "X"},  # nothing to change
+        {"sku": "X", "stock_quantity": -1},
+    ]
+    for change in invalid:
+        res = await client.patch(url, headers=auth_headers, json={"changes": [change]})
+        assert res.status_code == 422
+
+
+def test_postgres_statement_is_single_update_from_values():
+    product_ids = [uuid.uuid4(), uuid.uuid4()]
+    stmt = _values_update(
+        uuid.uuid4(),
+        ("price", "stock_quantity"),
+        [{"id": pid, "price": 5, "stock_quantity": 3} for pid in product_ids],
+    )
+    sql = str(stmt.compile(dialect=postgresql.asyncpg.dialect()))
+    assert sql.startswith("UPDATE products SET price=changes.price")
+    assert "FROM (VALUES" in sql
+    assert sql.count("UPDATE") == 1
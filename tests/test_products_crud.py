@@ -71,20 +71,21 @@ async def test_create_product_no_auth(client, store_id):
 
 
 @pytest.mark.asyncio
-async def test_list_products_empty(client, auth_headers, store_id):
-    """New store should have 0 products."""
+async def test_list_products_generated_catalog(client, auth_headers, store_id):
+    """A generated store should list its generated featured products."""
     res = await client.get(
         f"{API}/stores/{store_id}/products", headers=auth_headers
     )
     assert res.status_code == 200
     data = res.json()
-    assert data["total"] == 0
-    assert data["items"] == []
+    assert data["total"] > 0
+    assert all(p["is_featured"] for p in data["items"])
 
 
 @pytest.mark.asyncio
 async def test_list_products_after_create(client, auth_headers, store_id):
     """Should list created products."""
+    before = (await client.get(f"{API}/stores/{store_id}/products", headers=auth_headers)).json()
     # Create 2 products
     await client.post(
         f"{API}/stores/{store_id}/products",
@@ -102,8 +103,8 @@ async def test_list_products_after_create(client, auth_headers, store_id):
     )
     assert res.status_code == 200
     data = res.json()
-    assert data["total"] == 2
-    assert len(data["items"]) == 2
+    assert data["total"] == before["total"] + 2
+    assert {"Product A", "Product B"} <= {p["name"] for p in data["items"]}
 
 
 @pytest.mark.asyncio
@@ -134,6 +135,7 @@ async def test_list_products_search(client, auth_headers, store_id):
 @pytest.mark.asyncio
 async def test_list_products_pagination(client, auth_headers, store_id):
     """Pagination should limit results."""
+    before = (await client.get(f"{API}/stores/{store_id}/products", headers=auth_headers)).json()
     for i in range(3):
         await client.post(
             f"{API}/stores/{store_id}/products",
@@ -148,7 +150,7 @@ async def test_list_products_pagination(client, auth_headers, store_id):
     )
     assert res.status_code == 200
     data = res.json()
-    assert data["total"] == 3
+    assert data["total"] == before["total"] + 3
     assert len(data["items"]) == 2
 
 
@@ -0,0 +1,88 @@
+"""Tests -- Set-based slug allocator (bulk allocation, constraint retry, renames)."""
+
+import uuid
+
+import pytest
+
+from app.database import async_session_factory
+from app.models.category import Category
+from app.models.store import Store
+from app.utils import slugs
+from app.utils.slugs import allocate_slugs, flush_with_unique_slugs
+
+API = "/api/v1"
+
+
+async def _store_ids(store_id: str):
+    async with async_session_factory() as db:
+        store = await db.get(Store, uuid.UUID(store_id))
+        return store.id, store.tenant_id
+
+
+async def _add_categories(store_id: str, slug_list: list[str]) -> None:
+    sid, tenant_id = await _store_ids(store_id)
+    async with async_session_factory() as db:
+        db.add_all(
+            Category(tenant_id=tenant_id, store_id=sid, name=slug, slug=slug) for slug in slug_list
+        )
+        await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_allocate_slugs_bulk(store_id):
+    """Existing slugs and duplicates inside the batch get the smallest free suffix."""
+    await _add_categories(store_id, ["item", "item-1", "item-3", "items", "shoe-1"])
+    sid, _ = await _store_ids(store_id)
+
+    async with async_session_factory() as db:
+        allocated = await allocate_slugs(
+            db, Category, Category.store_id == sid, ["item", "item", "item", "shoe", "shoe-1"]
+        )
+    assert allocated == ["item-2", "item-4", "item-5", "shoe", "shoe-1-1"]
+
+
+@pytest.mark.asyncio
+async def test_flush_retries_after_concurrent_insert(store_id, monkeypatch):
+    """A slug taken between allocation and insert is re-allocated, not a 500."""
+    await _add_categories(store_id, ["gifts"])
+    sid, tenant_id = await _store_ids(store_id)
+
+    real_allocate = slugs.allocate_slugs
+    calls = []
+
+    async def stale_allocate(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 1:
+            return ["gifts"]  # what a racing request would have seen
+        return await real_allocate(*args, **kwargs)
+
+    monkeypatch.setattr(slugs, "allocate_slugs", stale_allocate)
+    async with async_session_factory() as db:
+        category = Category(tenant_id=tenant_id, store_id=sid, name="Gifts")
+        await flush_with_unique_slugs(
+            db, Category, Category.store_id == sid, [category], ["gifts"]
+        )
+        await db.commit()
+    assert len(calls) == 2
+    assert category.slug == "gifts-1"
+
+
+@pytest.mark.asyncio
+async def test_rename_keeps_slugs_unique(client, auth_headers, store_id):
+    """Renaming a product onto an existing name must not duplicate the slug."""
+    url = f"{API}/stores/{store_id}/products"
+    first = await client.post(url, headers=auth_headers, json={"name": "Lamp", "price": 5})
+    second = await client.post(url, headers=auth_headers, json={"name": "Desk", "price": 9})
+    res = await client.patch(
+        f"{API}/products/{second.json()['id']}", headers=auth_headers, json={"name": "Lamp"}
+    )
+    assert res.status_code == 200
+    assert first.json()["slug"] == "lamp"
+    assert res.json()["slug"] == "lamp-1"
+    assert res.json()["name"] == "Lamp"
+
+    # Renaming to its own current name keeps the slug
+    again = await client.patch(
+        f"{API}/products/{second.json()['id']}", headers=auth_headers, json={"name": "Lamp"}
+    )
+    assert again.json()["slug"] == "lamp-1"
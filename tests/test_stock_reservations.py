@@ -0,0 +1,168 @@
+"""Tests -- Stock reservations (guarded decrements, TTL holds, sweeper, conversion)."""
+
+import uuid
+
+import pytest
+from sqlalchemy import select, update
+
+from app.database import async_session_factory
+from app.models.inventory import StockReservation
+from app.models.order import Order
+from app.models.product import Product
+from app.services.inventory_reservations import (
+    InsufficientStockError,
+    release_expired_reservations,
+    take_stock,
+)
+
+API = "/api/v1"
+
+
+async def _product(client, auth_headers, store_id, stock: int) -> str:
+    res = await client.post(
+        f"{API}/stores/{store_id}/products",
+        headers=auth_headers,
+        json={"name": f"Item {uuid.uuid4().hex[:6]}", "price": 10, "stock_quantity": stock},
+    )
+    return res.json()["id"]
+
+
+async def _checkout(client, auth_headers, store_id, product_id, quantity, method="mada"):
+    return await client.post(
+        f"{API}/stores/{store_id}/checkout",
+        headers=auth_headers,
+        json={
+            "items": [{"product_id": product_id, "quantity": quantity}],
+            "customer_name": "Sara",
+            "customer_email": "sara@example.com",
+            "shipping_address": {"city": "Jeddah"},
+            "payment_method": method,
+        },
+    )
+
+
+async def _stock(client, auth_headers, product_id) -> int:
+    res = await client.get(f"{API}/products/{product_id}", headers=auth_headers)
+    return res.json()["stock_quantity"]
+
+
+async def _holds(order_id: str) -> list[StockReservation]:
+    async with async_session_factory() as db:
+        rows = await db.execute(
+            select(StockReservation).where(StockReservation.order_id == uuid.UUID(order_id))
+        )
+        return list(rows.scalars())
+
+
+async def _expire_holds() -> None:
+    async with async_session_factory() as db:
+        await db.execute(update(StockReservation).values(expires_at=StockReservation.created_at))
+        await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_guarded_decrement_rejects_stale_read(client, auth_headers, store_id):
+    """Two checkouts that both saw enough stock cannot both take it."""
+    product_id = uuid.UUID(await _product(client, auth_headers, store_id, stock=3))
+
+    async with async_session_factory() as first, async_session_factory() as second:
+        seen_by_first = await first.get(Product, product_id)
+        seen_by_second = await second.get(Product, product_id)
+        assert await take_stock(first, [(seen_by_first, 2)]) == {product_id: 2}
+        await first.commit()
+
+        with pytest.raises(InsufficientStockError) as exc:
+            await take_stock(second, [(seen_by_second, 2)])
+        assert exc.value.available == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_hold_cancels_order_and_returns_stock(client, auth_headers, store_id):
+    product_id = await _product(client, auth_headers, store_id, stock=5)
+    order = (await _checkout(client, auth_headers, store_id, product_id, 3)).json()
+    assert await _stock(client, auth_headers, product_id) == 2
+    [hold] = await _holds(order["id"])
+    assert (hold.quantity, hold.status) == (3, "held")
+
+    # Not expired yet — nothing happens
+    assert await release_expired_reservations() == 0
+
+    await _expire_holds()
+    assert await release_expired_reservations() == 1
+    assert await _stock(client, auth_headers, product_id) == 5
+    res = await client.get(f"{API}/orders/{order['id']}", headers=auth_headers)
+    assert res.json()["status"] == "cancelled"
+    [hold] = await _holds(order["id"])
+    assert hold.status == "released"
+
+    # A second sweep must not return the stock twice
+    assert await release_expired_reservations() == 0
+    assert await _stock(client, auth_headers, product_id) == 5
+
+
+@pytest.mark.asyncio
+async def test_paid_order_keeps_its_stock(client, auth_headers, store_id, gateway_statuses):
+    gateway_statuses["pay_1"] = "paid"
+    product_id = await _product(client, auth_headers, store_id, stock=4)
+    order = (await _checkout(client, auth_headers, store_id, product_id, 4)).json()
+
+    res = await client.post(
+        f"{API}/payments/webhook",
+        json={"id": "pay_1", "status": "paid", "metadata": {"order_id": order["order_number"]}},
+    )
+    assert res.json()["status"] == "accepted"
+    [hold] = await _holds(order["id"])
+    assert hold.status == "converted"
+
+    await _expire_holds()
+    assert await release_expired_reservations() == 0
+    assert await _stock(client, auth_headers, product_id) == 0
+
+    sold_out = await _checkout(client, auth_headers, store_id, product_id, 1)
+    assert sold_out.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_cash_on_delivery_has_no_expiring_hold(client, auth_headers, store_id):
+    product_id = await _product(client, auth_headers, store_id, stock=2)
+    order = (await _checkout(client, auth_headers, store_id, product_id, 1, "cod")).json()
+    assert await _holds(order["id"]) == []
+    assert await _stock(client, auth_headers, product_id) == 1
+
+
+@pytest.mark.asyncio
+async def test_payment_after_expiry_retakes_stock_or_is_refunded(
+    client, auth_headers, store_id, gateway_statuses
+):
+    product_id = await _product(client, auth_headers, store_id, stock=2)
+    first = (await _checkout(client, auth_headers, store_id, product_id, 2)).json()
+    await _expire_holds()
+    assert await release_expired_reservations() == 1
+    second = (await _checkout(client, auth_headers, store_id, product_id, 1)).json()
+    assert await _stock(client, auth_headers, product_id) == 1
+
+    # Only one of the two cancelled units is left: the late payment cannot take them
+    gateway_statuses["pay_late"] = "paid"
+    res = await client.post(
+        f"{API}/payments/webhook",
+        json={"id": "pay_late", "status": "paid", "metadata": {"order_id": first["order_number"]}},
+    )
+    assert res.json()["status"] == "accepted"
+    res = await client.get(f"{API}/orders/{first['id']}", headers=auth_headers)
+    assert (res.json()["status"], res.json()["payment_status"]) == ("cancelled", "refund_due")
+    assert await _stock(client, auth_headers, product_id) == 1
+
+    # The second order expires too; its late payment finds its stock still there
+    await _expire_holds()
+    assert await release_expired_reservations() == 1
+    async with async_session_factory() as db:
+        await db.execute(
+            update(Order).where(Order.id == uuid.UUID(second["id"])).values(payment_id="pay_back")
+        )
+        await db.commit()
+    gateway_statuses["pay_back"] = "paid"
+    res = await client.get(f"{API}/payments/callback/{second['order_number']}")
+    assert res.json()["status"] == "success"
+    res = await client.get(f"{API}/orders/{second['id']}", headers=auth_headers)
+    assert (res.json()["status"], res.json()["payment_status"]) == ("paid", "paid")
+    assert await _stock(client, auth_headers, product_id) == 1
@@ -0,0 +1,81 @@
+"""Tests -- Batch store generation (bulk create, plan limit, aggregate progress)."""
+
+import pytest
+from sqlalchemy import update
+
+from app.database import async_session_factory
+from app.models.tenant import Tenant
+from app.workers.inline_executor import inline_executor
+
+API = "/api/v1"
+
+
+def _specs(*names: str) -> dict:
+    return {"stores": [{"name": name, "store_type": "fashion"} for name in names]}
+
+
+async def _upgrade_plan(plan: str) -> None:
+    async with async_session_factory() as db:
+        await db.execute(update(Tenant).values(plan=plan))
+        await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_batch_generate_creates_all_stores(client, auth_headers):
+    """Every spec gets a store and a job; duplicate names get distinct slugs."""
+    await _upgrade_plan("pro")
+    res = await client.post(
+        f"{API}/stores/generate/batch",
+        headers=auth_headers,
+        json=_specs("Agency Shop", "Agency Shop", "Second Shop"),
+    )
+    assert res.status_code == 202, res.text
+    data = res.json()
+    assert data["total"] == 3
+    assert len(data["job_ids"]) == len(data["store_ids"]) == 3
+
+    await inline_executor.drain()
+
+    stores = (await client.get(f"{API}/stores/", headers=auth_headers)).json()["stores"]
+    slugs = sorted(store["slug"] for store in stores)
+    assert slugs == ["agency-shop", "agency-shop-1", "second-shop"]
+    assert {store["status"] for store in stores} == {"active"}
+
+    status_res = await client.get(
+        f"{API}/stores/generate/batch/{data['batch_id']}", headers=auth_headers
+    )
+    assert status_res.status_code == 200
+    summary = status_res.json()
+    assert summary["status"] == "done"
+    assert summary["progress"] == 100
+    assert (summary["total"], summary["done"], summary["failed"]) == (3, 3, 0)
+
+    batch_job = (await client.get(f"{API}/jobs/{data['batch_id']}", headers=auth_headers)).json()
+    assert batch_job["status"] == "done"
+    assert batch_job["result"] == {"total": 3, "done": 3, "failed": 0}
+
+
+@pytest.mark.asyncio
+async def test_batch_generate_respects_plan_limit(client, auth_headers):
+    """A batch that would exceed the plan is rejected without creating anything."""
+    res = await client.post(
+        f"{API}/stores/generate/batch",
+        headers=auth_headers,
+        json=_specs("One", "Two", "Three", "Four"),
+    )
+    assert res.status_code == 403
+
+    stores = (await client.get(f"{API}/stores/", headers=auth_headers)).json()
+    assert stores["total"] == 0
+
+
+@pytest.mark.asyncio
+async def test_batch_status_other_tenant_not_found(client, auth_headers, auth_headers_2):
+    """Tenants cannot read each other's batch progress."""
+    res = await client.post(
+        f"{API}/stores/generate/batch", headers=auth_headers, json=_specs("Private Shop")
+    )
+    batch_id = res.json()["batch_id"]
+
+    other = await client.get(f"{API}/stores/generate/batch/{batch_id}", headers=auth_headers_2)
+    assert other.status_code == 404
@@ -0,0 +1,104 @@
+"""Tests -- Store webhooks (public https URLs only, pinned address, signed bodies)."""
+
+import hashlib
+import hmac
+import socket
+
+import httpx
+import pytest
+
+from app.services.store_webhooks import WebhookURLError, post_webhook
+
+API = "/api/v1"
+
+
+@pytest.fixture
+def dns(monkeypatch) -> dict[str, str]:
+    """Fake resolver: tests map host names to addresses here."""
+    records: dict[str, str] = {"localhost": "127.0.0.1"}
+
+    def getaddrinfo(host, port, family=0, type=0, proto=0, flags=0):
+        if host not in records:
+            raise socket.gaierror(socket.EAI_NONAME, "unknown host")
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (records[host], port))]
+
+    monkeypatch.setattr(socket, "getaddrinfo", getaddrinfo)
+    return records
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "url",
+    [
+        "http://hooks.example.com/orders",
+        "https://localhost/orders",
+        "https://169.254.169.254/latest/meta-data",
+        "https://internal.example.com/orders",
+        "https://user:pw@hooks.example.com/orders",
+    ],
+)
+async def test_non_public_webhook_url_is_rejected(client, auth_headers, store_id, dns, url):
+    dns["hooks.example.com"] = "93.184.216.34"
+    dns["internal.example.com"] = "10.0.0.7"
+    res = await client.patch(
+        f"{API}/stores/{store_id}", headers=auth_headers, json={"config": {"webhook_url": url}}
+    )
+    assert res.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_saving_a_webhook_url_generates_its_secret(client, auth_headers, store_id, dns):
+    dns["hooks.example.com"] = "93.184.216.34"
+    res = await client.patch(
+        f"{API}/stores/{store_id}",
+        headers=auth_headers,
+        json={
+            "config": {"webhook_url": "https://hooks.example.com/orders", "webhook_secret": "x"}
+        },
+    )
+    assert res.status_code == 200, res.text
+    secret = res.json()["config"]["webhook_secret"]
+    assert len(secret) == 64
+
+    # Saving again keeps the secret the merchant already verifies with
+    res = await client.patch(
+        f"{API}/stores/{store_id}",
+        headers=auth_headers,
+        json={"config": {"webhook_url": "https://hooks.example.com/v2"}},
+    )
+    assert res.json()["config"]["webhook_secret"] == secret
+
+
+@pytest.mark.asyncio
+async def test_delivery_is_signed_and_sent_to_the_checked_address(dns, monkeypatch):
+    dns["hooks.example.com"] = "93.184.216.34"
+    sent = {}
+
+    async def post(self, url, **kwargs):
+        sent.update(kwargs, url=url)
+        return httpx.Response(200, request=httpx.Request("POST", url))
+
+    monkeypatch.setattr(httpx.AsyncClient, "post", post)
+    await post_webhook("https://hooks.example.com/orders", "s3cret", "order.paid", b'{"a":1}')
+
+    assert sent["url"] == "https://93.184.216.34:443/orders"
+    assert sent["headers"]["Host"] == "hooks.example.com"
+    assert sent["extensions"] == {"sni_hostname": "hooks.example.com"}
+    timestamp, signature = (
+        part.split("=", 1)[1] for part in sent["headers"]["X-Webflow-Signature"].split(",")
+    )
+    expected = hmac.new(b"s3cret", f"{timestamp}.".encode() + b'{"a":1}', hashlib.sha256)
+    assert signature == expected.hexdigest()
+
+
+@pytest.mark.asyncio
+async def test_delivery_rechecks_the_address(dns, monkeypatch):
+    # Saved while public, now resolving to an internal address
+    dns["hooks.example.com"] = "192.168.1.20"
+
+    async def post(self, url, **kwargs):
+        raise AssertionError("must not be sent")
+
+    monkeypatch.setattr(httpx.AsyncClient, "post", post)
+    with pytest.raises(WebhookURLError):
+        await post_webhook("https://hooks.example.com/orders", "s3cret", "order.paid", b"{}")
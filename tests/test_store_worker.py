@@ -0,0 +1,136 @@
+"""Tests -- Store generation worker (progress reporting, no simulated delays)."""
+
+import time
+import uuid
+
+import pytest
+from sqlalchemy import select
+
+from app.database import async_session_factory
+from app.models.category import Category
+from app.models.job import Job
+from app.models.product import Product
+from app.models.store import Store
+from app.models.tenant import Tenant
+from app.services.catalog_materializer import materialize_catalog
+from app.services.job_progress import JobProgressReporter
+from app.services.store_generator import create_store_and_job, generate_store
+from app.workers.store_worker import process_store_generation
+
+
+async def _create_pending_store(name: str = "Worker Store") -> tuple[str, str, dict]:
+    async with async_session_factory() as db:
+        tenant = Tenant(name="Worker Corp", slug=f"worker-corp-{time.monotonic_ns()}")
+        db.add(tenant)
+        await db.flush()
+        store, job = await create_store_and_job(
+            db, tenant.id, {"name": name, "store_type": "fashion", "language": "ar"}
+        )
+        await db.commit()
+        config = {**store.config, "name": name, "store_type": "fashion", "language": "ar"}
+        return str(job.id), str(store.id), config
+
+
+@pytest.mark.asyncio
+async def test_generate_store_reports_real_stages():
+    """Generator should emit increasing progress events and return the result."""
+    events: list[tuple[str, int]] = []
+
+    async def on_progress(message: str, progress: int) -> None:
+        events.append((message, progress))
+
+    result = await generate_store(
+        "job", "store", {"name": "متجر", "store_type": "beauty"}, on_progress=on_progress
+    )
+    assert result["ai_content"]["categories"]
+    progress_values = [p for _, p in events]
+    assert progress_values == sorted(progress_values)
+    assert progress_values[0] == 10
+    assert progress_values[-1] == 90
+
+
+@pytest.mark.asyncio
+async def test_process_store_generation_completes_fast():
+    """Template generation should finish without simulated sleeps."""
+    job_id, store_id, config = await _create_pending_store()
+
+    started = time.monotonic()
+    result = await process_store_generation({}, job_id, store_id, config)
+    assert time.monotonic() - started < 2
+
+    async with async_session_factory() as db:
+        job = (await db.execute(select(Job))).scalar_one()
+        store = (await db.execute(select(Store))).scalar_one()
+    assert job.status == "done"
+    assert job.progress == 100
+    assert store.status == "active"
+    assert store.config["ai_content"] == result["ai_content"]
+
+
+@pytest.mark.asyncio
+async def test_progress_reporter_coalesces_writes():
+    """Events inside the interval should be merged into one write on flush."""
+    job_id, _store_id, _config = await _create_pending_store()
+
+    async with async_session_factory() as db:
+        reporter = JobProgressReporter(db, uuid.UUID(job_id), min_interval=60)
+        await reporter("a", 10)
+        await reporter("b", 40)
+        await reporter("stale", 20)  # ignored — progress never goes backwards
+        assert reporter.progress == 40
+
+        job = (await db.execute(select(Job))).scalar_one()
+        assert job.progress == 0
+
+        await reporter.flush()
+        await db.refresh(job)
+        assert job.progress == 40
+
+
+@pytest.mark.asyncio
+async def test_generation_materializes_catalog_idempotently():
+    """Generated categories/products become rows once, even if the job is retried."""
+    job_id, store_id, config = await _create_pending_store()
+
+    result = await process_store_generation({}, job_id, store_id, config)
+    ai_content = result["ai_content"]
+    assert result["catalog"] == {
+        "categories": len(ai_content["categories"]),
+        "products": len(ai_content["featured_products"]),
+    }
+
+    # Retrying the same job must not duplicate the catalog
+    retry = await process_store_generation({}, job_id, store_id, config)
+    assert retry["catalog"] == {"categories": 0, "products": 0}
+
+    async with async_session_factory() as db:
+        categories = (await db.execute(select(Category))).scalars().all()
+        products = (await db.execute(select(Product))).scalars().all()
+    assert len(categories) == len(ai_content["categories"])
+    assert len(products) == len(ai_content["featured_products"])
+    assert len({p.slug for p in products}) == len(products)
+    assert all(str(p.store_id) == store_id and p.is_featured for p in products)
+
+
+@pytest.mark.asyncio
+async def test_malformed_catalog_entries_are_skipped():
+    """A string or null in the model's catalog must not fail the whole job."""
+    _, store_id, _ = await _create_pending_store("Malformed Catalog")
+    ai_content = {
+        "categories": ["Shoes", None, {"name": "Bags"}, {"name": 7}],
+        "featured_products": [
+            {"name": "Tote", "price": "120", "category": "Bags"},
+            "Sneaker",
+            {"name": "Clutch", "category": ["Bags"]},
+        ],
+    }
+
+    async with async_session_factory() as db:
+        store = await db.get(Store, uuid.UUID(store_id))
+        counts = await materialize_catalog(db, store, ai_content)
+        await db.commit()
+        products = (await db.execute(select(Product).order_by(Product.name))).scalars().all()
+
+    assert counts == {"categories": 1, "products": 2}
+    assert [p.name for p in products] == ["Clutch", "Tote"]
+    assert products[0].category_id is None and products[1].category_id is not None
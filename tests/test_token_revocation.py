@@ -0,0 +1,131 @@
+"""Tests -- Verified-token cache, token revocation and logout."""
+
+import time
+from collections import Counter
+
+import pytest
+
+from app.services import auth_service, token_revocation
+from app.services.auth_service import VerifiedTokenCache, create_access_token, decode_token
+from app.services.token_revocation import (
+    BloomFilter,
+    MemoryRevocationStore,
+    is_token_revoked,
+    revoke_token,
+)
+
+API = "/api/v1"
+
+USER = {
+    "email": "logout@example.com",
+    "password": "TestPass123!",
+    "full_name": "Logout User",
+    "tenant_name": "Logout Corp",
+}
+
+
+@pytest.mark.asyncio
+async def test_logout_revokes_access_and_refresh_tokens(client):
+    tokens = (await client.post(f"{API}/auth/register", json=USER)).json()
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    assert (await client.get(f"{API}/stores/", headers=headers)).status_code == 200
+
+    res = await client.post(
+        f"{API}/auth/logout", headers=headers, json={"refresh_token": tokens["refresh_token"]}
+    )
+    assert res.status_code == 200
+    assert (await client.get(f"{API}/stores/", headers=headers)).status_code == 401
+    res = await client.post(f"{API}/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert res.status_code == 401
+
+    # A new login is unaffected
+    login = await client.post(
+        f"{API}/auth/login", json={"email": USER["email"], "password": USER["password"]}
+    )
+    fresh = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    assert (await client.get(f"{API}/stores/", headers=fresh)).status_code == 200
+
+
+def test_decode_token_verifies_once(monkeypatch):
+    token = create_access_token({"sub": "user-1"})
+    calls = 0
+    real_decode = auth_service.jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        nonlocal calls
+        calls += 1
+        return real_decode(*args, **kwargs)
+
+    monkeypatch.setattr(auth_service.jwt, "decode", counting_decode)
+    first = decode_token(token)
+    first["sub"] = "tampered"  # callers get their own copy
+    assert decode_token(token)["sub"] == "user-1"
+    assert calls <= 1
+    assert decode_token(token + "x") is None
+
+
+def test_verified_token_cache_respects_expiry():
+    cache = VerifiedTokenCache(max_entries=2)
+    cache.put("expired", {"sub": "a", "exp": time.time() - 1})
+    cache.put("live", {"sub": "b", "exp": time.time() + 60})
+    assert cache.get("expired") is None
+    assert cache.get("live")["sub"] == "b"
+    cache.put("t2", {"exp": time.time() + 60})
+    cache.put("t3", {"exp": time.time() + 60})
+    assert cache.get("live") is None  # evicted
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    revoked = [f"jti-{n}" for n in range(1000)]
+    for jti in revoked:
+        bloom.add(jti)
+    assert all(jti in bloom for jti in revoked)
+    false_positives = sum(f"other-{n}" in bloom for n in range(10_000))
+    assert false_positives < 300
+
+
+class BrokenStore:
+    """A store whose backend is down."""
+
+    async def revoke(self, jti, expires_at):
+        raise ConnectionError("redis down")
+
+    async def revoke_many(self, revoked):
+        raise ConnectionError("redis down")
+
+    async def is_revoked(self, jti):
+        raise ConnectionError("redis down")
+
+
+@pytest.mark.asyncio
+async def test_revocation_check_falls_back_to_the_database(client, monkeypatch):
+    monkeypatch.setattr(token_revocation, "_revocation_store", BrokenStore())
+    monkeypatch.setattr(token_revocation, "revocation_fallbacks", Counter())
+    monkeypatch.setattr(token_revocation, "_store_behind", False)
+    revoked = {"jti": "revoked-while-down", "exp": time.time() + 60}
+    await revoke_token(revoked)  # recorded even though the store is down
+
+    assert await is_token_revoked(revoked)
+    assert not await is_token_revoked({"jti": "live", "exp": time.time() + 60})
+    assert token_revocation.revocation_fallbacks["database"] == 2
+
+    # Once the store answers again it is refilled with what it missed
+    store = MemoryRevocationStore()
+    monkeypatch.setattr(token_revocation, "_revocation_store", store)
+    assert await is_token_revoked(revoked)
+    assert await store.is_revoked("revoked-while-down")
+    assert token_revocation.revocation_fallbacks["database"] == 2
+
+
+@pytest.mark.asyncio
+async def test_revocation_check_fails_closed(client, monkeypatch):
+    async def unavailable(jti):
+        raise ConnectionError("database down")
+
+    monkeypatch.setattr(token_revocation, "_revocation_store", BrokenStore())
+    monkeypatch.setattr(token_revocation, "_revoked_in_database", unavailable)
+    monkeypatch.setattr(token_revocation, "revocation_fallbacks", Counter())
+    monkeypatch.setattr(token_revocation, "_store_behind", False)
+    assert await is_token_revoked({"jti": "unknown", "exp": time.time() + 60})
+    assert token_revocation.revocation_fallbacks["refused"] == 1
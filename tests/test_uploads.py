@@ -0,0 +1,260 @@
+"""Tests -- Streaming image uploads and the object storage backends."""
+
+import asyncio
+import hashlib
+import os
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import uploads
+from app.database import async_session_factory
+from app.models.media import MediaObject, MediaReference
+from app.services import object_storage
+from app.services.object_storage import LocalObjectStorage, S3ObjectStorage
+from app.services.upload_service import UploadService, UploadTooLargeError
+
+API = "/api/v1"
+
+
+def _files(root) -> list[str]:
+    return [name for _, _, names in os.walk(root) for name in names]
+
+
+async def _chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+@pytest.mark.asyncio
+async def test_upload_streams_to_disk_with_hash(client, auth_headers, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(uploads, "CHUNK_SIZE", 1024)
+    content = os.urandom(10_000)
+
+    res = await client.post(
+        f"{API}/upload/image",
+        headers=auth_headers,
+        files={"file": ("shoe.png", content, "image/png")},
+    )
+    assert res.status_code == 201
+    body = res.json()
+    assert body["size"] == len(content)
+    assert body["sha256"] == hashlib.sha256(content).hexdigest()
+    path = body["url"].removeprefix("/static/")
+    with open(path, "rb") as f:
+        assert f.read() == content
+
+
+async def _upload(client, headers, content: bytes) -> dict:
+    res = await client.post(
+        f"{API}/upload/image", headers=headers, files={"file": ("a.gif", content, "image/gif")}
+    )
+    assert res.status_code == 201
+    return res.json()
+
+
+async def _delete(client, headers, url: str) -> int:
+    res = await client.delete(f"{API}/upload/image", headers=headers, params={"url": url})
+    return res.status_code
+
+
+@pytest.mark.asyncio
+async def test_same_content_is_stored_once_until_last_delete(
+    client, auth_headers, auth_headers_2, tmp_path, monkeypatch
+):
+    monkeypatch.chdir(tmp_path)
+    content = os.urandom(3000)
+    first = await _upload(client, auth_headers, content)
+    again = await _upload(client, auth_headers, content)
+    other = await _upload(client, auth_headers_2, content)
+
+    assert first["url"] == again["url"] == other["url"]
+    # Reported per tenant: the second tenant is not told the bytes were known
+    assert [b["deduplicated"] for b in (first, again, other)] == [False, True, False]
+    assert len(_files(tmp_path)) == 1
+
+    url = first["url"]
+    assert [await _delete(client, auth_headers, url) for _ in range(3)] == [204, 204, 404]
+    assert len(_files(tmp_path)) == 1
+
+    assert await _delete(client, auth_headers_2, url) == 204
+    assert _files(tmp_path) == []
+    async with async_session_factory() as db:
+        assert await db.scalar(select(MediaObject).where(MediaObject.url == url)) is None
+        assert await db.scalar(select(MediaReference)) is None
+
+
+@pytest.mark.asyncio
+async def test_tenant_cannot_release_content_it_does_not_hold(
+    client, auth_headers, auth_headers_2, tmp_path, monkeypatch
+):
+    monkeypatch.chdir(tmp_path)
+    url = (await _upload(client, auth_headers, os.urandom(3000)))["url"]
+
+    assert await _delete(client, auth_headers_2, url) == 404
+    assert await _delete(client, auth_headers_2, "/static/uploads/other-tenant/x.png") == 404
+    assert len(_files(tmp_path)) == 1
+
+
+async def _failing_commit(self):
+    raise RuntimeError("database went away")
+
+
+@pytest.mark.asyncio
+async def test_upload_whose_rows_do_not_commit_leaves_no_file(
+    client, auth_headers, tmp_path, monkeypatch
+):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(AsyncSession, "commit", _failing_commit)
+    with pytest.raises(RuntimeError):
+        await _upload(client, auth_headers, os.urandom(3000))
+    assert _files(tmp_path) == []
+
+
+@pytest.mark.asyncio
+async def test_release_deletes_files_only_after_commit(
+    client, auth_headers, tmp_path, monkeypatch
+):
+    monkeypatch.chdir(tmp_path)
+    url = (await _upload(client, auth_headers, os.urandom(3000)))["url"]
+
+    with monkeypatch.context() as patch:
+        patch.setattr(AsyncSession, "commit", _failing_commit)
+        with pytest.raises(RuntimeError):
+            await _delete(client, auth_headers, url)
+    # Rolled back: the object is still recorded, so its file must still be there
+    assert len(_files(tmp_path)) == 1
+    async with async_session_factory() as db:
+        assert await db.scalar(select(MediaObject.ref_count).where(MediaObject.url == url)) == 1
+
+    assert await _delete(client, auth_headers, url) == 204
+    assert _files(tmp_path) == []
+
+
+@pytest.mark.asyncio
+async def test_oversized_upload_stores_nothing(client, auth_headers, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(uploads, "MAX_SIZE", 4096)
+    monkeypatch.setattr(uploads, "CHUNK_SIZE", 1024)
+
+    res = await client.post(
+        f"{API}/upload/image",
+        headers=auth_headers,
+        files={"file": ("big.png", os.urandom(5000), "image/png")},
+    )
+    assert res.status_code == 400
+    assert _files(tmp_path) == []
+
+
+@pytest.mark.asyncio
+async def test_declared_oversized_body_is_refused(client, auth_headers, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(uploads, "MAX_SIZE", 4096)
+
+    res = await client.post(
+        f"{API}/upload/image",
+        headers=auth_headers,
+        files={"file": ("big.png", os.urandom(4096 + uploads.MULTIPART_OVERHEAD), "image/png")},
+    )
+    assert res.status_code == 413
+    assert _files(tmp_path) == []
+
+
+class FakeS3:
+    def __init__(self):
+        self.calls: list[str] = []
+        self.parts: list[bytes] = []
+
+    def create_multipart_upload(self, **kwargs):
+        self.calls.append("create")
+        return {"UploadId": "up-1"}
+
+    def upload_part(self, Body, PartNumber, **kwargs):  # noqa: N803
+        self.calls.append(f"part{PartNumber}")
+        self.parts.append(Body)
+        return {"ETag": f"etag-{PartNumber}"}
+
+    def complete_multipart_upload(self, MultipartUpload, **kwargs):  # noqa: N803
+        self.calls.append(f"complete{len(MultipartUpload['Parts'])}")
+
+    def abort_multipart_upload(self, **kwargs):
+        self.calls.append("abort")
+
+    def put_object(self, Body, **kwargs):  # noqa: N803
+        self.calls.append("put")
+        self.parts.append(Body)
+
+    def delete_objects(self, Delete, **kwargs):  # noqa: N803
+        keys = [item["Key"] for item in Delete["Objects"]]
+        self.calls.append(f"delete{len(keys)}")
+        return {"Deleted": [{"Key": key} for key in keys]}
+
+
+def _r2_service(monkeypatch) -> tuple[UploadService, FakeS3]:
+    s3 = FakeS3()
+    storage = S3ObjectStorage("images", "https://cdn.example.com", client=s3)
+    monkeypatch.setattr(object_storage, "MULTIPART_PART_SIZE", 100)
+    return UploadService(storage), s3
+
+
+@pytest.mark.asyncio
+async def test_r2_upload_switches_to_multipart(monkeypatch):
+    service, s3 = _r2_service(monkeypatch)
+
+    small = await service.upload_image(_chunks(b"x" * 60), "a.jpg")
+    assert s3.calls == ["put"]
+    assert small.url.startswith("https://cdn.example.com/products/")
+
+    s3.calls.clear()
+    s3.parts.clear()
+    big = await service.upload_image(_chunks(*[b"y" * 60] * 4), "b.jpg")
+    assert s3.calls == ["create", "part1", "part2", "complete2"]
+    assert b"".join(s3.parts) == b"y" * 240
+    assert big.size == 240
+
+
+@pytest.mark.asyncio
+async def test_r2_upload_over_limit_is_aborted(monkeypatch):
+    service, s3 = _r2_service(monkeypatch)
+    with pytest.raises(UploadTooLargeError):
+        await service.upload_image(_chunks(*[b"z" * 60] * 4), "c.jpg", max_size=150)
+    assert s3.calls == ["create", "part1", "abort"]
+
+
+@pytest.mark.asyncio
+async def test_r2_batch_delete(monkeypatch):
+    service, s3 = _r2_service(monkeypatch)
+    monkeypatch.setattr(object_storage, "DELETE_BATCH_SIZE", 2)
+    urls = [f"https://cdn.example.com/products/{n}.jpg" for n in range(3)]
+
+    assert await service.delete_images([*urls, "https://elsewhere.com/x.jpg"]) == 3
+    assert s3.calls == ["delete2", "delete1"]
+
+
+@pytest.mark.asyncio
+async def test_local_storage_keeps_keys_inside_root(tmp_path):
+    service = UploadService(LocalObjectStorage(root=str(tmp_path)))
+    stored = await service.upload_image(_chunks(b"abc"), "a.png", folder="t1/products")
+    (tmp_path / "secret.txt").write_text("keep")
+
+    assert not await service.delete_image("/static/uploads/../secret.txt")
+    assert await service.delete_images([stored.url, stored.url]) == 1
+    assert _files(tmp_path) == ["secret.txt"]
+
+
+@pytest.mark.asyncio
+async def test_local_storage_concurrent_writes_of_one_key(tmp_path):
+    storage = LocalObjectStorage(root=str(tmp_path))
+
+    async def slow_chunks():
+        yield b"same "
+        await asyncio.sleep(0.01)
+        yield b"bytes"
+
+    await asyncio.gather(
+        *(storage.upload("media/ab/ab.png", slow_chunks(), "image/png") for _ in range(3))
+    )
+    assert _files(tmp_path) == ["ab.png"]
+    assert (tmp_path / "media/ab/ab.png").read_bytes() == b"same bytes"